@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark cache payload codecs on realistic tool responses
+
+Compares the legacy json.dumps TEXT format against CacheCodec with no
+compression, zlib and (when installed) zstd: encode time, decode time and
+stored size per payload.
+
+Usage:
+    python benchmarks/cache_codec_benchmark.py [--iterations 2000]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import cache_codec
+from src.services.cache_codec import CacheCodec
+
+LABEL_TEXT = (
+    "Sertraline hydrochloride tablets are indicated for the treatment of major depressive disorder "
+    "in adults, obsessive-compulsive disorder in adults and pediatric patients aged 6 years and older, "
+    "panic disorder, posttraumatic stress disorder, social anxiety disorder and premenstrual dysphoric "
+    "disorder. Monitor all antidepressant-treated patients for clinical worsening and for emergence of "
+    "suicidal thoughts and behaviors, especially during the initial few months of drug therapy. "
+)
+
+def fda_label_response() -> Dict[str, Any]:
+    """FDA label lookup shaped like FDATool results"""
+    section = [LABEL_TEXT * 4, LABEL_TEXT * 2]
+    return {
+        "status": "success",
+        "drug_name": "sertraline",
+        "results": {
+            "brand_names": ["Zoloft"],
+            "generic_names": ["SERTRALINE HYDROCHLORIDE"],
+            "manufacturer": ["Pfizer Laboratories Div Pfizer Inc"],
+            "indications": section,
+            "dosage": section,
+            "warnings": section,
+            "contraindications": section[:1],
+            "adverse_reactions": section,
+            "drug_interactions": section,
+            "pregnancy": section[:1]
+        },
+        "total_results": 12
+    }
+
+def clinical_trials_response() -> Dict[str, Any]:
+    """Clinical trials search shaped like ClinicalTrialsTool results"""
+    trials = []
+    for i in range(10):
+        trials.append({
+            "nct_id": f"NCT0{5000000 + i}",
+            "title": f"A Phase 3 Study of Investigational Therapy {i} in Adults With Type 2 Diabetes",
+            "status": "RECRUITING",
+            "phase": "PHASE3",
+            "study_type": "INTERVENTIONAL",
+            "conditions": ["Type 2 Diabetes Mellitus", "Obesity"],
+            "locations": [
+                {
+                    "facility": f"Research Site {j}",
+                    "city": ["Boston", "Chicago", "Houston", "Seattle"][j % 4],
+                    "state": ["Massachusetts", "Illinois", "Texas", "Washington"][j % 4],
+                    "country": "United States"
+                }
+                for j in range(40)
+            ],
+            "sponsor": "Example Pharmaceuticals",
+            "url": f"https://clinicaltrials.gov/study/NCT0{5000000 + i}",
+            "eligibility": {"gender": "ALL", "min_age": "18 Years", "max_age": "75 Years", "healthy_volunteers": False}
+        })
+    return {"status": "success", "condition": "diabetes", "search_status": "recruiting", "total_results": 10, "trials": trials}
+
+def icd_response() -> Dict[str, Any]:
+    """Small ICD-10 lookup shaped like MedicalTerminologyTool results"""
+    return {
+        "status": "success",
+        "search_term": "diabetes",
+        "total_results": 3,
+        "codes": [
+            {"code": "E11.9", "description": "Type 2 diabetes mellitus without complications"},
+            {"code": "E10.9", "description": "Type 1 diabetes mellitus without complications"},
+            {"code": "O24.419", "description": "Gestational diabetes mellitus in pregnancy, unspecified control"}
+        ]
+    }
+
+def time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    """Average wall time of func in microseconds"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def codecs() -> List[Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]]:
+    """Codecs to compare as (name, encode, decode)"""
+    candidates = [("legacy json text", json.dumps, json.loads)]
+    settings = [("codec none", "none"), ("codec zlib", "zlib")]
+    if cache_codec.zstandard is not None:
+        settings.append(("codec zstd", "zstd"))
+    for name, compression in settings:
+        codec = CacheCodec(compression=compression)
+        candidates.append((name, codec.encode, codec.decode))
+    return candidates
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cache payload codecs")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations per measurement")
+    args = parser.parse_args()
+    
+    payloads = {
+        "fda_label": fda_label_response(),
+        "clinical_trials": clinical_trials_response(),
+        "icd10": icd_response()
+    }
+    
+    print(f"orjson: {'yes' if cache_codec.orjson is not None else 'no'}, "
+          f"zstandard: {'yes' if cache_codec.zstandard is not None else 'no'}")
+    print(f"{'payload':<16} {'codec':<18} {'bytes':>9} {'ratio':>7} {'encode us':>10} {'decode us':>10}")
+    for payload_name, value in payloads.items():
+        baseline = len(json.dumps(value).encode("utf-8"))
+        for codec_name, encode, decode in codecs():
+            stored = encode(value)
+            size = len(stored.encode("utf-8")) if isinstance(stored, str) else len(stored)
+            encode_us = time_per_call(lambda: encode(value), args.iterations)
+            decode_us = time_per_call(lambda: decode(stored), args.iterations)
+            print(f"{payload_name:<16} {codec_name:<18} {size:>9} {size / baseline:>7.2f} "
+                  f"{encode_us:>10.1f} {decode_us:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Simulate upstream load after a synchronized cache warm-up
+
+Every key is written at t=0, as the startup warm-up or a traffic spike
+does, and then requested with Zipf-distributed popularity. A lookup that
+misses starts an upstream fetch that completes after --latency seconds;
+lookups of a key whose fetch is running share it, as BaseTool's
+single-flight does. The clock is simulated, so hours of traffic replay in
+seconds against the real InMemoryCacheService.
+
+Three policies are compared: a fixed TTL, TTL jitter, and TTL jitter with
+probabilistic early refresh. For each, the upstream request rate is
+reported: peak and 99th percentile per second, peak per minute (openFDA
+allows 240 requests per minute without an API key), and seconds above
+--limit.
+
+Usage:
+    python benchmarks/cache_expiry_simulation.py [--keys 2000] [--ttl 600] [--rate 50]
+"""
+import os
+import sys
+import heapq
+import random
+import argparse
+import itertools
+from collections import Counter
+from typing import Dict, List, Tuple
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.memory_cache_service import InMemoryCacheService
+
+POLICIES: List[Tuple[str, float, float]] = [
+    ("fixed ttl", 0.0, 0.0),
+    ("jitter", 0.1, 0.0),
+    ("jitter + early refresh", 0.1, 1.0)
+]
+
+class SimulatedClock:
+    """Clock standing in for time.time() and time.monotonic()"""
+    
+    def __init__(self, start: float = 1_000_000.0):
+        self.start = start
+        self.now = start
+    
+    def __call__(self) -> float:
+        return self.now
+
+def simulate(args: argparse.Namespace, ttl_jitter: float, beta: float) -> Dict[str, float]:
+    """
+    Replay one policy
+    
+    Returns:
+        Dictionary with lookups, upstream fetches, early refreshes and the
+        peak, p99 and over-limit seconds of the upstream request rate
+    """
+    rng = random.Random(args.seed)
+    # TTL jitter and early refresh draw from the module-level generator
+    random.seed(args.seed)
+    clock = SimulatedClock()
+    keys = [f"fda_drug:v2:s1:search_type=general|drug=drug{i}" for i in range(args.keys)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** args.zipf for rank in range(args.keys)))
+    
+    with mock.patch("time.time", clock), mock.patch("time.monotonic", clock), \
+            mock.patch.dict(os.environ, {"CACHE_MEMORY_MAX_ENTRIES": str(args.keys * 2)}):
+        cache = InMemoryCacheService(ttl=args.ttl)
+        cache.serve_stale = False
+        cache.ttl_jitter = ttl_jitter
+        cache.early_refresh_beta = beta
+        cache.default_recompute_seconds = args.latency if beta else 0.0
+        
+        # Synchronized warm-up: every key is written at the same instant
+        for key in keys:
+            cache.set(key, {"key": key}, ttl=args.ttl)
+        
+        fetches_per_second: Counter = Counter()
+        completions: List[Tuple[float, str]] = []
+        in_flight = set()
+        lookups = 0
+        t = 0.0
+        while t < args.duration:
+            t += rng.expovariate(args.rate)
+            # Complete the fetches that finished before this lookup
+            while completions and completions[0][0] <= t:
+                done_at, key = heapq.heappop(completions)
+                clock.now = clock.start + done_at
+                cache.set(key, {"key": key}, ttl=args.ttl)
+                in_flight.discard(key)
+            
+            clock.now = clock.start + t
+            key = rng.choices(keys, cum_weights=cum_weights)[0]
+            lookups += 1
+            if cache.get(key) is None and key not in in_flight:
+                in_flight.add(key)
+                fetches_per_second[int(t)] += 1
+                heapq.heappush(completions, (t + args.latency, key))
+    
+    per_second = [fetches_per_second.get(second, 0) for second in range(int(args.duration))]
+    per_minute = [sum(per_second[start:start + 60]) for start in range(0, len(per_second), 60)]
+    rates = sorted(per_second)
+    return {
+        "lookups": lookups,
+        "fetches": sum(rates),
+        "early_refreshes": cache.get_metrics()["totals"]["early_refreshes"],
+        "peak": rates[-1],
+        "p99": rates[int(len(rates) * 0.99) - 1],
+        "peak_minute": max(per_minute),
+        "over_limit": sum(1 for rate in rates if rate > args.limit)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate upstream load after a synchronized cache warm-up")
+    parser.add_argument("--keys", type=int, default=2000, help="Distinct cache keys")
+    parser.add_argument("--ttl", type=int, default=600, help="TTL of every entry in seconds")
+    parser.add_argument("--rate", type=float, default=50, help="Lookups per second")
+    parser.add_argument("--zipf", type=float, default=1.0, help="Zipf exponent of key popularity")
+    parser.add_argument("--latency", type=float, default=1.5, help="Upstream fetch latency in seconds")
+    parser.add_argument("--limit", type=int, default=10, help="Upstream requests per second above which a second counts as over the limit")
+    parser.add_argument("--cycles", type=float, default=3.5, help="Simulated duration in TTLs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.duration = args.ttl * args.cycles
+    
+    print(f"{args.keys} keys warmed at t=0, ttl={args.ttl}s, {args.rate:g} lookups/s for {args.duration:g}s, "
+          f"upstream latency {args.latency:g}s")
+    print(f"{'policy':<24} {'lookups':>8} {'fetches':>8} {'early':>6} {'peak/s':>7} {'p99/s':>6} "
+          f"{'peak/min':>9} {'s over limit':>13}")
+    for name, ttl_jitter, beta in POLICIES:
+        result = simulate(args, ttl_jitter, beta)
+        print(f"{name:<24} {result['lookups']:>8} {result['fetches']:>8} {result['early_refreshes']:>6} "
+              f"{result['peak']:>7} {result['p99']:>6} {result['peak_minute']:>9} {result['over_limit']:>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Replay a query log and compare cache hit rates of legacy and canonical keys
+
+Each lookup in the log is keyed both with the legacy scheme (MD5 of the
+raw arguments joined with "_") and with build_cache_key(). A lookup is a
+hit if an earlier lookup produced the same key, i.e. the cache is assumed
+unbounded and nothing expires, so the difference between the two columns
+is purely due to key canonicalization.
+
+The log is JSON Lines with one lookup per line:
+    {"prefix": "fda_drug", "args": ["label", "Sertraline"]}
+
+Without --log a built-in sample of realistic lookup variants is replayed.
+
+Usage:
+    python benchmarks/cache_key_replay.py [--log queries.jsonl] [--synonyms synonyms.json]
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import cache_keys
+from src.services.cache_keys import build_cache_key
+
+SAMPLE_LOG: List[Tuple[str, List[Any]]] = [
+    ("fda_drug", ["general", "sertraline"]),
+    ("fda_drug", ["general", "Sertraline"]),
+    ("fda_drug", ["general", "sertraline "]),
+    ("fda_drug", ["general", "SERTRALINE"]),
+    ("fda_drug", ["label", "ibuprofen"]),
+    ("fda_drug", ["label", "Ibuprofen"]),
+    ("fda_drug", ["label", "metformin"]),
+    ("fda_drug", ["adverse_events", "Metformin"]),
+    ("fda_drug", ["adverse_events", "metformin"]),
+    ("pubmed_search", ["covid vaccine myocarditis", 5, ""]),
+    ("pubmed_search", ["myocarditis covid vaccine", 5, ""]),
+    ("pubmed_search", ["Covid  Vaccine Myocarditis", 5, ""]),
+    ("pubmed_search", ["statin muscle pain", 10, "5"]),
+    ("pubmed_search", ["statin  muscle pain ", 10, "5"]),
+    ("pubmed_search", ['"heart failure" AND sglt2', 5, ""]),
+    ("pubmed_search", ['"Heart Failure" AND SGLT2', 5, ""]),
+    ("clinical_trials", ["diabetes", "recruiting", 10]),
+    ("clinical_trials", ["Diabetes", "recruiting", 10]),
+    ("clinical_trials", ["type 2 diabetes", "recruiting", 10]),
+    ("clinical_trials", ["Type 2  Diabetes", "recruiting", 10]),
+    ("clinical_trials", ["breast cancer", "completed", 20]),
+    ("health_topics", ["diabetes", "en"]),
+    ("health_topics", ["Diabetes", "en"]),
+    ("health_topics", ["high blood pressure", "en"]),
+    ("health_topics", ["High Blood Pressure ", "en"]),
+    ("icd10", ["E11.9", 10]),
+    ("icd10", ["e11.9", 10]),
+    ("icd10", ["E119", 10]),
+    ("icd10", ["diabetes", 10]),
+    ("icd10", ["Diabetes", 10]),
+    ("icd10", ["I10", 10]),
+    ("icd10", ["i10", 10])
+]
+
+def legacy_cache_key(prefix: str, *args: Any) -> str:
+    """Cache key as built before canonicalization"""
+    key_parts = [prefix] + [str(arg) for arg in args if arg is not None]
+    return f"{prefix}:{hashlib.md5('_'.join(key_parts).encode()).hexdigest()}"
+
+def read_log(path: str) -> Iterable[Tuple[str, List[Any]]]:
+    """Read lookups from a JSON Lines query log"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry["prefix"], entry.get("args", [])
+
+def replay(lookups: Iterable[Tuple[str, List[Any]]]) -> Dict[str, Dict[str, int]]:
+    """
+    Count lookups and hits per prefix under both key schemes
+    
+    Returns:
+        Mapping of prefix to counts of lookups, legacy hits and canonical hits
+    """
+    seen_legacy = set()
+    seen_canonical = set()
+    counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"lookups": 0, "legacy_hits": 0, "canonical_hits": 0})
+    for prefix, args in lookups:
+        legacy = legacy_cache_key(prefix, *args)
+        canonical = build_cache_key(prefix, *args)
+        stats = counts[prefix]
+        stats["lookups"] += 1
+        stats["legacy_hits"] += legacy in seen_legacy
+        stats["canonical_hits"] += canonical in seen_canonical
+        seen_legacy.add(legacy)
+        seen_canonical.add(canonical)
+    return counts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare cache hit rates of legacy and canonical keys")
+    parser.add_argument("--log", help="JSON Lines query log (defaults to a built-in sample)")
+    parser.add_argument("--synonyms", help="Synonym map JSON file (defaults to CACHE_KEY_SYNONYMS_FILE)")
+    args = parser.parse_args()
+    
+    cache_keys.load_synonyms(args.synonyms)
+    counts = replay(read_log(args.log) if args.log else SAMPLE_LOG)
+    
+    print(f"{'prefix':<16} {'lookups':>8} {'legacy hit%':>12} {'canonical hit%':>15} {'extra hits':>11}")
+    totals = {"lookups": 0, "legacy_hits": 0, "canonical_hits": 0}
+    for prefix, stats in sorted(counts.items()) + [("total", totals)]:
+        if prefix != "total":
+            for field in totals:
+                totals[field] += stats[field]
+        lookups = stats["lookups"] or 1
+        print(f"{prefix:<16} {stats['lookups']:>8} {stats['legacy_hits'] / lookups:>12.1%} "
+              f"{stats['canonical_hits'] / lookups:>15.1%} {stats['canonical_hits'] - stats['legacy_hits']:>11}")
+
+if __name__ == "__main__":
+    main()
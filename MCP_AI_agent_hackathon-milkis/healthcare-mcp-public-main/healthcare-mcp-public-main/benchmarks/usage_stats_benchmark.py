@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark the usage stats queries against the raw usage table and the rollups
+
+Fills a temporary usage database with --rows raw events spread over the
+last year, builds the rollups, and times get_usage_stats() (all time and
+over the last --days days) and get_monthly_usage() as they read the
+rollups against the equivalent queries over raw rows, which is how the
+stats were computed before. The query plans of the day-window reads and
+of the retention batches are printed too; they should search an index
+rather than scan a table.
+
+Usage:
+    python benchmarks/usage_stats_benchmark.py [--rows 1000000] [--sessions 20000]
+"""
+import os
+import sys
+import time
+import random
+import calendar
+import argparse
+import tempfile
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.usage_service import RETENTION_ROLLUP_DELETES, UsageService
+
+TOOLS = ["fda_drug_lookup", "pubmed_search", "health_topics", "clinical_trials_search", "lookup_icd_code"]
+
+RAW_STATS_QUERIES = [
+    "SELECT SUM(api_calls) FROM usage",
+    "SELECT COUNT(DISTINCT session_id) FROM usage",
+    "SELECT tool, SUM(api_calls) FROM usage GROUP BY tool ORDER BY SUM(api_calls) DESC",
+    """
+    SELECT strftime('%Y-%m', datetime(timestamp, 'unixepoch')) AS month, SUM(api_calls)
+    FROM usage GROUP BY month ORDER BY month DESC LIMIT 12
+    """
+]
+
+RAW_MONTHLY_QUERIES = [
+    "SELECT SUM(api_calls) FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ?",
+    "SELECT tool, SUM(api_calls) FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY tool",
+    """
+    SELECT strftime('%Y-%m-%d', datetime(timestamp, 'unixepoch')) AS date, SUM(api_calls)
+    FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY date ORDER BY date
+    """
+]
+
+RAW_WINDOW_QUERIES = [
+    "SELECT tool, SUM(api_calls) FROM usage WHERE timestamp >= ? GROUP BY tool ORDER BY SUM(api_calls) DESC",
+    "SELECT COUNT(DISTINCT session_id) FROM usage WHERE timestamp >= ?"
+]
+
+# Reads of usage_daily by day made by the window stats
+DAY_WINDOW_QUERIES = [
+    "SELECT tool, SUM(api_calls) FROM usage_daily WHERE day >= ? GROUP BY tool ORDER BY SUM(api_calls) DESC",
+    "SELECT COUNT(DISTINCT session_id) FROM usage_daily WHERE day >= ?"
+]
+
+def time_call(fn: Callable[[], object], repeat: int) -> float:
+    """Best of repeat runs, in milliseconds"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark usage stats queries on raw rows and rollups")
+    parser.add_argument("--rows", type=int, default=1000000, help="Raw usage events")
+    parser.add_argument("--sessions", type=int, default=20000, help="Distinct sessions")
+    parser.add_argument("--days", type=int, default=30, help="Window of the windowed get_usage_stats()")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the best is reported")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        service = UsageService(db_path=os.path.join(tmp, "usage.db"))
+        now = time.time()
+        started = time.perf_counter()
+        with service._get_pool().writer() as conn:
+            service._insert_events(conn, [
+                (f"session_{rng.randrange(args.sessions)}", rng.choice(TOOLS), now - rng.random() * 365 * 86400, 1,
+                 None, None, None, None, None)
+                for _ in range(args.rows)
+            ])
+            conn.commit()
+        service.rebuild_rollups()
+        print(f"{args.rows} events, {args.sessions} sessions loaded and rolled up in "
+              f"{time.perf_counter() - started:.1f}s")
+        
+        session_id = "session_0"
+        month_start = calendar.timegm(time.gmtime(now)[:2] + (1, 0, 0, 0))
+        month_end = now + 86400
+        
+        def raw_stats() -> None:
+            with service._get_pool().reader() as conn:
+                for sql in RAW_STATS_QUERIES:
+                    conn.execute(sql).fetchall()
+        
+        window_start = now - args.days * 86400
+        
+        def raw_window() -> None:
+            with service._get_pool().reader() as conn:
+                for sql in RAW_WINDOW_QUERIES:
+                    conn.execute(sql, (window_start,)).fetchall()
+        
+        def raw_monthly() -> None:
+            with service._get_pool().reader() as conn:
+                for sql in RAW_MONTHLY_QUERIES:
+                    conn.execute(sql, (session_id, month_start, month_end)).fetchall()
+        
+        print(f"{'query':<20} {'raw ms':>10} {'rollup ms':>10}")
+        print(f"{'get_usage_stats':<20} {time_call(raw_stats, args.repeat):>10.2f} "
+              f"{time_call(service.get_usage_stats, args.repeat):>10.2f}")
+        print(f"{f'get_usage_stats {args.days}d':<20} {time_call(raw_window, args.repeat):>10.2f} "
+              f"{time_call(lambda: service.get_usage_stats(args.days), args.repeat):>10.2f}")
+        print(f"{'get_monthly_usage':<20} {time_call(raw_monthly, args.repeat):>10.2f} "
+              f"{time_call(lambda: service.get_monthly_usage(session_id), args.repeat):>10.2f}")
+        
+        day = time.strftime("%Y-%m-%d", time.gmtime(window_start))
+        with service._get_pool().reader() as conn:
+            for sql in DAY_WINDOW_QUERIES:
+                plan = "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (day,)))
+                print(f"{' '.join(sql.split()[:6])} ...: {plan}")
+            for sql in RETENTION_ROLLUP_DELETES:
+                plan = "; ".join(row[-1] for row in conn.execute(
+                    "EXPLAIN QUERY PLAN " + sql, (day if "usage_daily" in sql else int(window_start), 5000)
+                ))
+                print(f"{' '.join(sql.split()[:3])} ...: {plan}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+import sys
+import os
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Invalidate Healthcare MCP cache entries by tag")
+    parser.add_argument("--tag", help="Tag to invalidate, e.g. entity:fda_drug:sertraline")
+    parser.add_argument("--tool", help="Cache key prefix of the tool, e.g. fda_drug")
+    parser.add_argument("--entity", help="Entity within the tool: drug, query, condition, topic or ICD-10 term")
+    parser.add_argument("--schema", type=int, help="Payload schema version within the tool")
+    parser.add_argument("--batch-size", type=int, help="Entries deleted per transaction")
+    parser.add_argument("--db", default=os.getenv("CACHE_DB_PATH", "healthcare_cache.db"),
+                        help="Cache database when using the sqlite backend")
+    args = parser.parse_args()
+    
+    if not args.tag and not args.tool:
+        parser.error("either --tag or --tool is required")
+    
+    from src.services.cache_factory import close_shared_caches, get_shared_cache
+    from src.services.cache_keys import invalidation_tag
+    
+    try:
+        tag = args.tag or invalidation_tag(args.tool, args.entity, args.schema)
+        invalidated = get_shared_cache(db_path=args.db).invalidate_tag(tag, args.batch_size)
+        asyncio.run(close_shared_caches())
+        print(f"Invalidated {invalidated} cache entries tagged {tag}")
+    except Exception as e:
+        print(f"Cache invalidation failed: {str(e)}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import sys
+import os
+import json
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import a Healthcare MCP cache snapshot")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="Write the non-expired cache entries to a snapshot file")
+    export_parser.add_argument("path", help="Snapshot file to write")
+    export_parser.add_argument("--db", default=os.getenv("CACHE_DB_PATH", "healthcare_cache.db"),
+                               help="Cache database to export")
+    
+    import_parser = subparsers.add_parser("import", help="Load a snapshot file into the configured cache backend")
+    import_parser.add_argument("path", help="Snapshot file to read")
+    import_parser.add_argument("--db", default=os.getenv("CACHE_DB_PATH", "healthcare_cache.db"),
+                               help="Cache database to fill when using the sqlite backend")
+    args = parser.parse_args()
+    
+    from src.services.cache_snapshot import export_snapshot, import_snapshot
+    
+    try:
+        if args.command == "export":
+            count = export_snapshot(args.db, args.path)
+            print(f"Exported {count} cache entries to {args.path}")
+        else:
+            from src.services.cache_factory import close_shared_caches, get_shared_cache
+            stats = import_snapshot(get_shared_cache(db_path=args.db), args.path)
+            asyncio.run(close_shared_caches())
+            print(json.dumps(stats))
+    except Exception as e:
+        print(f"Cache snapshot {args.command} failed: {str(e)}", file=sys.stderr)
+        sys.exit(1)
@@ -5,7 +5,8 @@ import logging
 from typing import AsyncGenerator, Optional
 from fastapi import Depends
 
-from src.services.cache_service import CacheService
+from src.services.cache_backend import CacheBackend
+from src.services.cache_factory import get_shared_cache
 from src.services.usage_service import UsageService
 from src.tools.fda_tool import FDATool
 from src.tools.pubmed_tool import PubMedTool
@@ -16,7 +17,7 @@ from src.tools.medical_terminology_tool import MedicalTerminologyTool
 logger = logging.getLogger("healthcare-mcp")
 
 # Singleton instances
-_cache_service: Optional[CacheService] = None
+_cache_service: Optional[CacheBackend] = None
 _usage_service: Optional[UsageService] = None
 
 # Tool instances
@@ -26,18 +27,18 @@ _healthfinder_tool: Optional[HealthFinderTool] = None
 _clinical_trials_tool: Optional[ClinicalTrialsTool] = None
 _medical_terminology_tool: Optional[MedicalTerminologyTool] = None
 
-async def get_cache_service() -> AsyncGenerator[CacheService, None]:
+async def get_cache_service() -> AsyncGenerator[CacheBackend, None]:
     """
     Get or create the cache service instance
     
     Returns:
-        CacheService: The cache service instance
+        CacheBackend: The shared cache service instance
     """
     global _cache_service
     
     if _cache_service is None:
         logger.info("Initializing cache service")
-        _cache_service = CacheService()
+        _cache_service = get_shared_cache()
         await _cache_service.init()
     
     try:
@@ -1,5 +1,8 @@
 import os
+import time
 import uuid
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP, Context
 
@@ -19,6 +22,7 @@ from src.tools.pubmed_tool import PubMedTool
 from src.tools.healthfinder_tool import HealthFinderTool
 from src.tools.clinical_trials_tool import ClinicalTrialsTool
 from src.tools.medical_terminology_tool import MedicalTerminologyTool
+from src.tools.base_tool import CallRecord, call_record
 from src.services.usage_service import UsageService
 
 # Initialize tool instances and services
@@ -32,6 +36,47 @@ usage_service = UsageService(db_path="healthcare_usage.db")
 # Generate a unique session ID for this connection
 session_id = str(uuid.uuid4())
 
+# Session ID of the HTTP request being served, set by the server; usage is recorded under it
+request_session_id: ContextVar[Optional[str]] = ContextVar("request_session_id", default=None)
+
+# Usage records of a batch of tool calls, written together once the batch finishes
+usage_batch: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("usage_batch", default=None)
+
+async def _track_call(tool: str, call: Awaitable[Any], subject: Optional[str] = None) -> Any:
+    """
+    Run a tool call and record its usage with latency, cache outcome and upstream details
+    
+    Args:
+        tool: Name of the tool
+        call: The tool's coroutine
+        subject: Drug or condition queried, for the approximate top-queried stats
+    
+    Returns:
+        Result of the tool call
+    """
+    record = CallRecord()
+    token = call_record.set(record)
+    started = time.perf_counter()
+    try:
+        return await call
+    finally:
+        call_record.reset(token)
+        usage = {
+            "session_id": request_session_id.get() or session_id,
+            "tool": tool,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "upstream_ms": record.upstream_ms,
+            "response_bytes": record.response_bytes,
+            "cache_outcome": record.cache_outcome,
+            "http_status": record.http_status,
+            "subject": subject
+        }
+        batch = usage_batch.get()
+        if batch is not None:
+            batch.append(usage)
+        else:
+            usage_service.record_usage(**usage)
+
 @mcp.tool()
 async def fda_drug_lookup(ctx: Context, drug_name: str, search_type: str = "general"):
     """
@@ -41,11 +86,8 @@ async def fda_drug_lookup(ctx: Context, drug_name: str, search_type: str = "gene
         drug_name: Name of the drug to search for
         search_type: Type of information to retrieve: 'label', 'adverse_events', or 'general'
     """
-    # Record usage
-    usage_service.record_usage(session_id, "fda_drug_lookup")
-    
-    # Call the tool
-    return await fda_tool.lookup_drug(drug_name, search_type)
+    # Call the tool, recording its usage
+    return await _track_call("fda_drug_lookup", fda_tool.lookup_drug(drug_name, search_type), drug_name)
 
 @mcp.tool()
 async def pubmed_search(ctx: Context, query: str, max_results: int = 5, date_range: str = ""):
@@ -57,11 +99,8 @@ async def pubmed_search(ctx: Context, query: str, max_results: int = 5, date_ran
         max_results: Maximum number of results to return
         date_range: Limit to articles published within years (e.g. '5' for last 5 years)
     """
-    # Record usage
-    usage_service.record_usage(session_id, "pubmed_search")
-    
-    # Call the tool
-    return await pubmed_tool.search_literature(query, max_results, date_range)
+    # Call the tool, recording its usage
+    return await _track_call("pubmed_search", pubmed_tool.search_literature(query, max_results, date_range))
 
 @mcp.tool()
 async def health_topics(ctx: Context, topic: str, language: str = "en"):
@@ -72,11 +111,8 @@ async def health_topics(ctx: Context, topic: str, language: str = "en"):
         topic: Health topic to search for information
         language: Language for content (en or es)
     """
-    # Record usage
-    usage_service.record_usage(session_id, "health_topics")
-    
-    # Call the tool
-    return await healthfinder_tool.get_health_topics(topic, language)
+    # Call the tool, recording its usage
+    return await _track_call("health_topics", healthfinder_tool.get_health_topics(topic, language))
 
 @mcp.tool()
 async def clinical_trials_search(ctx: Context, condition: str, status: str = "recruiting", max_results: int = 10):
@@ -88,11 +124,8 @@ async def clinical_trials_search(ctx: Context, condition: str, status: str = "re
         status: Trial status (recruiting, completed, active, not_recruiting, or all)
         max_results: Maximum number of results to return
     """
-    # Record usage
-    usage_service.record_usage(session_id, "clinical_trials_search")
-    
-    # Call the tool
-    return await clinical_trials_tool.search_trials(condition, status, max_results)
+    # Call the tool, recording its usage
+    return await _track_call("clinical_trials_search", clinical_trials_tool.search_trials(condition, status, max_results), condition)
 
 @mcp.tool()
 async def lookup_icd_code(ctx: Context, code: str = None, description: str = None, max_results: int = 10):
@@ -104,11 +137,8 @@ async def lookup_icd_code(ctx: Context, code: str = None, description: str = Non
         description: Medical condition description to search for (optional if code is provided)
         max_results: Maximum number of results to return
     """
-    # Record usage
-    usage_service.record_usage(session_id, "lookup_icd_code")
-    
-    # Call the tool
-    return await medical_terminology_tool.lookup_icd_code(code, description, max_results)
+    # Call the tool, recording its usage
+    return await _track_call("lookup_icd_code", medical_terminology_tool.lookup_icd_code(code, description, max_results), description)
 
 @mcp.tool()
 async def get_usage_stats(ctx: Context):
@@ -118,17 +148,38 @@ async def get_usage_stats(ctx: Context):
     Returns:
         A summary of API usage for the current session
     """
-    return usage_service.get_monthly_usage(session_id)
+    return await usage_service.get_monthly_usage_async(request_session_id.get() or session_id)
+
+@mcp.tool()
+async def get_usage_analytics(ctx: Context, hours: int = 24, tool: str = None):
+    """
+    Get latency percentiles, cache hit ratios and upstream statuses per tool
+    
+    Args:
+        hours: Number of recent hours to include
+        tool: Only include this tool (optional)
+    
+    Returns:
+        Per-tool call analytics across all sessions
+    """
+    return await usage_service.get_usage_analytics_async(hours, tool)
 
 @mcp.tool()
-async def get_all_usage_stats(ctx: Context):
+async def get_all_usage_stats(ctx: Context, days: int = 30, approximate: bool = False):
     """
     Get overall usage statistics for all sessions
     
+    Args:
+        days: Number of recent days to include in the window statistics
+        approximate: Estimate the window statistics, with top drugs and conditions,
+            from in-memory sketches instead of counting exactly
+    
     Returns:
         A summary of API usage across all sessions
     """
-    return usage_service.get_usage_stats()
+    if approximate:
+        return await usage_service.get_approximate_usage_stats_async(days)
+    return await usage_service.get_usage_stats_async(days)
 
 if __name__ == "__main__":
     # Using FastMCP's CLI
@@ -1,5 +1,8 @@
 import os
+import json
+import asyncio
 import logging
+import secrets
 import structlog
 from contextlib import asynccontextmanager
 from typing import Optional, Union, Dict, Any, List, Annotated
@@ -13,6 +16,7 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from src.main import mcp
 from src.tools.base_tool import BaseTool
+from src.services.sqlite_pool import SQLitePool
 from src.dependencies import (
     get_cache_service, 
     get_usage_service, 
@@ -56,8 +60,8 @@ async def lifespan(app: FastAPI):
     
     # Initialize services if needed
     try:
-        from src.services.cache_service import CacheService
-        cache = CacheService()
+        from src.services.cache_factory import get_shared_cache
+        cache = get_shared_cache()
         await cache.init()
         logger.info("Cache service initialized")
     except Exception as e:
@@ -71,11 +75,69 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("Failed to initialize usage service", error=str(e))
     
+    # Open the shared HTTP client used by all tools
+    try:
+        await BaseTool.init_http_client()
+        logger.info("HTTP client initialized")
+    except Exception as e:
+        logger.error("Failed to initialize HTTP client", error=str(e))
+    
+    # Load a cache snapshot before warm-up, so a new replica starts hot
+    app.state.cache_snapshot = None
+    snapshot_file = os.getenv("CACHE_SNAPSHOT_FILE")
+    if snapshot_file and os.path.exists(snapshot_file):
+        try:
+            from src.services.cache_factory import get_shared_cache
+            from src.services.cache_snapshot import import_snapshot
+            app.state.cache_snapshot = import_snapshot(get_shared_cache(), snapshot_file)
+            logger.info("Cache snapshot imported", **app.state.cache_snapshot)
+        except Exception as e:
+            logger.error("Failed to import cache snapshot", error=str(e))
+    
+    # Warm the cache before accepting traffic; a slow warm-up continues in the background
+    app.state.cache_warmer = None
+    try:
+        from src.services.cache_warmup import CacheWarmer
+        from src.main import fda_tool, pubmed_tool, healthfinder_tool, clinical_trials_tool, medical_terminology_tool
+        warmer = CacheWarmer.from_env({
+            "fda_drug_lookup": fda_tool.lookup_drug,
+            "pubmed_search": pubmed_tool.search_literature,
+            "health_topics": healthfinder_tool.get_health_topics,
+            "clinical_trials_search": clinical_trials_tool.search_trials,
+            "lookup_icd_code": medical_terminology_tool.lookup_icd_code
+        })
+        if warmer.seeds:
+            app.state.cache_warmer = warmer
+            await warmer.wait(float(os.getenv("CACHE_WARMUP_TIMEOUT", "120")))
+            logger.info("Cache warm-up", **warmer.get_stats())
+    except Exception as e:
+        logger.error("Failed to warm cache", error=str(e))
+    
+    # Enforce per-session quotas, reconciled with the persisted usage
+    app.state.quota_engine = None
+    try:
+        from src.services.quota import QuotaEngine
+        from src.main import usage_service
+        quota_engine = QuotaEngine.from_env(usage_service.get_recent_calls)
+        if quota_engine.enabled:
+            quota_engine.start()
+            app.state.quota_engine = quota_engine
+            logger.info("Quota enforcement enabled", rules=quota_engine.get_stats()["rules"])
+    except Exception as e:
+        logger.error("Failed to start quota enforcement", error=str(e))
+    
     yield  # Server is running
     
     # Shutdown: Clean up resources
     logger.info("Shutting down Healthcare MCP Server")
     
+    if app.state.quota_engine is not None:
+        app.state.quota_engine.stop()
+    
+    # Stop a warm-up that is still running before its HTTP client goes away
+    if app.state.cache_warmer is not None:
+        await app.state.cache_warmer.stop()
+    
     # Close the shared HTTP client
     try:
         from src.tools.base_tool import BaseTool
@@ -84,11 +146,34 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("Failed to close HTTP client", error=str(e))
     
+    # Commit writes still queued for group commit before closing databases
+    try:
+        from src.services.write_behind import WriteBehindQueue
+        WriteBehindQueue.stop_all()
+        logger.info("Write-behind queues flushed")
+    except Exception as e:
+        logger.error("Failed to flush write-behind queues", error=str(e))
+    
+    # Persist buffered usage events
+    try:
+        from src.services.usage_buffer import UsageBuffer
+        UsageBuffer.stop_all()
+        logger.info("Usage buffers flushed")
+    except Exception as e:
+        logger.error("Failed to flush usage buffers", error=str(e))
+    
+    # Checkpoint approximate usage sketches
+    try:
+        from src.services.usage_sketch import UsageSketches
+        UsageSketches.stop_all()
+        logger.info("Usage sketches checkpointed")
+    except Exception as e:
+        logger.error("Failed to checkpoint usage sketches", error=str(e))
+    
     # Close services
     try:
-        from src.services.cache_service import CacheService
-        cache = CacheService()
-        await cache.close()
+        from src.services.cache_factory import close_shared_caches
+        await close_shared_caches()
         logger.info("Cache service closed")
     except Exception as e:
         logger.error("Failed to close cache service", error=str(e))
@@ -118,6 +203,85 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# Tools metered by the quota middleware, by REST route
+QUOTA_ROUTES = {
+    "/api/fda": "fda_drug_lookup",
+    "/api/pubmed": "pubmed_search",
+    "/api/health_finder": "health_topics",
+    "/api/clinical_trials": "clinical_trials_search",
+    "/api/medical_terminology": "lookup_icd_code"
+}
+QUOTA_TOOLS = set(QUOTA_ROUTES.values())
+
+@app.middleware("http")
+async def enforce_quota(request: Request, call_next):
+    """
+    Admit or reject tool calls against the session's quotas before they run
+    
+    The session is the session-id header of REST routes or the session_id
+    of a call-tool body or batch call; calls without one are metered per
+    client address. A batch is admitted or rejected as a whole, with
+    identical calls counted once. Rejected calls get a 429 with the
+    exceeded rule, its limit and when to retry; admitted calls run with
+    their session recorded for usage.
+    """
+    quota_engine = getattr(request.app.state, "quota_engine", None)
+    if quota_engine is None:
+        return await call_next(request)
+    
+    client = f"ip:{get_remote_address(request)}"
+    path = request.url.path
+    session = request.headers.get("session-id")
+    calls = [(session or client, QUOTA_ROUTES[path], 1)] if path in QUOTA_ROUTES else []
+    if request.method == "POST" and path in ("/mcp/call-tool", "/mcp/call-tools"):
+        try:
+            body = json.loads(await request.body())
+            items = body["calls"] if path == "/mcp/call-tools" else [body]
+            session = body.get("session_id") if path == "/mcp/call-tool" else None
+            metered = {
+                tool_call_key(item.get("name"), item.get("arguments"), item.get("session_id"))
+                for item in items if item.get("name") in QUOTA_TOOLS
+            }
+            counts: Dict[tuple, int] = {}
+            for name, _, item_session in metered:
+                counts[(item_session or client, name)] = counts.get((item_session or client, name), 0) + 1
+            calls = [(item_session, name, cost) for (item_session, name), cost in counts.items()]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Malformed bodies are rejected by request validation
+            calls = []
+    if not calls:
+        return await call_next(request)
+    
+    from src.main import request_session_id
+    decision = quota_engine.acquire_many(calls)
+    if not decision["allowed"]:
+        logger.warning("Quota exceeded", session_id=session, tools=[name for _, name, _ in calls], rule=decision["rule"])
+        return JSONResponse(
+            status_code=429,
+            content={
+                "status": "error",
+                "error_message": f"Quota exceeded: {decision['limit']} calls per {decision['window']} seconds ({decision['rule']})",
+                "error_code": "QUOTA_EXCEEDED",
+                "quota": decision
+            },
+            headers={
+                "Retry-After": str(decision["retry_after"]),
+                "X-Quota-Limit": str(decision["limit"]),
+                "X-Quota-Remaining": "0",
+                "X-Quota-Reset": str(decision["reset"])
+            }
+        )
+    
+    token = request_session_id.set(session)
+    try:
+        response = await call_next(request)
+    finally:
+        request_session_id.reset(token)
+    response.headers["X-Quota-Limit"] = str(decision["limit"])
+    response.headers["X-Quota-Remaining"] = str(decision["remaining"])
+    response.headers["X-Quota-Reset"] = str(decision["reset"])
+    return response
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -150,6 +314,23 @@ class ToolRequest(BaseModel):
     arguments: Dict[str, Any] = Field(..., description="Arguments to pass to the tool")
     session_id: Optional[str] = Field(None, description="Session ID for tracking usage")
 
+# Batch limits: calls per batch, calls running at once and seconds per call
+BATCH_MAX_CALLS = int(os.getenv("BATCH_MAX_CALLS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "5"))
+BATCH_CALL_TIMEOUT = float(os.getenv("BATCH_CALL_TIMEOUT", "30"))
+
+# Define batch tool request model
+class ToolBatchRequest(BaseModel):
+    """Request model for batch tool execution"""
+    model_config = ConfigDict(extra="forbid")
+    
+    calls: List[ToolRequest] = Field(..., min_length=1, max_length=BATCH_MAX_CALLS, description="Tool calls to execute")
+    timeout: Optional[float] = Field(None, gt=0, description="Seconds each call may take, at most BATCH_CALL_TIMEOUT")
+
+def tool_call_key(name: Any, arguments: Any, session_id: Any) -> tuple:
+    """Identity of a tool call; identical calls in a batch run once"""
+    return (name, json.dumps(arguments, sort_keys=True, default=str), session_id)
+
 # Define error response model
 class ErrorResponse(BaseModel):
     """Standard error response"""
@@ -364,23 +545,92 @@ async def api_usage_stats(
 @limiter.limit("30/minute")
 async def api_all_usage_stats(
     request: Request,
-    days: Annotated[int, Query(description="Number of days to include in the statistics", ge=1, le=365)] = 30
+    days: Annotated[int, Query(description="Number of days to include in the statistics", ge=1, le=365)] = 30,
+    mode: Annotated[str, Query(description="'exact' counts from the rollups, 'approximate' estimates from sketches", pattern="^(exact|approximate)$")] = "exact"
 ):
     """
     Get overall usage statistics
     
     - **days**: Number of days to include in the statistics (1-365, default: 30)
+    - **mode**: `exact` (default) or `approximate`
     
-    Returns a summary of API usage across all sessions for the specified time period
+    Returns a summary of API usage across all sessions for the specified time period.
+    In approximate mode distinct sessions are a HyperLogLog estimate (1.6% relative
+    standard error) and the top tools, drugs and conditions come with per-value
+    error bounds
     """
     try:
         from src.main import get_all_usage_stats
-        logger.info("All usage stats request", days=days)
-        return await get_all_usage_stats(None, days=days)
+        logger.info("All usage stats request", days=days, mode=mode)
+        return await get_all_usage_stats(None, days=days, approximate=mode == "approximate")
     except Exception as e:
         logger.error("Error in all usage stats", error=str(e))
         return ErrorResponse(error_message=f"Error getting all usage statistics: {str(e)}")
 
+@app.get("/api/usage_analytics",
+         summary="Get per-tool call analytics",
+         description="Get latency percentiles, cache hit ratios and upstream statuses per tool over recent hours",
+         tags=["Monitoring"])
+@limiter.limit("30/minute")
+async def api_usage_analytics(
+    request: Request,
+    hours: Annotated[int, Query(description="Number of recent hours to include", ge=1, le=8784)] = 24,
+    tool: Annotated[Optional[str], Query(description="Only include this tool, e.g. 'fda_drug_lookup'")] = None
+):
+    """
+    Get per-tool call analytics
+    
+    - **hours**: Number of recent hours to include, counting the current one (1-8784, default: 24)
+    - **tool**: Only include this tool (optional)
+    
+    Returns p50/p95/p99 latency of whole calls and of their upstream requests, response
+    sizes, cache hit ratios and upstream HTTP status counts per tool and in total
+    """
+    try:
+        from src.main import get_usage_analytics
+        logger.info("Usage analytics request", hours=hours, tool=tool)
+        return await get_usage_analytics(None, hours=hours, tool=tool)
+    except Exception as e:
+        logger.error("Error in usage analytics", error=str(e))
+        return ErrorResponse(error_message=f"Error getting usage analytics: {str(e)}")
+
+async def _execute_tool(tool_request: ToolRequest) -> Any:
+    """
+    Run one tool call by name
+    
+    Args:
+        tool_request: Tool name, arguments and session ID
+    
+    Returns:
+        The tool's result, or an error response if the tool does not exist
+    """
+    from src.main import fda_drug_lookup, pubmed_search, health_topics, clinical_trials_search, lookup_icd_code, get_usage_stats, get_all_usage_stats, get_usage_analytics
+    
+    tool_name = tool_request.name
+    session_id = tool_request.session_id
+    
+    # Map tool names to their corresponding functions
+    tool_mapping = {
+        "fda_drug_lookup": lambda args: fda_drug_lookup(session_id, **args),
+        "pubmed_search": lambda args: pubmed_search(session_id, **args),
+        "health_topics": lambda args: health_topics(session_id, **args),
+        "clinical_trials_search": lambda args: clinical_trials_search(session_id, **args),
+        "lookup_icd_code": lambda args: lookup_icd_code(session_id, **args),
+        "get_usage_stats": lambda _: get_usage_stats(session_id),
+        "get_all_usage_stats": lambda args: get_all_usage_stats(session_id, **args),
+        "get_usage_analytics": lambda args: get_usage_analytics(session_id, **args)
+    }
+    
+    if tool_name not in tool_mapping:
+        logger.warning("Tool not found", tool_name=tool_name)
+        return ErrorResponse(
+            error_message=f"Tool '{tool_name}' not found",
+            error_code="TOOL_NOT_FOUND"
+        )
+    
+    # Call the appropriate tool function
+    return await tool_mapping[tool_name](tool_request.arguments)
+
 # Add the specific call-tool endpoint
 @app.post("/mcp/call-tool",
           summary="Call a specific tool by name",
@@ -400,37 +650,10 @@ async def call_tool(
     - **session_id**: Optional session ID for tracking usage
     """
     try:
-        from src.main import fda_drug_lookup, pubmed_search, health_topics, clinical_trials_search, lookup_icd_code, get_usage_stats, get_all_usage_stats
-        
-        tool_name = tool_request.name
-        arguments = tool_request.arguments
-        session_id = tool_request.session_id
-        
         logger.info("Tool call request", 
-                   tool_name=tool_name, 
-                   session_id=session_id)
-        
-        # Map tool names to their corresponding functions
-        tool_mapping = {
-            "fda_drug_lookup": lambda args: fda_drug_lookup(session_id, **args),
-            "pubmed_search": lambda args: pubmed_search(session_id, **args),
-            "health_topics": lambda args: health_topics(session_id, **args),
-            "clinical_trials_search": lambda args: clinical_trials_search(session_id, **args),
-            "lookup_icd_code": lambda args: lookup_icd_code(session_id, **args),
-            "get_usage_stats": lambda _: get_usage_stats(session_id),
-            "get_all_usage_stats": lambda args: get_all_usage_stats(session_id, **args)
-        }
-        
-        if tool_name not in tool_mapping:
-            logger.warning("Tool not found", tool_name=tool_name)
-            return ErrorResponse(
-                error_message=f"Tool '{tool_name}' not found",
-                error_code="TOOL_NOT_FOUND"
-            )
-        
-        # Call the appropriate tool function
-        result = await tool_mapping[tool_name](arguments)
-        return result
+                   tool_name=tool_request.name, 
+                   session_id=tool_request.session_id)
+        return await _execute_tool(tool_request)
     except Exception as e:
         logger.error("Error in tool call", error=str(e), tool_name=tool_request.name)
         return ErrorResponse(
@@ -438,6 +661,68 @@ async def call_tool(
             error_code="TOOL_EXECUTION_ERROR"
         )
 
+@app.post("/mcp/call-tools",
+          summary="Call several tools concurrently",
+          description="Run a batch of tool calls concurrently and return their results in order",
+          response_model=Union[SuccessResponse, ErrorResponse],
+          tags=["Tool Execution"])
+@limiter.limit("30/minute")
+async def call_tools(
+    request: Request,
+    batch: ToolBatchRequest = Body(...),
+):
+    """
+    Call several tools concurrently
+    
+    - **calls**: Tool calls, each with name, arguments and optional session ID
+    - **timeout**: Seconds each call may take (optional, capped at BATCH_CALL_TIMEOUT)
+    
+    At most BATCH_CONCURRENCY calls run at once. Identical calls run once and
+    share their result, and the usage of all calls is recorded in one write.
+    Results are returned in the order of the calls; a failed or timed-out
+    call gets an error result without failing the batch
+    """
+    from src.main import request_session_id, usage_batch, usage_service
+    
+    timeout = min(batch.timeout or BATCH_CALL_TIMEOUT, BATCH_CALL_TIMEOUT)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    unique: Dict[tuple, ToolRequest] = {}
+    for call in batch.calls:
+        unique.setdefault(tool_call_key(call.name, call.arguments, call.session_id), call)
+    logger.info("Tool batch request", calls=len(batch.calls), unique_calls=len(unique), timeout=timeout)
+    
+    async def run(call: ToolRequest) -> Any:
+        # Each call runs in its own task, so the session only applies to this call
+        request_session_id.set(call.session_id)
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(_execute_tool(call), timeout)
+            except asyncio.TimeoutError:
+                result = ErrorResponse(
+                    error_message=f"Tool '{call.name}' timed out after {timeout} seconds",
+                    error_code="TOOL_TIMEOUT"
+                )
+            except Exception as e:
+                logger.error("Error in batch tool call", error=str(e), tool_name=call.name)
+                result = ErrorResponse(
+                    error_message=f"Error calling tool: {str(e)}",
+                    error_code="TOOL_EXECUTION_ERROR"
+                )
+        return result.model_dump() if isinstance(result, BaseModel) else result
+    
+    records: List[Dict[str, Any]] = []
+    token = usage_batch.set(records)
+    try:
+        results = dict(zip(unique, await asyncio.gather(*(run(call) for call in unique.values()))))
+    finally:
+        usage_batch.reset(token)
+        usage_service.record_usages(records)
+    
+    return SuccessResponse(
+        results=[results[tool_call_key(call.name, call.arguments, call.session_id)] for call in batch.calls],
+        executed=len(unique)
+    )
+
 # Health check endpoint
 @app.get("/health",
          summary="Health check endpoint",
@@ -452,17 +737,14 @@ async def health_check(request: Request):
     """
     logger.info("Health check request")
     
-    # Check if cache service is available
+    # Check if cache service is available; in-memory counters only, no table scans
     cache_status = "ok"
+    cache_metrics = {}
     try:
-        from src.services.cache_service import CacheService
-        cache = CacheService()
-        await cache.init()
-        # Just check if we can access the cache
-        cache_stats = await cache.get_stats()
-        await cache.close()
-        if isinstance(cache_stats, dict) and "error" in cache_stats:
-            cache_status = f"error: {cache_stats['error']}"
+        from src.services.cache_factory import get_shared_cache_metrics
+        cache_metrics = get_shared_cache_metrics()
+        if not cache_metrics:
+            cache_status = "not initialized"
     except Exception as e:
         cache_status = f"error: {str(e)}"
     
@@ -472,14 +754,19 @@ async def health_check(request: Request):
         from src.services.usage_service import UsageService
         usage = UsageService()
         await usage.init()
-        # Just check if we can access the usage stats
-        usage_stats = await usage.get_usage_stats()
-        await usage.close()
+        # Just check if we can access the usage stats; they are read from the rollups
+        usage_stats = await usage.get_usage_stats_async()
         if isinstance(usage_stats, dict) and "error" in usage_stats:
             usage_status = f"error: {usage_stats['error']}"
     except Exception as e:
         usage_status = f"error: {str(e)}"
     
+    warmer = getattr(request.app.state, "cache_warmer", None)
+    quota_engine = getattr(request.app.state, "quota_engine", None)
+    snapshot = getattr(request.app.state, "cache_snapshot", None)
+    
+    from src.services.usage_service import UsageService
+    
     # Get current timestamp in ISO format
     from datetime import datetime, timezone
     timestamp = datetime.now(timezone.utc).isoformat()
@@ -491,9 +778,124 @@ async def health_check(request: Request):
         "services": {
             "cache": cache_status,
             "usage": usage_status
-        }
+        },
+        "single_flight": BaseTool.get_single_flight_stats(),
+        "background_refresh": BaseTool.get_refresh_stats(),
+        "negative_cache": BaseTool.get_negative_cache_stats(),
+        "cache_metrics": cache_metrics,
+        "sqlite_pools": SQLitePool.get_all_stats(),
+        "usage_buffers": UsageService.get_buffer_stats(),
+        "usage_retention": UsageService.get_retention_stats(),
+        "usage_sketches": UsageService.get_sketch_stats(),
+        "quotas": quota_engine.get_stats() if quota_engine is not None else None,
+        "cache_snapshot": snapshot,
+        "cache_warmup": warmer.get_stats() if warmer is not None else None
     }
 
+# Define cache invalidation request model
+class CacheInvalidationRequest(BaseModel):
+    """Request model for tag-based cache invalidation"""
+    model_config = ConfigDict(extra="forbid")
+    
+    tag: Optional[str] = Field(None, description="Tag to invalidate, e.g. 'entity:fda_drug:sertraline'")
+    tool: Optional[str] = Field(None, description="Cache key prefix of the tool, e.g. 'fda_drug'")
+    entity: Optional[str] = Field(None, description="Entity to invalidate within the tool: drug, query, condition, topic or ICD-10 term")
+    schema_version: Optional[int] = Field(None, description="Payload schema version to invalidate within the tool")
+
+def require_admin_key(x_admin_key: Annotated[Optional[str], Header(description="Admin API key")] = None) -> None:
+    """Reject the request unless it carries ADMIN_API_KEY; admin endpoints are disabled without one"""
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key:
+        raise HTTPException(status_code=403, detail="Admin API is disabled; set ADMIN_API_KEY to enable it")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(status_code=401, detail="Invalid admin API key")
+
+@app.post("/admin/cache/invalidate",
+          summary="Invalidate cached entries by tag",
+          description="Delete every cache entry of a tool, of one of its entities or of one payload schema version",
+          response_model=Union[SuccessResponse, ErrorResponse],
+          tags=["Admin"],
+          dependencies=[Depends(require_admin_key)])
+@limiter.limit("10/minute")
+async def admin_invalidate_cache(
+    request: Request,
+    invalidation: CacheInvalidationRequest = Body(...)
+):
+    """
+    Invalidate cached entries by tag
+    
+    - **tag**: Tag to invalidate, or
+    - **tool**: Cache key prefix of the tool, optionally narrowed by
+    - **entity**: Entity within the tool, or
+    - **schema_version**: Payload schema version within the tool
+    """
+    try:
+        from src.services.cache_factory import get_shared_cache
+        from src.services.cache_keys import invalidation_tag
+        
+        if invalidation.tag:
+            tag = invalidation.tag
+        elif invalidation.tool:
+            tag = invalidation_tag(invalidation.tool, invalidation.entity, invalidation.schema_version)
+        else:
+            return ErrorResponse(error_message="Either tag or tool is required", error_code="INVALID_REQUEST")
+        
+        logger.info("Cache invalidation request", tag=tag)
+        cache = get_shared_cache()
+        invalidated = await asyncio.get_running_loop().run_in_executor(None, cache.invalidate_tag, tag)
+        return SuccessResponse(tag=tag, invalidated=invalidated)
+    except ValueError as e:
+        return ErrorResponse(error_message=str(e), error_code="INVALID_REQUEST")
+    except Exception as e:
+        logger.error("Error in cache invalidation", error=str(e))
+        return ErrorResponse(error_message=f"Error invalidating cache: {str(e)}")
+
+@app.get("/admin/usage/export",
+         summary="Export raw usage events",
+         description="Stream raw usage events as NDJSON or CSV, filtered by time range and tool",
+         tags=["Admin"],
+         dependencies=[Depends(require_admin_key)])
+@limiter.limit("10/minute")
+async def admin_export_usage(
+    request: Request,
+    start: Annotated[Optional[str], Query(description="Start of the range, inclusive: epoch seconds or ISO 8601, UTC unless an offset is given")] = None,
+    end: Annotated[Optional[str], Query(description="End of the range, exclusive; defaults to now")] = None,
+    tool: Annotated[Optional[str], Query(description="Only include this tool, e.g. 'fda_drug_lookup'")] = None,
+    format: Annotated[str, Query(description="'ndjson' or 'csv'", pattern="^(ndjson|csv)$")] = "ndjson",
+    after: Annotated[Optional[str], Query(description="Resume after this '<timestamp>,<id>' cursor, the last event already received")] = None
+):
+    """
+    Export raw usage events
+    
+    - **start**: Start of the range, inclusive (optional)
+    - **end**: End of the range, exclusive (default: now)
+    - **tool**: Only include this tool (optional)
+    - **format**: `ndjson` (default) or `csv`
+    - **after**: Resume cursor, the timestamp and id of the last event received (optional)
+    
+    Events are streamed in (timestamp, id) order as they are read, one page
+    at a time, so exports of any size use constant memory
+    """
+    try:
+        from fastapi.responses import StreamingResponse
+        from src.main import usage_service
+        from src.services.usage_export import EXPORT_MEDIA_TYPES, format_events, parse_cursor, parse_time
+        
+        events = usage_service.export_usage(
+            start=parse_time(start) if start else None,
+            end=parse_time(end) if end else None,
+            tool=tool,
+            after=parse_cursor(after) if after else None
+        )
+        logger.info("Usage export request", start=start, end=end, tool=tool, format=format)
+        # A sync iterator; Starlette reads it in a worker thread
+        return StreamingResponse(format_events(events, format), media_type=EXPORT_MEDIA_TYPES[format])
+    except ValueError as e:
+        return ErrorResponse(error_message=str(e), error_code="INVALID_REQUEST")
+    except Exception as e:
+        logger.error("Error in usage export", error=str(e))
+        return ErrorResponse(error_message=f"Error exporting usage: {str(e)}")
+
 # Redirect root to docs
 @app.get("/",
          summary="Redirect to API documentation",
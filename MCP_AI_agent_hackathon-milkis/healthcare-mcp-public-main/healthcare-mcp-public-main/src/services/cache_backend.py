@@ -0,0 +1,296 @@
+import os
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Protocol, runtime_checkable
+from src.services.cache_codec import CacheCodec
+from src.services.cache_keys import cache_tags
+from src.services.cache_metrics import CacheMetrics, key_prefix
+from src.services.memory_cache import MemoryCache
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Misses awaiting their set() to measure the recompute time; older ones were abandoned
+MAX_PENDING_RECOMPUTES = 10000
+MAX_RECOMPUTE_SECONDS = 120.0
+
+# Weight of the newest sample in the per-prefix recompute time average
+RECOMPUTE_SMOOTHING = 0.2
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """
+    Interface shared by all cache backends
+    
+    Tools only use these methods, so any backend can be selected with
+    CACHE_BACKEND without changing them.
+    """
+    
+    default_ttl: int
+    
+    def get(self, key: str) -> Optional[Any]: ...
+    
+    def get_stale(self, key: str) -> Optional[Any]: ...
+    
+    async def get_async(self, key: str) -> Optional[Any]: ...
+    
+    async def get_stale_async(self, key: str) -> Optional[Any]: ...
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool: ...
+    
+    async def set_async(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool: ...
+    
+    def delete(self, key: str) -> bool: ...
+    
+    def clear_expired(self) -> int: ...
+    
+    def flush(self) -> int: ...
+    
+    def invalidate_tag(self, tag: str, batch_size: Optional[int] = None) -> int: ...
+    
+    def get_metrics(self) -> Dict[str, Any]: ...
+    
+    def get_stats(self) -> Dict[str, Any]: ...
+    
+    async def init(self) -> None: ...
+    
+    async def close(self) -> None: ...
+
+class BaseCacheService:
+    """
+    Settings and helpers common to the cache backends
+    
+    Holds the default TTL, serve-stale windows, TTL jitter and early
+    refresh settings, payload codec and per-prefix metrics. Subclasses
+    implement storage.
+    """
+    
+    # Default maximum staleness (seconds past expiry) per tool key prefix.
+    # Override with CACHE_MAX_STALE_<PREFIX>, e.g. CACHE_MAX_STALE_FDA_DRUG=3600
+    DEFAULT_MAX_STALE: Dict[str, int] = {
+        "fda_drug": 6 * 3600,
+        "pubmed_search": 6 * 3600,
+        "clinical_trials": 6 * 3600,
+        "icd10": 7 * 86400,
+        "health_topics": 86400
+    }
+    
+    def __init__(self, ttl: int = 3600):
+        """
+        Initialize the common cache settings
+        
+        Args:
+            ttl: Default time-to-live for cache entries in seconds
+        """
+        self.default_ttl = ttl
+        
+        # Serve-stale settings: expired entries are kept until expires_at + max staleness
+        self.serve_stale = os.getenv("CACHE_SERVE_STALE", "true").lower() == "true"
+        self.max_stale = {
+            prefix: int(os.getenv(f"CACHE_MAX_STALE_{prefix.upper()}", str(seconds)))
+            for prefix, seconds in self.DEFAULT_MAX_STALE.items()
+        }
+        
+        # Each TTL is shortened by a random share of up to ttl_jitter so that
+        # entries written together do not all expire together
+        self.ttl_jitter = min(max(float(os.getenv("CACHE_TTL_JITTER", "0.1")), 0.0), 1.0)
+        
+        # Probabilistic early refresh (XFetch); a beta of 0 disables it. Recompute
+        # times are measured per prefix from a miss to the set() that follows it;
+        # until then the default applies (0: no early refresh for the prefix yet)
+        self.early_refresh_beta = float(os.getenv("CACHE_EARLY_REFRESH_BETA", "1.0"))
+        self.default_recompute_seconds = float(os.getenv("CACHE_EARLY_REFRESH_DELTA", "0"))
+        self._recompute_seconds: Dict[str, float] = {}
+        self._recompute_started: Dict[str, float] = {}
+        self._recompute_lock = threading.Lock()
+        
+        # Codec for stored payloads; entries written with other settings still decode
+        self.codec = CacheCodec.from_env()
+        
+        self.metrics = CacheMetrics()
+    
+    def _get_max_stale(self, key: str) -> int:
+        """
+        Get how long past expiry an entry may still be served
+        
+        Args:
+            key: Cache key; its prefix selects the staleness window
+        
+        Returns:
+            Maximum staleness in seconds (0 if serving stale is disabled)
+        """
+        if not self.serve_stale or ":" not in key:
+            return 0
+        return self.max_stale.get(key.split(":", 1)[0], 0)
+    
+    def _jitter_ttl(self, ttl: float) -> float:
+        """
+        Shorten a TTL by a random share of up to ttl_jitter
+        
+        Args:
+            ttl: Requested time-to-live in seconds
+        
+        Returns:
+            TTL to store; never longer than requested
+        """
+        return ttl * (1.0 - self.ttl_jitter * random.random())
+    
+    def _start_recompute(self, key: str) -> None:
+        """Note that a lookup of key missed, so its next set() measures the recompute time"""
+        now = time.monotonic()
+        with self._recompute_lock:
+            if key in self._recompute_started:
+                return
+            if len(self._recompute_started) >= MAX_PENDING_RECOMPUTES:
+                self._recompute_started = {
+                    pending: started for pending, started in self._recompute_started.items()
+                    if now - started <= MAX_RECOMPUTE_SECONDS
+                }
+                if len(self._recompute_started) >= MAX_PENDING_RECOMPUTES:
+                    return
+            self._recompute_started[key] = now
+    
+    def _finish_recompute(self, key: str) -> None:
+        """Update the recompute time of key's prefix if a miss of key is pending"""
+        with self._recompute_lock:
+            started = self._recompute_started.pop(key, None)
+            if started is None:
+                return
+            elapsed = time.monotonic() - started
+            if elapsed > MAX_RECOMPUTE_SECONDS:
+                return
+            prefix = key_prefix(key)
+            previous = self._recompute_seconds.get(prefix)
+            self._recompute_seconds[prefix] = (
+                elapsed if previous is None else previous + RECOMPUTE_SMOOTHING * (elapsed - previous)
+            )
+    
+    def _refresh_early(self, key: str, expires_at: float) -> bool:
+        """
+        Decide whether a lookup of a fresh entry should refresh it early (XFetch)
+        
+        A lookup is treated as a miss when now - delta * beta * ln(rand())
+        reaches expires_at, where delta is the prefix's recompute time. The
+        chance rises as expiry nears, so a popular entry is refetched by one
+        caller shortly before it expires instead of by a burst of callers
+        right after.
+        
+        Args:
+            key: Cache key
+            expires_at: Expiry of the entry found
+        
+        Returns:
+            True if the caller should refetch the entry
+        """
+        if self.early_refresh_beta <= 0:
+            return False
+        delta = self._recompute_seconds.get(key_prefix(key), self.default_recompute_seconds)
+        if time.time() - delta * self.early_refresh_beta * math.log(1.0 - random.random()) < expires_at:
+            return False
+        self._start_recompute(key)
+        return True
+    
+    def _expiry_stats(self) -> Dict[str, Any]:
+        """
+        Get the TTL jitter and early refresh settings
+        
+        Returns:
+            Dictionary with the jitter share, beta and measured recompute
+            seconds per prefix
+        """
+        with self._recompute_lock:
+            recompute = {prefix: round(seconds, 3) for prefix, seconds in self._recompute_seconds.items()}
+        return {
+            "ttl_jitter": self.ttl_jitter,
+            "early_refresh_beta": self.early_refresh_beta,
+            "recompute_seconds": recompute
+        }
+    
+    async def get_async(self, key: str) -> Optional[Any]:
+        """
+        Get a value without blocking the event loop
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None if not found or expired
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, key)
+    
+    async def get_stale_async(self, key: str) -> Optional[Any]:
+        """
+        Get a stale value without blocking the event loop
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Stale cached value or None if not found, fresh or too old
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_stale, key)
+    
+    async def set_async(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool:
+        """
+        Set a value without blocking the event loop
+        
+        set() of the sqlite and memory backends only queues the write or
+        stores it in memory, so it runs inline; backends whose set() waits
+        on the network override this.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (optional)
+            jitter: Whether to apply TTL jitter
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.set(key, value, ttl=ttl, jitter=jitter)
+    
+    def flush(self) -> int:
+        """
+        Commit queued writes; backends that write synchronously have none
+        
+        Returns:
+            Number of committed writes
+        """
+        return 0
+    
+    @staticmethod
+    def _invalidate_memory_tag(memory: MemoryCache, tag: str) -> int:
+        """
+        Drop every entry carrying a tag from a memory tier
+        
+        Args:
+            memory: Memory tier to scan
+            tag: Tag from cache_tags()
+        
+        Returns:
+            Number of dropped entries
+        """
+        dropped = 0
+        for key in memory.keys():
+            if tag in cache_tags(key) and memory.delete(key):
+                dropped += 1
+        return dropped
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get per-prefix counters and latency histograms
+        
+        Returns:
+            Dictionary with counters and get/set latency histograms, in
+            total and per key prefix
+        """
+        return self.metrics.snapshot()
+    
+    async def init(self) -> None:
+        """Prepare the backend; called during application startup"""
+    
+    async def close(self) -> None:
+        """Release the backend's resources; called during application shutdown"""
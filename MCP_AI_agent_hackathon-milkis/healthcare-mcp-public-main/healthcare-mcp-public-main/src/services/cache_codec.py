@@ -0,0 +1,126 @@
+import os
+import json
+import zlib
+import logging
+from typing import Any, Union
+
+logger = logging.getLogger("healthcare-mcp")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Format-version byte written in front of every encoded payload. Rows written
+# before the codec existed are plain JSON TEXT and carry no header.
+FORMAT_JSON = 0x01
+FORMAT_JSON_ZLIB = 0x02
+FORMAT_JSON_ZSTD = 0x03
+
+COMPRESSIONS = ("none", "zlib", "zstd")
+
+class CacheCodec:
+    """
+    Encodes cache values into compact binary payloads and back
+    
+    Values are serialized to JSON (with orjson when installed) and compressed
+    with zlib or zstd once they exceed a size threshold. The first byte of
+    every payload records the format, so payloads written with any
+    compression setting, and legacy JSON TEXT rows, always decode.
+    """
+    
+    def __init__(self, compression: str = "zlib", threshold: int = 1024, level: int = 6):
+        """
+        Initialize the codec
+        
+        Args:
+            compression: Compression for payloads above the threshold: none, zlib or zstd
+            threshold: Minimum serialized size in bytes before compressing
+            level: Compression level
+        """
+        if compression not in COMPRESSIONS:
+            logger.warning(f"Unknown cache compression '{compression}', using 'zlib'")
+            compression = "zlib"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard package not installed, falling back to zlib cache compression")
+            compression = "zlib"
+        
+        self.compression = compression
+        self.threshold = threshold
+        self.level = level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=level) if compression == "zstd" else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+    
+    @classmethod
+    def from_env(cls) -> "CacheCodec":
+        """Create a codec configured from CACHE_COMPRESSION* environment variables"""
+        return cls(
+            compression=os.getenv("CACHE_COMPRESSION", "zlib").lower(),
+            threshold=int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024")),
+            level=int(os.getenv("CACHE_COMPRESSION_LEVEL", "6"))
+        )
+    
+    def encode(self, value: Any) -> bytes:
+        """
+        Encode a value
+        
+        Args:
+            value: JSON-serializable value
+        
+        Returns:
+            Payload starting with its format byte
+        
+        Raises:
+            TypeError: If the value is not JSON-serializable
+        """
+        if orjson is not None:
+            data = orjson.dumps(value)
+        else:
+            data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        
+        if self.compression == "none" or len(data) < self.threshold:
+            return bytes([FORMAT_JSON]) + data
+        if self.compression == "zstd":
+            return bytes([FORMAT_JSON_ZSTD]) + self._zstd_compressor.compress(data)
+        return bytes([FORMAT_JSON_ZLIB]) + zlib.compress(data, self.level)
+    
+    def decode(self, payload: Union[bytes, str]) -> Any:
+        """
+        Decode a payload written by encode() or a legacy JSON TEXT row
+        
+        Args:
+            payload: Stored payload
+        
+        Returns:
+            Decoded value
+        
+        Raises:
+            ValueError: If the payload is corrupt or uses an unknown format
+        """
+        if isinstance(payload, str):
+            return json.loads(payload)
+        
+        if not payload:
+            raise ValueError("Empty cache payload")
+        
+        fmt, data = payload[0], payload[1:]
+        if fmt == FORMAT_JSON_ZLIB:
+            try:
+                data = zlib.decompress(data)
+            except zlib.error as e:
+                raise ValueError(f"Corrupt zlib cache payload: {str(e)}")
+        elif fmt == FORMAT_JSON_ZSTD:
+            if self._zstd_decompressor is None:
+                raise ValueError("zstandard package not installed, cannot decode zstd cache payload")
+            data = self._zstd_decompressor.decompress(data)
+        elif fmt != FORMAT_JSON:
+            raise ValueError(f"Unknown cache payload format: {fmt}")
+        
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
@@ -0,0 +1,102 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+from src.services.cache_backend import CacheBackend
+from src.services.cache_service import CacheService
+from src.services.memory_cache_service import InMemoryCacheService
+from src.services.redis_cache_service import RedisCacheService
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Backends selectable with CACHE_BACKEND
+CACHE_BACKENDS = ("sqlite", "memory", "redis")
+
+# Shared cache per backend and location, so all tools use one instance
+_shared_caches: Dict[Tuple[str, str], CacheBackend] = {}
+_shared_caches_lock = threading.Lock()
+
+def get_cache_backend_name() -> str:
+    """
+    Get the configured cache backend
+    
+    Returns:
+        CACHE_BACKEND if it names a known backend, otherwise "sqlite"
+    """
+    backend = os.getenv("CACHE_BACKEND", "sqlite").lower()
+    if backend not in CACHE_BACKENDS:
+        logger.warning(f"Unknown cache backend '{backend}', using 'sqlite'")
+        backend = "sqlite"
+    return backend
+
+def create_cache(backend: Optional[str] = None, db_path: str = "healthcare_cache.db", ttl: int = 3600) -> CacheBackend:
+    """
+    Create a new cache service for a backend
+    
+    Args:
+        backend: sqlite, memory or redis (defaults to CACHE_BACKEND)
+        db_path: Path to the SQLite database file, used by the sqlite backend
+        ttl: Default time-to-live for cache entries in seconds
+    
+    Returns:
+        Cache service; falls back to SQLite if the redis package is missing
+    """
+    backend = backend or get_cache_backend_name()
+    if backend == "memory":
+        return InMemoryCacheService(ttl=ttl)
+    if backend == "redis":
+        try:
+            return RedisCacheService.from_env(ttl=ttl)
+        except ImportError as e:
+            logger.warning(f"{str(e)}, falling back to the sqlite cache backend")
+    return CacheService(db_path=db_path, ttl=ttl)
+
+def get_shared_cache(db_path: str = "healthcare_cache.db", ttl: int = 3600) -> CacheBackend:
+    """
+    Get the process-wide cache service for the configured backend
+    
+    Every caller asking for the same backend and location gets the same
+    instance, created on first use with that caller's default TTL.
+    
+    Args:
+        db_path: Path to the SQLite database file, used by the sqlite backend
+        ttl: Default time-to-live for cache entries in seconds
+    
+    Returns:
+        Shared cache service
+    """
+    backend = get_cache_backend_name()
+    if backend == "sqlite":
+        location = os.getenv("CACHE_DB_PATH", db_path)
+    elif backend == "redis":
+        location = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    else:
+        location = ""
+    
+    key = (backend, location)
+    cache = _shared_caches.get(key)
+    if cache is None:
+        with _shared_caches_lock:
+            cache = _shared_caches.get(key)
+            if cache is None:
+                cache = _shared_caches[key] = create_cache(backend, db_path=db_path, ttl=ttl)
+    return cache
+
+def get_shared_caches() -> Dict[str, CacheBackend]:
+    """Get every shared cache service, keyed by backend or backend:location"""
+    return {
+        f"{backend}:{location}" if location else backend: cache
+        for (backend, location), cache in list(_shared_caches.items())
+    }
+
+def get_shared_cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """Get the in-memory metrics of every shared cache service"""
+    return {name: cache.get_metrics() for name, cache in get_shared_caches().items()}
+
+async def close_shared_caches() -> None:
+    """Close and forget every shared cache service"""
+    with _shared_caches_lock:
+        caches = list(_shared_caches.values())
+        _shared_caches.clear()
+    for cache in caches:
+        await cache.close()
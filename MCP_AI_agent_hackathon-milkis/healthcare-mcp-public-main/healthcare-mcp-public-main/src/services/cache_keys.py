@@ -0,0 +1,322 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from urllib.parse import unquote
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Bump when canonicalization changes so old keys are never mixed with new ones
+CACHE_KEY_VERSION = "v2"
+
+# Structured key parts longer than this are truncated and suffixed with a hash
+MAX_READABLE_LENGTH = 200
+
+# Characters that delimit key fields, percent-encoded inside field values
+KEY_VALUE_ESCAPES = (("%", "%25"), ("|", "%7C"), ("=", "%3D"), ("#", "%23"))
+
+# ICD-10-CM code: letter, digit, digit or letter, then up to four more characters
+ICD10_CODE_PATTERN = re.compile(r"^([A-Z][0-9][0-9A-Z])\.?([0-9A-Z]{1,4})?$")
+
+# Queries using PubMed syntax keep their term order
+PUBMED_SYNTAX_PATTERN = re.compile(r'["()\[\]*:]|\b(AND|OR|NOT)\b')
+
+def normalize_text(value: Any) -> str:
+    """
+    Case-fold a value and collapse runs of whitespace
+    
+    Args:
+        value: Argument value
+    
+    Returns:
+        Canonical text
+    """
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).casefold()
+
+def normalize_query(value: Any) -> str:
+    """
+    Canonicalize a free-text search query
+    
+    Plain queries are bags of terms that PubMed ANDs together, so their
+    terms are de-duplicated and sorted. Queries with quotes, parentheses,
+    field tags or boolean operators are only case-folded and
+    whitespace-collapsed, since their term order matters.
+    
+    Args:
+        value: Search query
+    
+    Returns:
+        Canonical query
+    """
+    if value is None:
+        return ""
+    text = " ".join(str(value).split())
+    if PUBMED_SYNTAX_PATTERN.search(text):
+        return text.casefold()
+    return " ".join(sorted(set(text.casefold().split())))
+
+def format_icd10_code(value: Any) -> Optional[str]:
+    """
+    Format a value as an ICD-10 code if it looks like one
+    
+    "e119", "E11.9" and " e11.9 " all become "E11.9".
+    
+    Args:
+        value: Code or description
+    
+    Returns:
+        Dotted upper-case code, or None if the value is not a code
+    """
+    if value is None:
+        return None
+    match = ICD10_CODE_PATTERN.match("".join(str(value).split()).upper())
+    if match is None:
+        return None
+    category, detail = match.groups()
+    return f"{category}.{detail}" if detail else category
+
+def normalize_icd10_term(value: Any) -> str:
+    """
+    Canonicalize an ICD-10 search term: codes are formatted, descriptions normalized
+    
+    Args:
+        value: ICD-10 code or description
+    
+    Returns:
+        Canonical search term
+    """
+    return format_icd10_code(value) or normalize_text(value)
+
+# Named, per-tool canonicalization of the positional arguments passed to
+# build_cache_key(), keyed by cache key prefix
+KEY_SCHEMAS: Dict[str, Tuple[Tuple[str, Callable[[Any], str]], ...]] = {
+    "fda_drug": (("search_type", normalize_text), ("drug", normalize_text)),
+    "pubmed_search": (("query", normalize_query), ("max_results", normalize_text), ("date_range", normalize_text)),
+    "clinical_trials": (("condition", normalize_text), ("status", normalize_text), ("max_results", normalize_text)),
+    "health_topics": (("topic", normalize_text), ("language", normalize_text)),
+    "icd10": (("term", normalize_icd10_term), ("max_results", normalize_text))
+}
+
+# Shape of the cached payload per prefix. Bump a tool's version whenever the
+# response it caches changes shape (e.g. FDATool._extract_key_info), so a new
+# deploy never reads entries written by the old code.
+PAYLOAD_SCHEMA_VERSIONS: Dict[str, int] = {
+    "fda_drug": 1,
+    "pubmed_search": 1,
+    "clinical_trials": 1,
+    "health_topics": 1,
+    "icd10": 1
+}
+
+# Key field naming the looked-up entity per prefix, used for entity tags
+ENTITY_FIELDS: Dict[str, str] = {
+    "fda_drug": "drug",
+    "pubmed_search": "query",
+    "clinical_trials": "condition",
+    "health_topics": "topic",
+    "icd10": "term"
+}
+
+# Synonym maps loaded from CACHE_KEY_SYNONYMS_FILE, keyed by prefix then field
+_synonyms: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None
+
+def load_synonyms(path: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Load the optional synonym map
+    
+    The file is JSON of the form {"<prefix>": {"<field>": {"<term>": "<canonical>"}}},
+    e.g. {"fda_drug": {"drug": {"acetaminophen": "paracetamol"}}}. Terms are
+    matched after normalization. Synonyms only merge cache keys; the
+    upstream request still uses the caller's own value.
+    
+    Args:
+        path: JSON file path, defaults to CACHE_KEY_SYNONYMS_FILE
+    
+    Returns:
+        Synonym map, empty if no file is configured or it cannot be read
+    """
+    global _synonyms
+    path = path or os.getenv("CACHE_KEY_SYNONYMS_FILE")
+    _synonyms = {}
+    if not path:
+        return _synonyms
+    
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        _synonyms = {
+            prefix: {
+                field: {normalize_text(term): normalize_text(canonical) for term, canonical in terms.items()}
+                for field, terms in fields.items()
+            }
+            for prefix, fields in raw.items()
+        }
+        logger.info(f"Loaded cache key synonyms from {path}")
+    except (OSError, ValueError, AttributeError) as e:
+        logger.error(f"Failed to load cache key synonyms from {path}: {str(e)}")
+    return _synonyms
+
+def canonicalize(prefix: str, field: str, value: Any) -> str:
+    """
+    Canonicalize one named key field, including the synonym map
+    
+    Args:
+        prefix: Cache key prefix naming the tool
+        field: Field name from the prefix's schema
+        value: Argument value
+    
+    Returns:
+        Canonical field value as it appears in the key
+    """
+    if _synonyms is None:
+        load_synonyms()
+    normalize = dict(KEY_SCHEMAS.get(prefix, ())).get(field, normalize_text)
+    value = normalize(value)
+    return _synonyms.get(prefix, {}).get(field, {}).get(value, value)
+
+def _escape_value(value: str) -> str:
+    """Percent-encode the key delimiters in a canonical field value"""
+    for char, escaped in KEY_VALUE_ESCAPES:
+        value = value.replace(char, escaped)
+    return value
+
+def build_cache_key(prefix: str, *args: Any) -> str:
+    """
+    Build a canonical, versioned cache key
+    
+    Arguments are canonicalized by the prefix's entry in KEY_SCHEMAS (or
+    normalize_text for unknown prefixes) and mapped through the synonym
+    map, so lookups differing only in case, spacing, term order or code
+    formatting share one key. The prefix's payload schema version is part
+    of the key. Delimiters inside values are percent-encoded, so distinct
+    arguments never share a key. The key stays readable:
+    "fda_drug:v2:s1:search_type=label|drug=sertraline".
+    
+    Args:
+        prefix: Cache key prefix naming the tool
+        *args: Lookup arguments, in the order of the prefix's schema
+    
+    Returns:
+        A cache key of the form "<prefix>:<version>:s<schema>:<field>=<value>|..."
+    """
+    schema: Sequence[Tuple[str, Callable[[Any], str]]] = KEY_SCHEMAS.get(prefix, ())
+    parts = []
+    for i, arg in enumerate(args):
+        name = schema[i][0] if i < len(schema) else f"arg{i}"
+        parts.append(f"{name}={_escape_value(canonicalize(prefix, name, arg))}")
+    
+    body = "|".join(parts)
+    if len(body) > MAX_READABLE_LENGTH:
+        body = f"{body[:MAX_READABLE_LENGTH]}#{hashlib.md5(body.encode()).hexdigest()}"
+    return f"{prefix}:{CACHE_KEY_VERSION}:s{PAYLOAD_SCHEMA_VERSIONS.get(prefix, 1)}:{body}"
+
+def _split_cache_key(key: str) -> Optional[Tuple[str, str, str]]:
+    """Split a current-version key into (prefix, schema segment, body), or None"""
+    parts = key.split(":", 3)
+    if len(parts) != 4 or parts[1] != CACHE_KEY_VERSION or not parts[2].startswith("s"):
+        return None
+    return parts[0], parts[2], parts[3]
+
+def parse_cache_key(key: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """
+    Recover the prefix and canonical fields from a key built by build_cache_key()
+    
+    Args:
+        key: Cache key
+    
+    Returns:
+        Tuple of (prefix, unescaped field values), or None for keys of another
+        version, truncated keys and keys that cannot be parsed
+    """
+    split = _split_cache_key(key)
+    if split is None:
+        return None
+    prefix, _, body = split
+    
+    fields = {}
+    for part in body.split("|") if body else []:
+        name, sep, value = part.partition("=")
+        if not sep or "#" in value:
+            return None
+        fields[name] = unquote(value)
+    return prefix, fields
+
+def tool_tag(prefix: str) -> str:
+    """Tag of every entry cached by a tool, e.g. tool:fda_drug"""
+    return f"tool:{prefix}"
+
+def schema_tag(prefix: str, schema: Any) -> str:
+    """Tag of a tool's entries with one payload schema version, e.g. schema:fda_drug:s1"""
+    schema = str(schema)
+    return f"schema:{prefix}:{schema if schema.startswith('s') else 's' + schema}"
+
+def entity_tag(prefix: str, entity: Any) -> str:
+    """
+    Tag of a tool's entries about one entity, e.g. "entity:fda_drug:sertraline"
+    
+    The entity is canonicalized like the key field it comes from, so
+    "Sertraline " and "sertraline" name the same entity.
+    
+    Args:
+        prefix: Cache key prefix naming the tool
+        entity: Drug name, search query, condition, topic or ICD-10 term
+    
+    Returns:
+        Entity tag
+    """
+    field = ENTITY_FIELDS.get(prefix)
+    value = canonicalize(prefix, field, entity) if field else normalize_text(entity)
+    return f"entity:{prefix}:{value}"
+
+def invalidation_tag(tool: str, entity: Any = None, schema: Any = None) -> str:
+    """
+    Build the tag to invalidate: a tool's entries about one entity, with one
+    payload schema version, or all of them
+    
+    Args:
+        tool: Cache key prefix, e.g. "fda_drug"
+        entity: Entity to invalidate (optional)
+        schema: Payload schema version to invalidate (optional)
+    
+    Returns:
+        Entity, schema or tool tag
+    
+    Raises:
+        ValueError: If the tool is unknown or both entity and schema are given
+    """
+    if tool not in KEY_SCHEMAS:
+        raise ValueError(f"Unknown cache tool '{tool}', expected one of: {', '.join(KEY_SCHEMAS)}")
+    if entity is not None and schema is not None:
+        raise ValueError("Invalidate by entity or by schema version, not both")
+    if entity is not None:
+        return entity_tag(tool, entity)
+    if schema is not None:
+        return schema_tag(tool, schema)
+    return tool_tag(tool)
+
+def cache_tags(key: str) -> List[str]:
+    """
+    Get the invalidation tags of a cache key
+    
+    Args:
+        key: Cache key built by build_cache_key()
+    
+    Returns:
+        Tool, schema and (when the key names one) entity tags; empty for
+        keys of other versions
+    """
+    split = _split_cache_key(key)
+    if split is None:
+        return []
+    prefix, schema, _ = split
+    tags = [tool_tag(prefix), schema_tag(prefix, schema)]
+    
+    parsed = parse_cache_key(key)
+    field = ENTITY_FIELDS.get(prefix)
+    if parsed is not None and field and parsed[1].get(field):
+        tags.append(f"entity:{prefix}:{parsed[1][field]}")
+    return tags
@@ -0,0 +1,288 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Sequence
+
+# Upper bounds (milliseconds) of the latency histogram buckets; a final
+# unbounded bucket catches everything slower
+LATENCY_BUCKETS_MS: Sequence[float] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# Counters kept per key prefix
+COUNTERS = (
+    "memory_hits",
+    "store_hits",
+    "misses",
+    "expired",
+    "stale_hits",
+    "early_refreshes",
+    "errors",
+    "sets",
+    "bytes_read",
+    "bytes_written",
+    "evictions",
+    "bytes_evicted"
+)
+
+# Prefix reported for keys that have none
+NO_PREFIX = "other"
+
+def key_prefix(key: str) -> str:
+    """
+    Get the tool prefix of a cache key, e.g. "fda_drug" for "fda_drug:v2:s1:..."
+    
+    Args:
+        key: Cache key
+    
+    Returns:
+        Key prefix, or NO_PREFIX for keys without one
+    """
+    prefix, sep, _ = key.partition(":")
+    return prefix if sep and prefix else NO_PREFIX
+
+def expiry_spread(bucket_counts: Dict[int, int], bucket_seconds: int) -> Dict[str, Any]:
+    """
+    Summarize how evenly entry expirations are spread over time
+    
+    A peak far above the mean means many entries expire together and
+    will be refetched from upstream in the same burst.
+    
+    Args:
+        bucket_counts: Number of expiring entries per time bucket, keyed by
+            bucket index (expires_at // bucket_seconds)
+        bucket_seconds: Width of a bucket in seconds
+    
+    Returns:
+        Dictionary with the bucket width, number of non-empty buckets,
+        mean and peak expirations per bucket, the peak-to-mean ratio and
+        the start of the peak bucket
+    """
+    if not bucket_counts:
+        return {"bucket_seconds": bucket_seconds, "buckets": 0, "mean_per_bucket": 0.0,
+                "max_per_bucket": 0, "peak_ratio": 0.0, "peak_at": None}
+    peak_bucket, peak = max(bucket_counts.items(), key=lambda item: item[1])
+    mean = sum(bucket_counts.values()) / len(bucket_counts)
+    return {
+        "bucket_seconds": bucket_seconds,
+        "buckets": len(bucket_counts),
+        "mean_per_bucket": round(mean, 2),
+        "max_per_bucket": peak,
+        "peak_ratio": round(peak / mean, 2),
+        "peak_at": peak_bucket * bucket_seconds
+    }
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is a bisect and an increment"""
+    
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        """
+        Initialize an empty histogram
+        
+        Args:
+            bounds: Ascending bucket upper bounds in milliseconds
+        """
+        self.bounds = tuple(bounds)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, ms: float) -> None:
+        """Record one duration in milliseconds"""
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add another histogram's observations to this one
+        
+        Args:
+            other: Histogram with the same bucket bounds
+        
+        Raises:
+            ValueError: If the bucket bounds differ
+        """
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge latency histograms with different bucket bounds")
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+    
+    def state(self) -> Dict[str, Any]:
+        """Get the bucket counts, total and maximum, as stored by from_state()"""
+        return {"counts": list(self.counts), "total_ms": self.total_ms, "max_ms": self.max_ms}
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], bounds: Sequence[float] = LATENCY_BUCKETS_MS) -> "LatencyHistogram":
+        """
+        Rebuild a histogram from state()
+        
+        Args:
+            state: Dictionary returned by state()
+            bounds: Bucket bounds the state was recorded with
+        
+        Returns:
+            Histogram with the stored observations
+        
+        Raises:
+            ValueError: If the number of bucket counts does not match bounds
+        """
+        histogram = cls(bounds)
+        if len(state["counts"]) != len(histogram.counts):
+            raise ValueError("Stored latency histogram does not match the bucket bounds")
+        histogram.counts = list(state["counts"])
+        histogram.count = sum(histogram.counts)
+        histogram.total_ms = state["total_ms"]
+        histogram.max_ms = state["max_ms"]
+        return histogram
+    
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile as the upper bound of the bucket it falls in
+        
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.95
+        
+        Returns:
+            Estimated duration in milliseconds (the observed maximum for the
+            unbounded bucket), 0.0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.bounds[i], self.max_ms) if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the histogram as a dictionary
+        
+        Returns:
+            Dictionary with count, total/average/max and p50/p95/p99 in
+            milliseconds, and the per-bucket counts keyed by upper bound
+        """
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "buckets": buckets
+        }
+
+class CacheMetrics:
+    """
+    In-memory cache counters and latency histograms, split by key prefix
+    
+    Everything is updated on the lookup path under one lock and read
+    without touching the database, so snapshots are cheap enough for
+    health probes.
+    """
+    
+    def __init__(self):
+        """Initialize empty metrics"""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[str, Dict[str, LatencyHistogram]] = {}
+    
+    def _prefix_counters(self, prefix: str) -> Dict[str, int]:
+        counters = self._counters.get(prefix)
+        if counters is None:
+            counters = self._counters[prefix] = dict.fromkeys(COUNTERS, 0)
+            self._latency[prefix] = {"get": LatencyHistogram(), "set": LatencyHistogram()}
+        return counters
+    
+    def record_get(self, key: str, outcome: str, seconds: float, size: int = 0) -> None:
+        """
+        Record one lookup
+        
+        Args:
+            key: Cache key
+            outcome: Counter to increment: memory_hits, store_hits, misses, expired,
+                early_refreshes or errors
+            seconds: Lookup duration
+            size: Stored bytes read from the backing store
+        """
+        prefix = key_prefix(key)
+        with self._lock:
+            counters = self._prefix_counters(prefix)
+            counters[outcome] += 1
+            counters["bytes_read"] += size
+            self._latency[prefix]["get"].observe(seconds * 1000)
+    
+    def record_set(self, key: str, seconds: float, size: int) -> None:
+        """
+        Record one write
+        
+        Args:
+            key: Cache key
+            seconds: Write duration, including encoding
+            size: Stored bytes written
+        """
+        prefix = key_prefix(key)
+        with self._lock:
+            counters = self._prefix_counters(prefix)
+            counters["sets"] += 1
+            counters["bytes_written"] += size
+            self._latency[prefix]["set"].observe(seconds * 1000)
+    
+    def increment(self, key: str, counter: str, amount: int = 1) -> None:
+        """
+        Increment a counter for a key's prefix
+        
+        Args:
+            key: Cache key
+            counter: Counter name from COUNTERS
+            amount: Amount to add
+        """
+        with self._lock:
+            self._prefix_counters(key_prefix(key))[counter] += amount
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the counters and latency histograms
+        
+        Returns:
+            Dictionary with totals over all prefixes and, per prefix, the
+            counters, hit ratio and get/set latency histograms
+        """
+        with self._lock:
+            prefixes = {
+                prefix: {
+                    **counters,
+                    "latency": {op: histogram.snapshot() for op, histogram in self._latency[prefix].items()}
+                }
+                for prefix, counters in self._counters.items()
+            }
+        
+        totals = dict.fromkeys(COUNTERS, 0)
+        for stats in prefixes.values():
+            for counter in COUNTERS:
+                totals[counter] += stats[counter]
+            stats["hit_ratio"] = self._hit_ratio(stats)
+        totals["hit_ratio"] = self._hit_ratio(totals)
+        
+        return {"totals": totals, "prefixes": prefixes}
+    
+    @staticmethod
+    def _hit_ratio(counters: Dict[str, Any]) -> float:
+        """Share of lookups answered by either tier; expired entries and early refreshes count as misses"""
+        hits = counters["memory_hits"] + counters["store_hits"]
+        lookups = hits + counters["misses"] + counters["expired"] + counters["early_refreshes"] + counters["errors"]
+        return round(hits / lookups, 4) if lookups else 0.0
+    
+    def reset(self) -> None:
+        """Clear all counters and histograms"""
+        with self._lock:
+            self._counters.clear()
+            self._latency.clear()
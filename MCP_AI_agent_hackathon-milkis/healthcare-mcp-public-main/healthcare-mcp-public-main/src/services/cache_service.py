@@ -1,25 +1,68 @@
-import json
 import time
 import os
 import sqlite3
 import logging
 import threading
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from src.services.cache_backend import BaseCacheService
+from src.services.cache_keys import cache_tags
+from src.services.cache_metrics import CacheMetrics, expiry_spread
+from src.services.cache_sweeper import CacheSweeper
+from src.services.memory_cache import MemoryCache, MISSING
+from src.services.sqlite_pool import SQLitePool
+from src.services.write_behind import WriteBehindQueue
 
 logger = logging.getLogger("healthcare-mcp")
 
-class CacheService:
+class CacheService(BaseCacheService):
     """
     Cache service with SQLite backend and connection pooling
     
     This service provides caching functionality with automatic expiration
-    and connection pooling for better performance.
+    and connection pooling for better performance. A bounded in-process
+    memory tier (L1) holding decoded values sits in front of the shared,
+    persistent SQLite tier (L2). SQLite reads use a pool of read-only
+    connections; all writes go through a single writer connection.
     """
     
-    # Class-level connection pool
-    _connection_pools: Dict[str, sqlite3.Connection] = {}
-    _connection_locks: Dict[str, threading.Lock] = {}
+    # Class-level connection pools: one writer and several readers per database
+    _pools: Dict[str, SQLitePool] = {}
+    _pools_lock = threading.Lock()
+    
+    # Class-level memory tiers and SQLite tier counters, per database
+    _memory_tiers: Dict[str, MemoryCache] = {}
+    _sqlite_stats: Dict[str, Dict[str, int]] = {}
+    
+    # Class-level per-prefix counters and latency histograms, per database
+    _metrics: Dict[str, CacheMetrics] = {}
+    
+    # Class-level size budget bookkeeping and pending access updates, per database
+    _eviction_state: Dict[str, Dict[str, Any]] = {}
+    _pending_access: Dict[str, Dict[str, List[float]]] = {}
+    
+    # Class-level background sweepers, one per database
+    _sweepers: Dict[str, CacheSweeper] = {}
+    
+    # Class-level write-behind queues and writes not yet committed, per database;
+    # a MISSING value marks a queued delete
+    _write_queues: Dict[str, WriteBehindQueue] = {}
+    _pending_writes: Dict[str, Dict[str, Tuple[Any, float, int, tuple]]] = {}
+    _pending_write_locks: Dict[str, threading.Lock] = {}
+    
+    INSERT_SQL = """
+        INSERT OR REPLACE INTO cache
+            (key, data, expires_at, created_at, stale_until, size_bytes, last_accessed, hit_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+    """
+    TAG_SQL = "INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)"
+    DELETE_SQL = "DELETE FROM cache WHERE key = ?"
+    ACCESS_SQL = (
+        "UPDATE cache SET last_accessed = MAX(COALESCE(last_accessed, 0), ?), hit_count = hit_count + ? WHERE key = ?"
+    )
+    
+    # Supported eviction policies for the SQLite tier
+    EVICTION_POLICIES = ("lru", "lfu")
     
     def __init__(self, db_path: str = "cache.db", ttl: int = 3600):  # Default TTL: 1 hour
         """
@@ -29,19 +72,53 @@ class CacheService:
             db_path: Path to the SQLite database file
             ttl: Default time-to-live for cache entries in seconds
         """
+        super().__init__(ttl)
         self.db_path = os.getenv("CACHE_DB_PATH", db_path)
-        self.default_ttl = ttl
         
-        # Initialize connection lock for this database
-        if self.db_path not in self._connection_locks:
-            self._connection_locks[self.db_path] = threading.Lock()
+        # Size budget for the SQLite tier and eviction settings
+        self.max_bytes = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.max_rows = int(os.getenv("CACHE_MAX_ROWS", "100000"))
+        self.eviction_policy = os.getenv("CACHE_EVICTION_POLICY", "lru").lower()
+        if self.eviction_policy not in self.EVICTION_POLICIES:
+            logger.warning(f"Unknown cache eviction policy '{self.eviction_policy}', using 'lru'")
+            self.eviction_policy = "lru"
+        self.eviction_batch_size = int(os.getenv("CACHE_EVICTION_BATCH_SIZE", "200"))
+        self.eviction_check_interval = int(os.getenv("CACHE_EVICTION_CHECK_INTERVAL", "100"))
+        
+        # Width of the time buckets expirations are counted in for get_stats()
+        self.expiry_bucket_seconds = max(1, int(os.getenv("CACHE_EXPIRY_BUCKET_SECONDS", "60")))
+        
+        # Share one memory tier between all instances using this database
+        if self.db_path not in self._memory_tiers:
+            self._memory_tiers[self.db_path] = MemoryCache(
+                max_entries=int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "1024")),
+                max_bytes=int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(32 * 1024 * 1024)))
+            )
+            self._sqlite_stats[self.db_path] = {"hits": 0, "misses": 0, "stale_hits": 0}
+            self._metrics[self.db_path] = CacheMetrics()
+        self.memory = self._memory_tiers[self.db_path]
+        self.metrics = self._metrics[self.db_path]
         
         # Initialize the database
         self._init_db()
         
-        # Schedule periodic cleanup of expired entries
-        self._schedule_cleanup()
+        if self.db_path not in self._eviction_state:
+            self._eviction_state[self.db_path] = {
+                "sets_since_check": 0,
+                "total_rows": 0,
+                "total_bytes": 0,
+                "evicted_rows": 0,
+                "evicted_bytes": 0,
+                "eviction_runs": 0
+            }
+            self._pending_access[self.db_path] = {}
+            self._pending_writes[self.db_path] = {}
+            self._pending_write_locks[self.db_path] = threading.Lock()
+            self._refresh_totals()
         
+        # Start the background sweeper for expired entries
+        self._get_sweeper()
+    
     async def init(self) -> None:
         """
         Initialize the cache service asynchronously
@@ -56,50 +133,96 @@ class CacheService:
         
         logger.info(f"Cache service initialized with database at {self.db_path}")
     
-    def _get_connection(self) -> sqlite3.Connection:
+    def _get_pool(self) -> SQLitePool:
         """
-        Get a connection from the pool or create a new one
+        Get the connection pool for this database, creating it if needed
         
         Returns:
-            SQLite connection
+            Connection pool with one writer and several read-only connections
         """
-        # Create a lock for this database path if it doesn't exist
-        if self.db_path not in self._connection_locks:
-            self._connection_locks[self.db_path] = threading.RLock()
-            
-        with self._connection_locks[self.db_path]:
-            if self.db_path not in self._connection_pools:
-                logger.debug(f"Creating new database connection for {self.db_path}")
-                conn = sqlite3.connect(self.db_path, check_same_thread=False)
-                # Enable WAL mode for better concurrency
-                conn.execute("PRAGMA journal_mode=WAL")
-                # Enable foreign keys
-                conn.execute("PRAGMA foreign_keys=ON")
-                self._connection_pools[self.db_path] = conn
-            
-            return self._connection_pools[self.db_path]
+        pool = self._pools.get(self.db_path)
+        if pool is None or pool.closed:
+            with self._pools_lock:
+                pool = self._pools.get(self.db_path)
+                if pool is None or pool.closed:
+                    pool = SQLitePool.from_env(self.db_path, name="cache-sqlite")
+                    self._pools[self.db_path] = pool
+        return pool
     
     def _init_db(self) -> None:
         """Initialize the SQLite database if it doesn't exist"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Create cache table if it doesn't exist
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS cache (
-            key TEXT PRIMARY KEY,
-            data TEXT NOT NULL,
-            expires_at REAL NOT NULL,
-            created_at REAL NOT NULL
-        )
-        ''')
-        
-        # Create index on expires_at for faster cleanup
-        cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
-        ''')
-        
-        conn.commit()
+        with self._get_pool().writer() as conn:
+            cursor = conn.cursor()
+            
+            # Create cache table if it doesn't exist
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+            ''')
+            
+            # Create index on expires_at for faster cleanup
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
+            ''')
+            
+            # Add columns missing from databases created by older versions
+            cursor.execute("PRAGMA table_info(cache)")
+            columns = {row[1] for row in cursor.fetchall()}
+            if "stale_until" not in columns:
+                cursor.execute("ALTER TABLE cache ADD COLUMN stale_until REAL")
+                cursor.execute("UPDATE cache SET stale_until = expires_at")
+            if "size_bytes" not in columns:
+                cursor.execute("ALTER TABLE cache ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0")
+                cursor.execute("UPDATE cache SET size_bytes = length(data)")
+            if "last_accessed" not in columns:
+                cursor.execute("ALTER TABLE cache ADD COLUMN last_accessed REAL")
+                cursor.execute("UPDATE cache SET last_accessed = created_at")
+            if "hit_count" not in columns:
+                cursor.execute("ALTER TABLE cache ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0")
+            
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_stale_until ON cache(stale_until)
+            ''')
+            
+            # Indexes for picking eviction victims and summing sizes without a table scan
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_last_accessed ON cache(last_accessed)
+            ''')
+            
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_hit_count ON cache(hit_count, last_accessed)
+            ''')
+            
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_size_bytes ON cache(size_bytes)
+            ''')
+            
+            # Invalidation tags; a tag's entries are one index range away
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags(key)
+            ''')
+            
+            # Drop the tags of entries removed by delete, eviction or the sweeper
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cache_tags_cleanup AFTER DELETE ON cache
+            BEGIN
+                DELETE FROM cache_tags WHERE key = OLD.key;
+            END
+            ''')
+            
+            conn.commit()
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -107,73 +230,207 @@ class CacheService:
         
         Args:
             key: Cache key
-            
+        
         Returns:
             Cached value or None if not found or expired
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        started = time.perf_counter()
+        value, outcome, size = self._lookup(key)
+        self.metrics.record_get(key, outcome, time.perf_counter() - started, size)
+        return value
+    
+    def _lookup(self, key: str) -> Tuple[Optional[Any], str, int]:
+        """
+        Look a key up in the memory tier, pending writes and then SQLite
+        
+        Fresh entries may still be reported as a miss ("early_refreshes")
+        so that the caller refetches them before they expire.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (value or None, metrics outcome, stored bytes read from SQLite)
+        """
+        # Serve hot entries from the memory tier without touching SQLite
+        value, expires_at = self.memory.get_entry(key)
+        if value is not MISSING:
+            if self._refresh_early(key, expires_at):
+                return None, "early_refreshes", 0
+            self._record_access(key)
+            return value, "memory_hits", 0
+        
+        sqlite_stats = self._sqlite_stats[self.db_path]
+        
+        # Read our own writes that are still waiting for the next group commit
+        pending = self._pending_writes[self.db_path].get(key)
+        if pending is not None and pending[0] is MISSING:
+            # Deleted, but the delete is not committed yet
+            sqlite_stats["misses"] += 1
+            self._start_recompute(key)
+            return None, "misses", 0
+        if pending is not None and pending[1] >= time.time():
+            value, expires_at, size, _ = pending
+            if self._refresh_early(key, expires_at):
+                return None, "early_refreshes", 0
+            sqlite_stats["hits"] += 1
+            self._record_access(key)
+            self.memory.set(key, value, expires_at, size)
+            return value, "store_hits", 0
         
         try:
             # Get cache entry
-            cursor.execute("SELECT data, expires_at FROM cache WHERE key = ?", (key,))
-            result = cursor.fetchone()
+            with self._get_pool().reader() as conn:
+                result = conn.execute("SELECT data, expires_at, stale_until FROM cache WHERE key = ?", (key,)).fetchone()
             
             if not result:
-                return None
+                sqlite_stats["misses"] += 1
+                self._start_recompute(key)
+                return None, "misses", 0
             
-            data, expires_at = result
+            data, expires_at, stale_until = result
             
             # Check if expired
             if expires_at < time.time():
-                # Delete expired entry asynchronously
-                threading.Thread(target=self._delete_expired, args=(key,)).start()
-                return None
+                sqlite_stats["misses"] += 1
+                self._start_recompute(key)
+                # Hand the expired entry to the sweeper unless it may still be served stale
+                if (stale_until or expires_at) < time.time():
+                    self._get_sweeper().enqueue(key)
+                return None, "expired", 0
             
-            # Parse JSON data
+            if self._refresh_early(key, expires_at):
+                return None, "early_refreshes", 0
+            
+            # Decode the stored payload
             try:
-                return json.loads(data)
-            except json.JSONDecodeError:
-                logger.error(f"Failed to decode JSON data for key: {key}")
-                return None
-                
+                value = self.codec.decode(data)
+                sqlite_stats["hits"] += 1
+                self._record_access(key)
+                self.memory.set(key, value, expires_at, len(data))
+                return value, "store_hits", len(data)
+            except ValueError as e:
+                logger.error(f"Failed to decode cache data for key {key}: {str(e)}")
+                return None, "errors", 0
+        
         except sqlite3.Error as e:
             logger.error(f"Database error in get(): {str(e)}")
+            return None, "errors", 0
+    
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        Get an expired value that is still within its maximum staleness
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Stale cached value or None if not found, fresh or too old
+        """
+        now = time.time()
+        pending = self._pending_writes[self.db_path].get(key)
+        if pending is not None:
+            value, expires_at, _, params = pending
+            if value is MISSING or not expires_at < now <= params[4]:
+                return None
+            self._sqlite_stats[self.db_path]["stale_hits"] += 1
+            self.metrics.increment(key, "stale_hits")
+            return value
+        
+        try:
+            with self._get_pool().reader() as conn:
+                result = conn.execute(
+                    "SELECT data FROM cache WHERE key = ? AND expires_at < ? AND stale_until >= ?",
+                    (key, now, now)
+                ).fetchone()
+            
+            if not result:
+                return None
+            
+            self._sqlite_stats[self.db_path]["stale_hits"] += 1
+            self.metrics.increment(key, "stale_hits")
+            return self.codec.decode(result[0])
+        
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error in get_stale(): {str(e)}")
             return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    async def get_async(self, key: str) -> Optional[Any]:
+        """
+        Get a value without blocking the event loop
+        
+        Runs get() on the connection pool's executor.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None if not found or expired
+        """
+        return await self._get_pool().run(self.get, key)
+    
+    async def get_stale_async(self, key: str) -> Optional[Any]:
+        """
+        Get a stale value without blocking the event loop
+        
+        Runs get_stale() on the connection pool's executor.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Stale cached value or None if not found, fresh or too old
+        """
+        return await self._get_pool().run(self.get_stale, key)
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool:
         """
         Set value in cache with optional TTL
         
+        The TTL is shortened by a random share of up to CACHE_TTL_JITTER.
+        
         Args:
             key: Cache key
             value: Value to cache
             ttl: Time-to-live in seconds (optional)
-            
+            jitter: Whether to apply TTL jitter; off for entries whose expiry is already set
+        
         Returns:
             True if successful, False otherwise
         """
+        started = time.perf_counter()
+        self._finish_recompute(key)
         ttl = ttl or self.default_ttl
+        if jitter:
+            ttl = self._jitter_ttl(ttl)
         expires_at = time.time() + ttl
         created_at = time.time()
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Serialize value to JSON
-            serialized_value = json.dumps(value)
+            # Serialize and compress the value
+            serialized_value = self.codec.encode(value)
             
-            # Insert or replace cache entry
-            cursor.execute(
-                "INSERT OR REPLACE INTO cache (key, data, expires_at, created_at) VALUES (?, ?, ?, ?)",
-                (key, serialized_value, expires_at, created_at)
-            )
+            # Queue the insert for the next group commit; reads see it through the pending map
+            params = (key, serialized_value, expires_at, created_at, expires_at + self._get_max_stale(key),
+                      len(serialized_value), created_at)
+            with self._pending_write_locks[self.db_path]:
+                self._pending_writes[self.db_path][key] = (value, expires_at, len(serialized_value), params)
+            write_queue = self._get_write_queue()
+            write_queue.enqueue(self.INSERT_SQL, params)
+            for tag in cache_tags(key):
+                write_queue.enqueue(self.TAG_SQL, (tag, key))
+            self.memory.set(key, value, expires_at, len(serialized_value))
+            self.metrics.record_set(key, time.perf_counter() - started, len(serialized_value))
             
-            conn.commit()
+            # Every few writes, have the sweeper check the size budget off the request path
+            state = self._eviction_state[self.db_path]
+            state["sets_since_check"] += 1
+            if state["sets_since_check"] >= self.eviction_check_interval:
+                state["sets_since_check"] = 0
+                self._get_sweeper().request_maintenance()
             return True
-            
-        except (sqlite3.Error, json.JSONEncodeError) as e:
+        
+        except (sqlite3.Error, TypeError) as e:
             logger.error(f"Error in set(): {str(e)}")
             return False
     
@@ -181,41 +438,78 @@ class CacheService:
         """
         Delete value from cache
         
+        The delete is queued behind any pending insert of the key, so it
+        commits with the next group commit; until then reads see the key as
+        deleted.
+        
         Args:
             key: Cache key
-            
+        
         Returns:
             True if deleted, False otherwise
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        params = (key,)
+        with self._pending_write_locks[self.db_path]:
+            previous = self._pending_writes[self.db_path].get(key)
+            self._pending_writes[self.db_path][key] = (MISSING, 0.0, 0, params)
+        self.memory.delete(key)
         
-        try:
-            cursor.execute("DELETE FROM cache WHERE key = ?", (key,))
-            deleted = cursor.rowcount > 0
-            
-            conn.commit()
-            return deleted
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error in delete(): {str(e)}")
-            return False
+        deleted = previous is not None and previous[0] is not MISSING
+        if previous is None:
+            try:
+                with self._get_pool().reader() as conn:
+                    deleted = conn.execute("SELECT 1 FROM cache WHERE key = ?", params).fetchone() is not None
+            except sqlite3.Error as e:
+                logger.error(f"Error in delete(): {str(e)}")
+        
+        self._get_write_queue().enqueue(self.DELETE_SQL, params)
+        return deleted
     
-    def _delete_expired(self, key: str) -> None:
+    def invalidate_tag(self, tag: str, batch_size: Optional[int] = None) -> int:
         """
-        Delete an expired cache entry
+        Delete every entry carrying a tag
+        
+        Keys are read from the tag index and deleted in batches of
+        batch_size, each in its own short write transaction, so a large
+        invalidation never holds the writer for long.
         
         Args:
-            key: Cache key
+            tag: Tag from cache_tags(), e.g. "entity:fda_drug:sertraline"
+            batch_size: Keys deleted per transaction (defaults to CACHE_INVALIDATE_BATCH_SIZE)
+        
+        Returns:
+            Number of deleted entries
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        batch_size = batch_size or int(os.getenv("CACHE_INVALIDATE_BATCH_SIZE", "500"))
+        
+        # Commit queued writes first so pending entries and their tags are included
+        self.flush()
+        self._invalidate_memory_tag(self.memory, tag)
+        deleted = 0
         
         try:
-            cursor.execute("DELETE FROM cache WHERE key = ?", (key,))
-            conn.commit()
+            while True:
+                with self._get_pool().writer() as conn:
+                    keys = [(key,) for (key,) in conn.execute(
+                        "SELECT key FROM cache_tags WHERE tag = ? LIMIT ?", (tag, batch_size)
+                    )]
+                    if not keys:
+                        break
+                    rows = conn.executemany("DELETE FROM cache WHERE key = ?", keys).rowcount
+                    # Tags whose entry is already gone
+                    conn.executemany("DELETE FROM cache_tags WHERE tag = ? AND key = ?", [(tag, key) for (key,) in keys])
+                    conn.commit()
+                
+                for (key,) in keys:
+                    self.memory.delete(key)
+                deleted += rows
+            
+            logger.info(f"Invalidated {deleted} cache entries tagged {tag}")
+            return deleted
+        
         except sqlite3.Error as e:
-            logger.error(f"Error in _delete_expired(): {str(e)}")
+            logger.error(f"Error in invalidate_tag(): {str(e)}")
+            return deleted
     
     def clear_expired(self) -> int:
         """
@@ -224,63 +518,310 @@ class CacheService:
         Returns:
             Number of deleted entries
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        self.memory.clear_expired()
+        self.flush()
         
         try:
-            cursor.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
-            deleted = cursor.rowcount
-            
-            conn.commit()
+            # Entries past expiry but within their staleness window are kept
+            with self._get_pool().writer() as conn:
+                deleted = conn.execute("DELETE FROM cache WHERE stale_until < ?", (time.time(),)).rowcount
+                conn.commit()
             logger.info(f"Cleared {deleted} expired cache entries")
             return deleted
-            
+        
         except sqlite3.Error as e:
             logger.error(f"Error in clear_expired(): {str(e)}")
             return 0
     
-    def _schedule_cleanup(self) -> None:
-        """Schedule periodic cleanup of expired entries"""
-        # This would normally use a background task scheduler
-        # For simplicity, we'll just log a message
-        logger.info("Cache cleanup would be scheduled here in a production environment")
+    def _record_access(self, key: str) -> None:
+        """
+        Record a cache hit for LRU/LFU bookkeeping
+        
+        Access updates are buffered in memory and written in one batch by
+        _flush_access(), so reads never write to SQLite.
+        
+        Args:
+            key: Cache key that was hit
+        """
+        pending = self._pending_access[self.db_path]
+        entry = pending.get(key)
+        if entry is None:
+            pending[key] = [time.time(), 1]
+        else:
+            entry[0] = time.time()
+            entry[1] += 1
+    
+    def _flush_access(self) -> None:
+        """Queue buffered access times and hit counts for the next group commit"""
+        pending = self._pending_access[self.db_path]
+        if not pending:
+            return
+        self._pending_access[self.db_path] = {}
+        
+        write_queue = self._get_write_queue()
+        for key, (accessed, hits) in pending.items():
+            write_queue.enqueue(self.ACCESS_SQL, (accessed, hits, key))
+    
+    def _get_write_queue(self) -> WriteBehindQueue:
+        """
+        Get the write-behind queue for this database, starting it if needed
+        
+        Returns:
+            Running write-behind queue
+        """
+        write_queue = self._write_queues.get(self.db_path)
+        if write_queue is None or not write_queue.running:
+            write_queue = WriteBehindQueue.from_env(
+                self._get_pool().writer,
+                on_flush=self._on_writes_flushed,
+                name="cache-write-behind"
+            )
+            write_queue.start()
+            self._write_queues[self.db_path] = write_queue
+        return write_queue
+    
+    def _on_writes_flushed(self, batch: List[Tuple[str, tuple]], committed: bool) -> None:
+        """
+        Drop committed (or failed) inserts and deletes from the pending map
+        
+        Entries replaced by a newer set() or delete() since the batch was taken are kept.
+        
+        Args:
+            batch: Writes handled by the flush
+            committed: Whether the batch was committed
+        """
+        pending = self._pending_writes[self.db_path]
+        with self._pending_write_locks[self.db_path]:
+            for sql, params in batch:
+                if sql is self.INSERT_SQL or sql is self.DELETE_SQL:
+                    entry = pending.get(params[0])
+                    if entry is not None and entry[3] is params:
+                        del pending[params[0]]
+    
+    def flush(self) -> int:
+        """
+        Commit all queued cache writes now
+        
+        Returns:
+            Number of committed writes
+        """
+        return self._get_write_queue().flush()
+    
+    def _refresh_totals(self) -> Tuple[int, int]:
+        """
+        Recount rows and bytes held by the SQLite tier
+        
+        Both aggregates are answered from indexes rather than the table itself.
+        
+        Returns:
+            Tuple of (total rows, total bytes)
+        """
+        state = self._eviction_state[self.db_path]
+        
+        try:
+            with self._get_pool().reader() as conn:
+                state["total_rows"], state["total_bytes"] = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cache"
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error in _refresh_totals(): {str(e)}")
+        
+        return state["total_rows"], state["total_bytes"]
+    
+    def evict(self) -> int:
+        """
+        Evict one bounded batch of entries if the SQLite tier is over budget
+        
+        Entries past their staleness window go first, then the least recently
+        used (lru) or least frequently used (lfu) entries. At most
+        eviction_batch_size rows are removed per call, so a large backlog is
+        worked off incrementally over subsequent calls. The sweeper runs it
+        after each scheduled sweep and whenever set() asks for a check.
+        
+        Returns:
+            Number of evicted entries
+        """
+        # Off the request path: commit pending writes and access times so victims are picked on current data
+        self._flush_access()
+        self.flush()
+        total_rows, total_bytes = self._refresh_totals()
+        if total_rows <= self.max_rows and total_bytes <= self.max_bytes:
+            return 0
+        
+        state = self._eviction_state[self.db_path]
+        
+        try:
+            # Pick and delete victims under the writer so no insert slips in between
+            with self._get_pool().writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT key, size_bytes FROM cache WHERE stale_until < ? ORDER BY stale_until LIMIT ?",
+                    (time.time(), self.eviction_batch_size)
+                )
+                victims = cursor.fetchall()
+                
+                if len(victims) < self.eviction_batch_size:
+                    order_by = "last_accessed" if self.eviction_policy == "lru" else "hit_count, last_accessed"
+                    cursor.execute(
+                        f"SELECT key, size_bytes FROM cache ORDER BY {order_by} LIMIT ?",
+                        (self.eviction_batch_size,)
+                    )
+                    seen = {key for key, _ in victims}
+                    for key, size in cursor.fetchall():
+                        if len(victims) >= self.eviction_batch_size:
+                            break
+                        if key not in seen:
+                            victims.append((key, size))
+                
+                cursor.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key, _ in victims])
+                conn.commit()
+            
+            freed = sum(size for _, size in victims)
+            state["evicted_rows"] += len(victims)
+            state["evicted_bytes"] += freed
+            state["eviction_runs"] += 1
+            state["total_rows"] -= len(victims)
+            state["total_bytes"] -= freed
+            
+            for key, size in victims:
+                self.memory.delete(key)
+                self.metrics.increment(key, "evictions")
+                self.metrics.increment(key, "bytes_evicted", size or 0)
+            
+            logger.info(f"Evicted {len(victims)} cache entries ({freed} bytes) using {self.eviction_policy}")
+            return len(victims)
+        
+        except sqlite3.Error as e:
+            logger.error(f"Error in evict(): {str(e)}")
+            return 0
+    
+    def _maintenance(self) -> None:
+        """Maintenance run by the sweeper after each scheduled sweep and when set() requests it"""
+        self.memory.clear_expired()
+        self.evict()
+    
+    def _get_sweeper(self) -> CacheSweeper:
+        """
+        Get the background sweeper for this database, starting it if needed
+        
+        Returns:
+            Running sweeper
+        """
+        sweeper = self._sweepers.get(self.db_path)
+        if sweeper is None or not sweeper.running:
+            sweeper = CacheSweeper(
+                self._get_pool().writer,
+                self._maintenance,
+                interval=float(os.getenv("CACHE_SWEEP_INTERVAL", "60")),
+                batch_size=int(os.getenv("CACHE_SWEEP_BATCH_SIZE", "500")),
+                queue_size=int(os.getenv("CACHE_SWEEP_QUEUE_SIZE", "10000"))
+            )
+            sweeper.start()
+            self._sweepers[self.db_path] = sweeper
+        return sweeper
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get per-prefix counters and latency histograms without querying SQLite
+        
+        Returns:
+            Dictionary with lookup, write and eviction counters, bytes and
+            get/set latency histograms, in total and per key prefix, plus
+            the row and byte totals as of the last size budget check
+        """
+        return self._metrics_snapshot(self.db_path)
+    
+    @classmethod
+    def get_all_metrics(cls) -> Dict[str, Dict[str, Any]]:
+        """Get metrics of every cache database in use, keyed by database path"""
+        return {db_path: cls._metrics_snapshot(db_path) for db_path in list(cls._metrics) if db_path in cls._eviction_state}
+    
+    @classmethod
+    def _metrics_snapshot(cls, db_path: str) -> Dict[str, Any]:
+        state = cls._eviction_state[db_path]
+        return {
+            **cls._metrics[db_path].snapshot(),
+            "total_rows": state["total_rows"],
+            "total_bytes": state["total_bytes"]
+        }
     
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics
         
+        Runs aggregate queries over the whole cache table; use get_metrics()
+        for frequently polled counters.
+        
         Returns:
             Dictionary with cache statistics
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        self.flush()
         
         try:
-            # Get total entries
-            cursor.execute("SELECT COUNT(*) FROM cache")
-            total_entries = cursor.fetchone()[0]
-            
-            # Get expired entries
-            cursor.execute("SELECT COUNT(*) FROM cache WHERE expires_at < ?", (time.time(),))
-            expired_entries = cursor.fetchone()[0]
+            with self._get_pool().reader() as conn:
+                cursor = conn.cursor()
+                
+                # Get total entries
+                cursor.execute("SELECT COUNT(*) FROM cache")
+                total_entries = cursor.fetchone()[0]
+                
+                # Get expired entries
+                cursor.execute("SELECT COUNT(*) FROM cache WHERE expires_at < ?", (time.time(),))
+                expired_entries = cursor.fetchone()[0]
+                
+                # Get average TTL
+                cursor.execute("SELECT AVG(expires_at - created_at) FROM cache")
+                avg_ttl = cursor.fetchone()[0] or 0
+                
+                # Count upcoming expirations per time bucket
+                cursor.execute(
+                    "SELECT CAST(expires_at / ? AS INTEGER), COUNT(*) FROM cache WHERE expires_at >= ? GROUP BY 1",
+                    (self.expiry_bucket_seconds, time.time())
+                )
+                expiry_buckets = dict(cursor.fetchall())
             
-            # Get average TTL
-            cursor.execute("SELECT AVG(expires_at - created_at) FROM cache")
-            avg_ttl = cursor.fetchone()[0] or 0
+            sqlite_stats = self._sqlite_stats[self.db_path]
+            sqlite_lookups = sqlite_stats["hits"] + sqlite_stats["misses"]
             
             return {
                 "total_entries": total_entries,
                 "expired_entries": expired_entries,
                 "valid_entries": total_entries - expired_entries,
-                "average_ttl_seconds": round(avg_ttl, 2)
+                "average_ttl_seconds": round(avg_ttl, 2),
+                "stale_hits": sqlite_stats["stale_hits"],
+                "expiry": {
+                    **self._expiry_stats(),
+                    "spread": expiry_spread(expiry_buckets, self.expiry_bucket_seconds)
+                },
+                "metrics": self.get_metrics(),
+                "sweeper": self._get_sweeper().get_stats(),
+                "write_behind": self._get_write_queue().get_stats(),
+                "sqlite_pool": self._get_pool().get_stats(),
+                "eviction": {
+                    "policy": self.eviction_policy,
+                    "max_rows": self.max_rows,
+                    "max_bytes": self.max_bytes,
+                    "total_bytes": self._eviction_state[self.db_path]["total_bytes"],
+                    "evicted_rows": self._eviction_state[self.db_path]["evicted_rows"],
+                    "evicted_bytes": self._eviction_state[self.db_path]["evicted_bytes"],
+                    "eviction_runs": self._eviction_state[self.db_path]["eviction_runs"]
+                },
+                "tiers": {
+                    "memory": self.memory.get_stats(),
+                    "sqlite": {
+                        "hits": sqlite_stats["hits"],
+                        "misses": sqlite_stats["misses"],
+                        "hit_ratio": round(sqlite_stats["hits"] / sqlite_lookups, 4) if sqlite_lookups else 0.0
+                    }
+                }
             }
-            
+        
         except sqlite3.Error as e:
             logger.error(f"Error in get_stats(): {str(e)}")
             return {
                 "error": str(e)
             }
-            
+    
     async def close(self) -> None:
         """
         Close the cache service and clean up resources
@@ -288,12 +829,21 @@ class CacheService:
         This method is called during application shutdown
         """
         try:
-            # Close database connection if it exists
-            if self.db_path in self._connection_pools:
-                with self._connection_locks[self.db_path]:
-                    conn = self._connection_pools[self.db_path]
-                    conn.close()
-                    del self._connection_pools[self.db_path]
-                    logger.info(f"Closed database connection for {self.db_path}")
+            # Stop the sweeper first so it does not use a closed connection
+            sweeper = self._sweepers.pop(self.db_path, None)
+            if sweeper is not None:
+                sweeper.stop()
+            
+            # Commit queued writes and buffered access times before the connections go away
+            if self.db_path in self._pools:
+                self._flush_access()
+            write_queue = self._write_queues.pop(self.db_path, None)
+            if write_queue is not None:
+                write_queue.stop()
+            
+            # Close the connection pool if it exists
+            pool = self._pools.pop(self.db_path, None)
+            if pool is not None:
+                pool.close()
         except Exception as e:
             logger.error(f"Error closing cache service: {str(e)}")
@@ -0,0 +1,169 @@
+import os
+import time
+import zlib
+import struct
+import hashlib
+import logging
+import sqlite3
+from typing import Any, Dict, List, Tuple
+from src.services.cache_backend import CacheBackend
+from src.services.cache_codec import CacheCodec, FORMAT_JSON
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Snapshot layout: header, zlib-compressed records, SHA-256 of everything before it
+SNAPSHOT_MAGIC = b"HCSNAP"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct(">6sBdI")   # magic, version, created_at, entry count
+RECORD = struct.Struct(">HdI")     # key length, TTL remaining at created_at, payload length
+CHECKSUM_SIZE = hashlib.sha256().digest_size
+
+# A snapshot entry: cache key, seconds it had left at snapshot time, encoded payload
+SnapshotEntry = Tuple[str, float, bytes]
+
+def export_snapshot(db_path: str, path: str) -> int:
+    """
+    Write the non-expired entries of a SQLite cache database to a snapshot file
+    
+    Payloads are copied as stored, so nothing is decoded. Each entry keeps
+    the TTL it had left when the snapshot was taken. The file is written
+    to a temporary name and renamed, so readers never see a partial one.
+    
+    Args:
+        db_path: Path to the cache database
+        path: Snapshot file to write
+    
+    Returns:
+        Number of exported entries
+    
+    Raises:
+        sqlite3.Error: If the database cannot be read
+    """
+    created_at = time.time()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT key, data, expires_at FROM cache WHERE expires_at > ? ORDER BY key",
+            (created_at,)
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    compressor = zlib.compressobj(6)
+    chunks = []
+    for key, data, expires_at in rows:
+        # Rows written before the codec existed are plain JSON TEXT
+        if isinstance(data, str):
+            data = bytes([FORMAT_JSON]) + data.encode("utf-8")
+        encoded_key = key.encode("utf-8")
+        chunks.append(compressor.compress(RECORD.pack(len(encoded_key), expires_at - created_at, len(data))))
+        chunks.append(compressor.compress(encoded_key + data))
+    chunks.append(compressor.flush())
+    
+    content = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, created_at, len(rows)) + b"".join(chunks)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+        f.write(hashlib.sha256(content).digest())
+    os.replace(temp_path, path)
+    
+    logger.info(f"Exported {len(rows)} cache entries from {db_path} to {path}")
+    return len(rows)
+
+def read_snapshot(path: str) -> Tuple[float, List[SnapshotEntry]]:
+    """
+    Read and verify a snapshot file
+    
+    Args:
+        path: Snapshot file
+    
+    Returns:
+        Tuple of (snapshot creation time, entries)
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a snapshot, uses an unknown version or fails its checksum
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    
+    if len(content) < HEADER.size + CHECKSUM_SIZE:
+        raise ValueError(f"{path} is too short to be a cache snapshot")
+    body, checksum = content[:-CHECKSUM_SIZE], content[-CHECKSUM_SIZE:]
+    magic, version, created_at, count = HEADER.unpack_from(body)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a cache snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported cache snapshot version {version}")
+    if hashlib.sha256(body).digest() != checksum:
+        raise ValueError(f"Cache snapshot {path} failed its checksum")
+    
+    try:
+        records = zlib.decompress(body[HEADER.size:])
+    except zlib.error as e:
+        raise ValueError(f"Corrupt cache snapshot {path}: {str(e)}")
+    
+    entries = []
+    offset = 0
+    for _ in range(count):
+        key_length, remaining, data_length = RECORD.unpack_from(records, offset)
+        offset += RECORD.size
+        key = records[offset:offset + key_length].decode("utf-8")
+        offset += key_length
+        entries.append((key, remaining, records[offset:offset + data_length]))
+        offset += data_length
+    if offset != len(records):
+        raise ValueError(f"Cache snapshot {path} holds {len(records) - offset} unexpected trailing bytes")
+    
+    return created_at, entries
+
+def import_snapshot(cache: CacheBackend, path: str) -> Dict[str, Any]:
+    """
+    Load a snapshot file into a cache
+    
+    TTLs are remapped relative to the snapshot time: an entry that had
+    an hour left when the snapshot was taken ten minutes ago gets fifty
+    minutes, and entries that have run out since are skipped. TTL jitter
+    is not applied again, so the spread of expirations is kept. Values go
+    through cache.set(), so any backend can be filled and they are
+    re-encoded with its own codec settings.
+    
+    Args:
+        cache: Cache to fill
+        path: Snapshot file
+    
+    Returns:
+        Dictionary with counts of imported, expired and undecodable entries,
+        the snapshot age and the import duration
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a valid snapshot
+    """
+    started = time.time()
+    created_at, entries = read_snapshot(path)
+    age = max(0.0, started - created_at)
+    codec = CacheCodec()
+    
+    stats = {"imported": 0, "expired": 0, "failed": 0, "snapshot_age_seconds": round(age, 1)}
+    for key, remaining, data in entries:
+        ttl = int(remaining - age)
+        if ttl <= 0:
+            stats["expired"] += 1
+            continue
+        try:
+            value = codec.decode(data)
+        except ValueError as e:
+            logger.warning(f"Skipping undecodable snapshot entry {key}: {str(e)}")
+            stats["failed"] += 1
+            continue
+        if cache.set(key, value, ttl=ttl, jitter=False):
+            stats["imported"] += 1
+        else:
+            stats["failed"] += 1
+    cache.flush()
+    
+    stats["duration_seconds"] = round(time.time() - started, 3)
+    logger.info(f"Imported {stats['imported']} cache entries from {path} "
+                f"({stats['expired']} expired, {stats['failed']} failed) in {stats['duration_seconds']}s")
+    return stats
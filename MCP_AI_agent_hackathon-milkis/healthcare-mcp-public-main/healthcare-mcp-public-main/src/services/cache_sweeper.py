@@ -0,0 +1,246 @@
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, ContextManager, Dict, List
+
+logger = logging.getLogger("healthcare-mcp")
+
+class CacheSweeper:
+    """
+    Single background worker that removes expired cache rows
+    
+    Readers hand lazily detected expired keys to the sweeper through a
+    bounded queue instead of deleting them inline, and the sweeper deletes
+    them in batches. On every interval it also sweeps rows past their
+    staleness window in bounded batches and runs the periodic maintenance
+    callback (access flush and eviction). Writers that notice the cache may
+    be over budget call request_maintenance() to have the callback run
+    early. All deletes for a database go through this one thread, so
+    expired reads and cache writes never spawn threads or compete for the
+    writer connection.
+    """
+    
+    def __init__(
+        self,
+        get_connection: Callable[[], ContextManager[sqlite3.Connection]],
+        maintenance: Callable[[], Any],
+        interval: float = 60.0,
+        batch_size: int = 500,
+        queue_size: int = 10000
+    ):
+        """
+        Initialize the sweeper
+        
+        Args:
+            get_connection: Returns a context manager holding the connection to sweep
+            maintenance: Called after every scheduled sweep
+            interval: Seconds between scheduled sweeps
+            batch_size: Maximum rows deleted per statement
+            queue_size: Maximum number of queued expired keys
+        """
+        self.get_connection = get_connection
+        self.maintenance = maintenance
+        self.interval = interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._maintenance_requested = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cache-sweeper", daemon=True)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "sweeps": 0,
+            "rows_removed": 0,
+            "keys_queued": 0,
+            "keys_dropped": 0,
+            "maintenance_requests": 0,
+            "maintenance_runs": 0,
+            "last_sweep_duration_ms": 0.0,
+            "max_sweep_duration_ms": 0.0,
+            "total_sweep_duration_ms": 0.0,
+            "last_sweep_at": None,
+            "errors": 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the worker thread"""
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread, deleting any keys still queued
+        
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+    
+    def enqueue(self, key: str) -> bool:
+        """
+        Queue an expired key for deletion without blocking
+        
+        Args:
+            key: Cache key detected as expired
+        
+        Returns:
+            True if queued, False if the queue is full
+        """
+        try:
+            self._queue.put_nowait(key)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["keys_dropped"] += 1
+            return False
+        
+        with self._stats_lock:
+            self._stats["keys_queued"] += 1
+        return True
+    
+    def request_maintenance(self) -> None:
+        """Have the worker run the maintenance callback soon, without waiting for it"""
+        if not self._maintenance_requested.is_set():
+            with self._stats_lock:
+                self._stats["maintenance_requests"] += 1
+            self._maintenance_requested.set()
+    
+    def _run(self) -> None:
+        """Worker loop: delete queued keys as they arrive, sweep on every interval, maintain on request"""
+        next_sweep = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            timeout = max(0.0, min(next_sweep - time.monotonic(), 1.0))
+            try:
+                keys = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                keys = []
+            
+            if keys:
+                keys.extend(self._drain(self.batch_size - 1))
+                self._sweep(keys)
+            
+            if time.monotonic() >= next_sweep:
+                self._sweep()
+                next_sweep = time.monotonic() + self.interval
+            elif self._maintenance_requested.is_set():
+                self._maintain()
+        
+        # Do not leave detected keys behind on shutdown
+        keys = self._drain(self._queue.qsize())
+        if keys:
+            self._sweep(keys)
+    
+    def _drain(self, limit: int) -> List[str]:
+        """Take up to limit keys from the queue without blocking"""
+        keys = []
+        while len(keys) < limit:
+            try:
+                keys.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return keys
+    
+    def sweep_now(self) -> int:
+        """
+        Run a full scheduled sweep in the calling thread
+        
+        Returns:
+            Number of removed rows
+        """
+        keys = self._drain(self._queue.qsize())
+        removed = self._sweep(keys) if keys else 0
+        return removed + self._sweep()
+    
+    def _sweep(self, keys: List[str] = None) -> int:
+        """
+        Delete expired rows in bounded batches and record metrics
+        
+        Args:
+            keys: Specific keys to delete, or None for a scheduled sweep of
+                all rows past their staleness window
+        
+        Returns:
+            Number of removed rows
+        """
+        started = time.perf_counter()
+        removed = 0
+        
+        try:
+            now = time.time()
+            
+            if keys is not None:
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    # Re-check expiry so a concurrent refresh of the key is not lost
+                    cursor.executemany(
+                        "DELETE FROM cache WHERE key = ? AND stale_until < ?",
+                        [(key, now) for key in set(keys)]
+                    )
+                    removed = cursor.rowcount
+                    conn.commit()
+            else:
+                # Take the connection per batch so writers can interleave with a long sweep
+                while not self._stop.is_set():
+                    with self.get_connection() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(
+                            "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE stale_until < ? LIMIT ?)",
+                            (now, self.batch_size)
+                        )
+                        deleted = cursor.rowcount
+                        conn.commit()
+                    removed += deleted
+                    if deleted < self.batch_size:
+                        break
+                
+                self._maintain()
+        
+        except sqlite3.Error as e:
+            logger.error(f"Error in cache sweep: {str(e)}")
+            with self._stats_lock:
+                self._stats["errors"] += 1
+        
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["sweeps"] += 1
+            self._stats["rows_removed"] += max(removed, 0)
+            self._stats["last_sweep_duration_ms"] = round(duration_ms, 3)
+            self._stats["max_sweep_duration_ms"] = round(max(self._stats["max_sweep_duration_ms"], duration_ms), 3)
+            self._stats["total_sweep_duration_ms"] = round(self._stats["total_sweep_duration_ms"] + duration_ms, 3)
+            self._stats["last_sweep_at"] = time.time()
+        
+        if removed:
+            logger.debug(f"Cache sweep removed {removed} rows in {duration_ms:.1f}ms")
+        return removed
+    
+    def _maintain(self) -> None:
+        """Run the maintenance callback, clearing any pending request"""
+        self._maintenance_requested.clear()
+        try:
+            self.maintenance()
+        except sqlite3.Error as e:
+            logger.error(f"Error in cache maintenance: {str(e)}")
+            with self._stats_lock:
+                self._stats["errors"] += 1
+        with self._stats_lock:
+            self._stats["maintenance_runs"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sweeper statistics
+        
+        Returns:
+            Dictionary with sweep counts, rows removed, durations and queue depth
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["running"] = self.running
+        stats["interval_seconds"] = self.interval
+        return stats
@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.services.cache_keys import format_icd10_code, parse_cache_key
+from src.tools.base_tool import upstream_rate_limiter
+
+logger = logging.getLogger("healthcare-mcp")
+
+# A seed: MCP tool name and its arguments, as accepted by /mcp/call-tool
+Seed = Dict[str, Any]
+
+# Tool call for each cache key prefix: MCP tool name and key field -> argument name
+KEY_TOOL_ARGUMENTS: Dict[str, tuple] = {
+    "fda_drug": ("fda_drug_lookup", {"search_type": "search_type", "drug": "drug_name"}),
+    "pubmed_search": ("pubmed_search", {"query": "query", "max_results": "max_results", "date_range": "date_range"}),
+    "clinical_trials": ("clinical_trials_search", {"condition": "condition", "status": "status", "max_results": "max_results"}),
+    "health_topics": ("health_topics", {"topic": "topic", "language": "language"}),
+    "icd10": ("lookup_icd_code", {"term": "description", "max_results": "max_results"})
+}
+
+def seed_from_cache_key(key: str) -> Optional[Seed]:
+    """
+    Turn a canonical cache key back into the tool call that fills it
+    
+    Args:
+        key: Cache key built by build_cache_key()
+    
+    Returns:
+        Seed, or None if the key cannot be mapped to a tool call
+    """
+    parsed = parse_cache_key(key)
+    if parsed is None or parsed[0] not in KEY_TOOL_ARGUMENTS:
+        return None
+    prefix, fields = parsed
+    name, argument_names = KEY_TOOL_ARGUMENTS[prefix]
+    
+    arguments = {argument_names[field]: value for field, value in fields.items() if field in argument_names and value}
+    # ICD-10 lookups by code and by description share the "term" field
+    code = format_icd10_code(arguments.get("description"))
+    if prefix == "icd10" and code:
+        arguments["code"] = code
+        del arguments["description"]
+    return {"name": name, "arguments": arguments}
+
+def load_seed_file(path: str) -> List[Seed]:
+    """
+    Load seeds from a JSON file
+    
+    The file holds a list of {"name": "<tool>", "arguments": {...}} objects,
+    e.g. {"name": "fda_drug_lookup", "arguments": {"drug_name": "sertraline"}}.
+    
+    Args:
+        path: Seed file path
+    
+    Returns:
+        Seeds, empty if the file cannot be read
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            seeds = json.load(f)
+        return [seed for seed in seeds if isinstance(seed, dict) and seed.get("name")]
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"Failed to load cache warm-up seeds from {path}: {str(e)}")
+        return []
+
+def seeds_from_cache_db(db_path: str, top_n: int) -> List[Seed]:
+    """
+    Mine the most frequently hit lookups from a cache database
+    
+    The source can be the local cache of a previous run or a copy of
+    another replica's cache. Entries are ranked by hit count, then by
+    most recent access.
+    
+    Args:
+        db_path: Path to the cache database
+        top_n: Maximum number of seeds
+    
+    Returns:
+        Seeds for the hottest entries that map back to a tool call
+    """
+    if top_n <= 0 or not os.path.exists(db_path):
+        return []
+    
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            # Over-fetch, since entries written under other key versions are skipped
+            rows = conn.execute(
+                "SELECT key FROM cache ORDER BY hit_count DESC, last_accessed DESC LIMIT ?",
+                (top_n * 2,)
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.error(f"Failed to mine cache warm-up seeds from {db_path}: {str(e)}")
+        return []
+    
+    seeds = []
+    for (key,) in rows:
+        seed = seed_from_cache_key(key)
+        if seed is not None:
+            seeds.append(seed)
+            if len(seeds) >= top_n:
+                break
+    return seeds
+
+class HostRateLimiter:
+    """
+    Spaces requests to each upstream host at most rate_per_second apart
+    
+    Installed through the upstream_rate_limiter context variable, so only
+    requests that actually reach the upstream API are throttled; lookups
+    answered from the cache pass straight through.
+    """
+    
+    def __init__(self, rate_per_second: float):
+        """
+        Initialize the limiter
+        
+        Args:
+            rate_per_second: Maximum requests per second per host (0 disables limiting)
+        """
+        self.interval = 1 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self.requests = 0
+    
+    async def acquire(self, host: str) -> None:
+        """
+        Wait for the next free request slot for a host
+        
+        Args:
+            host: Upstream host name
+        """
+        self.requests += 1
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class CacheWarmer:
+    """
+    Fills the cache from a seed list by calling the regular tool methods
+    
+    Seeds run with bounded concurrency, and upstream requests are rate
+    limited per host. Progress is logged and available from get_stats().
+    """
+    
+    def __init__(
+        self,
+        tools: Dict[str, Callable[..., Awaitable[Any]]],
+        seeds: List[Seed],
+        concurrency: int = 4,
+        rate_per_second: float = 3.0
+    ):
+        """
+        Initialize the warmer
+        
+        Args:
+            tools: Tool method per MCP tool name, e.g. {"fda_drug_lookup": fda_tool.lookup_drug}
+            seeds: Tool calls to run
+            concurrency: Maximum seeds running at once
+            rate_per_second: Maximum upstream requests per second per host
+        """
+        self.tools = tools
+        self.seeds = self._dedupe(seeds)
+        self.concurrency = max(1, concurrency)
+        self.limiter = HostRateLimiter(rate_per_second)
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "seeds": len(self.seeds),
+            "completed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "started_at": None,
+            "finished_at": None
+        }
+    
+    @classmethod
+    def from_env(cls, tools: Dict[str, Callable[..., Awaitable[Any]]]) -> "CacheWarmer":
+        """
+        Create a warmer configured from CACHE_WARMUP_* environment variables
+        
+        Seeds come from CACHE_WARMUP_FILE and from the CACHE_WARMUP_TOP_N
+        hottest entries of CACHE_WARMUP_SOURCE_DB (the cache database by default).
+        """
+        seeds: List[Seed] = []
+        seed_file = os.getenv("CACHE_WARMUP_FILE")
+        if seed_file:
+            seeds.extend(load_seed_file(seed_file))
+        source_db = os.getenv("CACHE_WARMUP_SOURCE_DB", os.getenv("CACHE_DB_PATH", "healthcare_cache.db"))
+        seeds.extend(seeds_from_cache_db(source_db, int(os.getenv("CACHE_WARMUP_TOP_N", "0"))))
+        return cls(
+            tools,
+            seeds,
+            concurrency=int(os.getenv("CACHE_WARMUP_CONCURRENCY", "4")),
+            rate_per_second=float(os.getenv("CACHE_WARMUP_RATE", "3"))
+        )
+    
+    @staticmethod
+    def _dedupe(seeds: List[Seed]) -> List[Seed]:
+        """Drop repeated seeds, keeping the first occurrence"""
+        seen = set()
+        unique = []
+        for seed in seeds:
+            marker = json.dumps([seed.get("name"), seed.get("arguments", {})], sort_keys=True, default=str)
+            if marker not in seen:
+                seen.add(marker)
+                unique.append(seed)
+        return unique
+    
+    @property
+    def done(self) -> bool:
+        """Whether every seed has been run"""
+        return self._task is not None and self._task.done()
+    
+    def start(self) -> asyncio.Task:
+        """
+        Start warming in the background
+        
+        Returns:
+            Task running all seeds
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+    
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for warm-up to finish, leaving it running if the timeout passes
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait until done
+        
+        Returns:
+            True if warm-up finished within the timeout
+        """
+        try:
+            await asyncio.wait_for(asyncio.shield(self.start()), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Cache warm-up still running after {timeout}s, continuing in the background")
+            return False
+    
+    async def stop(self) -> None:
+        """Cancel warm-up if it is still running"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    async def _run(self) -> None:
+        """Run every seed with bounded concurrency under the rate limiter"""
+        self._stats["started_at"] = time.time()
+        logger.info(f"Cache warm-up started with {len(self.seeds)} seeds")
+        upstream_rate_limiter.set(self.limiter)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        progress_step = max(1, len(self.seeds) // 10)
+        
+        async def run_seed(seed: Seed) -> None:
+            async with semaphore:
+                await self._run_seed(seed)
+            self._stats["completed"] += 1
+            if self._stats["completed"] % progress_step == 0 or self._stats["completed"] == len(self.seeds):
+                logger.info(f"Cache warm-up progress: {self._stats['completed']}/{len(self.seeds)} "
+                            f"({self._stats['failed']} failed, {self.limiter.requests} upstream requests)")
+        
+        await asyncio.gather(*[run_seed(seed) for seed in self.seeds])
+        self._stats["finished_at"] = time.time()
+        logger.info(f"Cache warm-up finished in {self._stats['finished_at'] - self._stats['started_at']:.1f}s")
+    
+    async def _run_seed(self, seed: Seed) -> None:
+        """Call the seed's tool, counting success or failure"""
+        tool = self.tools.get(seed["name"])
+        if tool is None:
+            logger.warning(f"Skipping cache warm-up seed for unknown tool '{seed['name']}'")
+            self._stats["skipped"] += 1
+            return
+        
+        try:
+            result = await tool(**seed.get("arguments", {}))
+        except Exception as e:
+            logger.warning(f"Cache warm-up seed {seed} failed: {str(e)}")
+            self._stats["failed"] += 1
+            return
+        
+        if isinstance(result, dict) and result.get("status") == "error":
+            logger.warning(f"Cache warm-up seed {seed} failed: {result.get('error_message')}")
+            self._stats["failed"] += 1
+        else:
+            self._stats["succeeded"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get warm-up progress
+        
+        Returns:
+            Dictionary with seed counts, upstream requests made and timing
+        """
+        stats = dict(self._stats)
+        stats["running"] = self._task is not None and not self._task.done()
+        stats["upstream_requests"] = self.limiter.requests
+        if stats["started_at"] is not None:
+            stats["duration_seconds"] = round((stats["finished_at"] or time.time()) - stats["started_at"], 3)
+        return stats
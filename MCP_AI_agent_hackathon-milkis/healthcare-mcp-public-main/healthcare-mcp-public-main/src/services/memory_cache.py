@@ -0,0 +1,177 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Sentinel returned on a miss, since None is a valid cached value
+MISSING = object()
+
+class MemoryCache:
+    """
+    Bounded in-process LRU cache holding decoded values
+    
+    Entries are bounded both by count and by approximate size in bytes.
+    The least recently used entries are evicted first, and every entry
+    keeps the expires_at timestamp of the persistent tier it mirrors.
+    Cached objects are returned as-is, so callers must not mutate them.
+    """
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Initialize the memory cache
+        
+        Args:
+            max_entries: Maximum number of entries to keep
+            max_bytes: Maximum approximate size of all entries in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the memory tier holds any entries at all"""
+        return self.max_entries > 0 and self.max_bytes > 0
+    
+    def get(self, key: str) -> Any:
+        """
+        Get a value if it exists and is not expired
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or MISSING if not found or expired
+        """
+        return self.get_entry(key)[0]
+    
+    def get_entry(self, key: str) -> Tuple[Any, float]:
+        """
+        Get a value and its expiry if it exists and is not expired
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (cached value, expires_at), or (MISSING, 0.0) if not found or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING, 0.0
+            
+            value, expires_at, size = entry
+            if expires_at < time.time():
+                self._remove(key)
+                self.misses += 1
+                return MISSING, 0.0
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, expires_at
+    
+    def set(self, key: str, value: Any, expires_at: float, size: int) -> bool:
+        """
+        Store a value, evicting least recently used entries if over budget
+        
+        A value too large for the tier is not stored, but still replaces any
+        older value of the key, which would otherwise be served in its place.
+        
+        Args:
+            key: Cache key
+            value: Decoded value
+            expires_at: Absolute expiry timestamp
+            size: Approximate size of the value in bytes
+        
+        Returns:
+            True if the value was stored, False if it does not fit the tier
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if not self.enabled or size > self.max_bytes:
+                return False
+            
+            self._entries[key] = (value, expires_at, size)
+            self._total_bytes += size
+            
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+            return True
+    
+    def delete(self, key: str) -> bool:
+        """
+        Remove a value
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            True if the key was present, False otherwise
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+    
+    def clear_expired(self) -> int:
+        """
+        Remove all expired entries
+        
+        Returns:
+            Number of removed entries
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._entries.items() if expires_at < now]
+            for key in expired:
+                self._remove(key)
+            return len(expired)
+    
+    def keys(self) -> List[str]:
+        """Get a copy of the cached keys, expired or not"""
+        with self._lock:
+            return list(self._entries)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry; the caller must hold the lock"""
+        _, _, size = self._entries.pop(key)
+        self._total_bytes -= size
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get memory tier statistics
+        
+        Returns:
+            Dictionary with hit/miss counts, hit ratio and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,175 @@
+import os
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+from src.services.cache_backend import BaseCacheService
+from src.services.memory_cache import MemoryCache, MISSING
+
+logger = logging.getLogger("healthcare-mcp")
+
+class InMemoryCacheService(BaseCacheService):
+    """
+    Cache service holding everything in process memory
+    
+    Nothing is persisted or shared between worker processes, so this
+    backend suits single-worker deployments and tests. Entries are kept
+    until the end of their staleness window and bounded by the
+    CACHE_MEMORY_* limits, evicting the least recently used first.
+    """
+    
+    def __init__(self, ttl: int = 3600):
+        """
+        Initialize the in-memory cache service
+        
+        Args:
+            ttl: Default time-to-live for cache entries in seconds
+        """
+        super().__init__(ttl)
+        # Entries are (value, expires_at) and live in the LRU until stale_until
+        self.memory = MemoryCache(
+            max_entries=int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(32 * 1024 * 1024)))
+        )
+    
+    def _lookup(self, key: str) -> Tuple[Any, float]:
+        """Get (value, expires_at) of an entry within its staleness window, or (MISSING, 0)"""
+        entry = self.memory.get(key)
+        return (MISSING, 0.0) if entry is MISSING else entry
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache if it exists and is not expired
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None if not found or expired
+        """
+        started = time.perf_counter()
+        value, expires_at = self._lookup(key)
+        if value is MISSING:
+            outcome, value = "misses", None
+            self._start_recompute(key)
+        elif expires_at < time.time():
+            outcome, value = "expired", None
+            self._start_recompute(key)
+        elif self._refresh_early(key, expires_at):
+            outcome, value = "early_refreshes", None
+        else:
+            outcome = "memory_hits"
+        self.metrics.record_get(key, outcome, time.perf_counter() - started)
+        return value
+    
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        Get an expired value that is still within its maximum staleness
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Stale cached value or None if not found, fresh or too old
+        """
+        value, expires_at = self._lookup(key)
+        if value is MISSING or expires_at >= time.time():
+            return None
+        self.metrics.increment(key, "stale_hits")
+        return value
+    
+    async def get_async(self, key: str) -> Optional[Any]:
+        """Get a value; lookups never block, so no executor is needed"""
+        return self.get(key)
+    
+    async def get_stale_async(self, key: str) -> Optional[Any]:
+        """Get a stale value; lookups never block, so no executor is needed"""
+        return self.get_stale(key)
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool:
+        """
+        Set value in cache with optional TTL
+        
+        The TTL is shortened by a random share of up to CACHE_TTL_JITTER.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (optional)
+            jitter: Whether to apply TTL jitter; off for entries whose expiry is already set
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        started = time.perf_counter()
+        self._finish_recompute(key)
+        ttl = ttl or self.default_ttl
+        if jitter:
+            ttl = self._jitter_ttl(ttl)
+        expires_at = time.time() + ttl
+        
+        try:
+            # The encoded size is what the other backends would store
+            size = len(self.codec.encode(value))
+        except TypeError as e:
+            logger.error(f"Error in set(): {str(e)}")
+            return False
+        
+        if not self.memory.set(key, (value, expires_at), expires_at + self._get_max_stale(key), size):
+            logger.warning(f"Value for {key} ({size} bytes) exceeds the memory cache budget, not cached")
+            return False
+        self.metrics.record_set(key, time.perf_counter() - started, size)
+        return True
+    
+    def delete(self, key: str) -> bool:
+        """
+        Delete value from cache
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            True if deleted, False otherwise
+        """
+        return self.memory.delete(key)
+    
+    def invalidate_tag(self, tag: str, batch_size: Optional[int] = None) -> int:
+        """
+        Delete every entry carrying a tag
+        
+        Args:
+            tag: Tag from cache_tags(), e.g. "entity:fda_drug:sertraline"
+            batch_size: Unused; entries are dropped in one pass
+        
+        Returns:
+            Number of deleted entries
+        """
+        deleted = self._invalidate_memory_tag(self.memory, tag)
+        logger.info(f"Invalidated {deleted} cache entries tagged {tag}")
+        return deleted
+    
+    def clear_expired(self) -> int:
+        """
+        Clear all entries past their staleness window
+        
+        Returns:
+            Number of deleted entries
+        """
+        return self.memory.clear_expired()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with cache statistics
+        """
+        return {
+            "backend": "memory",
+            **self.memory.get_stats(),
+            "expiry": self._expiry_stats(),
+            "metrics": self.get_metrics()
+        }
+    
+    async def close(self) -> None:
+        """Drop all entries"""
+        self.memory.clear()
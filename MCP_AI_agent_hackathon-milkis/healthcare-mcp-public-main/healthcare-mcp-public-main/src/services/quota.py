@@ -0,0 +1,310 @@
+import os
+import math
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("healthcare-mcp")
+
+# A usage row used for reconciliation: session ID, tool, UTC hour (epoch seconds), calls
+UsageRow = Tuple[str, str, int, int]
+
+class QuotaRule(NamedTuple):
+    """A call limit per session ("session") or per session and tool ("tool") over a sliding window"""
+    scope: str
+    window: int
+    limit: int
+    
+    @property
+    def name(self) -> str:
+        """Rule name used in stats and 429 responses, e.g. "tool_per_minute" """
+        labels = {60: "minute", 3600: "hour", 86400: "day"}
+        return f"{self.scope}_per_{labels.get(self.window, f'{self.window}s')}"
+
+class QuotaEngine:
+    """
+    In-memory per-session and per-tool call quotas over sliding windows
+    
+    Each rule keeps one sliding-window counter per key: the counts of the
+    current and the previous fixed window, the previous one weighted by how
+    much of it still overlaps the sliding window. acquire() therefore takes
+    constant time and memory per key, whatever the call rate.
+    
+    Counters only see calls admitted by this process, so a worker thread
+    periodically reconciles rules of an hour or longer with the persisted
+    hourly usage, keeping the larger of both counts. This restores counts
+    after a restart. The same pass drops counters of idle keys.
+    """
+    
+    def __init__(
+        self,
+        rules: List[QuotaRule],
+        load: Optional[Callable[[float], Iterable[UsageRow]]] = None,
+        reconcile_interval: float = 60.0,
+        name: str = "quota-reconciler"
+    ):
+        """
+        Initialize the engine
+        
+        Args:
+            rules: Quota rules; rules with a limit of 0 or less are ignored
+            load: Returns persisted usage rows of the hours starting at or after
+                the given UTC epoch second; None disables reconciliation
+            reconcile_interval: Seconds between reconciliations
+            name: Worker thread name
+        """
+        self.rules = [rule for rule in rules if rule.limit > 0]
+        self.load = load
+        self.reconcile_interval = reconcile_interval
+        # (rule index, session, tool or "") -> [window index, current count, previous count]
+        self._counters: Dict[Tuple[int, str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._stats: Dict[str, Any] = {
+            "allowed": 0,
+            "denied": {rule.name: 0 for rule in self.rules},
+            "reconciles": 0,
+            "reconcile_errors": 0,
+            "last_reconcile_ms": 0.0
+        }
+    
+    @classmethod
+    def from_env(cls, load: Optional[Callable[[float], Iterable[UsageRow]]] = None, **kwargs: Any) -> "QuotaEngine":
+        """Create an engine configured from QUOTA_* environment variables"""
+        return cls(
+            [
+                QuotaRule("session", 60, int(os.getenv("QUOTA_SESSION_PER_MINUTE", "60"))),
+                QuotaRule("session", 86400, int(os.getenv("QUOTA_SESSION_PER_DAY", "2000"))),
+                QuotaRule("tool", 60, int(os.getenv("QUOTA_TOOL_PER_MINUTE", "30"))),
+                QuotaRule("tool", 86400, int(os.getenv("QUOTA_TOOL_PER_DAY", "0")))
+            ],
+            load=load,
+            reconcile_interval=float(os.getenv("QUOTA_RECONCILE_INTERVAL", "60")),
+            **kwargs
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any rule is active"""
+        return bool(self.rules)
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the worker thread; it reconciles immediately, then on every interval"""
+        if self.load is not None and any(rule.window >= 3600 for rule in self.rules):
+            self._thread.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread
+        
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+    
+    def _run(self) -> None:
+        """Worker loop: reconcile now and on every interval"""
+        while True:
+            self.reconcile()
+            if self._stop.wait(self.reconcile_interval):
+                return
+    
+    @staticmethod
+    def _roll(counter: List[float], index: int) -> None:
+        """Advance a counter to the given window index"""
+        if counter[0] == index:
+            return
+        counter[2] = counter[1] if counter[0] == index - 1 else 0
+        counter[1] = 0
+        counter[0] = index
+    
+    def _key(self, rule_index: int, session: str, tool: str) -> Tuple[int, str, str]:
+        """Counter key of a rule"""
+        return (rule_index, session, tool if self.rules[rule_index].scope == "tool" else "")
+    
+    def acquire(self, session: str, tool: str, cost: int = 1, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Admit calls if every rule allows them, and count them
+        
+        Args:
+            session: Session ID, or another stable key of the caller
+            tool: Name of the tool called
+            cost: Number of calls to admit
+            now: Current time, for tests
+        
+        Returns:
+            Decision: "allowed", and the rule, limit, remaining calls and reset
+            time of the tightest rule or, when denied, of the exceeded rule,
+            with "retry_after" in seconds
+        """
+        return self.acquire_many([(session, tool, cost)], now)
+    
+    def acquire_many(self, calls: List[Tuple[str, str, int]], now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Admit a group of calls together if every rule allows all of them, and count them
+        
+        Nothing is counted when any rule is exceeded, so a rejected batch
+        does not use up quota.
+        
+        Args:
+            calls: (session, tool, cost) per session and tool
+            now: Current time, for tests
+        
+        Returns:
+            Decision, as returned by acquire()
+        """
+        now = now if now is not None else time.time()
+        if not self.rules or not calls:
+            return {"allowed": True}
+        
+        # Cost per counter; a session rule counts the calls of all the session's tools
+        costs: Dict[Tuple[int, str, str], int] = {}
+        for session, tool, cost in calls:
+            for rule_index in range(len(self.rules)):
+                key = self._key(rule_index, session, tool)
+                costs[key] = costs.get(key, 0) + cost
+        
+        with self._lock:
+            tightest = None
+            for key, cost in costs.items():
+                rule = self.rules[key[0]]
+                index = int(now // rule.window)
+                counter = self._counters.get(key)
+                if counter is not None:
+                    self._roll(counter, index)
+                    current, previous = counter[1], counter[2]
+                else:
+                    current, previous = 0, 0
+                overlap = 1 - (now - index * rule.window) / rule.window
+                used = previous * overlap + current
+                reset = (index + 1) * rule.window
+                
+                if used + cost > rule.limit:
+                    self._stats["denied"][rule.name] += 1
+                    return {
+                        "allowed": False,
+                        "rule": rule.name,
+                        "scope": rule.scope,
+                        "window": rule.window,
+                        "limit": rule.limit,
+                        "used": math.ceil(used),
+                        "remaining": 0,
+                        "reset": reset,
+                        "retry_after": self._retry_after(rule, now, current, previous, cost)
+                    }
+                
+                remaining = int(rule.limit - used - cost)
+                if tightest is None or remaining < tightest["remaining"]:
+                    tightest = {"rule": rule.name, "limit": rule.limit, "remaining": remaining, "reset": reset}
+            
+            for key, cost in costs.items():
+                counter = self._counters.get(key)
+                if counter is None:
+                    counter = self._counters[key] = [int(now // self.rules[key[0]].window), 0, 0]
+                counter[1] += cost
+            self._stats["allowed"] += sum(cost for _, _, cost in calls)
+        
+        return {"allowed": True, **tightest}
+    
+    @staticmethod
+    def _retry_after(rule: QuotaRule, now: float, current: float, previous: float, cost: int) -> int:
+        """
+        Seconds until a rule admits the calls again, if no other calls are counted
+        
+        Args:
+            rule: Exceeded rule
+            now: Current time
+            current: Count of the current fixed window
+            previous: Count of the previous fixed window
+            cost: Number of calls to admit
+        
+        Returns:
+            Whole seconds, at least 1
+        """
+        window_start = (now // rule.window) * rule.window
+        if current + cost <= rule.limit and previous:
+            # The previous window's share shrinks enough within this window
+            overlap = (rule.limit - current - cost) / previous
+            wait = window_start + (1 - overlap) * rule.window - now
+        elif cost > rule.limit:
+            return rule.window
+        else:
+            # Only once this window's calls have partly slid out of the next one
+            overlap = (rule.limit - cost) / current if current else 1
+            wait = window_start + rule.window + (1 - overlap) * rule.window - now
+        return max(1, math.ceil(wait))
+    
+    def reconcile(self, now: Optional[float] = None) -> int:
+        """
+        Raise counters of rules of an hour or longer to the persisted usage, and drop idle counters
+        
+        Args:
+            now: Current time, for tests
+        
+        Returns:
+            Number of counters raised
+        """
+        now = now if now is not None else time.time()
+        started = time.perf_counter()
+        rules = [(rule_index, rule) for rule_index, rule in enumerate(self.rules) if rule.window >= 3600]
+        persisted: Dict[Tuple[int, str, str], List[int]] = {}
+        
+        if self.load is not None and rules:
+            since = min((int(now // rule.window) - 1) * rule.window for _, rule in rules)
+            try:
+                rows = list(self.load(since))
+            except Exception as e:
+                logger.error(f"Error in quota reconcile(): {str(e)}")
+                self._stats["reconcile_errors"] += 1
+                rows = []
+            
+            for session, tool, hour, calls in rows:
+                for rule_index, rule in rules:
+                    offset = int(now // rule.window) - hour // rule.window
+                    if offset in (0, 1):
+                        counts = persisted.setdefault(self._key(rule_index, session, tool), [0, 0])
+                        counts[offset] += calls
+        
+        raised = 0
+        with self._lock:
+            for key, (current, previous) in persisted.items():
+                index = int(now // self.rules[key[0]].window)
+                counter = self._counters.setdefault(key, [index, 0, 0])
+                self._roll(counter, index)
+                if current > counter[1] or previous > counter[2]:
+                    counter[1] = max(counter[1], current)
+                    counter[2] = max(counter[2], previous)
+                    raised += 1
+            
+            # Counters last used two or more windows ago no longer count
+            for key in [key for key, counter in self._counters.items()
+                        if counter[0] < int(now // self.rules[key[0]].window) - 1]:
+                del self._counters[key]
+        
+        self._stats["reconciles"] += 1
+        self._stats["last_reconcile_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return raised
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get quota statistics
+        
+        Returns:
+            Dictionary with the rules, admitted calls, denials per rule,
+            reconcile counts and the number of live counters
+        """
+        with self._lock:
+            stats = dict(self._stats, denied=dict(self._stats["denied"]), counters=len(self._counters))
+        stats["rules"] = {rule.name: rule.limit for rule in self.rules}
+        stats["running"] = self.running
+        stats["reconcile_interval"] = self.reconcile_interval
+        return stats
@@ -0,0 +1,269 @@
+import os
+import time
+import struct
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Dict, Optional
+from src.services.cache_backend import BaseCacheService
+from src.services.cache_keys import cache_tags
+
+logger = logging.getLogger("healthcare-mcp")
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Stored values are the entry's expires_at followed by the codec payload
+EXPIRES_AT = struct.Struct(">d")
+
+class RedisCacheService(BaseCacheService):
+    """
+    Cache service backed by a Redis-protocol server
+    
+    All worker processes and replicas pointed at the same server share one
+    cache. Redis expires each key at the end of its staleness window; the
+    entry's own expiry is stored in front of the payload so fresh and stale
+    reads can be told apart. Any server speaking the Redis protocol works
+    (Redis, Valkey, KeyDB, or fakeredis in tests).
+    """
+    
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        ttl: int = 3600,
+        namespace: str = "healthcare-mcp:cache:",
+        client: Optional[Any] = None
+    ):
+        """
+        Initialize the Redis cache service
+        
+        Args:
+            url: Redis server URL
+            ttl: Default time-to-live for cache entries in seconds
+            namespace: Prefix for every key stored in Redis
+            client: Redis client to use instead of connecting to url
+        
+        Raises:
+            ImportError: If no client is given and the redis package is not installed
+        """
+        super().__init__(ttl)
+        self.url = url
+        self.namespace = namespace
+        if client is None:
+            if redis is None:
+                raise ImportError("The redis package is required for the redis cache backend")
+            client = redis.Redis.from_url(url)
+        self.client = client
+    
+    @classmethod
+    def from_env(cls, ttl: int = 3600) -> "RedisCacheService":
+        """Create a service configured from CACHE_REDIS_* environment variables"""
+        return cls(
+            url=os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+            ttl=ttl,
+            namespace=os.getenv("CACHE_REDIS_NAMESPACE", "healthcare-mcp:cache:")
+        )
+    
+    def _tag_set(self, tag: str) -> str:
+        """Name of the Redis set holding a tag's keys"""
+        return f"{self.namespace}tag:{tag}"
+    
+    def _read(self, key: str) -> Optional[bytes]:
+        """Get the raw stored value of a key"""
+        return self.client.get(self.namespace + key)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache if it exists and is not expired
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None if not found or expired
+        """
+        started = time.perf_counter()
+        value, outcome, size = None, "misses", 0
+        try:
+            stored = self._read(key)
+            if stored is None:
+                self._start_recompute(key)
+            else:
+                (expires_at,) = EXPIRES_AT.unpack_from(stored)
+                if expires_at < time.time():
+                    outcome = "expired"
+                    self._start_recompute(key)
+                elif self._refresh_early(key, expires_at):
+                    outcome = "early_refreshes"
+                else:
+                    value = self.codec.decode(stored[EXPIRES_AT.size:])
+                    outcome, size = "store_hits", len(stored)
+        except Exception as e:
+            logger.error(f"Error in get(): {str(e)}")
+            value, outcome = None, "errors"
+        self.metrics.record_get(key, outcome, time.perf_counter() - started, size)
+        return value
+    
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        Get an expired value that is still within its maximum staleness
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Stale cached value or None if not found, fresh or too old
+        """
+        try:
+            stored = self._read(key)
+            if stored is None or EXPIRES_AT.unpack_from(stored)[0] >= time.time():
+                return None
+            value = self.codec.decode(stored[EXPIRES_AT.size:])
+            self.metrics.increment(key, "stale_hits")
+            return value
+        except Exception as e:
+            logger.error(f"Error in get_stale(): {str(e)}")
+            return None
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool:
+        """
+        Set value in cache with optional TTL
+        
+        The TTL is shortened by a random share of up to CACHE_TTL_JITTER.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (optional)
+            jitter: Whether to apply TTL jitter; off for entries whose expiry is already set
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        started = time.perf_counter()
+        self._finish_recompute(key)
+        ttl = ttl or self.default_ttl
+        if jitter:
+            ttl = self._jitter_ttl(ttl)
+        expires_at = time.time() + ttl
+        
+        try:
+            stored = EXPIRES_AT.pack(expires_at) + self.codec.encode(value)
+            # Redis drops the key once it can no longer be served, even stale
+            px = int((ttl + self._get_max_stale(key)) * 1000)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(self.namespace + key, stored, px=px)
+            # Tag sets outlive their longest-lived entry: the expiry is set once, then
+            # only ever extended (NX, then GT). Members of expired keys are harmless
+            for tag in cache_tags(key):
+                pipe.sadd(self._tag_set(tag), key)
+                pipe.pexpire(self._tag_set(tag), px, nx=True)
+                pipe.pexpire(self._tag_set(tag), px, gt=True)
+            pipe.execute()
+            self.metrics.record_set(key, time.perf_counter() - started, len(stored))
+            return True
+        except Exception as e:
+            logger.error(f"Error in set(): {str(e)}")
+            return False
+    
+    async def set_async(self, key: str, value: Any, ttl: Optional[int] = None, jitter: bool = True) -> bool:
+        """
+        Set a value without blocking the event loop
+        
+        Runs set() and its round trip to the server on the executor get_async() uses.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (optional)
+            jitter: Whether to apply TTL jitter
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self.set, key, value, ttl, jitter))
+    
+    def delete(self, key: str) -> bool:
+        """
+        Delete value from cache
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            True if deleted, False otherwise
+        """
+        try:
+            return self.client.delete(self.namespace + key) > 0
+        except Exception as e:
+            logger.error(f"Error in delete(): {str(e)}")
+            return False
+    
+    def invalidate_tag(self, tag: str, batch_size: Optional[int] = None) -> int:
+        """
+        Delete every entry carrying a tag
+        
+        Keys are popped from the tag's set and deleted batch_size at a time.
+        
+        Args:
+            tag: Tag from cache_tags(), e.g. "entity:fda_drug:sertraline"
+            batch_size: Keys deleted per round trip (defaults to CACHE_INVALIDATE_BATCH_SIZE)
+        
+        Returns:
+            Number of deleted entries
+        """
+        batch_size = batch_size or int(os.getenv("CACHE_INVALIDATE_BATCH_SIZE", "500"))
+        deleted = 0
+        try:
+            while True:
+                keys = self.client.spop(self._tag_set(tag), batch_size)
+                if not keys:
+                    break
+                names = [key.decode("utf-8") if isinstance(key, bytes) else key for key in keys]
+                deleted += self.client.delete(*[self.namespace + name for name in names])
+            logger.info(f"Invalidated {deleted} cache entries tagged {tag}")
+        except Exception as e:
+            logger.error(f"Error in invalidate_tag(): {str(e)}")
+        return deleted
+    
+    def clear_expired(self) -> int:
+        """
+        Clear expired entries; Redis expires keys itself, so there is nothing to do
+        
+        Returns:
+            Number of deleted entries (always 0)
+        """
+        return 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with cache statistics
+        """
+        stats: Dict[str, Any] = {"backend": "redis", "namespace": self.namespace, "expiry": self._expiry_stats()}
+        try:
+            stats["server_keys"] = self.client.dbsize()
+        except Exception as e:
+            logger.error(f"Error in get_stats(): {str(e)}")
+            stats["error"] = str(e)
+        stats["metrics"] = self.get_metrics()
+        return stats
+    
+    async def init(self) -> None:
+        """Check that the server is reachable"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.client.ping)
+            logger.info("Redis cache service connected")
+        except Exception as e:
+            logger.error(f"Error connecting to Redis cache: {str(e)}")
+    
+    async def close(self) -> None:
+        """Close the connections to the server"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.client.close)
+        except Exception as e:
+            logger.error(f"Error closing Redis cache service: {str(e)}")
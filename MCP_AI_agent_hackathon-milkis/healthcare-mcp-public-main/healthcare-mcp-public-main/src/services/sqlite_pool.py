@@ -0,0 +1,238 @@
+import os
+import queue
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("healthcare-mcp")
+
+class SQLitePool:
+    """
+    One writer and several read-only connections to a SQLite database
+    
+    In WAL mode readers do not block each other or the writer, so reads
+    check out one of up to max_readers query-only connections while all
+    writes serialize on the single writer connection. run() executes
+    blocking database work on a small thread pool so async callers never
+    block the event loop. Time spent waiting for a connection and time
+    spent holding it are recorded per role for get_stats().
+    """
+    
+    # Every live pool, so stats can be reported across databases
+    _instances: "weakref.WeakSet[SQLitePool]" = weakref.WeakSet()
+    
+    def __init__(self, db_path: str, max_readers: int = 4, busy_timeout_ms: int = 5000, name: str = "sqlite"):
+        """
+        Initialize the pool and open the writer connection
+        
+        Args:
+            db_path: Path to the SQLite database file
+            max_readers: Maximum number of read-only connections (0 reads through the writer)
+            busy_timeout_ms: Milliseconds to wait for a database lock or a free reader
+            name: Prefix for executor thread names
+        """
+        self.db_path = db_path
+        # Every connection to an in-memory database is a separate database
+        self.max_readers = 0 if db_path == ":memory:" else max(0, max_readers)
+        self.busy_timeout = busy_timeout_ms / 1000
+        self.name = name
+        self._writer_lock = threading.RLock()
+        self._writer = self._connect()
+        # Enable WAL mode so readers and the writer do not block each other
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA foreign_keys=ON")
+        self._readers: List[sqlite3.Connection] = []
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {role: self._empty_stats() for role in ("reader", "writer")}
+        self._instances.add(self)
+    
+    @classmethod
+    def from_env(cls, db_path: str, **kwargs: Any) -> "SQLitePool":
+        """Create a pool configured from SQLITE_* environment variables"""
+        return cls(
+            db_path,
+            max_readers=int(os.getenv("SQLITE_READERS", "4")),
+            busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+            **kwargs
+        )
+    
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            "acquisitions": 0,
+            "waited": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_hold_ms": 0.0,
+            "max_hold_ms": 0.0
+        }
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection usable from any pool thread"""
+        logger.debug(f"Creating new database connection for {self.db_path}")
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+    
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called"""
+        return self._closed
+    
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Hold the writer connection for the duration of the block
+        
+        The lock is re-entrant, so code holding the writer may call helpers
+        that take it again. Callers commit their own transactions.
+        
+        Yields:
+            Writer connection
+        """
+        started = time.perf_counter()
+        with self._writer_lock:
+            acquired = time.perf_counter()
+            try:
+                yield self._writer
+            finally:
+                self._record("writer", acquired - started, time.perf_counter() - acquired)
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a read-only connection for the duration of the block
+        
+        Yields:
+            Query-only connection, or the writer if the pool has no readers
+        
+        Raises:
+            sqlite3.OperationalError: If no reader frees up within the busy timeout
+        """
+        if not self.max_readers:
+            with self.writer() as conn:
+                yield conn
+            return
+        
+        started = time.perf_counter()
+        conn = self._checkout()
+        acquired = time.perf_counter()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+            self._record("reader", acquired - started, time.perf_counter() - acquired)
+    
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle reader, opening a new one while under max_readers"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._readers_lock:
+            if len(self._readers) < self.max_readers:
+                conn = self._connect()
+                conn.execute("PRAGMA query_only=ON")
+                self._readers.append(conn)
+                return conn
+        
+        try:
+            return self._idle.get(timeout=self.busy_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Timed out waiting for a reader connection to {self.db_path}")
+    
+    def _record(self, role: str, wait: float, hold: float) -> None:
+        """Add one connection use to the role's lock-wait and hold-time stats"""
+        wait_ms = wait * 1000
+        hold_ms = hold * 1000
+        with self._stats_lock:
+            stats = self._stats[role]
+            stats["acquisitions"] += 1
+            # Sub-millisecond acquisitions are uncontended lock/queue overhead
+            if wait_ms >= 1:
+                stats["waited"] += 1
+            stats["total_wait_ms"] += wait_ms
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+            stats["total_hold_ms"] += hold_ms
+            stats["max_hold_ms"] = max(stats["max_hold_ms"], hold_ms)
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run blocking database work on the pool's executor
+        
+        Args:
+            func: Function to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Result of func
+        """
+        if self._executor is None:
+            with self._readers_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(1, self.max_readers),
+                        thread_name_prefix=self.name
+                    )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+    
+    def close(self) -> None:
+        """Shut down the executor and close every connection"""
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._idle = queue.LifoQueue()
+        
+        with self._writer_lock:
+            self._writer.close()
+        logger.info(f"Closed database connections for {self.db_path}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics
+        
+        Returns:
+            Dictionary with reader counts and, per role, acquisitions, how
+            many had to wait, and total/average/max lock-wait and hold times
+        """
+        with self._stats_lock:
+            roles = {role: dict(stats) for role, stats in self._stats.items()}
+        
+        for stats in roles.values():
+            count = stats["acquisitions"]
+            stats["avg_wait_ms"] = round(stats["total_wait_ms"] / count, 3) if count else 0.0
+            stats["avg_hold_ms"] = round(stats["total_hold_ms"] / count, 3) if count else 0.0
+            for field in ("total_wait_ms", "max_wait_ms", "total_hold_ms", "max_hold_ms"):
+                stats[field] = round(stats[field], 3)
+        
+        return {
+            "max_readers": self.max_readers,
+            "open_readers": len(self._readers),
+            "idle_readers": self._idle.qsize(),
+            **roles
+        }
+    
+    @classmethod
+    def get_all_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """Get statistics of every open pool, keyed by database path"""
+        return {pool.db_path: pool.get_stats() for pool in list(cls._instances) if not pool.closed}
@@ -0,0 +1,152 @@
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+from src.services.cache_metrics import LatencyHistogram
+
+# Upper bounds (milliseconds) of the tool call latency histograms stored per
+# rollup bucket; stored histograms are only mergeable with the same bounds,
+# so changing them requires bumping the usage ROLLUP_VERSION
+CALL_LATENCY_BUCKETS_MS: Sequence[float] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Cache outcomes recorded per call: served fresh, served stale while
+# refreshing, or fetched from upstream
+CACHE_OUTCOMES = ("hit", "stale", "miss")
+
+class ToolCallStats:
+    """
+    Mergeable call statistics of one tool over one rollup bucket
+    
+    Holds the call count, cache outcome counts, upstream response bytes, latency
+    histograms of whole calls and of their upstream requests, and upstream
+    HTTP status counts. Buckets stored per hour merge into the statistics
+    of any window of hours without rereading raw events.
+    """
+    
+    def __init__(self):
+        """Initialize empty statistics"""
+        self.calls = 0
+        self.cache: Dict[str, int] = {outcome: 0 for outcome in CACHE_OUTCOMES}
+        self.response_bytes = 0
+        self.latency = LatencyHistogram(CALL_LATENCY_BUCKETS_MS)
+        self.upstream_latency = LatencyHistogram(CALL_LATENCY_BUCKETS_MS)
+        self.http_statuses: Dict[str, int] = {}
+    
+    def add(
+        self,
+        latency_ms: Optional[float],
+        upstream_ms: Optional[float],
+        response_bytes: Optional[int],
+        cache_outcome: Optional[str],
+        http_status: Optional[int]
+    ) -> None:
+        """
+        Add one call; fields that were not measured are None
+        
+        Args:
+            latency_ms: Duration of the whole tool call
+            upstream_ms: Time spent in upstream requests, None if none were made
+            response_bytes: Bytes of upstream response bodies, None if no requests were made
+            cache_outcome: One of CACHE_OUTCOMES, None if the tool has no cache
+            http_status: Status of the last upstream response
+        """
+        self.calls += 1
+        if cache_outcome in self.cache:
+            self.cache[cache_outcome] += 1
+        if response_bytes:
+            self.response_bytes += response_bytes
+        if latency_ms is not None:
+            self.latency.observe(latency_ms)
+        if upstream_ms is not None:
+            self.upstream_latency.observe(upstream_ms)
+        if http_status is not None:
+            self.http_statuses[str(http_status)] = self.http_statuses.get(str(http_status), 0) + 1
+    
+    def merge(self, other: "ToolCallStats") -> None:
+        """
+        Add another bucket's statistics to this one
+        
+        Args:
+            other: Statistics of another bucket
+        """
+        self.calls += other.calls
+        for outcome, count in other.cache.items():
+            self.cache[outcome] = self.cache.get(outcome, 0) + count
+        self.response_bytes += other.response_bytes
+        self.latency.merge(other.latency)
+        self.upstream_latency.merge(other.upstream_latency)
+        for status, count in other.http_statuses.items():
+            self.http_statuses[status] = self.http_statuses.get(status, 0) + count
+    
+    def to_row(self) -> Tuple[int, int, int, int, int, str, str, str]:
+        """
+        Get the values stored in a rollup row
+        
+        Returns:
+            (calls, cache_hits, cache_stale, cache_misses, response_bytes,
+            latency, upstream_latency, http_statuses); the last three as JSON
+        """
+        return (
+            self.calls,
+            self.cache["hit"],
+            self.cache["stale"],
+            self.cache["miss"],
+            self.response_bytes,
+            json.dumps(self.latency.state()),
+            json.dumps(self.upstream_latency.state()),
+            json.dumps(self.http_statuses)
+        )
+    
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "ToolCallStats":
+        """
+        Rebuild statistics from the values returned by to_row()
+        
+        Args:
+            row: Stored rollup values, in to_row() order
+        
+        Returns:
+            Statistics of the stored bucket
+        """
+        stats = cls()
+        stats.calls, hits, stale, misses, stats.response_bytes = row[:5]
+        stats.cache = {"hit": hits, "stale": stale, "miss": misses}
+        stats.latency = LatencyHistogram.from_state(json.loads(row[5]), CALL_LATENCY_BUCKETS_MS)
+        stats.upstream_latency = LatencyHistogram.from_state(json.loads(row[6]), CALL_LATENCY_BUCKETS_MS)
+        stats.http_statuses = json.loads(row[7])
+        return stats
+    
+    @staticmethod
+    def _latency_summary(histogram: LatencyHistogram) -> Dict[str, Any]:
+        """Percentiles of a histogram; bucket upper bounds, so estimates round up"""
+        return {
+            "count": histogram.count,
+            "avg_ms": round(histogram.total_ms / histogram.count, 3) if histogram.count else 0.0,
+            "p50_ms": round(histogram.percentile(0.50), 3),
+            "p95_ms": round(histogram.percentile(0.95), 3),
+            "p99_ms": round(histogram.percentile(0.99), 3),
+            "max_ms": round(histogram.max_ms, 3)
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the statistics for the analytics endpoint
+        
+        Returns:
+            Dictionary with calls, latency and upstream latency percentiles,
+            upstream response bytes (averaged over calls that made upstream
+            requests), cache outcomes with hit ratio and HTTP status counts
+        """
+        lookups = sum(self.cache.values())
+        return {
+            "calls": self.calls,
+            "latency": self._latency_summary(self.latency),
+            "upstream_latency": self._latency_summary(self.upstream_latency),
+            "response_bytes": {
+                "total": self.response_bytes,
+                "avg": round(self.response_bytes / self.upstream_latency.count, 1) if self.upstream_latency.count else 0.0
+            },
+            "cache": {
+                **self.cache,
+                "hit_ratio": round((self.cache["hit"] + self.cache["stale"]) / lookups, 4) if lookups else 0.0
+            },
+            "http_statuses": dict(sorted(self.http_statuses.items()))
+        }
@@ -0,0 +1,228 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger("healthcare-mcp")
+
+class UsageBuffer:
+    """
+    Bounded in-memory ring buffer of usage events, persisted in batches off the request path
+    
+    append() only takes a lock and appends, so recording never waits for
+    the usage database. A worker thread hands batches to persist() once
+    flush_interval_ms has passed since the oldest buffered event or
+    batch_size events are buffered. When the database falls behind and the
+    buffer is full, the oldest events are dropped and counted instead of
+    blocking callers. flush() persists synchronously, for readers and for
+    shutdown.
+    """
+    
+    # Every live buffer, so shutdown can persist them all
+    _instances: "weakref.WeakSet[UsageBuffer]" = weakref.WeakSet()
+    _atexit_registered = False
+    
+    def __init__(
+        self,
+        persist: Callable[[List[Any]], None],
+        capacity: int = 100000,
+        flush_interval_ms: int = 1000,
+        batch_size: int = 1000,
+        name: str = "usage-flusher"
+    ):
+        """
+        Initialize the buffer
+        
+        Args:
+            persist: Writes one batch of events in a single transaction; raises on failure
+            capacity: Maximum buffered events; the oldest are dropped beyond it
+            flush_interval_ms: Maximum milliseconds an event waits before it is persisted
+            batch_size: Number of buffered events that triggers an early flush and
+                the most events handed to persist() at once
+            name: Worker thread name
+        """
+        self.persist = persist
+        self.capacity = max(1, capacity)
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = max(1, batch_size)
+        self._events: Deque[Any] = deque(maxlen=self.capacity)
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._stats = {
+            "recorded": 0,
+            "dropped": 0,
+            "persisted": 0,
+            "failed": 0,
+            "batches": 0,
+            "high_water": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0
+        }
+        self._instances.add(self)
+    
+    @classmethod
+    def from_env(cls, persist: Callable[[List[Any]], None], **kwargs: Any) -> "UsageBuffer":
+        """Create a buffer configured from USAGE_BUFFER_* environment variables"""
+        return cls(
+            persist,
+            capacity=int(os.getenv("USAGE_BUFFER_SIZE", "100000")),
+            flush_interval_ms=int(os.getenv("USAGE_BUFFER_FLUSH_MS", "1000")),
+            batch_size=int(os.getenv("USAGE_BUFFER_BATCH_SIZE", "1000")),
+            **kwargs
+        )
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the worker thread; buffered events are also persisted at interpreter exit"""
+        self._thread.start()
+        if not UsageBuffer._atexit_registered:
+            atexit.register(UsageBuffer.stop_all)
+            UsageBuffer._atexit_registered = True
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread and persist everything still buffered
+        
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+    
+    @classmethod
+    def stop_all(cls) -> None:
+        """Stop every buffer, persisting all buffered events"""
+        for usage_buffer in list(cls._instances):
+            usage_buffer.stop()
+    
+    def append(self, event: Any) -> bool:
+        """
+        Buffer an event for the next flush
+        
+        Args:
+            event: Usage event, as expected by persist()
+        
+        Returns:
+            True if buffered without dropping, False if the oldest event was dropped to make room
+        """
+        return self.extend([event])
+    
+    def extend(self, events: List[Any]) -> bool:
+        """
+        Buffer several events at once, so they are persisted in the same batch when it has room
+        
+        Args:
+            events: Usage events, as expected by persist()
+        
+        Returns:
+            True if buffered without dropping, False if older events were dropped to make room
+        """
+        if not events:
+            return True
+        
+        with self._cond:
+            dropped = max(0, len(self._events) + len(events) - self.capacity)
+            if dropped:
+                self._stats["dropped"] += dropped
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.extend(events)
+            self._stats["recorded"] += len(events)
+            buffered = len(self._events)
+            if buffered > self._stats["high_water"]:
+                self._stats["high_water"] = buffered
+            # Wake the worker to start the flush timer, or to persist a full batch early
+            if buffered == len(events) or buffered >= self.batch_size:
+                self._cond.notify()
+        
+        # Warn on the first drop and then once per thousand
+        total = self._stats["dropped"]
+        if dropped and (total - 1) // 1000 != (total - dropped - 1) // 1000:
+            logger.warning(f"Usage buffer full ({self.capacity} events), dropped {self._stats['dropped']} events so far")
+        return not dropped
+    
+    def pending_count(self) -> int:
+        """Number of events waiting to be persisted"""
+        with self._cond:
+            return len(self._events)
+    
+    def _run(self) -> None:
+        """Worker loop: flush once the oldest event is flush_interval old or a batch is full"""
+        while not self._stop.is_set():
+            with self._cond:
+                if not self._events:
+                    self._cond.wait()
+                    continue
+                
+                remaining = self._oldest + self.flush_interval - time.monotonic()
+                if remaining > 0 and len(self._events) < self.batch_size:
+                    self._cond.wait(remaining)
+                    continue
+            
+            self.flush()
+    
+    def _take_batch(self) -> List[Any]:
+        """Remove up to batch_size of the oldest buffered events"""
+        with self._cond:
+            batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+            self._oldest = time.monotonic() if self._events else None
+            return batch
+    
+    def flush(self) -> int:
+        """
+        Persist all buffered events in the calling thread, batch_size at a time
+        
+        Returns:
+            Number of persisted events
+        """
+        persisted = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return persisted
+                
+                started = time.perf_counter()
+                try:
+                    self.persist(batch)
+                except Exception as e:
+                    logger.error(f"Error persisting {len(batch)} usage events: {str(e)}")
+                    self._stats["failed"] += len(batch)
+                    continue
+                
+                persisted += len(batch)
+                self._stats["persisted"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["last_batch_size"] = len(batch)
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get buffer statistics
+        
+        Returns:
+            Dictionary with recorded, dropped, persisted and failed event
+            counts, batch counts and the current backlog
+        """
+        stats = dict(self._stats)
+        stats["pending"] = self.pending_count()
+        stats["capacity"] = self.capacity
+        stats["running"] = self.running
+        stats["flush_interval_ms"] = round(self.flush_interval * 1000)
+        stats["batch_size"] = self.batch_size
+        return stats
@@ -0,0 +1,99 @@
+import io
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Tuple
+from src.services.usage_service import EVENT_COLUMNS
+
+# Fields of every exported event, in CSV column order
+EXPORT_COLUMNS = ("id",) + EVENT_COLUMNS
+
+# Content types of the export formats
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def parse_time(value: str) -> float:
+    """
+    Parse an export range bound given as epoch seconds or an ISO 8601 date or time
+    
+    Args:
+        value: e.g. "1760659200", "2026-10-17" or "2026-10-17T08:00:00+02:00";
+            times without an offset are UTC
+    
+    Returns:
+        UTC epoch seconds
+    
+    Raises:
+        ValueError: If the value is neither
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def parse_cursor(value: str) -> Tuple[float, int]:
+    """
+    Parse a resume cursor of the form "<timestamp>,<id>"
+    
+    Args:
+        value: Timestamp and id of the last event already received
+    
+    Returns:
+        (timestamp, id) tuple
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, separator, event_id = value.partition(",")
+    if not separator:
+        raise ValueError(f"Invalid export cursor '{value}', expected '<timestamp>,<id>'")
+    return float(timestamp), int(event_id)
+
+def format_events(events: Iterable[Dict[str, Any]], fmt: str = "ndjson", chunk_size: int = 500) -> Iterator[str]:
+    """
+    Format events as NDJSON lines or CSV rows, lazily
+    
+    Events are consumed as they are produced and emitted in chunks of
+    chunk_size, so exports of any size use constant memory. CSV output
+    starts with a header row.
+    
+    Args:
+        events: Events with the EXPORT_COLUMNS fields, e.g. from UsageService.export_usage()
+        fmt: "ndjson" or "csv"
+        chunk_size: Events per yielded chunk
+    
+    Yields:
+        Chunks of formatted text
+    
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format '{fmt}', expected one of {', '.join(EXPORT_MEDIA_TYPES)}")
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+    
+    pending = 0
+    for event in events:
+        if fmt == "csv":
+            writer.writerow([event[column] for column in EXPORT_COLUMNS])
+        else:
+            buffer.write(json.dumps(event) + "\n")
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,134 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("healthcare-mcp")
+
+class UsageRetentionJob:
+    """
+    Background worker that applies usage retention on a schedule
+    
+    Each run calls the service's retention function with a step budget;
+    every step is one short write transaction (dropping an expired
+    partition, deleting one batch of rows, or vacuuming a bounded number
+    of pages), so the writer is never held for long. When a run ends with
+    work left, the next one starts after a short pause instead of a full
+    interval.
+    """
+    
+    # Pause between runs while a retention backlog remains
+    BACKLOG_PAUSE_SECONDS = 1.0
+    
+    def __init__(
+        self,
+        run: Callable[[Optional[int]], Dict[str, Any]],
+        interval: float = 3600.0,
+        max_steps: int = 50,
+        name: str = "usage-retention"
+    ):
+        """
+        Initialize the job
+        
+        Args:
+            run: Applies retention in at most the given number of steps and returns
+                the counts it removed, with "done" set once nothing is left to do
+            interval: Seconds between scheduled runs
+            max_steps: Step budget of one run
+            name: Worker thread name
+        """
+        self.run = run
+        self.interval = interval
+        self.max_steps = max(1, max_steps)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "runs": 0,
+            "partitions_dropped": 0,
+            "rows_removed": 0,
+            "rollup_rows_removed": 0,
+            "pages_vacuumed": 0,
+            "last_run_ms": 0.0,
+            "last_run_at": None,
+            "backlog": False,
+            "errors": 0
+        }
+    
+    @classmethod
+    def from_env(cls, run: Callable[[Optional[int]], Dict[str, Any]], **kwargs: Any) -> "UsageRetentionJob":
+        """Create a job configured from USAGE_RETENTION_* environment variables"""
+        return cls(
+            run,
+            interval=float(os.getenv("USAGE_RETENTION_INTERVAL", "3600")),
+            max_steps=int(os.getenv("USAGE_RETENTION_MAX_STEPS", "50")),
+            **kwargs
+        )
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the worker thread; the first run is one interval after start"""
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread; a run in progress finishes its current step first
+        
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+    
+    def _run(self) -> None:
+        """Worker loop: run on every interval, or sooner while a backlog remains"""
+        delay = self.interval
+        while not self._stop.wait(delay):
+            result = self.run_now()
+            delay = self.BACKLOG_PAUSE_SECONDS if result.get("done") is False else self.interval
+    
+    def run_now(self) -> Dict[str, Any]:
+        """
+        Run retention once in the calling thread, within the step budget
+        
+        Returns:
+            Counts removed by this run, or an "error" entry if it failed
+        """
+        started = time.perf_counter()
+        try:
+            result = self.run(self.max_steps)
+        except Exception as e:
+            logger.error(f"Error in usage retention run: {str(e)}")
+            with self._stats_lock:
+                self._stats["errors"] += 1
+            return {"error": str(e)}
+        
+        with self._stats_lock:
+            self._stats["runs"] += 1
+            for counter in ("partitions_dropped", "rows_removed", "rollup_rows_removed", "pages_vacuumed"):
+                self._stats[counter] += result.get(counter, 0)
+            self._stats["last_run_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self._stats["last_run_at"] = time.time()
+            self._stats["backlog"] = result.get("done") is False
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get job statistics
+        
+        Returns:
+            Dictionary with run counts, removed partitions, rows and pages,
+            and the duration of the last run
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["running"] = self.running
+        stats["interval"] = self.interval
+        stats["max_steps"] = self.max_steps
+        return stats
@@ -1,24 +1,88 @@
 import sqlite3
+import json
 import time
+import calendar
 import os
 import logging
+import heapq
 import threading
-from datetime import datetime
-from typing import Dict, Any, Optional, List, Union
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Union, Iterator, Tuple
+from src.services.sqlite_pool import SQLitePool
+from src.services.usage_analytics import ToolCallStats
+from src.services.usage_buffer import UsageBuffer
+from src.services.usage_retention import UsageRetentionJob
+from src.services.usage_sketch import UsageSketches
 
 logger = logging.getLogger("healthcare-mcp")
 
+# Bump when the rollup tables change; existing databases are then rebuilt from raw rows
+ROLLUP_VERSION = 2
+
+# Per-call measurements added to the usage table after its first release
+CALL_COLUMNS = {
+    "latency_ms": "REAL",
+    "upstream_ms": "REAL",
+    "response_bytes": "INTEGER",
+    "cache_outcome": "TEXT",
+    "http_status": "INTEGER"
+}
+
+# Columns of every raw usage partition, in insert order after id
+EVENT_COLUMNS = ("session_id", "tool", "timestamp", "api_calls", *CALL_COLUMNS)
+
+# Single usage table of databases written before partitioning, renamed on startup
+LEGACY_PARTITION = "usage_legacy"
+
+# Batched deletes of expired rollups, taking the last expired hour (or the first
+# kept day) and the batch size; each batch is an index range, never a table scan
+RETENTION_ROLLUP_DELETES = (
+    "DELETE FROM usage_tool_hourly WHERE (hour, tool) IN "
+    "(SELECT hour, tool FROM usage_tool_hourly WHERE hour <= ? LIMIT ?)",
+    "DELETE FROM usage_hourly WHERE (session_id, hour, tool) IN "
+    "(SELECT session_id, hour, tool FROM usage_hourly WHERE hour <= ? LIMIT ?)",
+    "DELETE FROM usage_daily WHERE (session_id, day, tool) IN "
+    "(SELECT session_id, day, tool FROM usage_daily WHERE day < ? LIMIT ?)"
+)
+
 class UsageService:
     """
     Service for tracking API usage with SQLite backend
     
     This service provides anonymous usage tracking functionality
-    with connection pooling for better performance.
+    with connection pooling for better performance. Queries use a pool
+    of read-only connections; all writes go through a single writer.
+    
+    Raw events are kept in monthly partition tables (usage_YYYY_MM, UTC)
+    listed in usage_partitions and readable together through the usage
+    view. Queries over a time range only touch the partitions overlapping
+    it, and retention drops whole expired partitions, in bounded steps
+    run by a background job. Hourly and daily rollups per
+    session and tool, monthly totals per tool, the distinct session count
+    and hourly call statistics per tool (latency histograms, cache
+    outcomes, response bytes, HTTP statuses) are updated in the same
+    transaction as each flushed batch, so the stats and analytics queries
+    read a few small rows however large the raw table grows.
+    
+    Approximate statistics (distinct sessions per window, most used tools,
+    most queried drugs and conditions) come from in-memory per-day
+    sketches, checkpointed to usage_sketches.
     """
     
-    # Class-level connection pool
-    _connection_pools: Dict[str, sqlite3.Connection] = {}
-    _connection_locks: Dict[str, threading.Lock] = {}
+    # Class-level connection pools: one writer and several readers per database
+    _pools: Dict[str, SQLitePool] = {}
+    _pools_lock = threading.Lock()
+    
+    # Class-level usage buffers, one per database
+    _buffers: Dict[str, UsageBuffer] = {}
+    _buffers_lock = threading.Lock()
+    
+    # Class-level retention jobs, one per database
+    _retention_jobs: Dict[str, UsageRetentionJob] = {}
+    
+    # Class-level approximate usage sketches, one per database
+    _sketches: Dict[str, UsageSketches] = {}
+    _sketches_lock = threading.Lock()
     
     def __init__(self, db_path: str = "usage.db"):
         """
@@ -29,13 +93,18 @@ class UsageService:
         """
         self.db_path = os.getenv("USAGE_DB_PATH", db_path)
         
-        # Initialize connection lock for this database
-        if self.db_path not in self._connection_locks:
-            self._connection_locks[self.db_path] = threading.Lock()
+        # Retention settings; 0 days disables the scheduled retention job
+        self.retention_days = int(os.getenv("USAGE_RETENTION_DAYS", "365"))
+        self.retention_batch_size = int(os.getenv("USAGE_RETENTION_BATCH_SIZE", "5000"))
+        self.vacuum_pages = int(os.getenv("USAGE_VACUUM_PAGES", "1000"))
         
         # Initialize the database
         self._init_db()
         
+        # Start the scheduled retention job
+        if self.retention_days > 0:
+            self._get_retention_job()
+    
     async def init(self) -> None:
         """
         Initialize the usage service asynchronously
@@ -47,53 +116,313 @@ class UsageService:
         
         logger.info(f"Usage service initialized with database at {self.db_path}")
     
-    def _get_connection(self) -> sqlite3.Connection:
+    def _get_pool(self) -> SQLitePool:
         """
-        Get a connection from the pool or create a new one
+        Get the connection pool for this database, creating it if needed
         
         Returns:
-            SQLite connection
+            Connection pool with one writer and several read-only connections
         """
-        with self._connection_locks[self.db_path]:
-            if self.db_path not in self._connection_pools:
-                logger.debug(f"Creating new database connection for {self.db_path}")
-                conn = sqlite3.connect(self.db_path, check_same_thread=False)
-                # Enable WAL mode for better concurrency
-                conn.execute("PRAGMA journal_mode=WAL")
-                # Enable foreign keys
-                conn.execute("PRAGMA foreign_keys=ON")
-                self._connection_pools[self.db_path] = conn
-            
-            return self._connection_pools[self.db_path]
+        pool = self._pools.get(self.db_path)
+        if pool is None or pool.closed:
+            with self._pools_lock:
+                pool = self._pools.get(self.db_path)
+                if pool is None or pool.closed:
+                    pool = SQLitePool.from_env(self.db_path, name="usage-sqlite")
+                    self._pools[self.db_path] = pool
+        return pool
     
     def _init_db(self) -> None:
         """Initialize the SQLite database if it doesn't exist"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Create usage table for anonymous session tracking only
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usage (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            tool TEXT NOT NULL,
-            timestamp REAL NOT NULL,
-            api_calls INTEGER NOT NULL DEFAULT 1
+        with self._get_pool().writer() as conn:
+            cursor = conn.cursor()
+            
+            # Freed pages can then be returned in bounded steps. Only a database without
+            # tables can switch, and in WAL mode it takes a VACUUM (instant while empty)
+            if cursor.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is None:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+            
+            # Raw events live in monthly partitions; start and end are UTC epoch seconds
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_partitions (
+                name TEXT PRIMARY KEY,
+                start REAL NOT NULL,
+                end REAL NOT NULL,
+                rows INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            ''')
+            
+            # Databases written before partitioning kept every event in one usage table;
+            # it becomes a partition covering everything up to now
+            legacy = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage'").fetchone()
+            if legacy is not None:
+                columns = {row[1] for row in cursor.execute("PRAGMA table_info(usage)")}
+                for column, column_type in CALL_COLUMNS.items():
+                    if column not in columns:
+                        cursor.execute(f"ALTER TABLE usage ADD COLUMN {column} {column_type}")
+                cursor.execute(f"ALTER TABLE usage RENAME TO {LEGACY_PARTITION}")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{LEGACY_PARTITION}_timestamp ON {LEGACY_PARTITION}(timestamp)")
+                rows = cursor.execute(f"SELECT COUNT(*) FROM {LEGACY_PARTITION}").fetchone()[0]
+                cursor.execute(
+                    "INSERT OR REPLACE INTO usage_partitions (name, start, end, rows) VALUES (?, 0, ?, ?)",
+                    (LEGACY_PARTITION, time.time(), rows)
+                )
+                logger.info(f"Moved {rows} usage events into partition {LEGACY_PARTITION}")
+            
+            if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'usage'").fetchone() is None:
+                self._create_usage_view(conn)
+            
+            # Rollups; hours are UTC epoch seconds, days and months UTC dates
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_hourly (
+                session_id TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                tool TEXT NOT NULL,
+                api_calls INTEGER NOT NULL,
+                events INTEGER NOT NULL,
+                PRIMARY KEY (session_id, hour, tool)
+            ) WITHOUT ROWID
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_hourly_hour ON usage_hourly(hour)")
+            
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_daily (
+                session_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                api_calls INTEGER NOT NULL,
+                events INTEGER NOT NULL,
+                PRIMARY KEY (session_id, day, tool)
+            ) WITHOUT ROWID
+            ''')
+            # Day windows (stats, retention) read a range of this covering index instead of the whole table
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_daily_day ON usage_daily(day, session_id, tool, api_calls)")
+            
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_monthly (
+                month TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                api_calls INTEGER NOT NULL,
+                events INTEGER NOT NULL,
+                PRIMARY KEY (month, tool)
+            ) WITHOUT ROWID
+            ''')
+            
+            # Latencies and upstream statuses are JSON (see ToolCallStats.to_row)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_tool_hourly (
+                hour INTEGER NOT NULL,
+                tool TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                cache_hits INTEGER NOT NULL,
+                cache_stale INTEGER NOT NULL,
+                cache_misses INTEGER NOT NULL,
+                response_bytes INTEGER NOT NULL,
+                latency TEXT NOT NULL,
+                upstream_latency TEXT NOT NULL,
+                http_statuses TEXT NOT NULL,
+                PRIMARY KEY (hour, tool)
+            ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_sessions (
+                session_id TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL
+            ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID
+            ''')
+            
+            # Checkpoints of the approximate usage sketches; state is JSON (see UsageSketches.state)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usage_sketches (
+                day TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated REAL NOT NULL
+            ) WITHOUT ROWID
+            ''')
+            
+            conn.commit()
+            
+            # Databases written before the rollups existed are backfilled once
+            row = cursor.execute("SELECT value FROM usage_counters WHERE name = 'rollup_version'").fetchone()
+            if row is None or row[0] != ROLLUP_VERSION:
+                self._rebuild_rollups(conn)
+    
+    @staticmethod
+    def _create_usage_view(conn: sqlite3.Connection) -> None:
+        """
+        Recreate the usage view over every registered partition
+        
+        Args:
+            conn: Writer connection
+        """
+        columns = ", ".join(("id",) + EVENT_COLUMNS)
+        names = [row[0] for row in conn.execute("SELECT name FROM usage_partitions ORDER BY start")]
+        selects = [f"SELECT {columns} FROM {name}" for name in names]
+        if not selects:
+            selects = ["SELECT " + ", ".join(f"NULL AS {column}" for column in ("id",) + EVENT_COLUMNS) + " WHERE 0"]
+        conn.execute("DROP VIEW IF EXISTS usage")
+        conn.execute("CREATE VIEW usage AS " + " UNION ALL ".join(selects))
+    
+    @staticmethod
+    def _partition_for(timestamp: float) -> tuple:
+        """
+        Get the monthly partition holding a timestamp
+        
+        Args:
+            timestamp: UTC epoch seconds
+        
+        Returns:
+            (table name, start, end) of the partition's month
+        """
+        year, month = time.gmtime(timestamp)[:2]
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return (
+            f"usage_{year:04d}_{month:02d}",
+            calendar.timegm((year, month, 1, 0, 0, 0)),
+            calendar.timegm((next_year, next_month, 1, 0, 0, 0))
         )
-        ''')
+    
+    def _partitions(self, conn: sqlite3.Connection, start: Optional[float] = None, end: Optional[float] = None) -> List[str]:
+        """
+        Get the partitions overlapping a time range, oldest first
+        
+        Args:
+            conn: Database connection
+            start: Start of the range in UTC epoch seconds (optional)
+            end: End of the range, exclusive (optional)
+        
+        Returns:
+            Partition table names
+        """
+        rows = conn.execute(
+            "SELECT name FROM usage_partitions WHERE end > ? AND start < ? ORDER BY start",
+            (start if start is not None else float("-inf"), end if end is not None else float("inf"))
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def _insert_events(self, conn: sqlite3.Connection, events: List[tuple]) -> None:
+        """
+        Insert raw events into their monthly partitions, creating partitions as needed
         
-        # Create indexes for faster queries
-        cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_session_timestamp ON usage(session_id, timestamp)
-        ''')
+        Runs inside the caller's transaction; the caller commits.
         
-        cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_tool ON usage(tool)
-        ''')
+        Args:
+            conn: Writer connection
+            events: Event tuples in EVENT_COLUMNS order
+        """
+        by_partition: Dict[tuple, List[tuple]] = {}
+        for event in events:
+            by_partition.setdefault(self._partition_for(event[2]), []).append(event)
         
-        conn.commit()
+        known = {row[0] for row in conn.execute("SELECT name FROM usage_partitions")}
+        created = False
+        for (name, start, end), partition_events in by_partition.items():
+            if name not in known:
+                conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {name} (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    tool TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    api_calls INTEGER NOT NULL DEFAULT 1,
+                    latency_ms REAL,
+                    upstream_ms REAL,
+                    response_bytes INTEGER,
+                    cache_outcome TEXT,
+                    http_status INTEGER
+                )
+                ''')
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_timestamp ON {name}(timestamp)")
+                conn.execute(
+                    "INSERT INTO usage_partitions (name, start, end, rows) VALUES (?, ?, ?, 0)",
+                    (name, start, end)
+                )
+                created = True
+            
+            conn.executemany(
+                f"INSERT INTO {name} ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})",
+                partition_events
+            )
+            conn.execute("UPDATE usage_partitions SET rows = rows + ? WHERE name = ?", (len(partition_events), name))
+        
+        if created:
+            self._create_usage_view(conn)
+    
+    def _rebuild_rollups(self, conn: sqlite3.Connection) -> None:
+        """
+        Recompute every rollup from the raw usage table in one transaction
+        
+        Args:
+            conn: Writer connection
+        """
+        try:
+            for table in ("usage_hourly", "usage_daily", "usage_monthly", "usage_tool_hourly", "usage_sessions", "usage_counters"):
+                conn.execute(f"DELETE FROM {table}")
+            
+            conn.execute('''
+            INSERT INTO usage_hourly (session_id, hour, tool, api_calls, events)
+            SELECT session_id, CAST(timestamp / 3600 AS INTEGER) * 3600 AS hour, tool, SUM(api_calls), COUNT(*)
+            FROM usage GROUP BY session_id, hour, tool
+            ''')
+            conn.execute('''
+            INSERT INTO usage_daily (session_id, day, tool, api_calls, events)
+            SELECT session_id, strftime('%Y-%m-%d', timestamp, 'unixepoch') AS day, tool, SUM(api_calls), COUNT(*)
+            FROM usage GROUP BY session_id, day, tool
+            ''')
+            conn.execute('''
+            INSERT INTO usage_monthly (month, tool, api_calls, events)
+            SELECT strftime('%Y-%m', timestamp, 'unixepoch') AS month, tool, SUM(api_calls), COUNT(*)
+            FROM usage GROUP BY month, tool
+            ''')
+            # Histograms are built in Python; rows stream through, one bucket per hour and tool
+            tool_hourly: Dict[tuple, ToolCallStats] = {}
+            for hour, tool, *call in conn.execute('''
+            SELECT CAST(timestamp / 3600 AS INTEGER) * 3600, tool, latency_ms, upstream_ms, response_bytes, cache_outcome, http_status
+            FROM usage
+            '''):
+                tool_hourly.setdefault((hour, tool), ToolCallStats()).add(*call)
+            self._write_tool_hourly(conn, tool_hourly, merge=False)
+            
+            conn.execute('''
+            INSERT INTO usage_sessions (session_id, first_seen)
+            SELECT session_id, MIN(timestamp) FROM usage GROUP BY session_id
+            ''')
+            
+            conn.execute("INSERT INTO usage_counters (name, value) SELECT 'sessions', COUNT(*) FROM usage_sessions")
+            conn.execute("INSERT INTO usage_counters (name, value) VALUES ('rollup_version', ?)", (ROLLUP_VERSION,))
+            conn.commit()
+            logger.info(f"Rebuilt usage rollups for {self.db_path}")
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error in _rebuild_rollups(): {str(e)}")
     
-    def record_usage(self, session_id: str, tool: str, api_calls: int = 1) -> bool:
+    def rebuild_rollups(self) -> None:
+        """Recompute every rollup from the raw usage table, e.g. after editing raw rows by hand"""
+        self.flush()
+        with self._get_pool().writer() as conn:
+            self._rebuild_rollups(conn)
+    
+    def record_usage(
+        self,
+        session_id: str,
+        tool: str,
+        api_calls: int = 1,
+        latency_ms: Optional[float] = None,
+        upstream_ms: Optional[float] = None,
+        response_bytes: Optional[int] = None,
+        cache_outcome: Optional[str] = None,
+        http_status: Optional[int] = None,
+        subject: Optional[str] = None
+    ) -> bool:
         """
         Record API usage for a session anonymously
         
@@ -101,7 +430,14 @@ class UsageService:
             session_id: Anonymous session identifier
             tool: Name of the tool used
             api_calls: Number of API calls made
-            
+            latency_ms: Duration of the whole tool call in milliseconds
+            upstream_ms: Time spent in upstream requests, None if none were made
+            response_bytes: Bytes of upstream response bodies, None if no requests were made
+            cache_outcome: "hit", "stale" or "miss", None if the tool has no cache
+            http_status: Status of the last upstream response
+            subject: Drug or condition queried; only counted in the approximate
+                usage sketches, never stored with the event
+        
         Returns:
             True if successful, False otherwise
         """
@@ -109,21 +445,187 @@ class UsageService:
             logger.warning("Missing session_id or tool in record_usage")
             return False
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        # Buffered in memory; persisted in batches by the flusher thread, and
+        # readers flush before querying
+        timestamp = time.time()
+        self._get_buffer().append((
+            session_id, tool, timestamp, api_calls,
+            latency_ms, upstream_ms, response_bytes, cache_outcome, http_status
+        ))
+        self._get_sketches().add(session_id, tool, timestamp, api_calls, subject)
+        return True
+    
+    def record_usages(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Record the usage of several calls in one buffer write, so they persist in the same batch
         
-        try:
-            cursor.execute(
-                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
-                (session_id, tool, time.time(), api_calls)
+        Args:
+            records: Keyword arguments of record_usage() per call
+        
+        Returns:
+            Number of recorded calls; records without session_id or tool are skipped
+        """
+        timestamp = time.time()
+        events = []
+        sketches = self._get_sketches()
+        for record in records:
+            session_id, tool = record.get("session_id"), record.get("tool")
+            if not session_id or not tool:
+                logger.warning("Missing session_id or tool in record_usages")
+                continue
+            api_calls = record.get("api_calls", 1)
+            events.append((
+                session_id, tool, timestamp, api_calls,
+                *(record.get(column) for column in CALL_COLUMNS)
+            ))
+            sketches.add(session_id, tool, timestamp, api_calls, record.get("subject"))
+        
+        self._get_buffer().extend(events)
+        return len(events)
+    
+    def _get_buffer(self) -> UsageBuffer:
+        """
+        Get the usage buffer for this database, starting it if needed
+        
+        Returns:
+            Running usage buffer
+        """
+        usage_buffer = self._buffers.get(self.db_path)
+        if usage_buffer is None or not usage_buffer.running:
+            with self._buffers_lock:
+                usage_buffer = self._buffers.get(self.db_path)
+                if usage_buffer is None or not usage_buffer.running:
+                    usage_buffer = UsageBuffer.from_env(self._persist, name="usage-flusher")
+                    usage_buffer.start()
+                    self._buffers[self.db_path] = usage_buffer
+        return usage_buffer
+    
+    def _persist(self, events: List[tuple]) -> None:
+        """
+        Write a batch of buffered usage events and update the rollups in one transaction
+        
+        Args:
+            events: (session_id, tool, timestamp, api_calls, latency_ms, upstream_ms,
+                response_bytes, cache_outcome, http_status) tuples
+        
+        Raises:
+            sqlite3.Error: If the batch could not be written; it is rolled back
+        """
+        hourly: Dict[tuple, List[int]] = {}
+        daily: Dict[tuple, List[int]] = {}
+        monthly: Dict[tuple, List[int]] = {}
+        tool_hourly: Dict[tuple, ToolCallStats] = {}
+        first_seen: Dict[str, float] = {}
+        for session_id, tool, timestamp, api_calls, *call in events:
+            utc = time.gmtime(timestamp)
+            for rollup, key in (
+                (hourly, (session_id, int(timestamp // 3600) * 3600, tool)),
+                (daily, (session_id, time.strftime("%Y-%m-%d", utc), tool)),
+                (monthly, (time.strftime("%Y-%m", utc), tool))
+            ):
+                totals = rollup.setdefault(key, [0, 0])
+                totals[0] += api_calls
+                totals[1] += 1
+            tool_hourly.setdefault((int(timestamp // 3600) * 3600, tool), ToolCallStats()).add(*call)
+            first_seen.setdefault(session_id, timestamp)
+        
+        with self._get_pool().writer() as conn:
+            try:
+                self._insert_events(conn, events)
+                conn.executemany(
+                    """
+                    INSERT INTO usage_hourly (session_id, hour, tool, api_calls, events) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (session_id, hour, tool) DO UPDATE SET
+                        api_calls = api_calls + excluded.api_calls, events = events + excluded.events
+                    """,
+                    [(*key, calls, count) for key, (calls, count) in hourly.items()]
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO usage_daily (session_id, day, tool, api_calls, events) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (session_id, day, tool) DO UPDATE SET
+                        api_calls = api_calls + excluded.api_calls, events = events + excluded.events
+                    """,
+                    [(*key, calls, count) for key, (calls, count) in daily.items()]
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO usage_monthly (month, tool, api_calls, events) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (month, tool) DO UPDATE SET
+                        api_calls = api_calls + excluded.api_calls, events = events + excluded.events
+                    """,
+                    [(*key, calls, count) for key, (calls, count) in monthly.items()]
+                )
+                self._write_tool_hourly(conn, tool_hourly)
+                
+                # Only sessions seen for the first time add to the distinct count
+                new_sessions = conn.executemany(
+                    "INSERT OR IGNORE INTO usage_sessions (session_id, first_seen) VALUES (?, ?)",
+                    list(first_seen.items())
+                ).rowcount
+                if new_sessions:
+                    conn.execute(
+                        """
+                        INSERT INTO usage_counters (name, value) VALUES ('sessions', ?)
+                        ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+                        """,
+                        (new_sessions,)
+                    )
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+    
+    @staticmethod
+    def _write_tool_hourly(conn: sqlite3.Connection, buckets: Dict[tuple, ToolCallStats], merge: bool = True) -> None:
+        """
+        Store hourly call statistics per tool, merged into the stored buckets
+        
+        Args:
+            conn: Writer connection inside the caller's transaction
+            buckets: Statistics keyed by (hour, tool)
+            merge: Whether to merge into existing rows; False when rebuilding
+        """
+        for (hour, tool), stats in buckets.items():
+            if merge:
+                row = conn.execute(
+                    """
+                    SELECT calls, cache_hits, cache_stale, cache_misses, response_bytes, latency, upstream_latency, http_statuses
+                    FROM usage_tool_hourly WHERE hour = ? AND tool = ?
+                    """,
+                    (hour, tool)
+                ).fetchone()
+                if row is not None:
+                    stored = ToolCallStats.from_row(row)
+                    stored.merge(stats)
+                    stats = stored
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO usage_tool_hourly (hour, tool, calls, cache_hits, cache_stale, cache_misses,
+                                                          response_bytes, latency, upstream_latency, http_statuses)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (hour, tool, *stats.to_row())
             )
-            
-            conn.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error in record_usage(): {str(e)}")
-            return False
+    
+    def flush(self) -> int:
+        """
+        Persist all buffered usage events now
+        
+        Returns:
+            Number of persisted events
+        """
+        return self._get_buffer().flush()
+    
+    @classmethod
+    def get_buffer_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of every usage buffer
+        
+        Returns:
+            Dictionary of buffer statistics keyed by database path
+        """
+        return {db_path: usage_buffer.get_stats() for db_path, usage_buffer in cls._buffers.items()}
     
     def get_monthly_usage(self, session_id: str, month: Optional[int] = None, year: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -137,8 +639,8 @@ class UsageService:
         Returns:
             Dictionary with usage statistics
         """
-        # Use current month/year if not specified
-        current_date = datetime.now()
+        # Use current month/year (UTC, like the rollups) if not specified
+        current_date = datetime.now(timezone.utc)
         if month is None:
             month = current_date.month
         if year is None:
@@ -156,45 +658,39 @@ class UsageService:
             month = current_date.month
             year = current_date.year
         
-        # Calculate start and end timestamps for the month
-        start_date = datetime(year, month, 1).timestamp()
+        # Days of the month, as stored in the daily rollup (UTC)
+        start_day = f"{year:04d}-{month:02d}-01"
         if month == 12:
-            end_date = datetime(year + 1, 1, 1).timestamp()
+            end_day = f"{year + 1:04d}-01-01"
         else:
-            end_date = datetime(year, month + 1, 1).timestamp()
+            end_day = f"{year:04d}-{month + 1:02d}-01"
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        self.flush()
         
         try:
-            # Get total API calls for the month
-            cursor.execute(
-                "SELECT SUM(api_calls) FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ?",
-                (session_id, start_date, end_date)
-            )
-            total_calls = cursor.fetchone()[0] or 0
-            
-            # Get tool-specific usage
-            cursor.execute(
-                "SELECT tool, SUM(api_calls) FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY tool",
-                (session_id, start_date, end_date)
-            )
-            tool_usage = {tool: count for tool, count in cursor.fetchall()}
-            
-            # Get daily usage
-            cursor.execute(
-                """
-                SELECT 
-                    strftime('%Y-%m-%d', datetime(timestamp, 'unixepoch')) as date,
-                    SUM(api_calls) as calls
-                FROM usage 
-                WHERE session_id = ? AND timestamp >= ? AND timestamp < ?
-                GROUP BY date
-                ORDER BY date
-                """,
-                (session_id, start_date, end_date)
-            )
-            daily_usage = {date: calls for date, calls in cursor.fetchall()}
+            with self._get_pool().reader() as conn:
+                cursor = conn.cursor()
+                
+                # Get tool-specific usage
+                cursor.execute(
+                    "SELECT tool, SUM(api_calls) FROM usage_daily WHERE session_id = ? AND day >= ? AND day < ? GROUP BY tool",
+                    (session_id, start_day, end_day)
+                )
+                tool_usage = {tool: count for tool, count in cursor.fetchall()}
+                
+                # Get daily usage
+                cursor.execute(
+                    """
+                    SELECT day, SUM(api_calls)
+                    FROM usage_daily
+                    WHERE session_id = ? AND day >= ? AND day < ?
+                    GROUP BY day
+                    ORDER BY day
+                    """,
+                    (session_id, start_day, end_day)
+                )
+                daily_usage = {day: calls for day, calls in cursor.fetchall()}
+                total_calls = sum(tool_usage.values())
             
             return {
                 "session_id": session_id,
@@ -217,62 +713,606 @@ class UsageService:
                 "error": str(e)
             }
     
-    def get_usage_stats(self) -> Dict[str, Any]:
+    def get_hourly_usage(self, session_id: str, hours: int = 24) -> Dict[str, Any]:
         """
-        Get overall usage statistics
+        Get a session's usage per hour over the last hours
+        
+        Args:
+            session_id: Anonymous session identifier
+            hours: Number of hours to include, up to 31 days
         
         Returns:
-            Dictionary with overall usage statistics
+            Dictionary with API calls per tool for each UTC hour that had usage
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        hours = min(max(int(hours), 1), 31 * 24)
+        start_hour = (int(time.time() // 3600) - hours + 1) * 3600
+        
+        self.flush()
         
         try:
-            # Get total API calls
-            cursor.execute("SELECT SUM(api_calls) FROM usage")
-            total_calls = cursor.fetchone()[0] or 0
+            with self._get_pool().reader() as conn:
+                rows = conn.execute(
+                    "SELECT hour, tool, api_calls FROM usage_hourly WHERE session_id = ? AND hour >= ? ORDER BY hour",
+                    (session_id, start_hour)
+                ).fetchall()
             
-            # Get total unique sessions
-            cursor.execute("SELECT COUNT(DISTINCT session_id) FROM usage")
-            total_sessions = cursor.fetchone()[0] or 0
+            hourly_usage: Dict[str, Dict[str, int]] = {}
+            for hour, tool, calls in rows:
+                label = time.strftime("%Y-%m-%dT%H:00Z", time.gmtime(hour))
+                hourly_usage.setdefault(label, {})[tool] = calls
             
-            # Get tool-specific usage
-            cursor.execute(
-                "SELECT tool, SUM(api_calls) FROM usage GROUP BY tool ORDER BY SUM(api_calls) DESC"
-            )
-            tool_usage = {tool: count for tool, count in cursor.fetchall()}
+            return {
+                "session_id": session_id,
+                "hours": hours,
+                "hourly_usage": hourly_usage
+            }
+        
+        except sqlite3.Error as e:
+            logger.error(f"Error in get_hourly_usage(): {str(e)}")
+            return {
+                "session_id": session_id,
+                "hours": hours,
+                "hourly_usage": {},
+                "error": str(e)
+            }
+    
+    def get_recent_calls(self, since: float) -> List[tuple]:
+        """
+        Get persisted calls per session, tool and hour, for quota reconciliation
+        
+        Args:
+            since: Only include hours starting at or after this UTC epoch second
+        
+        Returns:
+            (session_id, tool, hour, calls) tuples; calls counts events, not api_calls
+        """
+        with self._get_pool().reader() as conn:
+            return conn.execute(
+                "SELECT session_id, tool, hour, events FROM usage_hourly WHERE hour >= ?",
+                (since,)
+            ).fetchall()
+    
+    def get_usage_analytics(self, hours: int = 24, tool: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get latency percentiles, cache hit ratios and upstream statuses per tool
+        
+        Merges the hourly call statistics of the window, so the cost depends on
+        the number of hours and tools, not on the number of calls.
+        
+        Args:
+            hours: Number of hours to include, counting the current one, up to 366 days
+            tool: Only include this tool (optional)
+        
+        Returns:
+            Dictionary with the window and a summary per tool and in total
+        """
+        hours = min(max(int(hours), 1), 366 * 24)
+        end_hour = int(time.time() // 3600) * 3600 + 3600
+        start_hour = end_hour - hours * 3600
+        
+        self.flush()
+        
+        query = """
+            SELECT tool, calls, cache_hits, cache_stale, cache_misses, response_bytes, latency, upstream_latency, http_statuses
+            FROM usage_tool_hourly WHERE hour >= ? AND hour < ?
+        """
+        params: List[Any] = [start_hour, end_hour]
+        if tool:
+            query += " AND tool = ?"
+            params.append(tool)
+        
+        window = {
+            "hours": hours,
+            "start": datetime.fromtimestamp(start_hour, timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(end_hour, timezone.utc).isoformat()
+        }
+        try:
+            with self._get_pool().reader() as conn:
+                rows = conn.execute(query, params).fetchall()
             
-            # Get usage by month
-            cursor.execute(
-                """
-                SELECT 
-                    strftime('%Y-%m', datetime(timestamp, 'unixepoch')) as month,
-                    SUM(api_calls) as calls
-                FROM usage 
-                GROUP BY month
-                ORDER BY month DESC
-                LIMIT 12
-                """
-            )
-            monthly_usage = {month: calls for month, calls in cursor.fetchall()}
+            tools: Dict[str, ToolCallStats] = {}
+            total = ToolCallStats()
+            for row_tool, *values in rows:
+                bucket = ToolCallStats.from_row(values)
+                tools.setdefault(row_tool, ToolCallStats()).merge(bucket)
+                total.merge(bucket)
             
             return {
-                "total_api_calls": total_calls,
-                "total_unique_sessions": total_sessions,
-                "tool_usage": tool_usage,
-                "monthly_usage": monthly_usage
+                **window,
+                "tools": {name: stats.summary() for name, stats in sorted(tools.items())},
+                "total": total.summary()
+            }
+        
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error in get_usage_analytics(): {str(e)}")
+            return {
+                **window,
+                "tools": {},
+                "error": str(e)
             }
+    
+    def get_usage_stats(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get overall usage statistics
+        
+        Args:
+            days: Also count calls per tool and distinct sessions over this many
+                recent UTC days, counting today (optional)
+        
+        Returns:
+            Dictionary with overall usage statistics
+        """
+        self.flush()
+        
+        try:
+            with self._get_pool().reader() as conn:
+                cursor = conn.cursor()
+                
+                # Get tool-specific usage
+                cursor.execute(
+                    "SELECT tool, SUM(api_calls) FROM usage_monthly GROUP BY tool ORDER BY SUM(api_calls) DESC"
+                )
+                tool_usage = {tool: count for tool, count in cursor.fetchall()}
+                total_calls = sum(tool_usage.values())
+                
+                # Get total unique sessions
+                cursor.execute("SELECT value FROM usage_counters WHERE name = 'sessions'")
+                row = cursor.fetchone()
+                total_sessions = row[0] if row else 0
+                
+                # Get usage by month
+                cursor.execute(
+                    """
+                    SELECT month, SUM(api_calls)
+                    FROM usage_monthly
+                    GROUP BY month
+                    ORDER BY month DESC
+                    LIMIT 12
+                    """
+                )
+                monthly_usage = {month: calls for month, calls in cursor.fetchall()}
+                
+                stats = {
+                    "total_api_calls": total_calls,
+                    "total_unique_sessions": total_sessions,
+                    "tool_usage": tool_usage,
+                    "monthly_usage": monthly_usage
+                }
+                
+                # Exact distinct sessions of a window scan its days in idx_usage_daily_day;
+                # the approximate stats answer the same from sketches
+                if days is not None:
+                    start = time.strftime("%Y-%m-%d", time.gmtime(time.time() - (max(1, days) - 1) * 86400))
+                    cursor.execute(
+                        "SELECT tool, SUM(api_calls) FROM usage_daily WHERE day >= ? GROUP BY tool ORDER BY SUM(api_calls) DESC",
+                        (start,)
+                    )
+                    window_usage = {tool: count for tool, count in cursor.fetchall()}
+                    cursor.execute("SELECT COUNT(DISTINCT session_id) FROM usage_daily WHERE day >= ?", (start,))
+                    stats["window"] = {
+                        "days": max(1, days),
+                        "start": start,
+                        "total_api_calls": sum(window_usage.values()),
+                        "unique_sessions": cursor.fetchone()[0],
+                        "tool_usage": window_usage
+                    }
             
+            return stats
+        
         except sqlite3.Error as e:
             logger.error(f"Error in get_usage_stats(): {str(e)}")
             return {
                 "error": str(e)
             }
     
+    async def get_monthly_usage_async(self, session_id: str, month: Optional[int] = None, year: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a month's usage for a session without blocking the event loop
+        
+        Runs get_monthly_usage() on the connection pool's executor.
+        
+        Args:
+            session_id: Anonymous session identifier
+            month: Month number (1-12)
+            year: Year (e.g., 2023)
+            
+        Returns:
+            Dictionary with usage statistics
+        """
+        return await self._get_pool().run(self.get_monthly_usage, session_id, month, year)
+    
+    async def get_usage_stats_async(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get overall usage statistics without blocking the event loop
+        
+        Runs get_usage_stats() on the connection pool's executor.
+        
+        Args:
+            days: Also include statistics of this many recent days (optional)
+        
+        Returns:
+            Dictionary with overall usage statistics
+        """
+        return await self._get_pool().run(self.get_usage_stats, days)
+    
+    def get_approximate_usage_stats(self, days: int = 30, limit: int = 10) -> Dict[str, Any]:
+        """
+        Get approximate usage statistics of recent days from the in-memory sketches
+        
+        Distinct sessions are a HyperLogLog estimate (1.6% relative standard
+        error); top counts carry their own error, and none is off by more than
+        the window's total divided by the sketch capacity. Events recorded by
+        other processes are not included.
+        
+        Args:
+            days: Number of recent UTC days to include, counting today
+            limit: Number of tools, drugs and conditions listed
+        
+        Returns:
+            Dictionary with the window, call count, estimated distinct sessions,
+            top tools, drugs and conditions, and their error bounds
+        """
+        try:
+            return {"mode": "approximate", **self._get_sketches().query(days, limit)}
+        except Exception as e:
+            logger.error(f"Error in get_approximate_usage_stats(): {str(e)}")
+            return {
+                "error": str(e)
+            }
+    
+    async def get_approximate_usage_stats_async(self, days: int = 30, limit: int = 10) -> Dict[str, Any]:
+        """
+        Get approximate usage statistics without blocking the event loop
+        
+        Runs get_approximate_usage_stats() on the connection pool's executor.
+        
+        Args:
+            days: Number of recent UTC days to include, counting today
+            limit: Number of tools, drugs and conditions listed
+        
+        Returns:
+            Dictionary with the window, estimates and their error bounds
+        """
+        return await self._get_pool().run(self.get_approximate_usage_stats, days, limit)
+    
+    def _get_sketches(self) -> UsageSketches:
+        """
+        Get the usage sketches for this database, loading and starting them if needed
+        
+        Returns:
+            Running usage sketches
+        """
+        sketches = self._sketches.get(self.db_path)
+        if sketches is None or not sketches.running:
+            with self._sketches_lock:
+                sketches = self._sketches.get(self.db_path)
+                if sketches is None or not sketches.running:
+                    sketches = UsageSketches.from_env(self._save_sketches, name="usage-sketches")
+                    self._load_sketches(sketches)
+                    sketches.start()
+                    self._sketches[self.db_path] = sketches
+        return sketches
+    
+    def _load_sketches(self, sketches: UsageSketches) -> None:
+        """
+        Restore sketches from their checkpoints, or seed them from the daily rollups
+        
+        Databases without checkpoints get session and tool sketches from
+        usage_daily; drugs and conditions are only counted from then on.
+        
+        Args:
+            sketches: Sketches to fill
+        """
+        try:
+            with self._get_pool().reader() as conn:
+                rows = conn.execute("SELECT day, state FROM usage_sketches").fetchall()
+                if rows:
+                    sketches.restore({day: json.loads(state) for day, state in rows})
+                    return
+                
+                first_kept = sketches.first_kept_day()
+                for day, session_id, tool, api_calls in conn.execute(
+                    "SELECT day, session_id, tool, api_calls FROM usage_daily WHERE day >= ?",
+                    (first_kept,)
+                ):
+                    sketches.add(session_id, tool, calendar.timegm(time.strptime(day, "%Y-%m-%d")), api_calls)
+            sketches.mark_dirty()
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error loading usage sketches: {str(e)}")
+    
+    def _save_sketches(self, states: Dict[str, Dict[str, Any]], first_kept: str) -> None:
+        """
+        Write sketch checkpoints and delete expired ones in one transaction
+        
+        Args:
+            states: Day states keyed by UTC day
+            first_kept: Oldest day still kept; earlier checkpoints are deleted
+        
+        Raises:
+            sqlite3.Error: If the checkpoint could not be written; it is rolled back
+        """
+        now = time.time()
+        with self._get_pool().writer() as conn:
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO usage_sketches (day, state, updated) VALUES (?, ?, ?)",
+                    [(day, json.dumps(state), now) for day, state in states.items()]
+                )
+                conn.execute("DELETE FROM usage_sketches WHERE day < ?", (first_kept,))
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+    
+    @classmethod
+    def get_sketch_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of every usage sketch set
+        
+        Returns:
+            Dictionary of sketch statistics keyed by database path
+        """
+        return {db_path: sketches.get_stats() for db_path, sketches in cls._sketches.items()}
+    
+    async def get_usage_analytics_async(self, hours: int = 24, tool: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get per-tool call analytics without blocking the event loop
+        
+        Runs get_usage_analytics() on the connection pool's executor.
+        
+        Args:
+            hours: Number of hours to include, counting the current one
+            tool: Only include this tool (optional)
+        
+        Returns:
+            Dictionary with the window and a summary per tool and in total
+        """
+        return await self._get_pool().run(self.get_usage_analytics, hours, tool)
+    
+    def export_usage(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        tool: Optional[str] = None,
+        after: Optional[Tuple[float, int]] = None,
+        page_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over raw usage events in (timestamp, id) order, one page at a time
+        
+        Each partition overlapping the range is paged by a (timestamp, id)
+        keyset on its timestamp index, with a short read per page, so memory
+        stays constant and no read transaction is held between pages.
+        Partitions whose time ranges overlap are merged by timestamp.
+        
+        Args:
+            start: Start of the range in UTC epoch seconds, inclusive (optional)
+            end: End of the range, exclusive; now if omitted, so the export ends
+                even while events keep arriving
+            tool: Only include this tool (optional)
+            after: (timestamp, id) of the last event already received, to resume
+            page_size: Events read per query
+        
+        Yields:
+            Events as dictionaries with id and EVENT_COLUMNS
+        """
+        self.flush()
+        start = start if start is not None else float("-inf")
+        end = end if end is not None else time.time()
+        page_size = max(1, page_size)
+        
+        with self._get_pool().reader() as conn:
+            partitions = conn.execute(
+                "SELECT name, start, end FROM usage_partitions WHERE end > ? AND start < ? ORDER BY start",
+                (start, end)
+            ).fetchall()
+        
+        # Partitions in one lane never overlap, so each lane is already ordered;
+        # only the legacy partition overlaps the monthly ones
+        lanes: List[List[str]] = []
+        lane_ends: List[float] = []
+        for name, partition_start, partition_end in partitions:
+            for index, lane_end in enumerate(lane_ends):
+                if lane_end <= partition_start:
+                    lanes[index].append(name)
+                    lane_ends[index] = partition_end
+                    break
+            else:
+                lanes.append([name])
+                lane_ends.append(partition_end)
+        
+        streams = [
+            (row for name in lane for row in self._export_partition(name, start, end, tool, after, page_size))
+            for lane in lanes
+        ]
+        columns = ("id",) + EVENT_COLUMNS
+        for row in heapq.merge(*streams, key=lambda row: (row[3], row[0])):
+            yield dict(zip(columns, row))
+    
+    def _export_partition(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        tool: Optional[str],
+        after: Optional[Tuple[float, int]],
+        page_size: int
+    ) -> Iterator[tuple]:
+        """
+        Page through one partition by (timestamp, id) keyset
+        
+        Args:
+            name: Partition table name
+            start: Start of the range, inclusive
+            end: End of the range, exclusive
+            tool: Only include this tool (optional)
+            after: (timestamp, id) to continue after (optional)
+            page_size: Rows read per query
+        
+        Yields:
+            Rows of id and EVENT_COLUMNS
+        """
+        cursor = after if after is not None else (start, 0)
+        query = (
+            f"SELECT id, {', '.join(EVENT_COLUMNS)} FROM {name} "
+            "WHERE timestamp >= ? AND timestamp < ? AND (timestamp, id) > (?, ?)"
+            + (" AND tool = ?" if tool is not None else "")
+            + " ORDER BY timestamp, id LIMIT ?"
+        )
+        while True:
+            params = (max(start, cursor[0]), end, *cursor) + ((tool,) if tool is not None else ()) + (page_size,)
+            try:
+                with self._get_pool().reader() as conn:
+                    rows = conn.execute(query, params).fetchall()
+            except sqlite3.OperationalError as e:
+                # Retention may drop an expired partition while it is being exported
+                if "no such table" not in str(e):
+                    raise
+                logger.warning(f"Usage partition {name} was dropped during export")
+                return
+            
+            yield from rows
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1][3], rows[-1][0])
+    
+    def _get_retention_job(self) -> UsageRetentionJob:
+        """
+        Get the retention job for this database, starting it if needed
+        
+        Returns:
+            Running retention job
+        """
+        job = self._retention_jobs.get(self.db_path)
+        if job is None or not job.running:
+            job = UsageRetentionJob.from_env(self.enforce_retention)
+            job.start()
+            self._retention_jobs[self.db_path] = job
+        return job
+    
+    @classmethod
+    def get_retention_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of every retention job
+        
+        Returns:
+            Dictionary of retention job statistics keyed by database path
+        """
+        return {db_path: job.get_stats() for db_path, job in cls._retention_jobs.items()}
+    
+    def _retention_step(self, conn: sqlite3.Connection, cutoff: float) -> Optional[Dict[str, int]]:
+        """
+        Do one bounded unit of retention work and commit it
+        
+        In order: drop a partition that ends before the cutoff, delete a batch
+        of expired rows from the partition containing the cutoff, delete a
+        batch of expired hourly or daily rollups, return a batch of free pages
+        to the filesystem.
+        
+        Args:
+            conn: Writer connection
+            cutoff: UTC epoch seconds before which events are removed
+        
+        Returns:
+            Counts removed by the step, or None if nothing is left to do
+        """
+        expired = conn.execute(
+            "SELECT name, rows FROM usage_partitions WHERE end <= ? ORDER BY start LIMIT 1", (cutoff,)
+        ).fetchone()
+        if expired is not None:
+            name, rows = expired
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute("DELETE FROM usage_partitions WHERE name = ?", (name,))
+            self._create_usage_view(conn)
+            conn.commit()
+            logger.info(f"Dropped usage partition {name} with {rows} events")
+            return {"partitions_dropped": 1, "rows_removed": rows}
+        
+        for name in self._partitions(conn, end=cutoff):
+            deleted = conn.execute(
+                f"DELETE FROM {name} WHERE id IN (SELECT id FROM {name} WHERE timestamp < ? LIMIT ?)",
+                (cutoff, self.retention_batch_size)
+            ).rowcount
+            if deleted:
+                conn.execute("UPDATE usage_partitions SET rows = MAX(rows - ?, 0) WHERE name = ?", (deleted, name))
+            if deleted < self.retention_batch_size:
+                # Nothing older than the cutoff is left; later steps skip this partition
+                conn.execute("UPDATE usage_partitions SET start = ? WHERE name = ? AND start < ?", (cutoff, name, cutoff))
+            conn.commit()
+            return {"rows_removed": deleted}
+        
+        # Hours ending by the cutoff, and days before the cutoff's day
+        bounds = (cutoff - 3600, cutoff - 3600, time.strftime("%Y-%m-%d", time.gmtime(cutoff)))
+        for sql, bound in zip(RETENTION_ROLLUP_DELETES, bounds):
+            deleted = conn.execute(sql, (bound, self.retention_batch_size)).rowcount
+            conn.commit()
+            if deleted:
+                return {"rollup_rows_removed": deleted}
+        
+        # Only databases created with incremental auto-vacuum can shrink without a full VACUUM
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages:
+                pages = min(free_pages, self.vacuum_pages)
+                conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+                conn.commit()
+                return {"pages_vacuumed": pages}
+        
+        return None
+    
+    def enforce_retention(self, max_steps: Optional[int] = None, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Remove usage data older than the retention period in bounded steps
+        
+        Each step is its own short transaction, so usage events keep being
+        persisted in between.
+        
+        Args:
+            max_steps: Maximum number of steps, None to run until done
+            days: Number of days to keep (defaults to USAGE_RETENTION_DAYS, at least 30)
+        
+        Returns:
+            Dictionary with the number of dropped partitions, removed events,
+            removed rollup rows and vacuumed pages, and whether all work is done
+        """
+        days = max(days or self.retention_days, 30)
+        cutoff = time.time() - days * 86400
+        
+        self.flush()
+        
+        result: Dict[str, Any] = {
+            "partitions_dropped": 0,
+            "rows_removed": 0,
+            "rollup_rows_removed": 0,
+            "pages_vacuumed": 0,
+            "done": False
+        }
+        steps = 0
+        while max_steps is None or steps < max_steps:
+            steps += 1
+            with self._get_pool().writer() as conn:
+                try:
+                    step = self._retention_step(conn, cutoff)
+                except sqlite3.Error:
+                    conn.rollback()
+                    raise
+            if step is None:
+                result["done"] = True
+                break
+            for counter, count in step.items():
+                result[counter] += count
+        return result
+    
     def cleanup_old_data(self, days: int = 365) -> int:
         """
         Clean up usage data older than specified days
         
+        Runs retention to completion: expired partitions are dropped, the
+        partition containing the cutoff and the hourly and daily rollups
+        (including the hourly call statistics) are trimmed in batches, and
+        freed pages are returned. Monthly totals and the distinct session
+        count are kept as all-time history.
+        
         Args:
             days: Number of days to keep
             
@@ -282,20 +1322,11 @@ class UsageService:
         if days < 30:  # Safety check
             days = 30
         
-        # Calculate cutoff timestamp
-        cutoff_timestamp = time.time() - (days * 86400)  # 86400 seconds in a day
-        
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("DELETE FROM usage WHERE timestamp < ?", (cutoff_timestamp,))
-            deleted = cursor.rowcount
-            
-            conn.commit()
-            logger.info(f"Cleaned up {deleted} old usage records")
-            return deleted
-            
+            result = self.enforce_retention(days=days)
+            logger.info(f"Cleaned up {result['rows_removed']} old usage records")
+            return result["rows_removed"]
+        
         except sqlite3.Error as e:
             logger.error(f"Error in cleanup_old_data(): {str(e)}")
             return 0
@@ -307,12 +1338,23 @@ class UsageService:
         This method is called during application shutdown
         """
         try:
-            # Close database connection if it exists
-            if self.db_path in self._connection_pools:
-                with self._connection_locks[self.db_path]:
-                    conn = self._connection_pools[self.db_path]
-                    conn.close()
-                    del self._connection_pools[self.db_path]
-                    logger.info(f"Closed database connection for {self.db_path}")
+            # Persist buffered usage events before the connections go away
+            usage_buffer = self._buffers.pop(self.db_path, None)
+            if usage_buffer is not None:
+                usage_buffer.stop()
+            
+            retention_job = self._retention_jobs.pop(self.db_path, None)
+            if retention_job is not None:
+                retention_job.stop()
+            
+            # Checkpoint the sketches while the writer is still open
+            sketches = self._sketches.pop(self.db_path, None)
+            if sketches is not None:
+                sketches.stop()
+            
+            # Close the connection pool if it exists
+            pool = self._pools.pop(self.db_path, None)
+            if pool is not None:
+                pool.close()
         except Exception as e:
             logger.error(f"Error closing usage service: {str(e)}")
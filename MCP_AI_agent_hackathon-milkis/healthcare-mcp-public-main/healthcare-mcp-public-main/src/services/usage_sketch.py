@@ -0,0 +1,501 @@
+import os
+import math
+import time
+import atexit
+import base64
+import hashlib
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger("healthcare-mcp")
+
+# HyperLogLog registers are 2**HLL_PRECISION bytes; stored sketches only merge
+# with the same precision, so changing it discards checkpointed session sketches
+HLL_PRECISION = 12
+
+# Queried subject recorded per tool, for the heavy-hitter sketches
+SUBJECT_KINDS = {
+    "fda_drug_lookup": "drugs",
+    "clinical_trials_search": "conditions",
+    "lookup_icd_code": "conditions"
+}
+
+# Heavy-hitter sketches kept per day
+TOP_KINDS = ("tools", "drugs", "conditions")
+
+class HyperLogLog:
+    """
+    HyperLogLog estimate of the number of distinct values added
+    
+    Uses 2**precision one-byte registers; the relative standard error of
+    count() is 1.04 / sqrt(2**precision), 1.6% at the default precision.
+    Sketches of the same precision merge into the sketch of the union.
+    """
+    
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[bytes] = None):
+        """
+        Initialize the sketch
+        
+        Args:
+            precision: Number of hash bits selecting a register (4-16)
+            registers: Stored registers from to_bytes(), or None for an empty sketch
+        """
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError(f"Expected {self.size} registers, got {len(self.registers)}")
+    
+    @property
+    def standard_error(self) -> float:
+        """Relative standard error of count()"""
+        return 1.04 / math.sqrt(self.size)
+    
+    def add(self, value: str) -> None:
+        """
+        Add a value
+        
+        Args:
+            value: Value to count, e.g. a session ID
+        """
+        hashed = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Merge another sketch into this one
+        
+        Args:
+            other: Sketch of the same precision
+        
+        Raises:
+            ValueError: If the precisions differ
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+    
+    def count(self) -> int:
+        """
+        Estimate the number of distinct values added
+        
+        Returns:
+            Estimated distinct count; small counts use linear counting
+        """
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return round(estimate)
+    
+    def to_bytes(self) -> bytes:
+        """Registers, for checkpoints"""
+        return bytes(self.registers)
+
+class SpaceSaving:
+    """
+    Space-saving summary of the most frequent values
+    
+    Keeps at most capacity counters. A value without a counter takes over
+    the smallest one and inherits its count as its error, so every count
+    overestimates the true count by at most its error, and the error is at
+    most total / capacity.
+    """
+    
+    def __init__(self, capacity: int = 200):
+        """
+        Initialize the summary
+        
+        Args:
+            capacity: Maximum number of counted values
+        """
+        self.capacity = max(1, capacity)
+        self.total = 0
+        self.counters: Dict[str, List[int]] = {}
+    
+    def add(self, value: str, count: int = 1) -> None:
+        """
+        Count a value
+        
+        Args:
+            value: Value to count
+            count: Occurrences to add
+        """
+        self.total += count
+        counter = self.counters.get(value)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[value] = [count, 0]
+        else:
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(smallest)[0]
+            self.counters[value] = [floor + count, floor]
+    
+    @property
+    def floor(self) -> int:
+        """Most occurrences a value without a counter can have"""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+    
+    def state(self) -> Dict[str, Any]:
+        """Counters and total, for checkpoints"""
+        return {"total": self.total, "counters": {value: list(counter) for value, counter in self.counters.items()}}
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], capacity: int = 200) -> "SpaceSaving":
+        """
+        Rebuild a summary from state()
+        
+        Args:
+            state: Stored counters and total
+            capacity: Maximum number of counted values
+        
+        Returns:
+            Summary holding the stored counters
+        """
+        summary = cls(capacity)
+        summary.total = state["total"]
+        summary.counters = {value: list(counter) for value, counter in state["counters"].items()}
+        return summary
+
+def top_values(summaries: List[SpaceSaving], limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Combine daily summaries into the most frequent values of their window
+    
+    A value's count is the sum of its daily counts. Its error adds its
+    daily errors and, for days where it has no counter, the most it could
+    have had that day, so the true count lies within count +/- error.
+    
+    Args:
+        summaries: One summary per day of the window
+        limit: Number of values to return
+    
+    Returns:
+        Values with count and error, most frequent first
+    """
+    combined: Dict[str, List[int]] = {}
+    for summary in summaries:
+        for value, (count, error) in summary.counters.items():
+            totals = combined.setdefault(value, [0, 0])
+            totals[0] += count
+            totals[1] += error
+    
+    floors = [(summary, summary.floor) for summary in summaries]
+    ranked = sorted(combined.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+    return [
+        {
+            "value": value,
+            "count": count,
+            "error": error + sum(floor for summary, floor in floors if floor and value not in summary.counters)
+        }
+        for value, (count, error) in ranked
+    ]
+
+class UsageSketches:
+    """
+    Per-day sketches of usage, answering approximate window queries in memory
+    
+    Each UTC day holds a HyperLogLog of session IDs, the exact call count,
+    and space-saving summaries of the most used tools and the most queried
+    drugs and conditions. A window query merges the days it covers, so its
+    cost depends on the number of days, not on the number of events.
+    
+    A worker thread hands the days changed since the last checkpoint to
+    save() every checkpoint_interval seconds; days older than keep_days are
+    dropped from memory and passed to save() for deletion.
+    """
+    
+    # Every live sketch set, so shutdown can checkpoint them all
+    _instances: "weakref.WeakSet[UsageSketches]" = weakref.WeakSet()
+    _atexit_registered = False
+    
+    def __init__(
+        self,
+        save: Callable[[Dict[str, Dict[str, Any]], str], None],
+        keep_days: int = 365,
+        capacity: int = 200,
+        checkpoint_interval: float = 60.0,
+        name: str = "usage-sketches"
+    ):
+        """
+        Initialize the sketches
+        
+        Args:
+            save: Stores the given day states and deletes stored days before the
+                given day (YYYY-MM-DD); raises on failure
+            keep_days: Number of days kept, counting today
+            capacity: Counters per heavy-hitter summary
+            checkpoint_interval: Seconds between checkpoints
+            name: Worker thread name
+        """
+        self.save = save
+        self.keep_days = max(1, keep_days)
+        self.capacity = max(1, capacity)
+        self.checkpoint_interval = checkpoint_interval
+        self._days: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._stats = {
+            "checkpoints": 0,
+            "failed_checkpoints": 0,
+            "last_checkpoint_ms": 0.0,
+            "last_checkpoint_at": None
+        }
+        self._instances.add(self)
+    
+    @classmethod
+    def from_env(cls, save: Callable[[Dict[str, Dict[str, Any]], str], None], **kwargs: Any) -> "UsageSketches":
+        """Create sketches configured from USAGE_SKETCH_* environment variables"""
+        return cls(
+            save,
+            keep_days=int(os.getenv("USAGE_SKETCH_DAYS", "365")),
+            capacity=int(os.getenv("USAGE_SKETCH_CAPACITY", "200")),
+            checkpoint_interval=float(os.getenv("USAGE_SKETCH_CHECKPOINT_INTERVAL", "60")),
+            **kwargs
+        )
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the worker thread; the sketches are also checkpointed at interpreter exit"""
+        self._thread.start()
+        if not UsageSketches._atexit_registered:
+            atexit.register(UsageSketches.stop_all)
+            UsageSketches._atexit_registered = True
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread and checkpoint the remaining changes
+        
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.checkpoint()
+    
+    @classmethod
+    def stop_all(cls) -> None:
+        """Stop every sketch set, checkpointing all changes"""
+        for sketches in list(cls._instances):
+            sketches.stop()
+    
+    def _run(self) -> None:
+        """Worker loop: checkpoint on every interval"""
+        while not self._stop.wait(self.checkpoint_interval):
+            self.checkpoint()
+    
+    @staticmethod
+    def _day(timestamp: float) -> str:
+        """UTC day of a timestamp"""
+        return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+    
+    def first_kept_day(self, now: Optional[float] = None) -> str:
+        """Oldest UTC day still kept (YYYY-MM-DD)"""
+        return self._day((now if now is not None else time.time()) - (self.keep_days - 1) * 86400)
+    
+    def _new_day(self) -> Dict[str, Any]:
+        """Empty sketches of one day"""
+        return {
+            "sessions": HyperLogLog(),
+            "calls": 0,
+            **{kind: SpaceSaving(self.capacity) for kind in TOP_KINDS}
+        }
+    
+    def add(
+        self,
+        session_id: str,
+        tool: str,
+        timestamp: Optional[float] = None,
+        api_calls: int = 1,
+        subject: Optional[str] = None
+    ) -> None:
+        """
+        Add one usage event
+        
+        Args:
+            session_id: Anonymous session identifier
+            tool: Name of the tool used
+            timestamp: Time of the event, now if omitted
+            api_calls: Number of API calls made
+            subject: Drug or condition queried, counted for tools in SUBJECT_KINDS
+        """
+        day = self._day(timestamp if timestamp is not None else time.time())
+        kind = SUBJECT_KINDS.get(tool)
+        subject = subject.strip().lower() if subject else None
+        with self._lock:
+            sketch = self._days.get(day)
+            if sketch is None:
+                sketch = self._days[day] = self._new_day()
+            sketch["sessions"].add(session_id)
+            sketch["calls"] += api_calls
+            sketch["tools"].add(tool, api_calls)
+            if kind is not None and subject:
+                sketch[kind].add(subject)
+            self._dirty.add(day)
+    
+    def query(self, days: int = 30, limit: int = 10) -> Dict[str, Any]:
+        """
+        Estimate distinct sessions and the most frequent values over recent days
+        
+        Args:
+            days: Number of days to include, counting today; at most keep_days
+            limit: Number of values listed per heavy-hitter kind
+        
+        Returns:
+            Dictionary with the window, call count, estimated distinct sessions,
+            top tools, drugs and conditions, and their error bounds
+        """
+        days = max(1, min(days, self.keep_days))
+        now = time.time()
+        window = [self._day(now - offset * 86400) for offset in range(days)]
+        with self._lock:
+            sketches = [self._days[day] for day in window if day in self._days]
+            sessions = HyperLogLog()
+            if sketches:
+                sessions.registers = bytearray(map(max, *(sketch["sessions"].registers for sketch in sketches))) \
+                    if len(sketches) > 1 else bytearray(sketches[0]["sessions"].registers)
+            calls = sum(sketch["calls"] for sketch in sketches)
+            totals = {kind: sum(sketch[kind].total for sketch in sketches) for kind in TOP_KINDS}
+            top = {kind: top_values([sketch[kind] for sketch in sketches], limit) for kind in TOP_KINDS}
+        
+        unique_sessions = sessions.count()
+        margin = 2 * sessions.standard_error
+        return {
+            "window": {"days": days, "start": window[-1], "end": window[0]},
+            "total_api_calls": calls,
+            "unique_sessions": unique_sessions,
+            "top_tools": top["tools"],
+            "top_drugs": top["drugs"],
+            "top_conditions": top["conditions"],
+            "error_bounds": {
+                "unique_sessions": {
+                    "relative_standard_error": round(sessions.standard_error, 4),
+                    "interval_95": [
+                        math.floor(unique_sessions * (1 - margin)),
+                        math.ceil(unique_sessions * (1 + margin))
+                    ]
+                },
+                # Every listed count is within its own error; none is off by more than these
+                **{
+                    f"top_{kind}": {"total": totals[kind], "max_error": totals[kind] // self.capacity}
+                    for kind in TOP_KINDS
+                }
+            }
+        }
+    
+    def state(self, day: str) -> Dict[str, Any]:
+        """
+        Get the checkpoint state of one day
+        
+        Args:
+            day: UTC day (YYYY-MM-DD)
+        
+        Returns:
+            JSON-serializable state; the session registers are base64
+        """
+        with self._lock:
+            sketch = self._days[day]
+            return {
+                "sessions": base64.b64encode(sketch["sessions"].to_bytes()).decode("ascii"),
+                "calls": sketch["calls"],
+                **{kind: sketch[kind].state() for kind in TOP_KINDS}
+            }
+    
+    def restore(self, states: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Load checkpointed days, replacing the in-memory sketches of those days
+        
+        Args:
+            states: Day states from state(), keyed by UTC day
+        """
+        first_kept = self.first_kept_day()
+        for day, state in states.items():
+            if day < first_kept:
+                continue
+            try:
+                registers = base64.b64decode(state["sessions"])
+                sketch = {
+                    "sessions": HyperLogLog(registers=registers),
+                    "calls": state["calls"],
+                    **{kind: SpaceSaving.from_state(state[kind], self.capacity) for kind in TOP_KINDS}
+                }
+            except (KeyError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring usage sketch checkpoint of {day}: {str(e)}")
+                continue
+            with self._lock:
+                self._days[day] = sketch
+    
+    def mark_dirty(self, days: Optional[List[str]] = None) -> None:
+        """
+        Include days in the next checkpoint
+        
+        Args:
+            days: UTC days to write, all in-memory days if omitted
+        """
+        with self._lock:
+            self._dirty.update(days if days is not None else self._days)
+    
+    def checkpoint(self) -> int:
+        """
+        Save the days changed since the last checkpoint and drop expired days
+        
+        Returns:
+            Number of saved days
+        """
+        with self._checkpoint_lock:
+            first_kept = self.first_kept_day()
+            with self._lock:
+                for day in [day for day in self._days if day < first_kept]:
+                    del self._days[day]
+                dirty = sorted(day for day in self._dirty if day in self._days)
+                self._dirty.clear()
+            
+            started = time.perf_counter()
+            states = {day: self.state(day) for day in dirty}
+            try:
+                self.save(states, first_kept)
+            except Exception as e:
+                logger.error(f"Error checkpointing usage sketches: {str(e)}")
+                self._stats["failed_checkpoints"] += 1
+                self.mark_dirty(dirty)
+                return 0
+            
+            self._stats["checkpoints"] += 1
+            self._stats["last_checkpoint_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self._stats["last_checkpoint_at"] = time.time()
+            return len(states)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sketch statistics
+        
+        Returns:
+            Dictionary with checkpoint counts, the number of days held and
+            waiting for a checkpoint, and the configuration
+        """
+        stats = dict(self._stats)
+        with self._lock:
+            stats["days"] = len(self._days)
+            stats["dirty_days"] = len(self._dirty)
+        stats["running"] = self.running
+        stats["keep_days"] = self.keep_days
+        stats["capacity"] = self.capacity
+        stats["checkpoint_interval"] = self.checkpoint_interval
+        return stats
@@ -0,0 +1,216 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+import weakref
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("healthcare-mcp")
+
+# A pending write: SQL statement and its parameters
+Write = Tuple[str, Tuple[Any, ...]]
+
+class WriteBehindQueue:
+    """
+    Batches SQLite writes into group commits off the request path
+    
+    Callers enqueue statements and return immediately. A single worker
+    thread per database commits everything pending in one transaction once
+    flush_interval_ms has passed since the oldest pending write or
+    batch_size writes are pending, so one fsync is shared by many tool
+    calls. flush() commits synchronously, for readers that need their own
+    writes and for shutdown.
+    """
+    
+    # Every live queue, so shutdown can commit them all
+    _instances: "weakref.WeakSet[WriteBehindQueue]" = weakref.WeakSet()
+    
+    def __init__(
+        self,
+        get_connection: Callable[[], ContextManager[sqlite3.Connection]],
+        flush_interval_ms: int = 50,
+        batch_size: int = 500,
+        max_pending: int = 10000,
+        on_flush: Optional[Callable[[List[Write], bool], None]] = None,
+        name: str = "write-behind"
+    ):
+        """
+        Initialize the queue
+        
+        Args:
+            get_connection: Returns a context manager holding the connection to write to
+            flush_interval_ms: Maximum milliseconds a write waits before commit
+            batch_size: Number of pending writes that triggers an early commit
+            max_pending: Pending writes above which enqueue() commits inline
+            on_flush: Called with each batch and whether it was committed
+            name: Worker thread name
+        """
+        self.get_connection = get_connection
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self._pending: List[Write] = []
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._stats = {
+            "enqueued": 0,
+            "flushed_writes": 0,
+            "commits": 0,
+            "failed_writes": 0,
+            "inline_flushes": 0,
+            "last_batch_size": 0,
+            "last_commit_ms": 0.0
+        }
+        self._instances.add(self)
+    
+    @classmethod
+    def from_env(cls, get_connection: Callable[[], ContextManager[sqlite3.Connection]], **kwargs: Any) -> "WriteBehindQueue":
+        """Create a queue configured from WRITE_BEHIND_* environment variables"""
+        return cls(
+            get_connection,
+            flush_interval_ms=int(os.getenv("WRITE_BEHIND_FLUSH_MS", "50")),
+            batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500")),
+            max_pending=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000")),
+            **kwargs
+        )
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the worker thread"""
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread and commit everything still pending
+        
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+    
+    @classmethod
+    def stop_all(cls) -> None:
+        """Stop every queue, committing all pending writes"""
+        for write_queue in list(cls._instances):
+            write_queue.stop()
+    
+    def enqueue(self, sql: str, params: Tuple[Any, ...]) -> None:
+        """
+        Queue a write for the next group commit
+        
+        Args:
+            sql: SQL statement
+            params: Statement parameters
+        """
+        with self._cond:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((sql, params))
+            self._stats["enqueued"] += 1
+            pending = len(self._pending)
+            # Wake the worker to start the flush timer, or to commit a full batch early
+            if pending == 1 or pending >= self.batch_size:
+                self._cond.notify()
+        
+        # Apply backpressure instead of growing without bound if the worker falls behind
+        if pending >= self.max_pending:
+            self._stats["inline_flushes"] += 1
+            self.flush()
+    
+    def pending_count(self) -> int:
+        """Number of writes waiting for commit"""
+        with self._cond:
+            return len(self._pending)
+    
+    def _run(self) -> None:
+        """Worker loop: commit once the oldest write is flush_interval old or a batch is full"""
+        while not self._stop.is_set():
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                
+                remaining = self._oldest + self.flush_interval - time.monotonic()
+                if remaining > 0 and len(self._pending) < self.batch_size:
+                    self._cond.wait(remaining)
+                    continue
+            
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Commit all pending writes in the calling thread
+        
+        Returns:
+            Number of committed writes
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                self._oldest = None
+            if not batch:
+                return 0
+            
+            started = time.perf_counter()
+            committed = False
+            try:
+                with self.get_connection() as conn:
+                    try:
+                        cursor = conn.cursor()
+                        # Consecutive writes with the same statement go through one executemany
+                        start = 0
+                        for i in range(1, len(batch) + 1):
+                            if i == len(batch) or batch[i][0] != batch[start][0]:
+                                cursor.executemany(batch[start][0], [params for _, params in batch[start:i]])
+                                start = i
+                        conn.commit()
+                        committed = True
+                    except sqlite3.Error:
+                        try:
+                            conn.rollback()
+                        except sqlite3.Error:
+                            pass
+                        raise
+            except sqlite3.Error as e:
+                logger.error(f"Error committing {len(batch)} queued writes: {str(e)}")
+            
+            commit_ms = (time.perf_counter() - started) * 1000
+            if committed:
+                self._stats["flushed_writes"] += len(batch)
+                self._stats["commits"] += 1
+                self._stats["last_batch_size"] = len(batch)
+                self._stats["last_commit_ms"] = round(commit_ms, 3)
+            else:
+                self._stats["failed_writes"] += len(batch)
+            
+            if self.on_flush is not None:
+                self.on_flush(batch, committed)
+            return len(batch) if committed else 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics
+        
+        Returns:
+            Dictionary with write, commit and backlog counts
+        """
+        stats = dict(self._stats)
+        stats["pending"] = self.pending_count()
+        stats["running"] = self.running
+        stats["flush_interval_ms"] = round(self.flush_interval * 1000)
+        stats["batch_size"] = self.batch_size
+        return stats
@@ -1,47 +1,410 @@
 import os
-import requests
-import hashlib
+import time
+import asyncio
+import httpx
 import logging
-from typing import Any, Dict, Optional, Union
-from src.services.cache_service import CacheService
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Union
+from src.services.cache_factory import get_shared_cache
+from src.services.cache_keys import build_cache_key
+from src.services.cache_metrics import key_prefix
 
 logger = logging.getLogger("healthcare-mcp")
 
+# Optional limiter awaited before each upstream request made in this context.
+# Any object with an async acquire(host) method, e.g. the cache warm-up's.
+upstream_rate_limiter: ContextVar[Optional[Any]] = ContextVar("upstream_rate_limiter", default=None)
+
+class CallRecord:
+    """
+    What one tool call did upstream and in the cache, for its usage event
+    
+    The caller sets a record in call_record for the duration of a tool
+    call; the cache lookups and upstream requests made in that context
+    fill it in.
+    """
+    
+    def __init__(self):
+        """Initialize an empty record"""
+        self.cache_outcome: Optional[str] = None
+        self.upstream_ms: Optional[float] = None
+        self.http_status: Optional[int] = None
+        self.response_bytes: Optional[int] = None
+    
+    def add_upstream(self, elapsed_ms: float, status: Optional[int], size: Optional[int] = None) -> None:
+        """
+        Add an upstream request's duration and body size, and remember its HTTP status
+        
+        Args:
+            elapsed_ms: Request duration in milliseconds
+            status: HTTP status, None if no response was received
+            size: Bytes of the response body, None if no response was received
+        """
+        self.upstream_ms = (self.upstream_ms or 0.0) + elapsed_ms
+        if status is not None:
+            self.http_status = status
+        if size is not None:
+            self.response_bytes = (self.response_bytes or 0) + size
+
+# Record of the tool call running in this context, if the caller tracks one
+call_record: ContextVar[Optional[CallRecord]] = ContextVar("call_record", default=None)
+
 class BaseTool:
     """Base class for all healthcare tools with common functionality"""
     
+    # Class-level HTTP client shared by all tools in the process
+    _http_client: Optional[httpx.AsyncClient] = None
+    _http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    _host_semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    # In-flight upstream fetches shared by concurrent identical lookups
+    _in_flight: Dict[str, asyncio.Future] = {}
+    _single_flight_stats: Dict[str, int] = {"fetches": 0, "coalesced": 0}
+    
+    # Background refreshes of stale cache entries
+    _refresh_tasks: Set[asyncio.Future] = set()
+    _refresh_stats: Dict[str, int] = {"stale_served": 0, "refreshes": 0, "refresh_errors": 0}
+    
+    # Default TTLs (seconds) of negative results per tool key prefix: well-formed
+    # empty results and upstream "not found" responses. Override with
+    # CACHE_NEGATIVE_TTL_<PREFIX>, e.g. CACHE_NEGATIVE_TTL_FDA_DRUG=600
+    DEFAULT_NEGATIVE_TTL: Dict[str, int] = {
+        "fda_drug": 3600,
+        "pubmed_search": 1800,
+        "clinical_trials": 1800,
+        "health_topics": 3600,
+        "icd10": 6 * 3600
+    }
+    
+    # Fields holding a tool's list of matches; an empty list makes a success negative
+    RESULT_LIST_FIELDS = ("trials", "articles", "topics", "results")
+    
+    # Upstream statuses meaning the lookup has no result rather than a transient failure
+    NOT_FOUND_STATUS_CODES = (404, 410)
+    
+    # Negative results stored and served from the cache, per key prefix
+    _negative_cache_stats: Dict[str, Dict[str, int]] = {}
+    
     def __init__(self, cache_db_path: str = "healthcare_cache.db", default_ttl: int = 3600):
         """
         Initialize the base tool with caching
         
+        All tools share one cache instance of the backend selected by CACHE_BACKEND.
+        
         Args:
-            cache_db_path: Path to the cache database
+            cache_db_path: Path to the cache database, used by the sqlite backend
             default_ttl: Default time-to-live for cache entries in seconds
         """
-        self.cache = CacheService(db_path=cache_db_path, ttl=default_ttl)
+        self.cache = get_shared_cache(db_path=cache_db_path, ttl=default_ttl)
         self.api_key = None
         self.base_url = None
+        self.negative_ttl = {
+            prefix: int(os.getenv(f"CACHE_NEGATIVE_TTL_{prefix.upper()}", str(seconds)))
+            for prefix, seconds in self.DEFAULT_NEGATIVE_TTL.items()
+        }
     
     def _get_cache_key(self, prefix: str, *args) -> str:
         """
-        Generate a cache key from the prefix and arguments
+        Generate a canonical cache key from the prefix and arguments
+        
+        Arguments are case-folded, whitespace-collapsed and otherwise
+        canonicalized per tool (see src.services.cache_keys), so equivalent
+        lookups share one entry.
         
         Args:
             prefix: Prefix for the cache key
             *args: Arguments to include in the cache key
         
         Returns:
-            A hashed cache key
+            A cache key of the form "<prefix>:<version>:<field>=<value>|..."
+        """
+        return build_cache_key(prefix, *args)
+    
+    @staticmethod
+    def _is_negative(result: Any) -> bool:
+        """
+        Check whether a result is a well-formed "no results" or "not found" answer
+        
+        Successes are judged by their list of matches. Upstream totals are
+        only a fallback for results without one, since not every API
+        reports a total.
+        
+        Args:
+            result: Tool result
+        
+        Returns:
+            True for successful results without matches and NOT_FOUND errors
         """
-        # Create a string from all arguments
-        key_parts = [prefix]
-        for arg in args:
-            if arg is not None:
-                key_parts.append(str(arg))
+        if not isinstance(result, dict):
+            return False
+        if result.get("status") == "success":
+            for field in BaseTool.RESULT_LIST_FIELDS:
+                if isinstance(result.get(field), list):
+                    return not result[field]
+            return not result.get("total_results")
+        return result.get("error_code") == "NOT_FOUND"
+    
+    @classmethod
+    def _count_negative(cls, key: str, counter: str) -> None:
+        """Increment a negative cache counter for a key's prefix"""
+        stats = cls._negative_cache_stats.setdefault(key_prefix(key), {"stored": 0, "hits": 0})
+        stats[counter] += 1
+    
+    async def _cache_result(self, key: str, result: Dict[str, Any], ttl: int) -> None:
+        """
+        Cache a fetched result; negative results get the tool's short negative TTL
+        
+        The write goes through set_async(), so backends that wait on the
+        network do not block the event loop.
+        
+        Args:
+            key: Cache key
+            result: Tool result
+            ttl: Time-to-live in seconds for positive results
+        """
+        if self._is_negative(result):
+            ttl = min(ttl, self.negative_ttl.get(key_prefix(key), ttl))
+            self._count_negative(key, "stored")
+        await self.cache.set_async(key, result, ttl=ttl)
+    
+    async def _get_cached(self, key: str) -> Optional[Any]:
+        """
+        Get a fresh cached result, counting negative hits
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached result or None if not found or expired
+        """
+        result = await self.cache.get_async(key)
+        if result is not None and self._is_negative(result):
+            self._count_negative(key, "hits")
+        record = call_record.get()
+        if record is not None:
+            record.cache_outcome = "miss" if result is None else "hit"
+        return result
+    
+    async def _fetch_or_not_found(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an upstream fetch, caching "not found" responses as negative results
+        
+        Other failures (5xx, timeouts, connection errors) are transient: they
+        still raise and are never cached.
+        
+        Args:
+            key: Cache key identifying the lookup
+            fetch: Zero-argument coroutine function performing the fetch
+        
+        Returns:
+            Result of the fetch, or a NOT_FOUND error response
+        """
+        try:
+            return await fetch()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in self.NOT_FOUND_STATUS_CODES:
+                raise
+            logger.info(f"Caching upstream {e.response.status_code} as a negative result for key: {key}")
+            result = self._format_error_response(
+                f"No results found (upstream returned {e.response.status_code})",
+                error_code="NOT_FOUND"
+            )
+            await self._cache_result(key, result, ttl=self.cache.default_ttl)
+            return result
+    
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an upstream fetch once for all concurrent callers with the same key
+        
+        The first caller starts the fetch; callers arriving while it is still
+        running await the same future and receive the same result (or error).
+        Upstream "not found" responses become cached negative results.
+        
+        Args:
+            key: Cache key identifying the lookup
+            fetch: Zero-argument coroutine function performing the fetch
+            
+        Returns:
+            Result of the fetch
+        """
+        task = BaseTool._in_flight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            BaseTool._single_flight_stats["coalesced"] += 1
+            logger.debug(f"Coalesced in-flight lookup for key: {key}")
+            return await asyncio.shield(task)
+        
+        task = asyncio.ensure_future(self._fetch_or_not_found(key, fetch))
+        BaseTool._in_flight[key] = task
+        BaseTool._single_flight_stats["fetches"] += 1
+        
+        def _on_done(done_task: asyncio.Future) -> None:
+            if BaseTool._in_flight.get(key) is done_task:
+                del BaseTool._in_flight[key]
+            # Mark the exception as retrieved if every caller was cancelled
+            if not done_task.cancelled():
+                done_task.exception()
+        
+        task.add_done_callback(_on_done)
         
-        # Join and hash
-        cache_key = "_".join(key_parts)
-        return hashlib.md5(cache_key.encode()).hexdigest()
+        # Shield the shared fetch so one cancelled caller does not cancel it for the others
+        return await asyncio.shield(task)
+    
+    async def _get_stale_and_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Get an expired-but-recent cache entry and refresh it in the background
+        
+        Args:
+            key: Cache key identifying the lookup
+            fetch: Zero-argument coroutine function that fetches and caches a fresh result
+            
+        Returns:
+            Stale cached value, or None if there is nothing to serve
+        """
+        stale = await self.cache.get_stale_async(key)
+        if stale is None:
+            return None
+        
+        BaseTool._refresh_stats["stale_served"] += 1
+        record = call_record.get()
+        if record is not None:
+            record.cache_outcome = "stale"
+        
+        # A refresh (or a foreground fetch) for this key is already running
+        task = BaseTool._in_flight.get(key)
+        if task is not None and not task.done():
+            return stale
+        
+        BaseTool._refresh_stats["refreshes"] += 1
+        refresh = asyncio.ensure_future(self._single_flight(key, fetch))
+        BaseTool._refresh_tasks.add(refresh)
+        
+        def _on_done(done_task: asyncio.Future) -> None:
+            BaseTool._refresh_tasks.discard(done_task)
+            if not done_task.cancelled() and done_task.exception() is not None:
+                BaseTool._refresh_stats["refresh_errors"] += 1
+                logger.warning(f"Background refresh failed for key {key}: {done_task.exception()}")
+        
+        refresh.add_done_callback(_on_done)
+        return stale
+    
+    @classmethod
+    def get_refresh_stats(cls) -> Dict[str, int]:
+        """
+        Get stale-while-revalidate statistics
+        
+        Returns:
+            Dictionary with stale entries served, background refreshes started,
+            failed refreshes and refreshes currently running
+        """
+        return {
+            **BaseTool._refresh_stats,
+            "running": len(BaseTool._refresh_tasks)
+        }
+    
+    @classmethod
+    def get_negative_cache_stats(cls) -> Dict[str, Dict[str, int]]:
+        """
+        Get negative caching statistics
+        
+        Returns:
+            Dictionary with negative results stored and served from the cache,
+            per key prefix
+        """
+        return {prefix: dict(stats) for prefix, stats in cls._negative_cache_stats.items()}
+    
+    @classmethod
+    def get_single_flight_stats(cls) -> Dict[str, int]:
+        """
+        Get single-flight coalescing statistics
+        
+        Returns:
+            Dictionary with upstream fetches started, coalesced callers and
+            lookups currently in flight
+        """
+        return {
+            "fetches": BaseTool._single_flight_stats["fetches"],
+            "coalesced": BaseTool._single_flight_stats["coalesced"],
+            "in_flight": len(BaseTool._in_flight)
+        }
+    
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        """
+        Get the shared async HTTP client, creating it if needed
+        
+        The client keeps a keep-alive connection pool per upstream host.
+        Pool sizes and timeouts are read from the environment:
+        HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        HTTP_KEEPALIVE_EXPIRY, HTTP_CONNECT_TIMEOUT and HTTP_TIMEOUT.
+        
+        Returns:
+            Shared httpx.AsyncClient instance
+        """
+        loop = asyncio.get_running_loop()
+        
+        # Connections are bound to the event loop they were opened on, so a
+        # client created on another (e.g. already closed) loop is replaced
+        if cls._http_client is None or cls._http_client.is_closed or cls._http_client_loop is not loop:
+            limits = httpx.Limits(
+                max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+            )
+            timeout = httpx.Timeout(
+                float(os.getenv("HTTP_TIMEOUT", "30")),
+                connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+            )
+            logger.debug(f"Creating shared HTTP client with limits={limits}")
+            cls._http_client = httpx.AsyncClient(
+                limits=limits,
+                timeout=timeout,
+                headers={"User-Agent": "healthcare-mcp/1.0 (Linux)"}
+            )
+            cls._http_client_loop = loop
+            cls._host_semaphores = {}
+        
+        return cls._http_client
+    
+    @classmethod
+    def _get_host_semaphore(cls, host: str) -> asyncio.Semaphore:
+        """
+        Get the semaphore limiting concurrent requests to a single upstream host
+        
+        Args:
+            host: Upstream host name
+            
+        Returns:
+            Semaphore for the host (HTTP_MAX_CONNECTIONS_PER_HOST permits)
+        """
+        if host not in cls._host_semaphores:
+            cls._host_semaphores[host] = asyncio.Semaphore(int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20")))
+        return cls._host_semaphores[host]
+    
+    @classmethod
+    async def init_http_client(cls) -> None:
+        """
+        Create the shared HTTP client
+        
+        This method is called during application startup
+        """
+        client = cls.get_http_client()
+        logger.info(f"HTTP client initialized (closed={client.is_closed})")
+    
+    @classmethod
+    async def close_http_client(cls) -> None:
+        """
+        Close the shared HTTP client and its connection pools
+        
+        This method is called during application shutdown
+        """
+        client = cls._http_client
+        cls._http_client = None
+        cls._http_client_loop = None
+        cls._host_semaphores = {}
+        
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("Closed shared HTTP client")
     
     async def _make_request(self, 
                            url: str, 
@@ -74,39 +437,59 @@ class BaseTool:
             if 'User-Agent' not in headers:
                 headers['User-Agent'] = 'healthcare-mcp/1.0 (Linux)'
             logger.debug(f"Making {method} request to {url} with params={params} headers={headers}")
-            response = requests.request(
-                method=method,
-                url=url,
-                params=params,
-                headers=headers,
-                data=data,
-                json=json_data,
-                timeout=timeout
-            )
-            logger.debug(f"FDA API response status: {response.status_code}")
-            logger.debug(f"FDA API response body: {response.text}")
+            client = self.get_http_client()
+            host = httpx.URL(url).host
+            limiter = upstream_rate_limiter.get()
+            if limiter is not None:
+                await limiter.acquire(host)
+            async with self._get_host_semaphore(host):
+                started, response = time.perf_counter(), None
+                try:
+                    response = await client.request(
+                        method=method,
+                        url=url,
+                        params=params,
+                        headers=headers,
+                        data=data,
+                        json=json_data,
+                        timeout=timeout
+                    )
+                finally:
+                    record = call_record.get()
+                    if record is not None:
+                        record.add_upstream(
+                            (time.perf_counter() - started) * 1000,
+                            response.status_code if response is not None else None,
+                            len(response.content) if response is not None else None
+                        )
+            logger.debug(f"API response status: {response.status_code}")
+            logger.debug(f"API response body: {response.text}")
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Request error: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"FDA API error response: {e.response.text}")
+            if isinstance(e, httpx.HTTPStatusError):
+                logger.error(f"API error response: {e.response.text}")
             raise
     
-    def _format_error_response(self, error_message: str) -> Dict[str, str]:
+    def _format_error_response(self, error_message: str, error_code: Optional[str] = None) -> Dict[str, str]:
         """
         Format an error response
         
         Args:
             error_message: Error message
-            
+            error_code: Error code for categorization (optional)
+        
         Returns:
             Formatted error response
         """
-        return {
+        response = {
             "status": "error",
             "error_message": error_message
         }
+        if error_code:
+            response["error_code"] = error_code
+        return response
     
     def _format_success_response(self, **kwargs) -> Dict[str, Any]:
         """
@@ -1,5 +1,5 @@
 import logging
-import requests
+from functools import partial
 from typing import Dict, Any, List, Optional
 from src.tools.base_tool import BaseTool
 
@@ -16,7 +16,6 @@ class ClinicalTrialsTool(BaseTool):
         """
         super().__init__(cache_db_path=cache_db_path or "healthcare_cache.db")
         self.base_url = "https://clinicaltrials.gov/api/v2/studies"
-        self.http_client = requests  # Initialize http_client attribute
     
     async def search_trials(self, condition: str, status: str = "recruiting", max_results: int = 10) -> Dict[str, Any]:
         """
@@ -48,62 +47,85 @@ class ClinicalTrialsTool(BaseTool):
         cache_key = self._get_cache_key("clinical_trials", condition, status, max_results)
         
         # Check cache first
-        cached_result = self.cache.get(cache_key)
-        if cached_result and cached_result.get('status') == 'success':
+        cached_result = await self._get_cached(cache_key)
+        if cached_result and (cached_result.get('status') == 'success' or self._is_negative(cached_result)):
             logger.info(f"Cache hit for clinical trials search: {condition}, status={status}")
             return cached_result
             
+        fetch = partial(self._fetch_trials, cache_key, condition, status, max_results)
+        
+        # Serve an expired-but-recent entry while it is refreshed in the background
+        stale_result = await self._get_stale_and_refresh(cache_key, fetch)
+        if stale_result and (stale_result.get('status') == 'success' or self._is_negative(stale_result)):
+            logger.info(f"Serving stale result while refreshing clinical trials search: {condition}, status={status}")
+            return stale_result
+        
         try:
-            logger.info(f"Searching clinical trials for condition: {condition}, status={status}, max_results={max_results}")
-            
-            # Map status to API format if needed
-            status_map = {
-                "recruiting": "RECRUITING",
-                "not_recruiting": "ACTIVE_NOT_RECRUITING",
-                "completed": "COMPLETED",
-                "active": "RECRUITING"
-            }
-            mapped_status = status_map.get(status.lower(), status.upper()) if status.lower() != "all" else None
-            
-            # Construct the API URL with correct parameters
-            params = {
-                "query.cond": condition,
-                "pageSize": max_results,
-                "format": "json"
-            }
-            
-            # Add status filter if not 'all'
-            if status.lower() != "all" and mapped_status:
-                params["filter.overallStatus"] = mapped_status
-            
-            # Make the API request using the base tool's _make_request method
-            data = await self._make_request(
-                url=self.base_url,
-                method="GET",
-                params=params
-            )
-            
-            # Process the studies
-            studies = data.get('studies', [])
-            trials = await self._process_trials(studies)
-            
-            # Create result object
-            result = self._format_success_response(
-                condition=condition,
-                search_status=status,
-                total_results=data.get('totalCount', 0),
-                trials=trials
-            )
-            
-            # Cache for 24 hours (86400 seconds)
-            self.cache.set(cache_key, result, ttl=86400)
-            
-            return result
-                
+            return await self._single_flight(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error searching clinical trials: {str(e)}")
             return self._format_error_response(f"Error searching clinical trials: {str(e)}")
     
+    async def _fetch_trials(self, cache_key: str, condition: str, status: str, max_results: int) -> Dict[str, Any]:
+        """
+        Search ClinicalTrials.gov for trials and cache the result
+        
+        Args:
+            cache_key: Cache key for the search
+            condition: Medical condition or disease to search for
+            status: Trial status
+            max_results: Validated maximum number of results
+            
+        Returns:
+            Dictionary containing clinical trial information
+        """
+        logger.info(f"Searching clinical trials for condition: {condition}, status={status}, max_results={max_results}")
+        
+        # Map status to API format if needed
+        status_map = {
+            "recruiting": "RECRUITING",
+            "not_recruiting": "ACTIVE_NOT_RECRUITING",
+            "completed": "COMPLETED",
+            "active": "RECRUITING"
+        }
+        mapped_status = status_map.get(status.lower(), status.upper()) if status.lower() != "all" else None
+        
+        # Construct the API URL with correct parameters
+        params = {
+            "query.cond": condition,
+            "pageSize": max_results,
+            "countTotal": "true",
+            "format": "json"
+        }
+        
+        # Add status filter if not 'all'
+        if status.lower() != "all" and mapped_status:
+            params["filter.overallStatus"] = mapped_status
+        
+        # Make the API request using the base tool's _make_request method
+        data = await self._make_request(
+            url=self.base_url,
+            method="GET",
+            params=params
+        )
+        
+        # Process the studies
+        studies = data.get('studies', [])
+        trials = await self._process_trials(studies)
+        
+        # Create result object
+        result = self._format_success_response(
+            condition=condition,
+            search_status=status,
+            total_results=data.get('totalCount', len(trials)),
+            trials=trials
+        )
+        
+        # Cache for 24 hours (86400 seconds)
+        await self._cache_result(cache_key, result, ttl=86400)
+        
+        return result
+    
     async def _process_trials(self, studies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Process clinical trial data from ClinicalTrials.gov API response
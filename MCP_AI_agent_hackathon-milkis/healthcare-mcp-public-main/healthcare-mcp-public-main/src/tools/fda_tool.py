@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import partial
 import re
 from typing import Dict, Any, Optional, List
 from src.tools.base_tool import BaseTool
@@ -26,6 +27,7 @@ class FDATool(BaseTool):
         Returns:
             Dictionary with extracted and sanitized information
         """
+        # Bump PAYLOAD_SCHEMA_VERSIONS["fda_drug"] in cache_keys.py when the shape changes
         extracted = {}
         
         # Handle empty results
@@ -144,55 +146,76 @@ class FDATool(BaseTool):
         cache_key = self._get_cache_key("fda_drug", search_type, drug_name)
         
         # Check cache first
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self._get_cached(cache_key)
         if cached_result:
             logger.info(f"Cache hit for FDA drug lookup: {drug_name}, {search_type}")
             return cached_result
         
-        # If not in cache, fetch from API
+        fetch = partial(self._fetch_drug, cache_key, drug_name, search_type)
+        
+        # Serve an expired-but-recent entry while it is refreshed in the background
+        stale_result = await self._get_stale_and_refresh(cache_key, fetch)
+        if stale_result:
+            logger.info(f"Serving stale result while refreshing FDA drug lookup: {drug_name}, {search_type}")
+            return stale_result
+        
+        # If not in cache, fetch from API (concurrent identical lookups share one fetch)
         try:
-            logger.info(f"Fetching FDA drug information for {drug_name}, type: {search_type}")
-            
-            # Determine endpoint and query based on search type
-            # Note: For adverse_events, we now use label data instead of event.json
-            if search_type == "adverse_events":
-                endpoint = f"{self.base_url}/label.json"
-                query = f"openfda.generic_name:{drug_name} OR openfda.brand_name:{drug_name}"
-            elif search_type == "label":
-                endpoint = f"{self.base_url}/label.json"
-                query = f"openfda.generic_name:{drug_name} OR openfda.brand_name:{drug_name}"
-            else:  # general
-                endpoint = f"{self.base_url}/ndc.json"
-                query = f"generic_name:{drug_name} OR brand_name:{drug_name}"
-            
-            # Build API URL
-            params = {
-                "search": query,
-                "limit": 1  # Reduced from 3 to 1 to limit response size
-            }
-            
-            # Add API key if available
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            # Make the request
-            data = await self._make_request(endpoint, params=params)
-            
-            # Extract and sanitize key information
-            extracted_data = self._extract_key_info(data, search_type)
-            
-            # Process the response
-            result = self._format_success_response(
-                drug_name=drug_name,
-                results=extracted_data,
-                total_results=data.get("meta", {}).get("results", {}).get("total", 0)
-            )
-            
-            # Cache for 24 hours (86400 seconds)
-            self.cache.set(cache_key, result, ttl=86400)
-            
-            return result
-                
+            return await self._single_flight(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error fetching FDA drug information: {str(e)}")
             return self._format_error_response(f"Error fetching drug information: {str(e)}")
+    
+    async def _fetch_drug(self, cache_key: str, drug_name: str, search_type: str) -> Dict[str, Any]:
+        """
+        Fetch drug information from the FDA API and cache the result
+        
+        Args:
+            cache_key: Cache key for the lookup
+            drug_name: Name of the drug to search for
+            search_type: Normalized search type
+            
+        Returns:
+            Dictionary containing drug information
+        """
+        logger.info(f"Fetching FDA drug information for {drug_name}, type: {search_type}")
+        
+        # Determine endpoint and query based on search type
+        # Note: For adverse_events, we now use label data instead of event.json
+        if search_type == "adverse_events":
+            endpoint = f"{self.base_url}/label.json"
+            query = f"openfda.generic_name:{drug_name} OR openfda.brand_name:{drug_name}"
+        elif search_type == "label":
+            endpoint = f"{self.base_url}/label.json"
+            query = f"openfda.generic_name:{drug_name} OR openfda.brand_name:{drug_name}"
+        else:  # general
+            endpoint = f"{self.base_url}/ndc.json"
+            query = f"generic_name:{drug_name} OR brand_name:{drug_name}"
+        
+        # Build API URL
+        params = {
+            "search": query,
+            "limit": 1  # Reduced from 3 to 1 to limit response size
+        }
+        
+        # Add API key if available
+        if self.api_key:
+            params["api_key"] = self.api_key
+        
+        # Make the request
+        data = await self._make_request(endpoint, params=params)
+        
+        # Extract and sanitize key information
+        extracted_data = self._extract_key_info(data, search_type)
+        
+        # Process the response
+        result = self._format_success_response(
+            drug_name=drug_name,
+            results=extracted_data,
+            total_results=data.get("meta", {}).get("results", {}).get("total", 0)
+        )
+        
+        # Cache for 24 hours (86400 seconds)
+        await self._cache_result(cache_key, result, ttl=86400)
+        
+        return result
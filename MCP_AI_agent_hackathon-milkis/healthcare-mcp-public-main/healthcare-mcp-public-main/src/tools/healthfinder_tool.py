@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import partial
 from typing import Dict, Any, List, Optional
 from src.tools.base_tool import BaseTool
 
@@ -9,12 +10,9 @@ class HealthFinderTool(BaseTool):
     """Tool for accessing health information from Health.gov"""
     
     def __init__(self):
-        """Initialize the HealthFinder tool with base URL and HTTP client"""
+        """Initialize the HealthFinder tool with base URL and caching"""
         super().__init__(cache_db_path="healthcare_cache.db")
         self.base_url = "https://health.gov/myhealthfinder/api/v3"
-        # Initialize http_client
-        import requests
-        self.http_client = requests
     
     async def get_health_topics(self, topic: str, language: str = "en") -> Dict[str, Any]:
         """
@@ -40,51 +38,72 @@ class HealthFinderTool(BaseTool):
         cache_key = self._get_cache_key("health_topics", topic, language)
         
         # Check cache first
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self._get_cached(cache_key)
         if cached_result:
             logger.info(f"Cache hit for health topics: {topic}, language={language}")
             return cached_result
             
+        fetch = partial(self._fetch_health_topics, cache_key, topic, language)
+        
+        # Serve an expired-but-recent entry while it is refreshed in the background
+        stale_result = await self._get_stale_and_refresh(cache_key, fetch)
+        if stale_result:
+            logger.info(f"Serving stale result while refreshing health topics: {topic}, language={language}")
+            return stale_result
+        
         try:
-            logger.info(f"Fetching health information for topic: {topic}, language={language}")
-            
-            # Construct the API URL
-            endpoint = f"{self.base_url}/topicsearch.json"
-            params = {
-                "keyword": topic,
-                "lang": language
-            }
-            
-            # Make the API request using the base tool's _make_request method
-            data = await self._make_request(
-                url=endpoint,
-                method="GET",
-                params=params
-            )
-            
-            # Parse the response
-            result_data = data.get("Result", {})
-            
-            # Extract topics from the response
-            topics = await self._extract_topics(result_data)
-            
-            # Create result object
-            result = self._format_success_response(
-                search_term=topic,
-                language=language,
-                total_results=result_data.get("Total", 0) if isinstance(result_data, dict) else 0,
-                topics=topics
-            )
-            
-            # Cache for 1 week (604800 seconds) since health information doesn't change often
-            self.cache.set(cache_key, result, ttl=604800)
-            
-            return result
-                
+            return await self._single_flight(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error fetching health information: {str(e)}")
             return self._format_error_response(f"Error fetching health information: {str(e)}")
     
+    async def _fetch_health_topics(self, cache_key: str, topic: str, language: str) -> Dict[str, Any]:
+        """
+        Fetch health topics from Health.gov and cache the result
+        
+        Args:
+            cache_key: Cache key for the lookup
+            topic: Health topic to search for information
+            language: Validated content language
+            
+        Returns:
+            Dictionary containing health information
+        """
+        logger.info(f"Fetching health information for topic: {topic}, language={language}")
+        
+        # Construct the API URL
+        endpoint = f"{self.base_url}/topicsearch.json"
+        params = {
+            "keyword": topic,
+            "lang": language
+        }
+        
+        # Make the API request using the base tool's _make_request method
+        data = await self._make_request(
+            url=endpoint,
+            method="GET",
+            params=params
+        )
+        
+        # Parse the response
+        result_data = data.get("Result", {})
+        
+        # Extract topics from the response
+        topics = await self._extract_topics(result_data)
+        
+        # Create result object
+        result = self._format_success_response(
+            search_term=topic,
+            language=language,
+            total_results=result_data.get("Total", 0) if isinstance(result_data, dict) else 0,
+            topics=topics
+        )
+        
+        # Cache for 1 week (604800 seconds) since health information doesn't change often
+        await self._cache_result(cache_key, result, ttl=604800)
+        
+        return result
+    
     async def _extract_topics(self, result_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Extract topics from Health.gov API response
@@ -1,5 +1,7 @@
 import logging
+from functools import partial
 from typing import Dict, Any, List, Optional, Union
+from src.services.cache_keys import format_icd10_code
 from src.tools.base_tool import BaseTool
 
 logger = logging.getLogger("healthcare-mcp")
@@ -28,8 +30,8 @@ class MedicalTerminologyTool(BaseTool):
         if not code and not description:
             return self._format_error_response("Either code or description must be provided")
         
-        # Determine search term
-        search_term = code if code else description
+        # Determine search term, formatting codes as "E11.9" whether given as "e119" or "E11.9"
+        search_term = (format_icd10_code(code) or code.strip()) if code else description
         
         # Validate max_results
         try:
@@ -45,43 +47,64 @@ class MedicalTerminologyTool(BaseTool):
         cache_key = self._get_cache_key("icd10", search_term, max_results)
         
         # Check cache first
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self._get_cached(cache_key)
         if cached_result:
             logger.info(f"Cache hit for ICD-10 lookup: {search_term}")
             return cached_result
             
+        fetch = partial(self._fetch_icd_codes, cache_key, search_term, max_results)
+        
+        # Serve an expired-but-recent entry while it is refreshed in the background
+        stale_result = await self._get_stale_and_refresh(cache_key, fetch)
+        if stale_result:
+            logger.info(f"Serving stale result while refreshing ICD-10 lookup: {search_term}")
+            return stale_result
+        
         try:
-            logger.info(f"Looking up ICD-10 code: {search_term}, max_results={max_results}")
-            
-            # Build parameters
-            params = {
-                "terms": search_term,
-                "maxList": max_results,
-                "df": "code,name"  # Display fields
-            }
-            
-            # Make the request
-            data = await self._make_request(self.icd10_base_url, params=params)
-            
-            # Process the response
-            codes = await self._process_icd10_response(data, search_term)
-            
-            # Create result object
-            result = self._format_success_response(
-                search_term=search_term,
-                total_results=len(codes),
-                results=codes
-            )
-            
-            # Cache for 30 days (ICD-10 codes don't change frequently)
-            self.cache.set(cache_key, result, ttl=30*86400)
-            
-            return result
-                
+            return await self._single_flight(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error looking up ICD-10 code: {str(e)}")
             return self._format_error_response(f"Error looking up ICD-10 code: {str(e)}")
     
+    async def _fetch_icd_codes(self, cache_key: str, search_term: str, max_results: int) -> Dict[str, Any]:
+        """
+        Look up ICD-10 codes from the NLM API and cache the result
+        
+        Args:
+            cache_key: Cache key for the lookup
+            search_term: ICD-10 code or description to search for
+            max_results: Validated maximum number of results
+            
+        Returns:
+            Dictionary containing ICD-10 code information
+        """
+        logger.info(f"Looking up ICD-10 code: {search_term}, max_results={max_results}")
+        
+        # Build parameters
+        params = {
+            "terms": search_term,
+            "maxList": max_results,
+            "df": "code,name"  # Display fields
+        }
+        
+        # Make the request
+        data = await self._make_request(self.icd10_base_url, params=params)
+        
+        # Process the response
+        codes = await self._process_icd10_response(data, search_term)
+        
+        # Create result object
+        result = self._format_success_response(
+            search_term=search_term,
+            total_results=len(codes),
+            results=codes
+        )
+        
+        # Cache for 30 days (ICD-10 codes don't change frequently)
+        await self._cache_result(cache_key, result, ttl=30*86400)
+        
+        return result
+    
     async def _process_icd10_response(self, data: List[Any], search_term: str) -> List[Dict[str, Any]]:
         """
         Process ICD-10 code data from API response
@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import partial
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from src.tools.base_tool import BaseTool
@@ -45,84 +46,106 @@ class PubMedTool(BaseTool):
         cache_key = self._get_cache_key("pubmed_search", query, max_results, date_range)
         
         # Check cache first
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self._get_cached(cache_key)
         if cached_result:
             logger.info(f"Cache hit for PubMed search: {query}")
             return cached_result
             
+        fetch = partial(self._fetch_literature, cache_key, query, max_results, date_range)
+        
+        # Serve an expired-but-recent entry while it is refreshed in the background
+        stale_result = await self._get_stale_and_refresh(cache_key, fetch)
+        if stale_result:
+            logger.info(f"Serving stale result while refreshing PubMed search: {query}")
+            return stale_result
+        
         try:
-            logger.info(f"Searching PubMed for: {query}, max_results={max_results}, date_range={date_range}")
-            
-            # Process query with date range if provided
-            processed_query = query
-            if date_range:
-                try:
-                    years_back = int(date_range)
-                    current_year = datetime.now().year
-                    min_year = current_year - years_back
-                    processed_query += f" AND {min_year}:{current_year}[pdat]"
-                    logger.debug(f"Added date range filter: {min_year}-{current_year}")
-                except ValueError:
-                    # If date_range isn't a valid integer, just ignore it
-                    logger.warning(f"Invalid date range: {date_range}, ignoring")
-                    pass
+            return await self._single_flight(cache_key, fetch)
+        except Exception as e:
+            logger.error(f"Error searching PubMed: {str(e)}")
+            return self._format_error_response(f"Error searching PubMed: {str(e)}")
+    
+    async def _fetch_literature(self, cache_key: str, query: str, max_results: int, date_range: str) -> Dict[str, Any]:
+        """
+        Search PubMed for articles and cache the result
+        
+        Args:
+            cache_key: Cache key for the search
+            query: Search query for medical literature
+            max_results: Validated maximum number of results
+            date_range: Limit to articles published within years
             
-            # Search PubMed to get article IDs
-            search_params = {
+        Returns:
+            Dictionary containing search results
+        """
+        logger.info(f"Searching PubMed for: {query}, max_results={max_results}, date_range={date_range}")
+        
+        # Process query with date range if provided
+        processed_query = query
+        if date_range:
+            try:
+                years_back = int(date_range)
+                current_year = datetime.now().year
+                min_year = current_year - years_back
+                processed_query += f" AND {min_year}:{current_year}[pdat]"
+                logger.debug(f"Added date range filter: {min_year}-{current_year}")
+            except ValueError:
+                # If date_range isn't a valid integer, just ignore it
+                logger.warning(f"Invalid date range: {date_range}, ignoring")
+                pass
+        
+        # Search PubMed to get article IDs
+        search_params = {
+            "db": "pubmed",
+            "term": processed_query,
+            "retmax": max_results,
+            "format": "json"
+        }
+        
+        # Add API key if available
+        if self.api_key:
+            search_params["api_key"] = self.api_key
+        
+        # Make the search request
+        search_endpoint = f"{self.base_url}esearch.fcgi"
+        search_data = await self._make_request(search_endpoint, params=search_params)
+        
+        # Extract article IDs and total count
+        id_list = search_data.get("esearchresult", {}).get("idlist", [])
+        total_results = int(search_data.get("esearchresult", {}).get("count", 0))
+        
+        # If we have results, fetch article details
+        articles = []
+        if id_list:
+            # Prepare parameters for summary request
+            summary_params = {
                 "db": "pubmed",
-                "term": processed_query,
-                "retmax": max_results,
-                "format": "json"
+                "id": ",".join(id_list),
+                "retmode": "json"
             }
             
             # Add API key if available
             if self.api_key:
-                search_params["api_key"] = self.api_key
-            
-            # Make the search request
-            search_endpoint = f"{self.base_url}esearch.fcgi"
-            search_data = await self._make_request(search_endpoint, params=search_params)
-            
-            # Extract article IDs and total count
-            id_list = search_data.get("esearchresult", {}).get("idlist", [])
-            total_results = int(search_data.get("esearchresult", {}).get("count", 0))
-            
-            # If we have results, fetch article details
-            articles = []
-            if id_list:
-                # Prepare parameters for summary request
-                summary_params = {
-                    "db": "pubmed",
-                    "id": ",".join(id_list),
-                    "retmode": "json"
-                }
-                
-                # Add API key if available
-                if self.api_key:
-                    summary_params["api_key"] = self.api_key
-                
-                # Make the summary request
-                summary_endpoint = f"{self.base_url}esummary.fcgi"
-                summary_data = await self._make_request(summary_endpoint, params=summary_params)
-                
-                # Process article data
-                articles = await self._process_article_data(id_list, summary_data)
+                summary_params["api_key"] = self.api_key
             
-            # Create result object
-            result = self._format_success_response(
-                query=query,
-                total_results=total_results,
-                articles=articles
-            )
+            # Make the summary request
+            summary_endpoint = f"{self.base_url}esummary.fcgi"
+            summary_data = await self._make_request(summary_endpoint, params=summary_params)
             
-            # Cache for 12 hours (43200 seconds)
-            self.cache.set(cache_key, result, ttl=43200)
-            
-            return result
-                
-        except Exception as e:
-            logger.error(f"Error searching PubMed: {str(e)}")
-            return self._format_error_response(f"Error searching PubMed: {str(e)}")
+            # Process article data
+            articles = await self._process_article_data(id_list, summary_data)
+        
+        # Create result object
+        result = self._format_success_response(
+            query=query,
+            total_results=total_results,
+            articles=articles
+        )
+        
+        # Cache for 12 hours (43200 seconds)
+        await self._cache_result(cache_key, result, ttl=43200)
+        
+        return result
     
     async def _process_article_data(self, id_list: List[str], summary_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
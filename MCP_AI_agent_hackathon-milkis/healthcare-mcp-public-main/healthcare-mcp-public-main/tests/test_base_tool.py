@@ -1,9 +1,12 @@
 import pytest
 import os
 import json
+import time
+import asyncio
 import tempfile
-from unittest.mock import patch, MagicMock
-from src.tools.base_tool import BaseTool
+import httpx
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.tools.base_tool import BaseTool, CallRecord, call_record
 
 class TestBaseTool:
     """Test suite for BaseTool class"""
@@ -37,7 +40,7 @@ class TestBaseTool:
         key3 = base_tool._get_cache_key("test", "arg1", "different")
         assert key1 != key3
     
-    @patch('requests.request')
+    @patch('httpx.AsyncClient.request', new_callable=AsyncMock)
     async def test_make_request(self, mock_request, base_tool):
         """Test HTTP request functionality"""
         # Mock response
@@ -85,6 +88,157 @@ class TestBaseTool:
             timeout=30
         )
     
+    async def test_make_request_http_error(self, base_tool):
+        """Test that upstream HTTP errors are raised as httpx errors"""
+        transport = httpx.MockTransport(lambda request: httpx.Response(404, json={"error": "not found"}))
+        BaseTool._http_client = httpx.AsyncClient(transport=transport)
+        BaseTool._http_client_loop = asyncio.get_running_loop()
+        
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await base_tool._make_request("https://example.com/missing")
+        finally:
+            await BaseTool.close_http_client()
+    
+    async def test_shared_http_client_lifecycle(self, base_tool):
+        """Test that one HTTP client is shared and can be closed and recreated"""
+        client1 = BaseTool.get_http_client()
+        client2 = BaseTool.get_http_client()
+        assert client1 is client2
+        
+        await BaseTool.close_http_client()
+        assert client1.is_closed
+        assert BaseTool._http_client is None
+        
+        # Closing twice is a no-op
+        await BaseTool.close_http_client()
+        
+        client3 = BaseTool.get_http_client()
+        assert client3 is not client1
+        assert not client3.is_closed
+        await BaseTool.close_http_client()
+    
+    async def test_make_request_concurrent(self, base_tool):
+        """Test that concurrent requests do not block each other"""
+        async def slow_handler(request):
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={"path": request.url.path})
+        
+        BaseTool._http_client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+        BaseTool._http_client_loop = asyncio.get_running_loop()
+        
+        try:
+            start = time.monotonic()
+            results = await asyncio.gather(*[
+                base_tool._make_request(f"https://example.com/item/{i}") for i in range(5)
+            ])
+            elapsed = time.monotonic() - start
+        finally:
+            await BaseTool.close_http_client()
+        
+        assert [r["path"] for r in results] == [f"/item/{i}" for i in range(5)]
+        # Five 0.2s requests in parallel should take well under 5 * 0.2s
+        assert elapsed < 0.6
+    
+    async def test_single_flight_coalesces_concurrent_calls(self, base_tool):
+        """Test that concurrent identical lookups share a single fetch"""
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"status": "success", "call": calls}
+        
+        before = BaseTool.get_single_flight_stats()
+        results = await asyncio.gather(*[base_tool._single_flight("same_key", fetch) for _ in range(5)])
+        after = BaseTool.get_single_flight_stats()
+        
+        assert calls == 1
+        assert all(result == {"status": "success", "call": 1} for result in results)
+        assert after["fetches"] - before["fetches"] == 1
+        assert after["coalesced"] - before["coalesced"] == 4
+        assert after["in_flight"] == 0
+        
+        # A later call with the same key fetches again
+        await base_tool._single_flight("same_key", fetch)
+        assert calls == 2
+    
+    async def test_single_flight_propagates_errors(self, base_tool):
+        """Test that a failed fetch raises for every coalesced caller"""
+        async def failing_fetch():
+            await asyncio.sleep(0.05)
+            raise ValueError("upstream failed")
+        
+        results = await asyncio.gather(
+            *[base_tool._single_flight("failing_key", failing_fetch) for _ in range(3)],
+            return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "failing_key" not in BaseTool._in_flight
+    
+    async def test_single_flight_caches_not_found(self, base_tool):
+        """Test that upstream 404s become cached negative results and 5xx errors raise"""
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(404 if request.url.path == "/missing" else 503)
+        )
+        BaseTool._http_client = httpx.AsyncClient(transport=transport)
+        BaseTool._http_client_loop = asyncio.get_running_loop()
+        key = base_tool._get_cache_key("icd10", "xyz", 10)
+        
+        try:
+            result = await base_tool._single_flight(key, lambda: base_tool._make_request("https://example.com/missing"))
+            assert result["error_code"] == "NOT_FOUND"
+            assert await base_tool._get_cached(key) == result
+            assert BaseTool.get_negative_cache_stats()["icd10"]["hits"] >= 1
+            
+            with pytest.raises(httpx.HTTPStatusError):
+                await base_tool._single_flight("failing_key", lambda: base_tool._make_request("https://example.com/down"))
+            assert base_tool.cache.get("failing_key") is None
+        finally:
+            await BaseTool.close_http_client()
+    
+    async def test_call_record(self, base_tool):
+        """Test that cache lookups and upstream requests fill in the current call record"""
+        transport = httpx.MockTransport(lambda request: httpx.Response(404 if request.url.path == "/missing" else 200, json={}))
+        BaseTool._http_client = httpx.AsyncClient(transport=transport)
+        BaseTool._http_client_loop = asyncio.get_running_loop()
+        key = base_tool._get_cache_key("icd10", "call_record", 10)
+        
+        record = CallRecord()
+        token = call_record.set(record)
+        try:
+            assert await base_tool._get_cached(key) is None
+            assert record.cache_outcome == "miss"
+            
+            await base_tool._make_request("https://example.com/found")
+            with pytest.raises(httpx.HTTPStatusError):
+                await base_tool._make_request("https://example.com/missing")
+            assert record.upstream_ms > 0
+            assert record.http_status == 404
+            assert record.response_bytes == 2 * len(b"{}")
+            
+            base_tool.cache.set(key, {"status": "success"})
+            await base_tool._get_cached(key)
+            assert record.cache_outcome == "hit"
+        finally:
+            call_record.reset(token)
+            await BaseTool.close_http_client()
+        
+        # Without a record in the context nothing is tracked
+        assert call_record.get() is None
+        await base_tool._get_cached(key)
+    
+    def test_is_negative(self, base_tool):
+        """Test which results count as negative"""
+        assert base_tool._is_negative({"status": "success", "total_results": 0, "results": []})
+        assert base_tool._is_negative({"status": "error", "error_message": "x", "error_code": "NOT_FOUND"})
+        assert not base_tool._is_negative({"status": "success", "total_results": 3})
+        # The list of matches decides, whatever the upstream total says
+        assert not base_tool._is_negative({"status": "success", "total_results": 0, "trials": [{"nct_id": "NCT1"}]})
+        assert base_tool._is_negative({"status": "success", "total_results": 5, "articles": []})
+        assert not base_tool._is_negative({"status": "error", "error_message": "timeout"})
+    
     def test_format_error_response(self, base_tool):
         """Test error response formatting"""
         error_msg = "Test error message"
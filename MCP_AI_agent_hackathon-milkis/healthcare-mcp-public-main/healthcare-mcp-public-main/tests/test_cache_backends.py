@@ -0,0 +1,186 @@
+import pytest
+import time
+import threading
+import tempfile
+from src.services import cache_factory, redis_cache_service
+from src.services.cache_backend import CacheBackend
+from src.services.cache_keys import build_cache_key
+from src.services.cache_service import CacheService
+from src.services.memory_cache_service import InMemoryCacheService
+from src.services.redis_cache_service import RedisCacheService
+
+class TestCacheBackends:
+    """Test suite for the cache backends and their shared behaviour"""
+    
+    @pytest.fixture(params=["memory", "sqlite", "redis"])
+    def cache(self, request):
+        """Create a cache service for each backend"""
+        if request.param == "memory":
+            yield InMemoryCacheService(ttl=10)
+        elif request.param == "sqlite":
+            with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+                yield CacheService(db_path=temp_db.name, ttl=10)
+        else:
+            fakeredis = pytest.importorskip("fakeredis")
+            yield RedisCacheService(ttl=10, client=fakeredis.FakeRedis())
+    
+    def test_protocol(self, cache):
+        """Test that every backend implements the cache interface"""
+        assert isinstance(cache, CacheBackend)
+    
+    def test_set_get_delete(self, cache):
+        """Test storing, reading and deleting values"""
+        value = {"drug": "sertraline", "results": [1, 2, 3]}
+        assert cache.set("fda_drug:v1:drug=sertraline", value) is True
+        assert cache.get("fda_drug:v1:drug=sertraline") == value
+        assert cache.get("fda_drug:v1:drug=ibuprofen") is None
+        
+        assert cache.delete("fda_drug:v1:drug=sertraline") is True
+        assert cache.get("fda_drug:v1:drug=sertraline") is None
+        assert cache.delete("fda_drug:v1:drug=sertraline") is False
+    
+    def test_expiry_and_stale(self, cache):
+        """Test that expired entries are only served through get_stale()"""
+        cache.max_stale["fda_drug"] = 60
+        cache.set("fda_drug:v1:drug=sertraline", {"drug": "sertraline"}, ttl=1)
+        cache.set("no_prefix_key", "value", ttl=1)
+        assert cache.get_stale("fda_drug:v1:drug=sertraline") is None
+        
+        time.sleep(1.5)
+        
+        assert cache.get("fda_drug:v1:drug=sertraline") is None
+        assert cache.get_stale("fda_drug:v1:drug=sertraline") == {"drug": "sertraline"}
+        assert cache.get_stale("no_prefix_key") is None
+    
+    async def test_async_lookups(self, cache):
+        """Test the non-blocking lookups"""
+        cache.set("icd10:v1:term=e11.9", {"code": "E11.9"})
+        assert await cache.get_async("icd10:v1:term=e11.9") == {"code": "E11.9"}
+        assert await cache.get_stale_async("icd10:v1:term=e11.9") is None
+    
+    async def test_async_set(self, cache):
+        """Test the non-blocking write; Redis round trips run off the event loop thread"""
+        write_threads = []
+        if isinstance(cache, RedisCacheService):
+            pipeline = cache.client.pipeline
+            cache.client.pipeline = lambda **kwargs: write_threads.append(threading.current_thread()) or pipeline(**kwargs)
+        
+        assert await cache.set_async("icd10:v1:term=e11.9", {"code": "E11.9"}) is True
+        assert await cache.get_async("icd10:v1:term=e11.9") == {"code": "E11.9"}
+        if isinstance(cache, RedisCacheService):
+            assert write_threads and threading.current_thread() not in write_threads
+    
+    def test_metrics(self, cache):
+        """Test that every backend records per-prefix metrics"""
+        cache.set("pubmed_search:v1:query=statin", {"articles": []})
+        cache.flush()
+        cache.get("pubmed_search:v1:query=statin")
+        cache.get("pubmed_search:v1:query=aspirin")
+        
+        pubmed = cache.get_metrics()["prefixes"]["pubmed_search"]
+        assert pubmed["sets"] == 1
+        assert pubmed["memory_hits"] + pubmed["store_hits"] == 1
+        assert pubmed["misses"] == 1
+        assert "metrics" in cache.get_stats()
+    
+    def test_ttl_jitter(self, cache):
+        """Test that jittered entries never outlive the requested TTL"""
+        cache.ttl_jitter = 0.5
+        cache.set("icd10:v1:term=e11.9", {"code": "E11.9"}, ttl=2)
+        cache.set("icd10:v1:term=i10", {"code": "I10"}, ttl=2, jitter=False)
+        assert cache.get("icd10:v1:term=e11.9") == {"code": "E11.9"}
+        
+        time.sleep(2.1)
+        
+        assert cache.get("icd10:v1:term=e11.9") is None
+        assert cache.get("icd10:v1:term=i10") is None
+    
+    def test_early_refresh(self, cache):
+        """Test that fresh entries are refreshed early once their prefix has a recompute time"""
+        assert cache.get("fda_drug:v1:drug=sertraline") is None
+        time.sleep(0.05)
+        cache.set("fda_drug:v1:drug=sertraline", {"drug": "sertraline"})
+        cache.flush()
+        assert cache._expiry_stats()["recompute_seconds"]["fda_drug"] >= 0.05
+        assert cache.get("fda_drug:v1:drug=sertraline") == {"drug": "sertraline"}
+        
+        # A recompute time far beyond the TTL makes every lookup refresh early
+        cache._recompute_seconds["fda_drug"] = 1000
+        assert cache.get("fda_drug:v1:drug=sertraline") is None
+        assert cache.get_metrics()["prefixes"]["fda_drug"]["early_refreshes"] == 1
+        
+        cache.early_refresh_beta = 0
+        assert cache.get("fda_drug:v1:drug=sertraline") == {"drug": "sertraline"}
+    
+    def test_invalidate_tag(self, cache):
+        """Test that tagged entries are deleted and others are kept"""
+        sertraline = build_cache_key("fda_drug", "general", "sertraline")
+        label = build_cache_key("fda_drug", "label", "Sertraline")
+        ibuprofen = build_cache_key("fda_drug", "general", "ibuprofen")
+        topic = build_cache_key("health_topics", "diabetes", "en")
+        for key in (sertraline, label, ibuprofen, topic):
+            cache.set(key, {"key": key})
+        cache.flush()
+        
+        assert cache.invalidate_tag("entity:fda_drug:sertraline", batch_size=1) == 2
+        assert cache.get(sertraline) is None
+        assert cache.get(label) is None
+        assert cache.get(ibuprofen) == {"key": ibuprofen}
+        
+        assert cache.invalidate_tag("tool:fda_drug") == 1
+        assert cache.get(ibuprofen) is None
+        assert cache.get(topic) == {"key": topic}
+        assert cache.invalidate_tag("tool:fda_drug") == 0
+    
+    def test_invalidate_tag_mixed_ttls(self, cache):
+        """Test that a short-lived entry does not cut short the tag of a longer-lived one"""
+        cache.max_stale["fda_drug"] = 0
+        sertraline = build_cache_key("fda_drug", "general", "sertraline")
+        ibuprofen = build_cache_key("fda_drug", "general", "ibuprofen")
+        cache.set(sertraline, {"key": sertraline}, ttl=86400)
+        cache.set(ibuprofen, {"key": ibuprofen}, ttl=1)
+        cache.flush()
+        
+        time.sleep(1.5)
+        
+        assert cache.get(sertraline) == {"key": sertraline}
+        assert cache.invalidate_tag("tool:fda_drug") >= 1
+        assert cache.get(sertraline) is None
+
+class TestCacheFactory:
+    """Test suite for backend selection and the shared cache"""
+    
+    @pytest.fixture(autouse=True)
+    def shared_caches(self, monkeypatch):
+        """Start every test without shared caches"""
+        monkeypatch.setattr(cache_factory, "_shared_caches", {})
+        monkeypatch.delenv("CACHE_DB_PATH", raising=False)
+    
+    def test_backend_selection(self, monkeypatch):
+        """Test that CACHE_BACKEND selects the backend"""
+        monkeypatch.setenv("CACHE_BACKEND", "memory")
+        assert isinstance(cache_factory.create_cache(), InMemoryCacheService)
+        
+        monkeypatch.setenv("CACHE_BACKEND", "unknown")
+        assert cache_factory.get_cache_backend_name() == "sqlite"
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            assert isinstance(cache_factory.create_cache(db_path=temp_db.name), CacheService)
+    
+    def test_redis_unavailable(self, monkeypatch):
+        """Test the SQLite fallback when the redis package is missing"""
+        monkeypatch.setattr(redis_cache_service, "redis", None)
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            assert isinstance(cache_factory.create_cache("redis", db_path=temp_db.name), CacheService)
+    
+    async def test_shared_cache(self, monkeypatch):
+        """Test that all callers share one instance per backend"""
+        monkeypatch.setenv("CACHE_BACKEND", "memory")
+        cache = cache_factory.get_shared_cache(db_path="a.db")
+        assert cache_factory.get_shared_cache(db_path="b.db") is cache
+        
+        cache.set("health_topics:v1:topic=diabetes", {"topic": "diabetes"})
+        assert cache_factory.get_shared_cache_metrics()["memory"]["totals"]["sets"] == 1
+        
+        await cache_factory.close_shared_caches()
+        assert cache_factory.get_shared_caches() == {}
+        assert cache_factory.get_shared_cache() is not cache
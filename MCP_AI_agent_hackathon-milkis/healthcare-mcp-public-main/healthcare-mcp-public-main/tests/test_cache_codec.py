@@ -0,0 +1,68 @@
+import pytest
+import json
+from src.services import cache_codec
+from src.services.cache_codec import CacheCodec, FORMAT_JSON, FORMAT_JSON_ZLIB
+
+class TestCacheCodec:
+    """Test suite for CacheCodec class"""
+    
+    @pytest.fixture
+    def value(self):
+        """A tool response large enough to be compressed"""
+        return {
+            "status": "success",
+            "drug_name": "sertraline",
+            "label": {"warnings": ["Suicidal thoughts and behaviors in pediatric patients. " * 20]},
+            "unicode": "naïve – café"
+        }
+    
+    def test_roundtrip_compressed(self, value):
+        """Test that large values are compressed and decode unchanged"""
+        codec = CacheCodec(compression="zlib", threshold=100)
+        payload = codec.encode(value)
+        
+        assert payload[0] == FORMAT_JSON_ZLIB
+        assert len(payload) < len(json.dumps(value))
+        assert codec.decode(payload) == value
+    
+    def test_below_threshold(self):
+        """Test that small values are stored uncompressed"""
+        codec = CacheCodec(compression="zlib", threshold=100)
+        payload = codec.encode({"status": "success"})
+        
+        assert payload[0] == FORMAT_JSON
+        assert codec.decode(payload) == {"status": "success"}
+    
+    def test_cross_setting_decode(self, value):
+        """Test that payloads decode regardless of the reader's compression setting"""
+        payload = CacheCodec(compression="zlib", threshold=0).encode(value)
+        assert CacheCodec(compression="none").decode(payload) == value
+    
+    def test_legacy_text(self, value):
+        """Test that JSON TEXT rows written before the codec still decode"""
+        codec = CacheCodec()
+        assert codec.decode(json.dumps(value)) == value
+    
+    def test_invalid_payloads(self):
+        """Test that corrupt payloads raise ValueError"""
+        codec = CacheCodec()
+        with pytest.raises(ValueError):
+            codec.decode(b"")
+        with pytest.raises(ValueError):
+            codec.decode(bytes([0x7f]) + b"{}")
+        with pytest.raises(ValueError):
+            codec.decode(bytes([FORMAT_JSON_ZLIB]) + b"not zlib")
+    
+    def test_json_fallback(self, value, monkeypatch):
+        """Test encoding and decoding without orjson installed"""
+        payload = CacheCodec(threshold=0).encode(value)
+        monkeypatch.setattr(cache_codec, "orjson", None)
+        
+        codec = CacheCodec(threshold=0)
+        assert codec.decode(payload) == value
+        assert codec.decode(codec.encode(value)) == value
+    
+    def test_zstd_unavailable(self, monkeypatch):
+        """Test that zstd falls back to zlib when zstandard is not installed"""
+        monkeypatch.setattr(cache_codec, "zstandard", None)
+        assert CacheCodec(compression="zstd").compression == "zlib"
@@ -0,0 +1,85 @@
+import json
+import pytest
+import tempfile
+from src.services import cache_keys
+from src.services.cache_keys import build_cache_key, cache_tags, format_icd10_code, invalidation_tag, normalize_query, parse_cache_key
+
+class TestCacheKeys:
+    """Test suite for canonical cache key building"""
+    
+    @pytest.fixture(autouse=True)
+    def no_synonyms(self):
+        """Start every test without a synonym map"""
+        cache_keys.load_synonyms("")
+        yield
+        cache_keys.load_synonyms("")
+    
+    def test_case_and_whitespace(self):
+        """Test that case and whitespace variants share one key"""
+        key = build_cache_key("fda_drug", "general", "sertraline")
+        assert key == "fda_drug:v2:s1:search_type=general|drug=sertraline"
+        assert build_cache_key("fda_drug", "General", "  SERTRALINE ") == key
+        assert build_cache_key("fda_drug", "label", "sertraline") != key
+    
+    def test_query_term_order(self):
+        """Test that plain queries ignore term order but PubMed syntax keeps it"""
+        assert normalize_query("Covid vaccine  myocarditis") == normalize_query("myocarditis covid vaccine")
+        assert normalize_query('"heart failure" AND sglt2') == '"heart failure" and sglt2'
+        assert normalize_query("a AND b") != normalize_query("b AND a")
+    
+    def test_icd10_codes(self):
+        """Test that ICD-10 codes are formatted and descriptions are not"""
+        assert format_icd10_code("e119") == "E11.9"
+        assert format_icd10_code(" E11.9 ") == "E11.9"
+        assert format_icd10_code("i10") == "I10"
+        assert format_icd10_code("diabetes") is None
+        assert build_cache_key("icd10", "E119", 10) == build_cache_key("icd10", "e11.9", "10")
+        assert build_cache_key("icd10", "Diabetes", 10) == "icd10:v2:s1:term=diabetes|max_results=10"
+    
+    def test_synonyms(self):
+        """Test that configured synonyms map onto one key"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump({"fda_drug": {"drug": {"Acetaminophen": "paracetamol"}}}, f)
+            f.flush()
+            cache_keys.load_synonyms(f.name)
+        
+        assert build_cache_key("fda_drug", "general", "ACETAMINOPHEN") == build_cache_key("fda_drug", "general", "paracetamol")
+        assert build_cache_key("health_topics", "acetaminophen", "en") == "health_topics:v2:s1:topic=acetaminophen|language=en"
+    
+    def test_long_keys(self):
+        """Test that long arguments are truncated with a hash and stay distinct"""
+        first = build_cache_key("pubmed_search", "x" * 300 + " a", 5, "")
+        second = build_cache_key("pubmed_search", "x" * 300 + " b", 5, "")
+        assert first.startswith("pubmed_search:v2:s1:query=")
+        assert first != second
+        assert len(first) < 260
+    
+    def test_delimiters_in_values(self):
+        """Test that delimiters inside arguments cannot make distinct lookups share a key"""
+        first = build_cache_key("fda_drug", "a|drug=b", "c")
+        second = build_cache_key("fda_drug", "a", "b|drug=c")
+        assert first != second
+        assert parse_cache_key(first) == ("fda_drug", {"search_type": "a|drug=b", "drug": "c"})
+        assert parse_cache_key(second) == ("fda_drug", {"search_type": "a", "drug": "b|drug=c"})
+        assert build_cache_key("fda_drug", "general", "100%") != build_cache_key("fda_drug", "general", "100%25")
+        
+        key = build_cache_key("fda_drug", "general", "b|drug=c#1")
+        assert cache_tags(key)[-1] == "entity:fda_drug:b|drug=c#1"
+        assert invalidation_tag("fda_drug", entity="b|drug=c#1") in cache_tags(key)
+    
+    def test_cache_tags(self):
+        """Test that keys carry tool, schema and canonical entity tags"""
+        key = build_cache_key("fda_drug", "general", " Sertraline")
+        assert cache_tags(key) == ["tool:fda_drug", "schema:fda_drug:s1", "entity:fda_drug:sertraline"]
+        assert invalidation_tag("fda_drug", entity="SERTRALINE ") in cache_tags(key)
+        assert invalidation_tag("fda_drug", schema=1) in cache_tags(key)
+        assert invalidation_tag("fda_drug") == "tool:fda_drug"
+        assert cache_tags("fda_drug:v1:drug=sertraline") == []
+        assert cache_tags("no_prefix_key") == []
+    
+    def test_invalidation_tag_errors(self):
+        """Test that unknown tools and ambiguous selections are rejected"""
+        with pytest.raises(ValueError):
+            invalidation_tag("unknown_tool")
+        with pytest.raises(ValueError):
+            invalidation_tag("fda_drug", entity="sertraline", schema=1)
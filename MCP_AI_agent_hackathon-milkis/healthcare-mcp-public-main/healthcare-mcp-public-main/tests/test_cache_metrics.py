@@ -0,0 +1,97 @@
+import pytest
+from src.services.cache_metrics import CacheMetrics, LatencyHistogram, expiry_spread, key_prefix
+
+class TestCacheMetrics:
+    """Test suite for CacheMetrics class"""
+    
+    @pytest.fixture
+    def metrics(self):
+        """Create an empty CacheMetrics instance"""
+        return CacheMetrics()
+    
+    def test_key_prefix(self):
+        """Test that the tool prefix is recovered from cache keys"""
+        assert key_prefix("fda_drug:v1:search_type=label|drug=sertraline") == "fda_drug"
+        assert key_prefix("icd10:0123abcd") == "icd10"
+        assert key_prefix("no_prefix_key") == "other"
+        assert key_prefix(":leading_colon") == "other"
+    
+    def test_counters_by_prefix(self, metrics):
+        """Test that lookups and writes are counted per prefix"""
+        metrics.record_set("fda_drug:v1:drug=a", 0.001, 100)
+        metrics.record_get("fda_drug:v1:drug=a", "memory_hits", 0.0001)
+        metrics.record_get("fda_drug:v1:drug=b", "store_hits", 0.002, 80)
+        metrics.record_get("fda_drug:v1:drug=c", "misses", 0.002)
+        metrics.record_get("icd10:v1:term=e11.9", "expired", 0.002)
+        metrics.increment("icd10:v1:term=e11.9", "evictions")
+        metrics.increment("icd10:v1:term=e11.9", "bytes_evicted", 50)
+        
+        snapshot = metrics.snapshot()
+        fda = snapshot["prefixes"]["fda_drug"]
+        assert fda["sets"] == 1
+        assert fda["bytes_written"] == 100
+        assert fda["memory_hits"] == 1
+        assert fda["store_hits"] == 1
+        assert fda["bytes_read"] == 80
+        assert fda["misses"] == 1
+        assert fda["hit_ratio"] == round(2 / 3, 4)
+        assert fda["latency"]["get"]["count"] == 3
+        assert fda["latency"]["set"]["count"] == 1
+        
+        icd10 = snapshot["prefixes"]["icd10"]
+        assert icd10["expired"] == 1
+        assert icd10["evictions"] == 1
+        assert icd10["bytes_evicted"] == 50
+        assert icd10["hit_ratio"] == 0.0
+        
+        assert snapshot["totals"]["sets"] == 1
+        assert snapshot["totals"]["hit_ratio"] == 0.5
+        
+        metrics.reset()
+        assert metrics.snapshot()["prefixes"] == {}
+    
+    def test_latency_histogram(self):
+        """Test bucket counts and percentile estimates"""
+        histogram = LatencyHistogram(bounds=(1, 10, 100))
+        for ms in [0.5] * 90 + [5] * 9 + [500]:
+            histogram.observe(ms)
+        
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["buckets"] == {"le_1": 90, "le_10": 9, "le_100": 0, "le_inf": 1}
+        assert snapshot["p50_ms"] == 1
+        assert snapshot["p95_ms"] == 10
+        assert snapshot["p99_ms"] == 10
+        assert snapshot["max_ms"] == 500
+        
+        # The unbounded bucket reports the observed maximum
+        assert histogram.percentile(1.0) == 500
+        assert LatencyHistogram().percentile(0.5) == 0.0
+    
+    def test_latency_histogram_merge(self):
+        """Test that stored histograms merge into the histogram of all their observations"""
+        first, second = LatencyHistogram(bounds=(1, 10, 100)), LatencyHistogram(bounds=(1, 10, 100))
+        for ms in [0.5] * 50:
+            first.observe(ms)
+        for ms in [50] * 49 + [200]:
+            second.observe(ms)
+        
+        merged = LatencyHistogram.from_state(first.state(), bounds=(1, 10, 100))
+        merged.merge(LatencyHistogram.from_state(second.state(), bounds=(1, 10, 100)))
+        assert merged.count == 100
+        assert merged.percentile(0.5) == 1
+        assert merged.percentile(0.95) == 100
+        assert merged.max_ms == 200
+        
+        with pytest.raises(ValueError):
+            merged.merge(LatencyHistogram(bounds=(1, 10)))
+    
+    def test_expiry_spread(self):
+        """Test the peak-to-mean summary of expirations per bucket"""
+        spread = expiry_spread({100: 10, 101: 10, 102: 40}, 60)
+        assert spread["buckets"] == 3
+        assert spread["mean_per_bucket"] == 20
+        assert spread["max_per_bucket"] == 40
+        assert spread["peak_ratio"] == 2
+        assert spread["peak_at"] == 102 * 60
+        assert expiry_spread({}, 60)["peak_at"] is None
@@ -3,6 +3,7 @@ import os
 import time
 import tempfile
 import sqlite3
+from src.services.cache_keys import build_cache_key
 from src.services.cache_service import CacheService
 
 class TestCacheService:
@@ -143,4 +144,258 @@ class TestCacheService:
         assert stats["total_entries"] == 3
         assert stats["expired_entries"] == 1
         assert stats["valid_entries"] == 2
-        assert stats["average_ttl_seconds"] > 0
\ No newline at end of file
+        assert stats["average_ttl_seconds"] > 0
+    
+    def test_memory_tier(self, cache_service):
+        """Test that hot entries are served from the memory tier"""
+        cache_service.set("hot_key", {"drug": "sertraline"})
+        
+        # Remove the row behind the cache's back; the memory tier still serves it
+        conn = sqlite3.connect(cache_service.db_path)
+        conn.execute("DELETE FROM cache WHERE key = ?", ("hot_key",))
+        conn.commit()
+        conn.close()
+        assert cache_service.get("hot_key") == {"drug": "sertraline"}
+        
+        # Deleting through the service evicts the memory tier as well
+        cache_service.delete("hot_key")
+        assert cache_service.get("hot_key") is None
+    
+    def test_tier_stats(self, cache_service):
+        """Test per-tier hit ratios in statistics"""
+        cache_service.set("tier_key", "value")
+        
+        # Drop the memory copy so the next read falls through to SQLite
+        cache_service.memory.clear()
+        assert cache_service.get("tier_key") == "value"  # SQLite hit, promoted to memory
+        assert cache_service.get("tier_key") == "value"  # memory hit
+        assert cache_service.get("missing_key") is None  # miss in both tiers
+        
+        tiers = cache_service.get_stats()["tiers"]
+        assert tiers["memory"]["hits"] == 1
+        assert tiers["memory"]["misses"] == 2
+        assert tiers["sqlite"]["hits"] == 1
+        assert tiers["sqlite"]["misses"] == 1
+        assert tiers["sqlite"]["hit_ratio"] == 0.5
+    
+    def test_serve_stale(self, cache_service):
+        """Test that expired entries are kept within their staleness window"""
+        cache_service.max_stale["fda_drug"] = 60
+        cache_service.set("fda_drug:stale_key", {"drug": "sertraline"}, ttl=1)
+        cache_service.set("no_prefix_key", "value", ttl=1)
+        
+        # Fresh entries are not returned as stale
+        assert cache_service.get_stale("fda_drug:stale_key") is None
+        
+        time.sleep(1.5)
+        
+        # Expired entries are a miss for get() but can still be served stale
+        assert cache_service.get("fda_drug:stale_key") is None
+        assert cache_service.get_stale("fda_drug:stale_key") == {"drug": "sertraline"}
+        assert cache_service.get_stale("no_prefix_key") is None
+        
+        # Only entries past their staleness window are cleared
+        assert cache_service.clear_expired() == 1
+        assert cache_service.get_stale("fda_drug:stale_key") == {"drug": "sertraline"}
+        assert cache_service.get_stats()["stale_hits"] == 2    
+    def test_eviction_lru(self, cache_service):
+        """Test that the least recently used entries are evicted when over budget"""
+        cache_service.max_rows = 3
+        cache_service.eviction_batch_size = 1
+        for i in range(4):
+            cache_service.set(f"key_{i}", i)
+            time.sleep(0.01)
+        
+        # Touch key_0 so key_1 becomes the least recently used entry
+        cache_service.memory.clear()
+        assert cache_service.get("key_0") == 0
+        
+        assert cache_service.evict() == 1
+        assert cache_service.get("key_1") is None
+        assert cache_service.get("key_0") == 0
+        
+        # Back within budget, nothing else is evicted
+        assert cache_service.evict() == 0
+        eviction = cache_service.get_stats()["eviction"]
+        assert eviction["evicted_rows"] == 1
+        assert eviction["evicted_bytes"] > 0
+    
+    def test_eviction_lfu(self, cache_service):
+        """Test that the least frequently used entries are evicted under lfu"""
+        cache_service.eviction_policy = "lfu"
+        cache_service.max_bytes = 1
+        cache_service.eviction_batch_size = 2
+        for i in range(3):
+            cache_service.set(f"key_{i}", "x" * 100)
+        
+        for _ in range(3):
+            assert cache_service.get("key_0") is not None
+        assert cache_service.get("key_2") is not None
+        
+        # One bounded batch per pass: the two least hit entries go first
+        assert cache_service.evict() == 2
+        assert cache_service.get("key_1") is None
+        assert cache_service.get("key_2") is None
+        assert cache_service.get("key_0") is not None
+    
+    def test_set_defers_eviction(self, cache_service):
+        """Test that set() leaves budget checks to the sweeper instead of evicting inline"""
+        cache_service.max_rows = 1
+        cache_service.eviction_check_interval = 2
+        sweeper = cache_service._get_sweeper()
+        requests = sweeper.get_stats()["maintenance_requests"]
+        evictions = []
+        cache_service.evict = lambda: evictions.append(1)
+        
+        for i in range(4):
+            assert cache_service.set(f"key_{i}", i) is True
+        
+        assert evictions == []
+        assert sweeper.get_stats()["maintenance_requests"] >= requests + 1
+    
+    def test_access_tracking_migration(self):
+        """Test that databases created before access tracking are migrated"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute(
+                "CREATE TABLE cache (key TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("INSERT INTO cache VALUES (?, ?, ?, ?)", ("old_key", '"value"', time.time() + 60, time.time()))
+            conn.commit()
+            conn.close()
+            
+            service = CacheService(db_path=temp_db.name, ttl=10)
+            assert service.get("old_key") == "value"
+            assert service.get_stats()["eviction"]["total_bytes"] == len('"value"')
+    
+    def test_expired_read_queues_sweep(self, cache_service):
+        """Test that expired reads hand keys to the background sweeper"""
+        cache_service.set("expired_key", "value", ttl=1)
+        time.sleep(1.5)
+        
+        assert cache_service.get("expired_key") is None
+        
+        sweeper = cache_service._get_sweeper()
+        deadline = time.time() + 2
+        while sweeper.get_stats()["rows_removed"] == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        
+        assert cache_service.get_stats()["sweeper"]["rows_removed"] == 1
+        assert cache_service.get_stats()["total_entries"] == 0
+    
+    def test_legacy_text_rows(self, cache_service):
+        """Test that JSON TEXT rows written before the binary codec still read"""
+        conn = sqlite3.connect(cache_service.db_path)
+        conn.execute(
+            "INSERT INTO cache (key, data, expires_at, created_at, stale_until) VALUES (?, ?, ?, ?, ?)",
+            ("legacy_key", '{"drug": "sertraline"}', time.time() + 60, time.time(), time.time() + 60)
+        )
+        conn.commit()
+        conn.close()
+        
+        assert cache_service.get("legacy_key") == {"drug": "sertraline"}
+        
+        # New writes are stored as binary payloads
+        cache_service.set("new_key", {"drug": "sertraline"})
+        cache_service.flush()
+        conn = sqlite3.connect(cache_service.db_path)
+        data = conn.execute("SELECT data FROM cache WHERE key = ?", ("new_key",)).fetchone()[0]
+        conn.close()
+        assert isinstance(data, bytes)
+    
+    def test_write_behind(self, cache_service):
+        """Test read-your-writes while cache writes wait for group commit"""
+        cache_service._get_write_queue().flush_interval = 60
+        cache_service.memory.max_entries = 0  # read through the pending map, not the memory tier
+        cache_service.set("queued_key", {"drug": "sertraline"})
+        
+        conn = sqlite3.connect(cache_service.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 0
+        assert cache_service.get("queued_key") == {"drug": "sertraline"}
+        
+        # Deleting a queued key must not let the pending insert resurrect it
+        assert cache_service.delete("queued_key") is True
+        assert cache_service.get("queued_key") is None
+        assert conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 0
+        conn.close()
+    
+    def test_delete_is_queued(self, cache_service):
+        """Test that delete() leaves the commit to the write-behind worker"""
+        cache_service.set("committed_key", "value")
+        cache_service.flush()
+        write_queue = cache_service._get_write_queue()
+        write_queue.flush_interval = 60
+        commits = write_queue.get_stats()["commits"]
+        
+        assert cache_service.delete("committed_key") is True
+        assert cache_service.get("committed_key") is None
+        assert cache_service.get_stale("committed_key") is None
+        assert cache_service.delete("committed_key") is False
+        assert write_queue.get_stats()["commits"] == commits
+        
+        conn = sqlite3.connect(cache_service.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 1
+        cache_service.flush()
+        assert conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 0
+        conn.close()
+        assert cache_service._pending_writes[cache_service.db_path] == {}
+    
+    def test_metrics(self, cache_service):
+        """Test per-prefix counters collected without querying SQLite"""
+        cache_service.set("fda_drug:v1:drug=sertraline", {"drug": "sertraline"})
+        cache_service.set("icd10:v1:term=e11.9", {"code": "E11.9"}, ttl=1)
+        assert cache_service.get("fda_drug:v1:drug=sertraline") is not None  # memory hit
+        cache_service.memory.clear()
+        assert cache_service.get("fda_drug:v1:drug=sertraline") is not None  # SQLite hit
+        assert cache_service.get("fda_drug:v1:drug=ibuprofen") is None  # miss
+        
+        time.sleep(1.5)
+        cache_service.flush()
+        cache_service.memory.clear()
+        assert cache_service.get("icd10:v1:term=e11.9") is None  # expired
+        
+        metrics = cache_service.get_metrics()
+        fda = metrics["prefixes"]["fda_drug"]
+        assert fda["sets"] == 1
+        assert fda["memory_hits"] == 1
+        assert fda["store_hits"] == 1
+        assert fda["misses"] == 1
+        assert fda["bytes_written"] > 0
+        assert fda["latency"]["get"]["count"] == 3
+        assert metrics["prefixes"]["icd10"]["expired"] == 1
+        assert metrics["totals"]["sets"] == 2
+        
+        # Metrics are also reported with the full statistics and across databases
+        assert cache_service.get_stats()["metrics"]["totals"]["sets"] == 2
+        assert CacheService.get_all_metrics()[cache_service.db_path]["totals"]["sets"] == 2
+    
+    def test_tags_follow_deletes(self, cache_service):
+        """Test that tag rows are removed with their entries"""
+        key = build_cache_key("pubmed_search", "statin", 5, "")
+        cache_service.set(key, {"articles": []})
+        cache_service.flush()
+        with sqlite3.connect(cache_service.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM cache_tags WHERE key = ?", (key,)).fetchone()[0] == 3
+        
+        cache_service.delete(key)
+        cache_service.flush()
+        with sqlite3.connect(cache_service.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM cache_tags").fetchone()[0] == 0
+    
+    def test_expiry_spread(self, cache_service):
+        """Test that jitter spreads the expiry of entries written together"""
+        cache_service.ttl_jitter = 0.5
+        cache_service.expiry_bucket_seconds = 10
+        for i in range(200):
+            cache_service.set(f"fda_drug:v1:drug=drug{i}", {"i": i}, ttl=100)
+        cache_service.flush()
+        
+        with sqlite3.connect(cache_service.db_path) as conn:
+            low, high = conn.execute("SELECT MIN(expires_at - created_at), MAX(expires_at - created_at) FROM cache").fetchone()
+        assert 50 <= low < high <= 100
+        
+        expiry = cache_service.get_stats()["expiry"]
+        assert expiry["ttl_jitter"] == 0.5
+        assert expiry["spread"]["buckets"] >= 4
+        assert expiry["spread"]["peak_ratio"] < 3
+
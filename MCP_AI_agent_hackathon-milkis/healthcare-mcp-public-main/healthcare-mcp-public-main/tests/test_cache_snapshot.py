@@ -0,0 +1,90 @@
+import pytest
+import os
+import hashlib
+import time
+import sqlite3
+import tempfile
+from src.services.cache_service import CacheService
+from src.services.cache_snapshot import CHECKSUM_SIZE, HEADER, export_snapshot, import_snapshot, read_snapshot
+from src.services.memory_cache_service import InMemoryCacheService
+
+class TestCacheSnapshot:
+    """Test suite for cache snapshot export and import"""
+    
+    @pytest.fixture
+    def source_db(self):
+        """Create a cache database with fresh, expired and legacy entries"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            cache = CacheService(db_path=temp_db.name)
+            cache.set("fda_drug:v1:drug=sertraline", {"drug": "sertraline"}, ttl=3600, jitter=False)
+            cache.set("icd10:v1:term=e11.9", {"code": "E11.9", "padding": "x" * 5000}, ttl=600)
+            cache.set("pubmed_search:v1:query=statin", {"articles": []}, ttl=1)
+            cache.flush()
+            
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute(
+                "INSERT INTO cache (key, data, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                ("legacy_key", '{"legacy": true}', time.time() + 60, time.time())
+            )
+            conn.commit()
+            conn.close()
+            time.sleep(1.1)
+            yield temp_db.name
+    
+    @pytest.fixture
+    def snapshot_path(self):
+        """Path for a snapshot file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield os.path.join(temp_dir, "cache.snapshot")
+    
+    def test_round_trip(self, source_db, snapshot_path):
+        """Test that non-expired entries survive export and import"""
+        assert export_snapshot(source_db, snapshot_path) == 3
+        
+        created_at, entries = read_snapshot(snapshot_path)
+        assert created_at <= time.time()
+        assert [key for key, _, _ in entries] == ["fda_drug:v1:drug=sertraline", "icd10:v1:term=e11.9", "legacy_key"]
+        
+        target = InMemoryCacheService()
+        stats = import_snapshot(target, snapshot_path)
+        assert stats["imported"] == 3
+        assert target.get("fda_drug:v1:drug=sertraline") == {"drug": "sertraline"}
+        assert target.get("icd10:v1:term=e11.9")["code"] == "E11.9"
+        assert target.get("legacy_key") == {"legacy": True}
+        assert target.get("pubmed_search:v1:query=statin") is None
+    
+    def test_ttl_remapped(self, source_db, snapshot_path):
+        """Test that TTLs count down from the snapshot time"""
+        export_snapshot(source_db, snapshot_path)
+        
+        # Backdate the snapshot by 20 minutes and re-sign it
+        with open(snapshot_path, "rb") as f:
+            content = f.read()[:-CHECKSUM_SIZE]
+        magic, version, created_at, count = HEADER.unpack_from(content)
+        content = HEADER.pack(magic, version, created_at - 1200, count) + content[HEADER.size:]
+        with open(snapshot_path, "wb") as f:
+            f.write(content + hashlib.sha256(content).digest())
+        
+        target = InMemoryCacheService()
+        stats = import_snapshot(target, snapshot_path)
+        assert stats["imported"] == 1
+        assert stats["expired"] == 2
+        _, expires_at = target.memory.get("fda_drug:v1:drug=sertraline")
+        assert expires_at - time.time() == pytest.approx(3600 - 1200 - 1.1, abs=2)
+    
+    def test_corrupt_snapshot(self, source_db, snapshot_path):
+        """Test that damaged or foreign files are rejected"""
+        export_snapshot(source_db, snapshot_path)
+        with open(snapshot_path, "rb") as f:
+            content = bytearray(f.read())
+        
+        content[-CHECKSUM_SIZE - 1] ^= 0xFF
+        with open(snapshot_path, "wb") as f:
+            f.write(content)
+        with pytest.raises(ValueError, match="checksum"):
+            read_snapshot(snapshot_path)
+        
+        with open(snapshot_path, "wb") as f:
+            f.write(b"not a snapshot" * 10)
+        with pytest.raises(ValueError, match="not a cache snapshot"):
+            import_snapshot(InMemoryCacheService(), snapshot_path)
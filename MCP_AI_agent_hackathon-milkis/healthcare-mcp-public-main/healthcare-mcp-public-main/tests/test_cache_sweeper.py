@@ -0,0 +1,87 @@
+import pytest
+import time
+import threading
+import sqlite3
+import tempfile
+from src.services.cache_sweeper import CacheSweeper
+
+class TestCacheSweeper:
+    """Test suite for CacheSweeper class"""
+    
+    @pytest.fixture
+    def conn(self):
+        """Create a cache table with two expired rows and one fresh row"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name, check_same_thread=False)
+            conn.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, data TEXT, stale_until REAL)")
+            now = time.time()
+            conn.executemany(
+                "INSERT INTO cache VALUES (?, ?, ?)",
+                [("old_1", "1", now - 10), ("old_2", "2", now - 10), ("fresh", "3", now + 60)]
+            )
+            conn.commit()
+            yield conn
+            conn.close()
+    
+    def _keys(self, conn):
+        return {row[0] for row in conn.execute("SELECT key FROM cache")}
+    
+    def test_sweep_in_batches(self, conn):
+        """Test that a scheduled sweep removes all expired rows in bounded batches"""
+        maintenance_runs = []
+        sweeper = CacheSweeper(lambda: conn, lambda: maintenance_runs.append(1), batch_size=1)
+        
+        assert sweeper.sweep_now() == 2
+        assert self._keys(conn) == {"fresh"}
+        assert maintenance_runs == [1]
+        
+        stats = sweeper.get_stats()
+        assert stats["rows_removed"] == 2
+        assert stats["sweeps"] == 1
+        assert stats["last_sweep_duration_ms"] >= 0
+    
+    def test_queued_keys(self, conn):
+        """Test that queued keys are deleted by the worker, re-checking expiry"""
+        sweeper = CacheSweeper(lambda: conn, lambda: None, interval=3600)
+        sweeper.start()
+        try:
+            assert sweeper.enqueue("old_1")
+            assert sweeper.enqueue("fresh")
+            
+            deadline = time.time() + 2
+            while "old_1" in self._keys(conn) and time.time() < deadline:
+                time.sleep(0.05)
+            
+            assert self._keys(conn) == {"old_2", "fresh"}
+            assert sweeper.get_stats()["keys_queued"] == 2
+        finally:
+            sweeper.stop()
+        assert not sweeper.running
+    
+    def test_queue_bound(self, conn):
+        """Test that keys are dropped rather than blocking when the queue is full"""
+        sweeper = CacheSweeper(lambda: conn, lambda: None, queue_size=1)
+        assert sweeper.enqueue("old_1")
+        assert not sweeper.enqueue("old_2")
+        assert sweeper.get_stats()["keys_dropped"] == 1
+        assert sweeper.get_stats()["queue_depth"] == 1
+    
+    def test_requested_maintenance(self, conn):
+        """Test that requested maintenance runs on the worker without waiting for the next sweep"""
+        maintenance_threads = []
+        sweeper = CacheSweeper(lambda: conn, lambda: maintenance_threads.append(threading.current_thread()), interval=3600)
+        sweeper.start()
+        try:
+            sweeper.request_maintenance()
+            sweeper.request_maintenance()
+            
+            deadline = time.time() + 3
+            while not maintenance_threads and time.time() < deadline:
+                time.sleep(0.05)
+            
+            assert maintenance_threads == [sweeper._thread]
+            stats = sweeper.get_stats()
+            assert stats["maintenance_runs"] == 1
+            assert stats["sweeps"] == 0
+        finally:
+            sweeper.stop()
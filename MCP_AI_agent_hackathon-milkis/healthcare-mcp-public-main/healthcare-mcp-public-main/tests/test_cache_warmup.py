@@ -0,0 +1,95 @@
+import pytest
+import json
+import time
+import asyncio
+import tempfile
+from src.services.cache_keys import build_cache_key
+from src.services.cache_service import CacheService
+from src.services.cache_warmup import CacheWarmer, HostRateLimiter, load_seed_file, seed_from_cache_key, seeds_from_cache_db
+
+class TestCacheWarmup:
+    """Test suite for cache warm-up"""
+    
+    def test_seed_from_cache_key(self):
+        """Test that canonical keys map back to tool calls"""
+        assert seed_from_cache_key(build_cache_key("fda_drug", "label", "Sertraline")) == {
+            "name": "fda_drug_lookup",
+            "arguments": {"search_type": "label", "drug_name": "sertraline"}
+        }
+        assert seed_from_cache_key(build_cache_key("icd10", "e119", 10)) == {
+            "name": "lookup_icd_code",
+            "arguments": {"code": "E11.9", "max_results": "10"}
+        }
+        assert seed_from_cache_key("fda_drug:0123456789abcdef") is None
+    
+    def test_seeds_from_cache_db(self):
+        """Test that the most frequently hit entries are mined first"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            cache = CacheService(db_path=temp_db.name)
+            hot = build_cache_key("health_topics", "diabetes", "en")
+            cold = build_cache_key("health_topics", "asthma", "en")
+            cache.set(hot, {"status": "success"})
+            cache.set(cold, {"status": "success"})
+            cache.set("legacy:0123456789abcdef", {"status": "success"})
+            cache.memory.delete(hot)
+            for _ in range(3):
+                cache.get(hot)
+            cache.evict()
+            
+            seeds = seeds_from_cache_db(temp_db.name, 1)
+            assert seeds == [{"name": "health_topics", "arguments": {"topic": "diabetes", "language": "en"}}]
+            assert len(seeds_from_cache_db(temp_db.name, 10)) == 2
+    
+    def test_load_seed_file(self):
+        """Test loading seeds from a JSON file"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump([{"name": "fda_drug_lookup", "arguments": {"drug_name": "ibuprofen"}}, {"arguments": {}}], f)
+            f.flush()
+            assert load_seed_file(f.name) == [{"name": "fda_drug_lookup", "arguments": {"drug_name": "ibuprofen"}}]
+        assert load_seed_file("/nonexistent/seeds.json") == []
+    
+    async def test_warmer_runs_seeds(self):
+        """Test that seeds run through the tools with bounded concurrency"""
+        running = 0
+        peak = 0
+        
+        async def lookup(drug_name, search_type="general"):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            if drug_name == "broken":
+                return {"status": "error", "error_message": "not found"}
+            return {"status": "success"}
+        
+        seeds = [{"name": "fda_drug_lookup", "arguments": {"drug_name": f"drug{i}"}} for i in range(6)]
+        seeds += [
+            {"name": "fda_drug_lookup", "arguments": {"drug_name": "drug0"}},
+            {"name": "fda_drug_lookup", "arguments": {"drug_name": "broken"}},
+            {"name": "unknown_tool", "arguments": {}}
+        ]
+        warmer = CacheWarmer({"fda_drug_lookup": lookup}, seeds, concurrency=2)
+        
+        assert await warmer.wait(5)
+        assert peak == 2
+        
+        stats = warmer.get_stats()
+        assert stats["seeds"] == 8
+        assert stats["completed"] == 8
+        assert stats["succeeded"] == 6
+        assert stats["failed"] == 1
+        assert stats["skipped"] == 1
+        assert not stats["running"]
+    
+    async def test_rate_limiter_spaces_requests_per_host(self):
+        """Test that requests to one host are spaced and other hosts are not delayed"""
+        limiter = HostRateLimiter(20)
+        started = time.monotonic()
+        await asyncio.gather(*[limiter.acquire("api.fda.gov") for _ in range(3)])
+        assert time.monotonic() - started >= 0.09
+        
+        started = time.monotonic()
+        await limiter.acquire("clinicaltrials.gov")
+        assert time.monotonic() - started < 0.05
+        assert limiter.requests == 4
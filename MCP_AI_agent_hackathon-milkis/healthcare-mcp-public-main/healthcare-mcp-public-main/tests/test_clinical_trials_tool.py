@@ -3,7 +3,7 @@ import sys
 import os
 import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -131,6 +131,23 @@ async def test_clinical_trials_search_with_mock():
         assert trial['eligibility']['min_age'] == '18 Years'
         assert trial['eligibility']['max_age'] == '75 Years'
 
+@pytest.mark.asyncio
+async def test_clinical_trials_search_without_total_count():
+    """Test that trials found without a totalCount are cached as a positive result"""
+    tool = ClinicalTrialsTool()
+    study = {"protocolSection": {"identificationModule": {"nctId": "NCT87654321", "briefTitle": "Uncounted Trial"}}}
+    
+    with patch.object(tool, '_make_request', return_value={"studies": [study]}) as mock_request, \
+            patch.object(tool.cache, 'get_async', new=AsyncMock(return_value=None)), \
+            patch.object(tool.cache, 'set_async', new=AsyncMock(return_value=True)) as mock_set:
+        result = await tool.search_trials("uncounted_test_condition_456", "all", 3)
+    
+    assert mock_request.call_args[1]["params"]["countTotal"] == "true"
+    assert result['status'] == 'success'
+    assert result['total_results'] == 1
+    assert not tool._is_negative(result)
+    assert mock_set.call_args[1]["ttl"] == 86400
+
 @pytest.mark.asyncio
 async def test_clinical_trials_search_error_handling():
     """Test error handling in clinical trials search"""
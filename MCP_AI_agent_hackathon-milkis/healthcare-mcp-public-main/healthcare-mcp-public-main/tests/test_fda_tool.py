@@ -1,9 +1,12 @@
 import pytest
 import os
 import json
+import asyncio
 import tempfile
+import httpx
 from unittest.mock import patch, MagicMock
 from src.tools.fda_tool import FDATool
+from src.tools.base_tool import BaseTool
 
 class TestFDATool:
     """Test suite for FDATool class"""
@@ -277,8 +280,8 @@ class TestFDATool:
         
         def mock_cache_get(key):
             return cache_data.get(key)
-            
-        def mock_cache_set(key, value, ttl=None):
+        
+        def mock_cache_set(key, value, ttl=None, jitter=True):
             cache_data[key] = value
             return True
             
@@ -299,7 +302,92 @@ class TestFDATool:
         result3 = await fda_tool.lookup_drug("ibuprofen")
         assert result3["status"] == "success"
         assert mock_request.call_count == 2
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_negative_caching(self, mock_request, fda_tool):
+        """Test that empty results and upstream 404s are cached with the short negative TTL"""
+        request = httpx.Request("GET", "https://api.fda.gov/drug/ndc.json")
+        mock_request.side_effect = httpx.HTTPStatusError(
+            "Not Found", request=request, response=httpx.Response(404, request=request)
+        )
+        
+        result = await fda_tool.lookup_drug("sertralien")
+        assert result["status"] == "error"
+        assert result["error_code"] == "NOT_FOUND"
+        key, cached = fda_tool.cache.set.call_args[0]
+        assert cached == result
+        assert fda_tool.cache.set.call_args[1]["ttl"] == fda_tool.negative_ttl["fda_drug"]
+        
+        # The next lookup is served from the negative cache
+        fda_tool.cache.get.side_effect = lambda cache_key: cached if cache_key == key else None
+        before = BaseTool.get_negative_cache_stats()["fda_drug"]["hits"]
+        assert await fda_tool.lookup_drug("Sertralien") == result
+        assert mock_request.call_count == 1
+        assert BaseTool.get_negative_cache_stats()["fda_drug"]["hits"] == before + 1
+        
+        # Well-formed empty results get the negative TTL too
+        mock_request.side_effect = None
+        mock_request.return_value = {"meta": {"results": {"total": 0}}, "results": []}
+        result = await fda_tool.lookup_drug("ibuprofen")
+        assert result["status"] == "success"
+        assert fda_tool.cache.set.call_args[1]["ttl"] == fda_tool.negative_ttl["fda_drug"]
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_server_error_not_cached(self, mock_request, fda_tool):
+        """Test that transient upstream failures are not cached"""
+        request = httpx.Request("GET", "https://api.fda.gov/drug/ndc.json")
+        mock_request.side_effect = httpx.HTTPStatusError(
+            "Service Unavailable", request=request, response=httpx.Response(503, request=request)
+        )
+        
+        result = await fda_tool.lookup_drug("aspirin")
+        assert result["status"] == "error"
+        assert "error_code" not in result
+        fda_tool.cache.set.assert_not_called()
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_concurrent_coalescing(self, mock_request, fda_tool):
+        """Test that concurrent identical lookups make a single API call"""
+        async def slow_response(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return {
+                "meta": {"results": {"total": 1}},
+                "results": [{"generic_name": "SERTRALINE", "brand_name": "ZOLOFT"}]
+            }
+        mock_request.side_effect = slow_response
+        
+        results = await asyncio.gather(*[fda_tool.lookup_drug("sertraline") for _ in range(5)])
+        
+        assert all(result["status"] == "success" for result in results)
+        assert mock_request.call_count == 1
+        fda_tool.cache.set.assert_called_once()
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_serves_stale_and_refreshes(self, mock_request):
+        """Test that an expired entry is served while it is refreshed in the background"""
+        mock_request.return_value = {
+            "meta": {"results": {"total": 1}},
+            "results": [{"generic_name": "SERTRALINE", "brand_name": "ZOLOFT"}]
+        }
         
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            tool = FDATool(cache_db_path=temp_db.name)
+            cache_key = tool._get_cache_key("fda_drug", "general", "sertraline")
+            stale_value = {"status": "success", "drug_name": "sertraline", "results": {}, "total_results": 0}
+            tool.cache.set(cache_key, stale_value, ttl=1)
+            await asyncio.sleep(1.5)
+            
+            # The stale entry is returned immediately
+            result = await tool.lookup_drug("sertraline")
+            assert result == stale_value
+            
+            # The background refresh replaces it with a fresh result
+            await asyncio.gather(*BaseTool._refresh_tasks)
+            assert mock_request.call_count == 1
+            fresh = tool.cache.get(cache_key)
+            assert fresh["total_results"] == 1
+            assert fresh["results"]["generic_name"] == "SERTRALINE"
+    
     @patch('src.tools.base_tool.BaseTool._make_request')
     async def test_sanitize_text(self, mock_request, fda_tool):
         """Test text sanitization functionality"""
@@ -0,0 +1,79 @@
+import pytest
+import time
+from src.services.memory_cache import MemoryCache, MISSING
+
+class TestMemoryCache:
+    """Test suite for MemoryCache class"""
+    
+    @pytest.fixture
+    def memory_cache(self):
+        """Create a small MemoryCache instance"""
+        return MemoryCache(max_entries=3, max_bytes=1000)
+    
+    def test_set_get(self, memory_cache):
+        """Test storing and retrieving values"""
+        memory_cache.set("key", {"data": "value"}, time.time() + 10, 10)
+        assert memory_cache.get("key") == {"data": "value"}
+        
+        # None is a valid cached value and differs from a miss
+        memory_cache.set("none_key", None, time.time() + 10, 4)
+        assert memory_cache.get("none_key") is None
+        assert memory_cache.get("missing_key") is MISSING
+    
+    def test_expiration(self, memory_cache):
+        """Test that expired entries are not returned"""
+        memory_cache.set("expired", "value", time.time() - 1, 5)
+        assert memory_cache.get("expired") is MISSING
+        assert memory_cache.get_stats()["entries"] == 0
+    
+    def test_lru_eviction_by_count(self, memory_cache):
+        """Test that the least recently used entry is evicted first"""
+        expires_at = time.time() + 10
+        memory_cache.set("a", 1, expires_at, 1)
+        memory_cache.set("b", 2, expires_at, 1)
+        memory_cache.set("c", 3, expires_at, 1)
+        
+        # Touch "a" so "b" becomes the least recently used
+        assert memory_cache.get("a") == 1
+        memory_cache.set("d", 4, expires_at, 1)
+        
+        assert memory_cache.get("b") is MISSING
+        assert memory_cache.get("a") == 1
+        assert memory_cache.get("d") == 4
+        assert memory_cache.get_stats()["evictions"] == 1
+    
+    def test_eviction_by_bytes(self, memory_cache):
+        """Test that the byte budget is enforced"""
+        expires_at = time.time() + 10
+        memory_cache.set("a", "x", expires_at, 600)
+        memory_cache.set("b", "y", expires_at, 600)
+        
+        assert memory_cache.get("a") is MISSING
+        assert memory_cache.get("b") == "y"
+        assert memory_cache.get_stats()["bytes"] == 600
+        
+        # Values larger than the whole budget are not stored
+        memory_cache.set("huge", "z", expires_at, 5000)
+        assert memory_cache.get("huge") is MISSING
+    
+    def test_oversized_overwrite(self, memory_cache):
+        """Test that a value too large for the tier drops the key's older value"""
+        expires_at = time.time() + 10
+        assert memory_cache.set("key", "old", expires_at, 10) is True
+        assert memory_cache.set("key", "new", expires_at, 5000) is False
+        
+        assert memory_cache.get("key") is MISSING
+        assert memory_cache.get_stats()["bytes"] == 0
+    
+    def test_delete_and_stats(self, memory_cache):
+        """Test deleting entries and hit ratio reporting"""
+        memory_cache.set("key", "value", time.time() + 10, 5)
+        assert memory_cache.get("key") == "value"
+        assert memory_cache.delete("key") is True
+        assert memory_cache.delete("key") is False
+        assert memory_cache.get("key") is MISSING
+        
+        stats = memory_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
@@ -0,0 +1,123 @@
+from src.services.quota import QuotaEngine, QuotaRule
+
+MINUTE_START = 1792195200.0
+
+class TestQuotaEngine:
+    """Test suite for QuotaEngine class"""
+    
+    def test_rule_name(self):
+        """Test rule names used in stats and 429 responses"""
+        assert QuotaRule("session", 60, 10).name == "session_per_minute"
+        assert QuotaRule("tool", 86400, 10).name == "tool_per_day"
+        assert QuotaRule("tool", 300, 10).name == "tool_per_300s"
+    
+    def test_limits_per_session_and_tool(self):
+        """Test that session and tool rules admit calls up to their limits"""
+        engine = QuotaEngine([QuotaRule("session", 60, 5), QuotaRule("tool", 60, 3)])
+        for i in range(3):
+            decision = engine.acquire("s1", "fda_drug_lookup", now=MINUTE_START + i)
+            assert decision["allowed"] is True
+        assert decision["rule"] == "tool_per_minute"
+        assert decision["remaining"] == 0
+        assert decision["reset"] == MINUTE_START + 60
+        
+        denied = engine.acquire("s1", "fda_drug_lookup", now=MINUTE_START + 3)
+        assert denied["allowed"] is False
+        assert denied["rule"] == "tool_per_minute"
+        assert denied["used"] == 3
+        assert denied["limit"] == 3
+        assert denied["retry_after"] >= 1
+        
+        # Other tools share only the session rule; other sessions are independent
+        assert engine.acquire("s1", "pubmed_search", now=MINUTE_START + 4)["allowed"] is True
+        assert engine.acquire("s1", "pubmed_search", now=MINUTE_START + 5)["allowed"] is True
+        assert engine.acquire("s1", "pubmed_search", now=MINUTE_START + 6)["rule"] == "session_per_minute"
+        assert engine.acquire("s2", "fda_drug_lookup", now=MINUTE_START + 6)["allowed"] is True
+        
+        stats = engine.get_stats()
+        assert stats["allowed"] == 6
+        assert stats["denied"] == {"session_per_minute": 1, "tool_per_minute": 1}
+    
+    def test_sliding_window(self):
+        """Test that the previous window counts in proportion to its overlap"""
+        engine = QuotaEngine([QuotaRule("session", 60, 10)])
+        assert engine.acquire("s1", "tool1", cost=10, now=MINUTE_START + 50)["allowed"] is True
+        
+        # 15 seconds into the next window, 75% of the previous 10 calls still count
+        denied = engine.acquire("s1", "tool1", cost=3, now=MINUTE_START + 75)
+        assert denied["allowed"] is False
+        assert denied["used"] == 8
+        assert denied["retry_after"] == 3
+        assert engine.acquire("s1", "tool1", cost=3, now=MINUTE_START + 78)["allowed"] is True
+        
+        # Two windows later nothing counts
+        assert engine.acquire("s1", "tool1", cost=10, now=MINUTE_START + 180)["allowed"] is True
+        
+        # A batch larger than the limit is never admitted
+        assert engine.acquire("s2", "tool1", cost=11, now=MINUTE_START)["retry_after"] == 60
+    
+    def test_acquire_many(self):
+        """Test that a group of calls is admitted or rejected as a whole"""
+        engine = QuotaEngine([QuotaRule("session", 60, 5), QuotaRule("tool", 60, 3)])
+        decision = engine.acquire_many([("s1", "fda_drug_lookup", 2), ("s1", "pubmed_search", 2)], now=MINUTE_START)
+        assert decision["allowed"] is True
+        assert decision["remaining"] == 1
+        
+        # The session rule sums both tools; nothing of the rejected group is counted
+        denied = engine.acquire_many([("s1", "fda_drug_lookup", 1), ("s1", "pubmed_search", 1)], now=MINUTE_START + 1)
+        assert denied["rule"] == "session_per_minute"
+        assert engine.acquire("s1", "fda_drug_lookup", now=MINUTE_START + 2)["remaining"] == 0
+        assert engine.acquire_many([], now=MINUTE_START) == {"allowed": True}
+        assert engine.get_stats()["allowed"] == 5
+    
+    def test_disabled_rules(self):
+        """Test that rules with no limit are ignored"""
+        engine = QuotaEngine([QuotaRule("session", 60, 0)])
+        assert engine.enabled is False
+        assert engine.acquire("s1", "tool1") == {"allowed": True}
+    
+    def test_reconcile(self):
+        """Test that day counters are raised to the persisted usage and idle counters dropped"""
+        day_start = 1792195200
+        rows = [
+            ("s1", "fda_drug_lookup", day_start + 3600, 4),
+            ("s1", "pubmed_search", day_start + 7200, 3),
+            ("s1", "fda_drug_lookup", day_start - 3600, 8),
+            ("s2", "fda_drug_lookup", day_start - 3 * 86400, 100)
+        ]
+        loads = []
+        
+        def load(since):
+            loads.append(since)
+            return [row for row in rows if row[2] >= since]
+        
+        engine = QuotaEngine([QuotaRule("session", 86400, 10), QuotaRule("tool", 60, 100)], load=load)
+        now = day_start + 4 * 3600
+        engine.acquire("s3", "fda_drug_lookup", now=now - 600)
+        assert engine.reconcile(now=now) == 1
+        assert loads == [day_start - 86400]
+        
+        # 7 calls today and 8 of yesterday's, weighted by the remaining 5/6 of the overlap
+        denied = engine.acquire("s1", "fda_drug_lookup", now=now)
+        assert denied["allowed"] is False
+        assert denied["used"] == 14
+        
+        # Counts already above the persisted ones are kept
+        engine.acquire("s4", "tool1", cost=10, now=now)
+        engine.reconcile(now=now)
+        assert engine.acquire("s4", "tool1", now=now)["allowed"] is False
+        
+        # The minute counter of s3 went idle and was dropped
+        assert ("s3", "fda_drug_lookup") not in {key[1:] for key in engine._counters if key[0] == 1}
+        assert engine.get_stats()["reconciles"] == 2
+    
+    def test_reconcile_error(self):
+        """Test that a failing load is counted and leaves the counters in place"""
+        def load(since):
+            raise RuntimeError("database is locked")
+        
+        engine = QuotaEngine([QuotaRule("session", 86400, 1)], load=load)
+        engine.acquire("s1", "tool1", now=MINUTE_START)
+        assert engine.reconcile(now=MINUTE_START) == 0
+        assert engine.get_stats()["reconcile_errors"] == 1
+        assert engine.acquire("s1", "tool1", now=MINUTE_START)["allowed"] is False
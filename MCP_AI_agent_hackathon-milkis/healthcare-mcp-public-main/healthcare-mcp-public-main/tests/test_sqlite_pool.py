@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from src.services.sqlite_pool import SQLitePool
+
+class TestSQLitePool:
+    """Test suite for SQLitePool class"""
+    
+    @pytest.fixture
+    def pool(self):
+        """Create a pool with two readers over a temporary database"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            pool = SQLitePool(temp_db.name, max_readers=2, busy_timeout_ms=200)
+            with pool.writer() as conn:
+                conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+                conn.execute("INSERT INTO items (name) VALUES ('first')")
+                conn.commit()
+            yield pool
+            pool.close()
+    
+    def test_readers_are_concurrent(self, pool):
+        """Test that readers are checked out side by side while the writer is held"""
+        with pool.writer():
+            with pool.reader() as first, pool.reader() as second:
+                assert first is not second
+                assert first.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+                assert second.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+        
+        stats = pool.get_stats()
+        assert stats["open_readers"] == 2
+        assert stats["idle_readers"] == 2
+        assert stats["reader"]["acquisitions"] == 2
+        assert stats["writer"]["acquisitions"] == 2
+    
+    def test_readers_are_read_only(self, pool):
+        """Test that reader connections reject writes"""
+        with pool.reader() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items (name) VALUES ('second')")
+    
+    def test_reader_timeout(self, pool):
+        """Test that waiting for a reader past the busy timeout raises instead of hanging"""
+        with pool.reader(), pool.reader():
+            with pytest.raises(sqlite3.OperationalError):
+                with pool.reader():
+                    pass
+    
+    def test_writer_wait_is_recorded(self, pool):
+        """Test that time spent waiting for the writer lock is recorded"""
+        held = threading.Event()
+        release = threading.Event()
+        
+        def hold_writer():
+            with pool.writer():
+                held.set()
+                release.wait(1)
+        
+        thread = threading.Thread(target=hold_writer)
+        thread.start()
+        held.wait(1)
+        threading.Timer(0.05, release.set).start()
+        with pool.writer():
+            pass
+        thread.join()
+        
+        stats = pool.get_stats()["writer"]
+        assert stats["waited"] >= 1
+        assert stats["max_wait_ms"] >= 20
+        assert stats["max_hold_ms"] >= 20
+    
+    def test_run_uses_executor(self, pool):
+        """Test that run() executes blocking work off the event loop thread"""
+        def count():
+            with pool.reader() as conn:
+                return threading.current_thread().name, conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        
+        thread_name, total = asyncio.run(pool.run(count))
+        assert total == 1
+        assert thread_name != threading.current_thread().name
+    
+    def test_memory_database_reads_through_writer(self):
+        """Test that an in-memory database has no separate readers"""
+        pool = SQLitePool(":memory:")
+        with pool.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+        assert pool.get_stats()["open_readers"] == 0
+        pool.close()
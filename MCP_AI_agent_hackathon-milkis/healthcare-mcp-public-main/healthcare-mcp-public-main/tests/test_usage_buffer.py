@@ -0,0 +1,104 @@
+import time
+import threading
+from src.services.usage_buffer import UsageBuffer
+
+class TestUsageBuffer:
+    """Test suite for UsageBuffer class"""
+    
+    def test_background_flush(self):
+        """Test that buffered events are persisted in batches by the worker"""
+        batches = []
+        usage_buffer = UsageBuffer(batches.append, flush_interval_ms=50, batch_size=4)
+        usage_buffer.start()
+        try:
+            for i in range(10):
+                assert usage_buffer.append(i) is True
+            
+            deadline = time.time() + 2
+            while sum(len(batch) for batch in batches) < 10 and time.time() < deadline:
+                time.sleep(0.01)
+            
+            assert [event for batch in batches for event in batch] == list(range(10))
+            assert max(len(batch) for batch in batches) <= 4
+            stats = usage_buffer.get_stats()
+            assert stats["persisted"] == 10
+            assert stats["pending"] == 0
+        finally:
+            usage_buffer.stop()
+    
+    def test_append_does_not_wait_for_persist(self):
+        """Test that a slow database does not slow down append()"""
+        release = threading.Event()
+        usage_buffer = UsageBuffer(lambda batch: release.wait(5), flush_interval_ms=0, batch_size=1)
+        usage_buffer.start()
+        try:
+            usage_buffer.append("first")
+            time.sleep(0.05)
+            
+            started = time.perf_counter()
+            for i in range(100):
+                usage_buffer.append(i)
+            assert time.perf_counter() - started < 0.5
+        finally:
+            release.set()
+            usage_buffer.stop()
+    
+    def test_drops_oldest_when_full(self):
+        """Test that a full buffer drops and counts its oldest events"""
+        batches = []
+        usage_buffer = UsageBuffer(batches.append, capacity=3)
+        results = [usage_buffer.append(i) for i in range(5)]
+        
+        assert results == [True, True, True, False, False]
+        assert usage_buffer.flush() == 3
+        assert batches == [[2, 3, 4]]
+        stats = usage_buffer.get_stats()
+        assert stats["recorded"] == 5
+        assert stats["dropped"] == 2
+        assert stats["high_water"] == 3
+    
+    def test_flush_and_stop(self):
+        """Test that flush() persists synchronously and stop() persists the rest"""
+        batches = []
+        usage_buffer = UsageBuffer(batches.append, flush_interval_ms=60000, batch_size=2)
+        usage_buffer.start()
+        
+        for i in range(3):
+            usage_buffer.append(i)
+        assert usage_buffer.flush() == 3
+        assert batches == [[0, 1], [2]]
+        
+        usage_buffer.append(3)
+        usage_buffer.stop()
+        assert not usage_buffer.running
+        assert batches[-1] == [3]
+        assert usage_buffer.get_stats()["batches"] == 3
+    
+    def test_failed_batch(self):
+        """Test that a failing batch is counted and later batches still persist"""
+        def persist(batch):
+            if "bad" in batch:
+                raise ValueError("bad event")
+        
+        usage_buffer = UsageBuffer(persist, batch_size=2)
+        for event in ["bad", "first", "second"]:
+            usage_buffer.append(event)
+        
+        assert usage_buffer.flush() == 1
+        stats = usage_buffer.get_stats()
+        assert stats["failed"] == 2
+        assert stats["persisted"] == 1
+    
+    def test_extend(self):
+        """Test that events buffered together are persisted in one batch and drops are counted"""
+        batches = []
+        usage_buffer = UsageBuffer(batches.append, capacity=4)
+        assert usage_buffer.extend([]) is True
+        assert usage_buffer.extend([1, 2, 3]) is True
+        assert usage_buffer.extend([4, 5]) is False
+        
+        assert usage_buffer.flush() == 4
+        assert batches == [[2, 3, 4, 5]]
+        stats = usage_buffer.get_stats()
+        assert stats["recorded"] == 5
+        assert stats["dropped"] == 1
@@ -0,0 +1,44 @@
+import csv
+import json
+import pytest
+from src.services.usage_export import EXPORT_COLUMNS, format_events, parse_cursor, parse_time
+
+def _events(count):
+    """Build exported events"""
+    return (
+        {column: None for column in EXPORT_COLUMNS} | {"id": i, "session_id": f"s{i}", "tool": "tool1", "timestamp": 1000.5 + i, "api_calls": 1}
+        for i in range(count)
+    )
+
+class TestUsageExport:
+    """Test suite for usage export formatting"""
+    
+    def test_ndjson(self):
+        """Test that events become one JSON object per line, in chunks"""
+        chunks = list(format_events(_events(5), "ndjson", chunk_size=2))
+        assert len(chunks) == 3
+        lines = "".join(chunks).splitlines()
+        assert [json.loads(line)["session_id"] for line in lines] == ["s0", "s1", "s2", "s3", "s4"]
+        assert list(format_events(_events(0), "ndjson")) == []
+    
+    def test_csv(self):
+        """Test that CSV output has a header row and one row per event"""
+        rows = list(csv.reader("".join(format_events(_events(3), "csv")).splitlines()))
+        assert rows[0] == list(EXPORT_COLUMNS)
+        assert rows[1][:5] == ["0", "s0", "tool1", "1000.5", "1"]
+        assert len(rows) == 4
+        
+        with pytest.raises(ValueError):
+            list(format_events(_events(1), "xml"))
+    
+    def test_parse(self):
+        """Test parsing of range bounds and resume cursors"""
+        assert parse_time("1760659200") == 1760659200.0
+        assert parse_time("2026-10-17") == 1792195200.0
+        assert parse_time("2026-10-17T02:00:00+02:00") == 1792195200.0
+        assert parse_cursor("1792195200.25,42") == (1792195200.25, 42)
+        
+        with pytest.raises(ValueError):
+            parse_time("yesterday")
+        with pytest.raises(ValueError):
+            parse_cursor("42")
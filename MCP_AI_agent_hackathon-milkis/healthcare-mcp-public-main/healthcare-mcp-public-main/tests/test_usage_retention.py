@@ -0,0 +1,56 @@
+import time
+from src.services.usage_retention import UsageRetentionJob
+
+class TestUsageRetentionJob:
+    """Test suite for UsageRetentionJob class"""
+    
+    def test_run_now(self):
+        """Test that a run passes its step budget and accumulates the removed counts"""
+        budgets = []
+        
+        def run(max_steps):
+            budgets.append(max_steps)
+            return {"partitions_dropped": 1, "rows_removed": 10, "pages_vacuumed": 5, "done": True}
+        
+        job = UsageRetentionJob(run, max_steps=7)
+        job.run_now()
+        job.run_now()
+        
+        assert budgets == [7, 7]
+        stats = job.get_stats()
+        assert stats["runs"] == 2
+        assert stats["partitions_dropped"] == 2
+        assert stats["rows_removed"] == 20
+        assert stats["pages_vacuumed"] == 10
+        assert stats["backlog"] is False
+    
+    def test_failed_run(self):
+        """Test that a failing run is counted instead of stopping the job"""
+        def run(max_steps):
+            raise RuntimeError("database is locked")
+        
+        job = UsageRetentionJob(run)
+        assert job.run_now() == {"error": "database is locked"}
+        assert job.get_stats()["errors"] == 1
+    
+    def test_backlog_runs_again_soon(self):
+        """Test that the worker keeps running while a run ends with work left"""
+        results = [{"rows_removed": 5, "done": False}, {"rows_removed": 2, "done": True}]
+        calls = []
+        
+        def run(max_steps):
+            calls.append(max_steps)
+            return results[min(len(calls), len(results)) - 1]
+        
+        job = UsageRetentionJob(run, interval=0.05)
+        job.BACKLOG_PAUSE_SECONDS = 0.01
+        job.start()
+        try:
+            deadline = time.time() + 2
+            while len(calls) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            job.stop()
+        
+        assert not job.running
+        assert job.get_stats()["rows_removed"] >= 7
@@ -3,8 +3,12 @@ import os
 import time
 import tempfile
 import sqlite3
-from datetime import datetime
-from src.services.usage_service import UsageService
+from datetime import datetime, timezone
+from src.services.usage_service import RETENTION_ROLLUP_DELETES, UsageService
+
+def _event(session_id, tool, timestamp, api_calls=1):
+    """Build a raw usage event without per-call details"""
+    return (session_id, tool, timestamp, api_calls, None, None, None, None, None)
 
 class TestUsageService:
     """Test suite for UsageService class"""
@@ -22,16 +26,13 @@ class TestUsageService:
         conn = sqlite3.connect(usage_service.db_path)
         cursor = conn.cursor()
         
-        # Check if usage table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='usage'")
-        assert cursor.fetchone() is not None
-        
-        # Check if indexes exist
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_session_timestamp'")
+        # Check if the partition registry and the usage view over the partitions exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='usage_partitions'")
         assert cursor.fetchone() is not None
         
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_tool'")
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='view' AND name='usage'")
         assert cursor.fetchone() is not None
+        assert cursor.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 0
         
         conn.close()
     
@@ -127,22 +128,19 @@ class TestUsageService:
         usage_service.record_usage("session1", "tool1", 1)
         
         # Manually insert old data
-        conn = usage_service._get_connection()
-        cursor = conn.cursor()
-        
-        # Insert data from 400 days ago
-        old_timestamp = time.time() - (400 * 86400)
-        cursor.execute(
-            "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
-            ("old_session", "old_tool", old_timestamp, 5)
-        )
-        conn.commit()
+        with usage_service._get_pool().writer() as conn:
+            # Insert data from 400 days ago
+            old_timestamp = time.time() - (400 * 86400)
+            usage_service._insert_events(conn, [_event("old_session", "old_tool", old_timestamp, 5)])
+            conn.commit()
         
         # Clean up data older than 365 days
         deleted = usage_service.cleanup_old_data(365)
         assert deleted == 1
         
         # Verify old data is gone
+        conn = sqlite3.connect(usage_service.db_path)
+        cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM usage WHERE session_id = 'old_session'")
         count = cursor.fetchone()[0]
         assert count == 0
@@ -150,4 +148,322 @@ class TestUsageService:
         # Verify recent data is still there
         cursor.execute("SELECT COUNT(*) FROM usage WHERE session_id = 'session1'")
         count = cursor.fetchone()[0]
-        assert count == 1
\ No newline at end of file
+        assert count == 1
+        conn.close()
+    
+    def test_buffered_usage(self, usage_service):
+        """Test that usage events are buffered and visible to readers"""
+        usage_service._get_buffer().flush_interval = 60
+        usage_service.record_usage("queued_session", "tool1", 2)
+        
+        # Not persisted yet, but readers flush before querying
+        conn = sqlite3.connect(usage_service.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 0
+        assert usage_service.get_monthly_usage("queued_session")["total_api_calls"] == 2
+        assert conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 1
+        conn.close()
+        
+        stats = UsageService.get_buffer_stats()[usage_service.db_path]
+        assert stats["persisted"] == 1
+        assert stats["dropped"] == 0
+    
+    def test_rollups(self, usage_service):
+        """Test that flushed events update the hourly, daily and monthly rollups"""
+        usage_service.record_usage("session1", "tool1", 1)
+        usage_service.record_usage("session1", "tool1", 2)
+        usage_service.record_usage("session2", "tool2", 4)
+        usage_service.flush()
+        
+        conn = sqlite3.connect(usage_service.db_path)
+        assert conn.execute(
+            "SELECT api_calls, events FROM usage_daily WHERE session_id = 'session1' AND tool = 'tool1'"
+        ).fetchone() == (3, 2)
+        assert conn.execute("SELECT SUM(api_calls) FROM usage_hourly").fetchone()[0] == 7
+        assert conn.execute("SELECT SUM(api_calls) FROM usage_monthly").fetchone()[0] == 7
+        assert conn.execute("SELECT value FROM usage_counters WHERE name = 'sessions'").fetchone()[0] == 2
+        conn.close()
+        
+        # A known session does not add to the distinct count again
+        usage_service.record_usage("session1", "tool2", 1)
+        assert usage_service.get_usage_stats()["total_unique_sessions"] == 2
+        
+        hourly = usage_service.get_hourly_usage("session1")["hourly_usage"]
+        assert list(hourly.values()) == [{"tool1": 3, "tool2": 1}]
+    
+    def test_rollups_backfilled(self, usage_service):
+        """Test that raw rows written before the rollups existed are rolled up on startup"""
+        old_timestamp = time.time() - 40 * 86400
+        with usage_service._get_pool().writer() as conn:
+            usage_service._insert_events(conn, [_event("old_session", "tool1", old_timestamp, 5)])
+            conn.execute("DELETE FROM usage_counters")
+            conn.commit()
+        
+        service = UsageService(db_path=usage_service.db_path)
+        stats = service.get_usage_stats()
+        assert stats["total_api_calls"] == 5
+        assert stats["total_unique_sessions"] == 1
+        
+        old_date = datetime.fromtimestamp(old_timestamp, timezone.utc)
+        usage = service.get_monthly_usage("old_session", old_date.month, old_date.year)
+        assert usage["daily_usage"] == {old_date.strftime("%Y-%m-%d"): 5}
+    
+    def test_call_details(self, usage_service):
+        """Test that per-call details are stored and summarized per tool"""
+        for latency_ms, outcome in [(3, "hit")] * 8 + [(400, "miss"), (2000, "miss")]:
+            usage_service.record_usage(
+                "session1", "fda_drug_lookup", latency_ms=latency_ms,
+                upstream_ms=latency_ms - 1 if outcome == "miss" else None,
+                response_bytes=1000 if outcome == "miss" else None, cache_outcome=outcome,
+                http_status=200 if outcome == "miss" else None
+            )
+        usage_service.record_usage("session1", "get_usage_stats", latency_ms=1)
+        usage_service.flush()
+        
+        conn = sqlite3.connect(usage_service.db_path)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM usage WHERE cache_outcome = 'miss' AND http_status = 200"
+        ).fetchone()[0] == 2
+        conn.close()
+        
+        analytics = usage_service.get_usage_analytics(hours=1)
+        fda = analytics["tools"]["fda_drug_lookup"]
+        assert fda["calls"] == 10
+        assert fda["latency"]["p50_ms"] == 5
+        assert fda["latency"]["p95_ms"] == 2000
+        assert fda["upstream_latency"]["count"] == 2
+        assert fda["response_bytes"] == {"total": 2000, "avg": 1000.0}
+        assert fda["cache"]["hit_ratio"] == 0.8
+        assert fda["http_statuses"] == {"200": 2}
+        assert analytics["total"]["calls"] == 11
+        
+        # Later batches merge into the stored hourly histograms
+        usage_service.record_usage("session2", "fda_drug_lookup", latency_ms=20, cache_outcome="hit")
+        fda = usage_service.get_usage_analytics(hours=1, tool="fda_drug_lookup")["tools"]["fda_drug_lookup"]
+        assert fda["calls"] == 11
+        assert fda["latency"]["count"] == 11
+        assert list(usage_service.get_usage_analytics(tool="pubmed_search")["tools"]) == []
+    
+    def test_call_columns_added(self):
+        """Test that usage tables created before the per-call columns are migrated"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute(
+                "CREATE TABLE usage (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "tool TEXT NOT NULL, timestamp REAL NOT NULL, api_calls INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.execute(
+                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES ('old', 'pubmed_search', ?, 1)",
+                (time.time(),)
+            )
+            conn.commit()
+            conn.close()
+            
+            service = UsageService(db_path=temp_db.name)
+            service.record_usage("new", "pubmed_search", latency_ms=50, cache_outcome="miss")
+            pubmed = service.get_usage_analytics(hours=1)["tools"]["pubmed_search"]
+            assert pubmed["calls"] == 2
+            assert pubmed["latency"]["count"] == 1
+    
+    def test_partitions(self, usage_service):
+        """Test that events go to monthly partitions and range queries only touch overlapping ones"""
+        now = time.time()
+        with usage_service._get_pool().writer() as conn:
+            usage_service._insert_events(conn, [
+                _event("session1", "tool1", now - 100 * 86400),
+                _event("session1", "tool1", now - 100 * 86400),
+                _event("session1", "tool1", now)
+            ])
+            conn.commit()
+            
+            old_name = usage_service._partition_for(now - 100 * 86400)[0]
+            current_name = usage_service._partition_for(now)[0]
+            assert usage_service._partitions(conn) == [old_name, current_name]
+            assert usage_service._partitions(conn, start=now - 3600) == [current_name]
+            assert usage_service._partitions(conn, end=now - 90 * 86400) == [old_name]
+            assert conn.execute(f"SELECT rows FROM usage_partitions WHERE name = '{old_name}'").fetchone()[0] == 2
+            assert conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 3
+    
+    def test_retention_steps(self, usage_service):
+        """Test that retention drops expired partitions and trims the current one in bounded steps"""
+        usage_service.retention_batch_size = 2
+        now = time.time()
+        cutoff_start = usage_service._partition_for(now - 40 * 86400)[1]
+        with usage_service._get_pool().writer() as conn:
+            usage_service._insert_events(conn, [_event("old", "tool1", now - 200 * 86400)] * 3)
+            # Five events in the partition containing the cutoff, all older than it
+            usage_service._insert_events(conn, [_event("trimmed", "tool1", cutoff_start + 1)] * 5)
+            usage_service._insert_events(conn, [_event("kept", "tool1", now)])
+            conn.commit()
+        
+        first = usage_service.enforce_retention(max_steps=1, days=30)
+        assert first == {"partitions_dropped": 1, "rows_removed": 3, "rollup_rows_removed": 0,
+                         "pages_vacuumed": 0, "done": False}
+        
+        rest = usage_service.enforce_retention(days=30)
+        assert rest["done"] is True
+        assert rest["rows_removed"] == 5
+        assert rest["pages_vacuumed"] > 0
+        
+        conn = sqlite3.connect(usage_service.db_path)
+        sessions = {row[0] for row in conn.execute("SELECT DISTINCT session_id FROM usage")}
+        assert sessions == {"kept"}
+        
+        # New databases use incremental auto-vacuum, so freed pages can be returned in steps
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        conn.close()
+        assert usage_service.enforce_retention(days=30)["rows_removed"] == 0
+        
+        # Rollup batches search an index for their expired range instead of scanning the table
+        with usage_service._get_pool().reader() as conn:
+            for sql in RETENTION_ROLLUP_DELETES:
+                plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (0, 2))]
+                assert not any(step.startswith("SCAN") for step in plan), plan
+    
+    def test_legacy_table_partitioned(self):
+        """Test that a usage table from before partitioning becomes a partition and can expire"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute(
+                "CREATE TABLE usage (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "tool TEXT NOT NULL, timestamp REAL NOT NULL, api_calls INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.executemany(
+                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, 'tool1', ?, 1)",
+                [("old", time.time() - 400 * 86400), ("recent", time.time() - 60)]
+            )
+            conn.commit()
+            conn.close()
+            
+            service = UsageService(db_path=temp_db.name)
+            service.record_usage("new", "tool1")
+            assert service.get_usage_stats()["total_api_calls"] == 3
+            
+            assert service.cleanup_old_data(365) == 1
+            conn = sqlite3.connect(temp_db.name)
+            assert {row[0] for row in conn.execute("SELECT session_id FROM usage")} == {"recent", "new"}
+            conn.close()
+    
+    def test_usage_stats_window(self, usage_service):
+        """Test exact calls and distinct sessions over recent days"""
+        old = time.time() - 10 * 86400
+        usage_service._persist([_event("old", "tool1", old, 5), _event("shared", "tool1", old)])
+        usage_service.record_usage("shared", "tool1", 2)
+        usage_service.record_usage("new", "tool2", 1)
+        
+        stats = usage_service.get_usage_stats(days=7)
+        assert stats["total_api_calls"] == 9
+        assert stats["window"]["total_api_calls"] == 3
+        assert stats["window"]["unique_sessions"] == 2
+        assert stats["window"]["tool_usage"] == {"tool1": 2, "tool2": 1}
+        assert "window" not in usage_service.get_usage_stats()
+        
+        # Window reads search the day index rather than scanning the whole table
+        with usage_service._get_pool().reader() as conn:
+            for sql in ("SELECT tool, SUM(api_calls) FROM usage_daily WHERE day >= ? GROUP BY tool",
+                        "SELECT COUNT(DISTINCT session_id) FROM usage_daily WHERE day >= ?"):
+                plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ("2026-01-01",)))
+                assert "USING COVERING INDEX idx_usage_daily_day" in plan
+    
+    async def test_approximate_usage_stats(self, usage_service):
+        """Test sketch estimates, their checkpoint and their restore after a restart"""
+        for i in range(500):
+            usage_service.record_usage(f"session{i % 200}", "fda_drug_lookup", subject="Aspirin" if i % 2 else f"drug{i}")
+        usage_service.record_usage("session0", "clinical_trials_search", subject="Diabetes")
+        
+        stats = usage_service.get_approximate_usage_stats(days=7, limit=3)
+        assert stats["mode"] == "approximate"
+        assert stats["window"]["days"] == 7
+        assert stats["total_api_calls"] == 501
+        low, high = stats["error_bounds"]["unique_sessions"]["interval_95"]
+        assert low <= 200 <= high
+        assert abs(stats["unique_sessions"] - 200) <= 200 * 0.05
+        assert stats["top_tools"][0] == {"value": "fda_drug_lookup", "count": 500, "error": 0}
+        assert stats["top_drugs"][0]["value"] == "aspirin"
+        assert abs(stats["top_drugs"][0]["count"] - 250) <= stats["top_drugs"][0]["error"]
+        assert stats["top_conditions"] == [{"value": "diabetes", "count": 1, "error": 0}]
+        
+        # Closing checkpoints the sketches; a new service restores them
+        await usage_service.close()
+        conn = sqlite3.connect(usage_service.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM usage_sketches").fetchone()[0] == 1
+        conn.close()
+        
+        restored = UsageService(db_path=usage_service.db_path)
+        assert restored.get_approximate_usage_stats(days=1, limit=3) == {**stats, "window": {**stats["window"], "days": 1, "start": stats["window"]["end"]}}
+        await restored.close()
+    
+    async def test_sketches_seeded_from_rollups(self, usage_service):
+        """Test that a database without sketch checkpoints seeds them from the daily rollups"""
+        usage_service._persist([_event(f"session{i}", "tool1", time.time() - 86400, 2) for i in range(50)])
+        
+        stats = usage_service.get_approximate_usage_stats(days=2)
+        assert stats["total_api_calls"] == 100
+        assert stats["unique_sessions"] == 50
+        assert stats["top_tools"] == [{"value": "tool1", "count": 100, "error": 0}]
+        assert stats["top_drugs"] == []
+        assert usage_service.get_approximate_usage_stats(days=1)["total_api_calls"] == 0
+        await usage_service.close()
+    
+    def test_export_usage(self, usage_service):
+        """Test keyset-paged export across partitions with filters and resume"""
+        now = time.time()
+        events = [_event(f"s{i}", "tool1" if i % 3 else "tool2", now - i * 20 * 86400) for i in range(10)]
+        usage_service._persist(events)
+        usage_service.record_usage("latest", "tool1")
+        
+        exported = list(usage_service.export_usage(page_size=2))
+        assert [event["session_id"] for event in exported] == [f"s{i}" for i in range(9, -1, -1)] + ["latest"]
+        assert set(exported[0]) == {"id", "session_id", "tool", "timestamp", "api_calls", "latency_ms",
+                                    "upstream_ms", "response_bytes", "cache_outcome", "http_status"}
+        
+        window = list(usage_service.export_usage(start=now - 100 * 86400, end=now - 20 * 86400, tool="tool1", page_size=1))
+        assert [event["session_id"] for event in window] == ["s5", "s4", "s2"]
+        
+        # Resuming after the fourth event continues with the fifth
+        cursor = (exported[3]["timestamp"], exported[3]["id"])
+        assert list(usage_service.export_usage(after=cursor, page_size=3)) == exported[4:]
+    
+    def test_export_legacy_partition(self):
+        """Test that the legacy partition is merged by timestamp with the monthly ones it overlaps"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute(
+                "CREATE TABLE usage (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "tool TEXT NOT NULL, timestamp REAL NOT NULL, api_calls INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.executemany(
+                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, 'tool1', ?, 1)",
+                [("legacy1", time.time() - 3), ("legacy2", time.time() - 1)]
+            )
+            conn.commit()
+            conn.close()
+            
+            service = UsageService(db_path=temp_db.name)
+            service._persist([_event("new1", "tool1", time.time() - 2), _event("new2", "tool1", time.time())])
+            exported = [event["session_id"] for event in service.export_usage(end=time.time() + 1, page_size=1)]
+            assert exported == ["legacy1", "new1", "legacy2", "new2"]
+    
+    def test_get_recent_calls(self, usage_service):
+        """Test persisted calls per session, tool and hour used for quota reconciliation"""
+        hour = int(time.time() // 3600) * 3600
+        usage_service._persist([
+            _event("s1", "tool1", hour + 1, 5), _event("s1", "tool1", hour + 2), _event("s2", "tool1", hour - 7200)
+        ])
+        assert usage_service.get_recent_calls(hour) == [("s1", "tool1", hour, 2)]
+        assert len(usage_service.get_recent_calls(hour - 7200)) == 2
+    
+    def test_record_usages(self, usage_service):
+        """Test that the usage of several calls is recorded in one buffer write"""
+        recorded = usage_service.record_usages([
+            {"session_id": "s1", "tool": "fda_drug_lookup", "latency_ms": 12.5, "cache_outcome": "hit", "subject": "Aspirin"},
+            {"session_id": "s1", "tool": "pubmed_search", "http_status": 200},
+            {"session_id": "", "tool": "pubmed_search"}
+        ])
+        assert recorded == 2
+        
+        stats = usage_service.get_usage_stats()
+        assert stats["tool_usage"] == {"fda_drug_lookup": 1, "pubmed_search": 1}
+        analytics = usage_service.get_usage_analytics(hours=1)
+        assert analytics["tools"]["fda_drug_lookup"]["cache"]["hit"] == 1
+        assert analytics["tools"]["pubmed_search"]["http_statuses"] == {"200": 1}
+        assert usage_service.get_approximate_usage_stats(days=1)["top_drugs"][0]["value"] == "aspirin"
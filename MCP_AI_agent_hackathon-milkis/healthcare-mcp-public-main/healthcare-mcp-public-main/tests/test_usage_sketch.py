@@ -0,0 +1,120 @@
+import time
+import pytest
+from src.services.usage_sketch import HyperLogLog, SpaceSaving, UsageSketches, top_values
+
+class TestHyperLogLog:
+    """Test suite for HyperLogLog class"""
+    
+    def test_count(self):
+        """Test that estimates stay within three standard errors"""
+        sketch = HyperLogLog()
+        for i in range(20000):
+            sketch.add(f"session{i}")
+            sketch.add(f"session{i}")
+        assert abs(sketch.count() - 20000) <= 20000 * 3 * sketch.standard_error
+        
+        # Small counts use linear counting and are close to exact
+        small = HyperLogLog()
+        for i in range(100):
+            small.add(f"session{i}")
+        assert abs(small.count() - 100) <= 2
+        assert HyperLogLog().count() == 0
+    
+    def test_merge(self):
+        """Test that merged sketches estimate the union"""
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            first.add(f"session{i}")
+        for i in range(2000, 5000):
+            second.add(f"session{i}")
+        first.merge(second)
+        assert abs(first.count() - 5000) <= 5000 * 3 * first.standard_error
+        
+        restored = HyperLogLog(registers=first.to_bytes())
+        assert restored.count() == first.count()
+        
+        with pytest.raises(ValueError):
+            first.merge(HyperLogLog(precision=10))
+
+class TestSpaceSaving:
+    """Test suite for SpaceSaving class and top_values"""
+    
+    def test_counts_within_error(self):
+        """Test that frequent values are kept and every count is within its error"""
+        summary = SpaceSaving(capacity=10)
+        exact = {}
+        for i in range(1000):
+            value = "aspirin" if i % 3 == 0 else f"drug{i % 50}"
+            summary.add(value)
+            exact[value] = exact.get(value, 0) + 1
+        
+        assert summary.total == 1000
+        assert "aspirin" in summary.counters
+        for value, (count, error) in summary.counters.items():
+            assert count - error <= exact[value] <= count
+            assert error <= summary.total // summary.capacity
+        
+        restored = SpaceSaving.from_state(summary.state(), capacity=10)
+        assert restored.counters == summary.counters
+    
+    def test_top_values(self):
+        """Test that daily summaries combine into window counts with bounded error"""
+        first, second = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+        for value in ["aspirin"] * 5 + ["ibuprofen"] * 3:
+            first.add(value)
+        for value in ["aspirin"] * 4 + ["ibuprofen", "sertraline", "sertraline"]:
+            second.add(value)
+        
+        top = top_values([first, second], limit=2)
+        assert top[0] == {"value": "aspirin", "count": 9, "error": 0}
+        
+        # ibuprofen lost its counter on the second day, where it could have had up to that day's floor
+        assert top[1]["value"] == "ibuprofen"
+        assert top[1]["count"] == 3
+        assert top[1]["count"] - top[1]["error"] <= 4 <= top[1]["count"] + top[1]["error"]
+
+class TestUsageSketches:
+    """Test suite for UsageSketches class"""
+    
+    def test_query_and_checkpoint(self):
+        """Test window queries, checkpoints of changed days and expiry of old days"""
+        saved = []
+        sketches = UsageSketches(lambda states, first_kept: saved.append((states, first_kept)), keep_days=30)
+        now = time.time()
+        sketches.add("session1", "fda_drug_lookup", now, subject=" Aspirin ")
+        sketches.add("session2", "pubmed_search", now - 86400, api_calls=3)
+        sketches.add("session3", "pubmed_search", now - 40 * 86400)
+        
+        stats = sketches.query(days=1)
+        assert stats["total_api_calls"] == 1
+        assert stats["unique_sessions"] == 1
+        assert stats["top_drugs"] == [{"value": "aspirin", "count": 1, "error": 0}]
+        assert sketches.query(days=2)["top_tools"][0] == {"value": "pubmed_search", "count": 3, "error": 0}
+        assert sketches.query(days=400)["window"]["days"] == 30
+        
+        assert sketches.checkpoint() == 2
+        states, first_kept = saved[-1]
+        assert len(states) == 2
+        assert first_kept == sketches.first_kept_day()
+        assert sketches.get_stats()["days"] == 2
+        
+        # Nothing changed since the last checkpoint
+        assert sketches.checkpoint() == 0
+        
+        restored = UsageSketches(lambda states, first_kept: None, keep_days=30)
+        restored.restore(states)
+        assert restored.query(days=2) == sketches.query(days=2)
+    
+    def test_failed_checkpoint(self):
+        """Test that days of a failed checkpoint are written by the next one"""
+        def save(states, first_kept):
+            raise RuntimeError("database is locked")
+        
+        sketches = UsageSketches(save)
+        sketches.add("session1", "tool1")
+        assert sketches.checkpoint() == 0
+        assert sketches.get_stats()["failed_checkpoints"] == 1
+        assert sketches.get_stats()["dirty_days"] == 1
+        
+        sketches.save = lambda states, first_kept: None
+        assert sketches.checkpoint() == 1
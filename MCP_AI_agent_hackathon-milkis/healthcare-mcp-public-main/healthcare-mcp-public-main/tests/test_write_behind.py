@@ -0,0 +1,82 @@
+import pytest
+import time
+import sqlite3
+import tempfile
+from src.services.write_behind import WriteBehindQueue
+
+INSERT_SQL = "INSERT INTO items (name) VALUES (?)"
+
+class TestWriteBehindQueue:
+    """Test suite for WriteBehindQueue class"""
+    
+    @pytest.fixture
+    def conn(self):
+        """Create a database with an empty items table"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name, check_same_thread=False)
+            conn.execute("CREATE TABLE items (name TEXT PRIMARY KEY)")
+            conn.commit()
+            yield conn
+            conn.close()
+    
+    def _count(self, conn):
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    
+    def test_group_commit(self, conn):
+        """Test that queued writes are committed together by the worker"""
+        write_queue = WriteBehindQueue(lambda: conn, flush_interval_ms=50)
+        write_queue.start()
+        try:
+            for i in range(10):
+                write_queue.enqueue(INSERT_SQL, (f"item_{i}",))
+            
+            deadline = time.time() + 2
+            while write_queue.pending_count() and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            
+            assert self._count(conn) == 10
+            stats = write_queue.get_stats()
+            assert stats["flushed_writes"] == 10
+            assert stats["commits"] < 10
+        finally:
+            write_queue.stop()
+    
+    def test_flush_and_stop(self, conn):
+        """Test that flush() commits synchronously and stop() commits the rest"""
+        flushed = []
+        write_queue = WriteBehindQueue(
+            lambda: conn, flush_interval_ms=60000, on_flush=lambda batch, ok: flushed.append((len(batch), ok))
+        )
+        write_queue.start()
+        
+        write_queue.enqueue(INSERT_SQL, ("first",))
+        assert write_queue.flush() == 1
+        assert self._count(conn) == 1
+        
+        write_queue.enqueue(INSERT_SQL, ("second",))
+        write_queue.stop()
+        assert not write_queue.running
+        assert self._count(conn) == 2
+        assert flushed == [(1, True), (1, True)]
+    
+    def test_failed_batch(self, conn):
+        """Test that a failing batch is rolled back and reported"""
+        flushed = []
+        write_queue = WriteBehindQueue(lambda: conn, on_flush=lambda batch, ok: flushed.append(ok))
+        write_queue.enqueue(INSERT_SQL, ("duplicate",))
+        write_queue.enqueue(INSERT_SQL, ("duplicate",))
+        
+        assert write_queue.flush() == 0
+        assert self._count(conn) == 0
+        assert flushed == [False]
+        assert write_queue.get_stats()["failed_writes"] == 2
+    
+    def test_backpressure(self, conn):
+        """Test that enqueue() commits inline once max_pending writes are waiting"""
+        write_queue = WriteBehindQueue(lambda: conn, flush_interval_ms=60000, max_pending=3)
+        for i in range(3):
+            write_queue.enqueue(INSERT_SQL, (f"item_{i}",))
+        
+        assert self._count(conn) == 3
+        assert write_queue.get_stats()["inline_flushes"] == 1
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import sys
+import os
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export raw Healthcare MCP usage events as NDJSON or CSV")
+    parser.add_argument("--start", help="Start of the range, inclusive: epoch seconds or ISO 8601 (UTC unless an offset is given)")
+    parser.add_argument("--end", help="End of the range, exclusive; defaults to now")
+    parser.add_argument("--tool", help="Only export events of this tool, e.g. fda_drug_lookup")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="Output format")
+    parser.add_argument("--after", help="Resume after this '<timestamp>,<id>' cursor, the last event already exported")
+    parser.add_argument("--page-size", type=int, default=1000, help="Events read per query")
+    parser.add_argument("--output", "-o", help="File to write; standard output if omitted")
+    parser.add_argument("--db", default=os.getenv("USAGE_DB_PATH", "healthcare_usage.db"),
+                        help="Usage database to export")
+    args = parser.parse_args()
+    
+    # UsageService reads its path from USAGE_DB_PATH first
+    os.environ["USAGE_DB_PATH"] = args.db
+    
+    from src.services.usage_service import UsageService
+    from src.services.usage_export import format_events, parse_cursor, parse_time
+    
+    try:
+        service = UsageService(db_path=args.db)
+        events = service.export_usage(
+            start=parse_time(args.start) if args.start else None,
+            end=parse_time(args.end) if args.end else None,
+            tool=args.tool,
+            after=parse_cursor(args.after) if args.after else None,
+            page_size=args.page_size
+        )
+        output = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            for chunk in format_events(events, args.format):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        asyncio.run(service.close())
+    except Exception as e:
+        print(f"Usage export failed: {str(e)}", file=sys.stderr)
+        sys.exit(1)